@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Kiwoom MCP Server - Backtest Runner
+
+Drives a strategy's tool calls through the server against historical daily
+bars, with orders executed by the paper broker on a simulated clock.
+
+Usage:
+    python backtest.py --data bars.csv --strategy my_strategy.py [--cash 100000000]
+
+The bars CSV needs date, stock_code (or code), open, high, low, close and
+optionally volume columns. The strategy module defines
+`async def on_bar(ctx)` (and optionally `setup(ctx)`), called at each day's
+open with history up to the previous close.
+"""
+
+import argparse
+import asyncio
+import csv
+import importlib.util
+import inspect
+import time
+from array import array
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import KiwoomConfig, ServerConfig, RiskConfig
+from engine.history import HistoricalBars
+from engine.order_book import STATUS_REJECTED
+from server import KiwoomMCPServer
+
+
+SESSION_OPEN = "0900"
+SESSION_CLOSE = "1530"
+
+
+class BacktestContext:
+    """What a strategy sees: tool calls, history up to the last close, and the account"""
+
+    def __init__(self, backtester: "Backtester"):
+        self._backtester = backtester
+        self.server = backtester.server
+        self.broker = backtester.server.paper_broker
+        self.date = ""
+        self.universe: List[str] = []
+        self.state: Dict[str, Any] = {}
+
+    async def call_tool(self, name: str, **arguments: Any) -> str:
+        """Call an MCP tool exactly as a client would; returns the response text"""
+        contents = await self.server.call_tool(name, arguments)
+        return "\n".join(content.text for content in contents)
+
+    async def buy(self, stock_code: str, quantity: int, price: Optional[int] = None) -> str:
+        """stock_buy_order shortcut (market order unless a limit price is given)"""
+        return await self.call_tool(
+            "stock_buy_order", stock_code=stock_code, quantity=quantity,
+            price=str(price) if price else "", trade_type="보통" if price else "시장가"
+        )
+
+    async def sell(self, stock_code: str, quantity: int, price: Optional[int] = None) -> str:
+        """stock_sell_order shortcut (market order unless a limit price is given)"""
+        return await self.call_tool(
+            "stock_sell_order", stock_code=stock_code, quantity=quantity,
+            price=str(price) if price else "", trade_type="보통" if price else "시장가"
+        )
+
+    def closes(self, stock_code: str, lookback: Optional[int] = None) -> array:
+        """Closes up to and including the previous session"""
+        bars = self._backtester.bars.symbols[stock_code]
+        end = self._backtester.rows.get(stock_code, 0)
+        start = max(0, end - lookback) if lookback else 0
+        return bars.close[start:end]
+
+    def open_price(self, stock_code: str) -> Optional[int]:
+        """Today's opening price"""
+        quote = self.server.market_data.get(stock_code)
+        return quote.price if quote else None
+
+    def position(self, stock_code: str) -> int:
+        """Held quantity"""
+        position = self.broker.positions.get(stock_code)
+        return position.quantity if position else 0
+
+    @property
+    def cash(self) -> int:
+        """Cash not reserved by open orders"""
+        return self.broker.cash - self.broker.reserved_cash
+
+
+@dataclass
+class BacktestReport:
+    """Backtest summary"""
+    start: str
+    end: str
+    days: int
+    bars: int
+    initial_cash: int
+    final_equity: float
+    max_drawdown_pct: float
+    traded_notional: int
+    turnover: float
+    orders: int
+    fills: int
+    rejected: int
+    elapsed_sec: float
+    realized_pnl: Dict[str, float]
+    equity_curve: List[Tuple[str, float]]
+
+    @property
+    def pnl(self) -> float:
+        return self.final_equity - self.initial_cash
+
+    @property
+    def return_pct(self) -> float:
+        return self.pnl / self.initial_cash * 100 if self.initial_cash else 0.0
+
+    def format(self) -> str:
+        """Human-readable summary"""
+        message = f"📈 백테스트 결과 ({self.start} ~ {self.end}, {self.days:,}일, {self.bars:,}개 봉)\n\n"
+        message += f"- 초기자금: {self.initial_cash:,}원\n"
+        message += f"- 최종평가: {self.final_equity:,.0f}원\n"
+        message += f"- 손익: {self.pnl:+,.0f}원 ({self.return_pct:+.2f}%)\n"
+        message += f"- 최대낙폭: {self.max_drawdown_pct:.2f}%\n"
+        message += f"- 거래대금: {self.traded_notional:,}원 (회전율 {self.turnover:.2f}배)\n"
+        message += f"- 주문: {self.orders:,}건 (거부 {self.rejected:,}건) / 체결: {self.fills:,}건\n"
+        message += f"- 실행시간: {self.elapsed_sec:.2f}초\n"
+
+        traded = sorted(self.realized_pnl.items(), key=lambda kv: kv[1])
+        if traded:
+            message += "\n종목별 실현손익 (하위/상위 5):\n"
+            for stock_code, pnl in traded[:5] + traded[-5:] if len(traded) > 10 else traded:
+                message += f"- {stock_code}: {pnl:+,.0f}원\n"
+        return message
+
+
+class Backtester:
+    """Step a strategy through historical bars against the paper broker
+
+    Each day: every symbol opens (its quote is the open price), the strategy
+    runs, then symbols with resting orders or armed triggers walk the bar
+    (open -> low/high -> close, in the bar's direction) so limits, stops
+    and triggers fill at the levels the day reached. Other symbols jump
+    straight to the close.
+    """
+
+    def __init__(
+        self,
+        bars: HistoricalBars,
+        strategy: Any,
+        initial_cash: int = 100_000_000,
+        risk_config: Optional[RiskConfig] = None,
+        quote_depth: Optional[int] = None
+    ):
+        self.bars = bars
+        self.strategy = strategy
+        self.initial_cash = initial_cash
+        self.rows: Dict[str, int] = {}
+        self._now = 0.0
+
+        kiwoom_config = KiwoomConfig(
+            access_token="backtest",
+            paper_trading=True,
+            paper_cash=initial_cash,
+            paper_quote_depth=quote_depth,
+            journal_path=None,
+            token_cache_path=None,
+            # Bars carry their own times; the wall-clock session check does not apply
+            session_policy="off"
+        )
+        # Cached results expire on wall-clock time, which does not move with the bars
+        server_config = ServerConfig(log_level="WARNING", audit_log_path=None, response_cache_entries=0)
+        self.server = KiwoomMCPServer(kiwoom_config, server_config, risk_config or RiskConfig())
+        self.broker = self.server.paper_broker
+        self.broker.reset(initial_cash)
+        self.broker.clock = lambda: self._now
+
+    @staticmethod
+    def _timestamp(date: str, hhmm: str) -> float:
+        return datetime.strptime(date + hhmm, "%Y%m%d%H%M").timestamp()
+
+    async def _call(self, name: str, ctx: BacktestContext) -> None:
+        hook = getattr(self.strategy, name, None)
+        if hook is None:
+            return
+        result = hook(ctx)
+        if inspect.isawaitable(result):
+            await result
+
+    async def run(self) -> BacktestReport:
+        """Run the strategy over every date in the data"""
+        started = time.perf_counter()
+        market_data = self.server.market_data
+        triggers = self.server.trigger_engine
+        broker = self.broker
+        symbols = self.bars.symbols
+
+        ctx = BacktestContext(self)
+        await self._call("setup", ctx)
+
+        equity_curve: List[Tuple[str, float]] = []
+        peak = float(self.initial_cash)
+        max_drawdown = 0.0
+
+        for date, day in zip(self.bars.calendar, self.bars.days):
+            self._now = self._timestamp(date, SESSION_OPEN)
+            for stock_code, row in day:
+                price = symbols[stock_code].open[row]
+                market_data.update_trade(stock_code, price, 0, price, price)
+
+            ctx.date = date
+            ctx.universe = [stock_code for stock_code, _ in day]
+            await self._call("on_bar", ctx)
+            await triggers.drain()
+
+            self._now = self._timestamp(date, SESSION_CLOSE)
+            for stock_code, row in day:
+                bars = symbols[stock_code]
+                close = bars.close[row]
+                book = broker.books.get(stock_code)
+                if (book is not None and book.has_resting()) or triggers.has_conditions(stock_code):
+                    low, high = bars.low[row], bars.high[row]
+                    path = (low, high) if close >= bars.open[row] else (high, low)
+                    for price in path:
+                        market_data.update_trade(stock_code, price, 0, price, price)
+                market_data.update_trade(stock_code, close, bars.volume[row], close, close)
+                self.rows[stock_code] = row + 1
+            await triggers.drain()
+
+            equity = broker.equity()
+            equity_curve.append((date, equity))
+            peak = max(peak, equity)
+            max_drawdown = max(max_drawdown, (peak - equity) / peak if peak else 0.0)
+
+        await self._call("teardown", ctx)
+
+        traded_notional = broker.fills.notional()
+        average_equity = sum(e for _, e in equity_curve) / len(equity_curve) if equity_curve else self.initial_cash
+        return BacktestReport(
+            start=self.bars.calendar[0] if self.bars.calendar else "",
+            end=self.bars.calendar[-1] if self.bars.calendar else "",
+            days=len(self.bars.calendar),
+            bars=len(self.bars),
+            initial_cash=self.initial_cash,
+            final_equity=broker.equity(),
+            max_drawdown_pct=max_drawdown * 100,
+            traded_notional=traded_notional,
+            turnover=traded_notional / average_equity if average_equity else 0.0,
+            orders=len(broker.orders),
+            fills=len(broker.fills),
+            rejected=sum(1 for order in broker.orders.values() if order.status == STATUS_REJECTED),
+            elapsed_sec=time.perf_counter() - started,
+            realized_pnl={
+                code: position.realized_pnl
+                for code, position in broker.positions.items() if position.realized_pnl
+            },
+            equity_curve=equity_curve
+        )
+
+
+def load_strategy(path: str) -> Any:
+    """Import a strategy module from a file path"""
+    spec = importlib.util.spec_from_file_location("backtest_strategy", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_report(data_path: str, strategy_path: str, cash: int = 100_000_000, quote_depth: Optional[int] = None) -> str:
+    """Run a backtest to completion and return the formatted report (analytics worker entry point)"""
+    backtester = Backtester(
+        HistoricalBars.from_csv(data_path),
+        load_strategy(strategy_path),
+        initial_cash=cash,
+        quote_depth=quote_depth
+    )
+    return asyncio.run(backtester.run()).format()
+
+
+async def main():
+    """Backtest entry point"""
+    parser = argparse.ArgumentParser(description="Backtest a strategy against historical bars")
+    parser.add_argument("--data", required=True, help="Bars CSV (date, stock_code, open, high, low, close, volume)")
+    parser.add_argument("--strategy", required=True, help="Strategy module defining on_bar(ctx)")
+    parser.add_argument("--cash", type=int, default=100_000_000, help="Initial cash")
+    parser.add_argument("--quote-depth", type=int, default=None, help="Shares available at the touch per update")
+    parser.add_argument("--equity-csv", help="Write the daily equity curve here")
+    args = parser.parse_args()
+
+    bars = HistoricalBars.from_csv(args.data)
+    backtester = Backtester(
+        bars,
+        load_strategy(args.strategy),
+        initial_cash=args.cash,
+        risk_config=RiskConfig.from_env(),
+        quote_depth=args.quote_depth
+    )
+    report = await backtester.run()
+    print(report.format())
+
+    if args.equity_csv:
+        with open(args.equity_csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["date", "equity"])
+            writer.writerows(report.equity_curve)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
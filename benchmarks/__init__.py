@@ -0,0 +1 @@
+"""Micro-benchmarks for Kiwoom MCP Server hot paths"""
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Per-message cost of models and JSON on the request/response path
+
+Compares the slotted models, FillLog and the active JSON codec against
+plain dataclasses, lists of records and the stdlib json module.
+
+Usage:
+    python -m benchmarks.codec_models [--count 100000]
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from engine.order_book import Fill, FillLog
+from models.types import OrderResponse
+from utils import json_codec
+
+
+ORDER_RESPONSE = (
+    '{"ord_no":"0000139","dmst_stex_tp":"KRX","return_code":0,'
+    '"return_msg":"매수주문이 완료되었습니다."}'
+)
+REAL_MESSAGE = json.dumps({
+    "trnm": "REAL",
+    "data": [{
+        "type": "0B",
+        "name": "주식체결",
+        "item": "005930",
+        "values": {
+            "20": "153005", "10": "+60700", "11": "+200", "12": "+0.33", "27": "+60700",
+            "28": "+60600", "15": "+12", "13": "11254783", "14": "682893", "16": "+60500",
+            "17": "+60900", "18": "+60400", "25": "2", "26": "-2210"
+        }
+    }]
+}, ensure_ascii=False)
+
+
+@dataclass
+class PlainOrderResponse:
+    """OrderResponse as it was before slots"""
+    success: bool
+    order_number: Optional[str] = None
+    message: Optional[str] = None
+    raw_response: Optional[Dict[str, Any]] = None
+    status_code: Optional[int] = None
+
+
+@dataclass
+class PlainFill:
+    """Fill as it was before slots"""
+    order_number: str
+    stock_code: str
+    is_buy: bool
+    quantity: int
+    price: int
+    filled_at: float
+
+
+def per_call(fn: Callable[[], Any], count: int) -> float:
+    """Microseconds per call"""
+    started = time.perf_counter()
+    for _ in range(count):
+        fn()
+    return (time.perf_counter() - started) / count * 1e6
+
+
+def retained(build: Callable[[int], Any], count: int) -> Tuple[float, Any]:
+    """Bytes per item still allocated after building `count` items"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build(count)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / count, kept
+
+
+def report(title: str, rows: List[Tuple[str, float, float]], unit: str) -> None:
+    print(f"\n{title}")
+    for name, baseline, current in rows:
+        change = (1 - current / baseline) * 100 if baseline else 0.0
+        print(f"  {name:<28} {baseline:10.2f} -> {current:10.2f} {unit}  ({change:.0f}% less)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--count", type=int, default=100_000, help="Messages per measurement")
+    args = parser.parse_args()
+    count = args.count
+
+    order_bytes = ORDER_RESPONSE.encode()
+    real_bytes = REAL_MESSAGE.encode()
+    decoded = json.loads(REAL_MESSAGE)
+    print(f"JSON codec: {json_codec.codec_name()} ({count:,} messages per measurement)")
+
+    report("CPU per message", [
+        (
+            "decode order response",
+            per_call(lambda: json.loads(order_bytes), count),
+            per_call(lambda: json_codec.loads(order_bytes), count)
+        ),
+        (
+            "decode realtime tick",
+            per_call(lambda: json.loads(real_bytes), count),
+            per_call(lambda: json_codec.loads(real_bytes), count)
+        ),
+        (
+            "encode realtime tick",
+            per_call(lambda: json.dumps(decoded, ensure_ascii=False), count),
+            per_call(lambda: json_codec.dumps(decoded), count)
+        ),
+        (
+            "build order response",
+            per_call(lambda: PlainOrderResponse(True, "0000139", "완료", None, 200), count),
+            per_call(lambda: OrderResponse(True, "0000139", "완료", None, 200), count)
+        ),
+    ], "us")
+
+    def plain_fills(n: int) -> List[PlainFill]:
+        return [PlainFill("0000139", "005930", True, 10, 60700 + i, 1.7e9 + i) for i in range(n)]
+
+    def slotted_fills(n: int) -> List[Fill]:
+        return [Fill("0000139", "005930", True, 10, 60700 + i, 1.7e9 + i) for i in range(n)]
+
+    def fill_log(n: int) -> FillLog:
+        log = FillLog()
+        for i in range(n):
+            log.append(Fill("0000139", "005930", True, 10, 60700 + i, 1.7e9 + i))
+        return log
+
+    def plain_responses(n: int) -> List[PlainOrderResponse]:
+        return [PlainOrderResponse(True, str(i), "완료", None, 200) for i in range(n)]
+
+    def slotted_responses(n: int) -> List[OrderResponse]:
+        return [OrderResponse(True, str(i), "완료", None, 200) for i in range(n)]
+
+    plain_fill_bytes, _ = retained(plain_fills, count)
+    slotted_fill_bytes, _ = retained(slotted_fills, count)
+    log_bytes, _ = retained(fill_log, count)
+    plain_response_bytes, _ = retained(plain_responses, count)
+    slotted_response_bytes, _ = retained(slotted_responses, count)
+
+    report("Memory retained per record", [
+        ("order response (slots)", plain_response_bytes, slotted_response_bytes),
+        ("fill (slots)", plain_fill_bytes, slotted_fill_bytes),
+        ("fill (FillLog columns)", plain_fill_bytes, log_bytes),
+    ], "B ")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,20 +5,40 @@ Constants for Kiwoom MCP Server
 # API Hosts
 KIWOOM_REAL_HOST = "https://api.kiwoom.com"
 KIWOOM_MOCK_HOST = "https://mockapi.kiwoom.com"
+KIWOOM_REAL_WS_HOST = "wss://api.kiwoom.com:10000"
+KIWOOM_MOCK_WS_HOST = "wss://mockapi.kiwoom.com:10000"
 
 # API Endpoints
 ENDPOINTS = {
     "TOKEN": "/oauth2/token",
     "STOCK_ORDER": "/api/dostk/ordr",
+    "ACCOUNT": "/api/dostk/acnt",
+    "STOCK_INFO": "/api/dostk/stkinfo",
+    "WEBSOCKET": "/api/dostk/websocket",
 }
 
 # Exchange Types
 EXCHANGE_TYPES = {
     "KRX": "KRX",
     "KOSDAQ": "NXT", 
-    "SOR": "SOR"
+    "NXT": "NXT",
+    "SOR": "SOR",
+    # Routed locally into KRX/NXT legs before sending (never sent as is)
+    "AUTO": "AUTO"
 }
 
+# Local smart order routing
+ROUTE_AUTO = "AUTO"
+ROUTE_VENUES = ("KRX", "NXT")
+# Real-time items for NXT quotes carry this suffix; KRX items are the bare code
+NXT_ITEM_SUFFIX = "_NX"
+# Top of book older than this is ignored when routing
+ROUTE_QUOTE_MAX_AGE_SEC = 2.0
+# Trade types that may be routed to NXT; others always go to KRX
+NXT_TRADE_TYPES = {"보통", "시장가", "최유리지정가", "최우선지정가", "보통IOC", "보통FOK", "시장가IOC", "시장가FOK"}
+# Trade types whose price is a limit the routed venue's quote must meet
+LIMIT_TRADE_TYPES = {"보통", "보통IOC", "보통FOK"}
+
 # Trade Types
 TRADE_TYPES = {
     "보통": "0",
@@ -45,5 +65,222 @@ TRADE_TYPES = {
 API_IDS = {
     "TOKEN": "au10001",
     "BUY_ORDER": "kt10000",
-    "SELL_ORDER": "kt10001"
-} 
\ No newline at end of file
+    "SELL_ORDER": "kt10001",
+    "ORDER_HISTORY": "kt00007",
+    "HOLDINGS": "kt00018",
+    "STOCK_INFO": "ka10001",
+    "SYMBOL_LIST": "ka10099"
+}
+
+# Continuation pages read per paged query before the result is reported incomplete
+MAX_CONTINUATION_PAGES = 50
+
+# Market codes for the symbol list (ka10099)
+SYMBOL_MARKETS = {
+    "KOSPI": "0",
+    "KOSDAQ": "10"
+}
+
+# Real-time Types
+REALTIME_TYPES = {
+    "TRADE": "0B",
+    "ORDERBOOK": "0D",
+    "CONDITION": "02",
+    "ORDER_EXECUTION": "00"
+}
+
+# Condition search (조건검색) messages on the real-time channel
+CONDITION_MESSAGES = {
+    "LIST": "CNSRLST",
+    "SEARCH": "CNSRREQ",
+    "CLEAR": "CNSRCLR"
+}
+# CNSRREQ search_type: one-off scan, or scan plus real-time hits (type "02")
+CONDITION_SEARCH_TYPES = {"ONCE": "0", "LIVE": "1"}
+CONDITION_REQUEST_TIMEOUT_SEC = 10.0
+# Add/remove events kept for get_condition_events and condition resources
+CONDITION_EVENT_HISTORY = 1000
+
+# Execution Algorithms
+ALGO_TYPES = {
+    "TWAP": "시간분할",
+    "VWAP": "거래량분할",
+    "ICEBERG": "빙산주문"
+}
+
+# Intraday volume profile for KRX regular session (30-minute buckets from 09:00)
+DEFAULT_VOLUME_PROFILE = [
+    0.155, 0.095, 0.075, 0.065, 0.060, 0.055, 0.050,
+    0.050, 0.055, 0.060, 0.070, 0.085, 0.125
+]
+VOLUME_PROFILE_BUCKET_MINUTES = 30
+REGULAR_SESSION_OPEN = "0900"
+
+# Trading sessions per venue: (session, start HHMMSS, end HHMMSS), KST
+MARKET_SESSIONS = {
+    "KRX": (
+        ("pre_open", "083000", "084000"),
+        ("opening_auction", "084000", "090000"),
+        ("regular", "090000", "152000"),
+        ("closing_auction", "152000", "153000"),
+        ("post_close", "153000", "160000"),
+        ("after_hours_single", "160000", "180000"),
+    ),
+    "NXT": (
+        ("pre_market", "080000", "085000"),
+        ("main", "090030", "152000"),
+        ("after_market", "153000", "200000"),
+    ),
+}
+SESSION_NAMES = {
+    "pre_open": "장전 동시호가·장전 시간외",
+    "opening_auction": "장전 동시호가",
+    "regular": "정규장",
+    "closing_auction": "장마감 동시호가",
+    "post_close": "장후 시간외 종가",
+    "after_hours_single": "시간외 단일가",
+    "pre_market": "프리마켓",
+    "main": "메인마켓",
+    "after_market": "애프터마켓",
+}
+_AUCTION_TRADE_TYPES = frozenset({"보통", "시장가"})
+_OFF_HOURS_TRADE_TYPES = frozenset({"장시작전시간외", "장마감후시간외", "시간외단일가"})
+# Trade types each session accepts
+SESSION_TRADE_TYPES = {
+    "pre_open": _AUCTION_TRADE_TYPES | {"장시작전시간외"},
+    "opening_auction": _AUCTION_TRADE_TYPES,
+    "regular": frozenset(TRADE_TYPES) - _OFF_HOURS_TRADE_TYPES,
+    "closing_auction": _AUCTION_TRADE_TYPES,
+    "post_close": frozenset({"장마감후시간외"}),
+    "after_hours_single": frozenset({"시간외단일가"}),
+    "pre_market": frozenset({"보통"}),
+    "main": frozenset(NXT_TRADE_TYPES),
+    "after_market": frozenset({"보통"}),
+}
+# Local re-mapping of regular trade types in off-hours sessions (session_policy "remap")
+SESSION_REMAP = {
+    "post_close": {"보통": "장마감후시간외", "시장가": "장마감후시간외"},
+    "after_hours_single": {"보통": "시간외단일가"},
+}
+# Exchanges that may use either venue
+EXCHANGE_VENUES = {
+    "KRX": ("KRX",),
+    "KOSDAQ": ("NXT",),
+    "NXT": ("NXT",),
+    "SOR": ("KRX", "NXT"),
+    "AUTO": ("KRX", "NXT"),
+}
+SESSION_POLICIES = ("reject", "remap", "queue", "off")
+# KRX holidays on weekdays (NXT follows KRX); extend with KIWOOM_MARKET_HOLIDAYS
+KRX_HOLIDAYS = frozenset({
+    # 2025
+    "20250101", "20250127", "20250128", "20250129", "20250130", "20250303", "20250501", "20250505",
+    "20250506", "20250603", "20250606", "20250815", "20251003", "20251006", "20251007", "20251008",
+    "20251009", "20251225", "20251231",
+    # 2026
+    "20260101", "20260216", "20260217", "20260218", "20260302", "20260501", "20260505", "20260525",
+    "20260603", "20260817", "20260924", "20260925", "20260928", "20261005", "20261009", "20261225",
+    "20261231",
+    # 2027
+    "20270101", "20270208", "20270209", "20270301", "20270505", "20270513", "20270816", "20270914",
+    "20270915", "20270916", "20271004", "20271011", "20271227", "20271231",
+})
+# Sessions shift later on these days: (minutes, last boundary shifted HHMMSS)
+FIRST_TRADING_DAY_SHIFT = (60, "090030")  # the year's first trading day opens at 10:00
+CSAT_DAY_SHIFT = (60, "160000")           # college entrance exam day: open and close an hour later
+CSAT_DAYS = frozenset({"20251113", "20261119", "20271118"})
+
+# Pre-market warmup
+WARMUP_STEPS = ("token", "connections", "holdings", "symbols", "limits", "health")
+# A warmed token must last through the NXT after-market (20:00)
+WARMUP_TOKEN_MIN_VALID_SEC = 12 * 60 * 60
+# Price-limit lookups per warmup (one ka10001 call each)
+WARMUP_MAX_LIMIT_SYMBOLS = 200
+# Re-probe pooled connections until the open so they are not idled out
+WARMUP_KEEPALIVE_SEC = 30.0
+# Symbol used by the health probe when no warmup symbols are configured
+HEALTH_PROBE_SYMBOL = "005930"
+
+# Trigger Conditions
+TRIGGER_CONDITIONS = {
+    "price_above": "가격 이상 도달",
+    "price_below": "가격 이하 도달",
+    "trailing_stop": "고점 대비 하락 (추적손절)",
+    "trailing_buy": "저점 대비 상승 (추적매수)"
+}
+# Fired/cancelled conditions kept for status queries
+TRIGGER_HISTORY = 1000
+
+# Read-only tools whose rendered results may be cached (TTL in seconds)
+CACHEABLE_TOOLS = {
+    "get_trade_types": 3600.0,
+    "check_token_status": 1.0,
+    "get_quote": 0.2,
+    "get_risk_status": 1.0,
+    "get_algo_status": 1.0,
+    "list_triggers": 1.0,
+    "get_order_journal": 2.0,
+    "get_paper_account": 0.5
+}
+
+# Cached tools whose results a state-changing tool makes stale (unlisted tools invalidate everything)
+CACHE_INVALIDATIONS = {
+    "set_credentials": ["check_token_status"],
+    "get_access_token": ["check_token_status"],
+    "set_access_token": ["check_token_status"],
+    "stock_buy_order": ["get_risk_status", "get_order_journal", "get_paper_account"],
+    "stock_sell_order": ["get_risk_status", "get_order_journal", "get_paper_account"],
+    "stock_batch_order": ["get_risk_status", "get_order_journal", "get_paper_account"],
+    "start_algo_order": ["get_risk_status", "get_algo_status"],
+    "cancel_algo_order": ["get_algo_status"],
+    "arm_trigger_order": ["list_triggers"],
+    "arm_bracket_order": ["list_triggers", "get_risk_status", "get_order_journal", "get_paper_account"],
+    "cancel_trigger": ["list_triggers"],
+    "reconcile_order_journal": ["get_order_journal"],
+    "get_cache_stats": [],
+    "screen_indicators": [],
+    "run_backtest": [],
+    "get_order_latency": [],
+    "set_profiling": [],
+    "run_warmup": ["check_token_status"],
+    "get_warmup_status": [],
+    "get_market_session": [],
+    "cancel_queued_order": [],
+    "list_conditions": [],
+    "run_condition_search": [],
+    "stop_condition_search": [],
+    "get_condition_events": [],
+    "get_admission_stats": []
+}
+
+# Cached tools made stale by events outside tool calls: trade ticks, fills, and
+# orders sent by engine components (algo slices, trigger fires)
+TICK_INVALIDATIONS = ["get_quote", "get_paper_account"]
+FILL_INVALIDATIONS = ["get_risk_status", "get_order_journal", "get_paper_account"]
+ORDER_INVALIDATIONS = FILL_INVALIDATIONS + ["get_algo_status", "list_triggers"]
+
+# Admission priority per tool (lower goes first); unlisted tools are reads
+PRIORITY_ORDER = 0
+PRIORITY_CONTROL = 1
+PRIORITY_READ = 2
+PRIORITY_NAMES = {PRIORITY_ORDER: "주문/취소", PRIORITY_CONTROL: "설정", PRIORITY_READ: "조회"}
+TOOL_PRIORITIES = {
+    "stock_buy_order": PRIORITY_ORDER,
+    "stock_sell_order": PRIORITY_ORDER,
+    "stock_batch_order": PRIORITY_ORDER,
+    "start_algo_order": PRIORITY_ORDER,
+    "cancel_algo_order": PRIORITY_ORDER,
+    "arm_trigger_order": PRIORITY_ORDER,
+    "arm_bracket_order": PRIORITY_ORDER,
+    "cancel_trigger": PRIORITY_ORDER,
+    "cancel_queued_order": PRIORITY_ORDER,
+    "set_credentials": PRIORITY_CONTROL,
+    "get_access_token": PRIORITY_CONTROL,
+    "set_access_token": PRIORITY_CONTROL,
+    "reconcile_order_journal": PRIORITY_CONTROL,
+    "run_warmup": PRIORITY_CONTROL,
+    "set_profiling": PRIORITY_CONTROL,
+    "stop_condition_search": PRIORITY_CONTROL
+}
+# Tools that bypass admission control (they must answer while the server is saturated)
+ADMISSION_EXEMPT_TOOLS = {"get_admission_stats"}
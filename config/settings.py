@@ -2,9 +2,10 @@
 Settings and configuration for Kiwoom MCP Server
 """
 
+import json
 import os
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 
 
 @dataclass
@@ -15,6 +16,26 @@ class KiwoomConfig:
     is_mock: bool = False
     access_token: Optional[str] = None
     token_expires_dt: Optional[str] = None
+    order_rate_limit: float = 5.0
+    journal_path: Optional[str] = "~/.kiwoom_mcp/order_journal.db"
+    token_cache_path: Optional[str] = "~/.kiwoom_mcp/token_cache.json"
+    # Record REST traffic to / replay it from a session file (replay wins)
+    record_path: Optional[str] = None
+    replay_path: Optional[str] = None
+    replay_speed: float = 1.0
+    # Route orders to the local paper-trading broker instead of Kiwoom
+    paper_trading: bool = False
+    paper_cash: int = 100_000_000
+    paper_quote_depth: Optional[int] = None
+    # Daily pre-market warmup at HH:MM on trading days (None disables the schedule)
+    warmup_time: Optional[str] = "08:50"
+    # Symbols whose price limits are preloaded (holdings are always included)
+    warmup_symbols: List[str] = field(default_factory=list)
+    warmup_connections: int = 4
+    # Extra market holidays (YYYYMMDD) on top of the built-in KRX calendar
+    market_holidays: List[str] = field(default_factory=list)
+    # Orders outside a session that takes them: "reject", "remap", "queue" or "off"
+    session_policy: str = "reject"
     
     @classmethod
     def from_env(cls) -> "KiwoomConfig":
@@ -24,7 +45,25 @@ class KiwoomConfig:
             secretkey=os.getenv("KIWOOM_SECRETKEY"),
             is_mock=os.getenv("KIWOOM_IS_MOCK", "false").lower() == "true",
             access_token=os.getenv("KIWOOM_ACCESS_TOKEN"),
-            token_expires_dt=os.getenv("KIWOOM_TOKEN_EXPIRES_DT")
+            token_expires_dt=os.getenv("KIWOOM_TOKEN_EXPIRES_DT"),
+            order_rate_limit=float(os.getenv("KIWOOM_ORDER_RATE_LIMIT", "5")),
+            journal_path=os.getenv("KIWOOM_JOURNAL_PATH", "~/.kiwoom_mcp/order_journal.db") or None,
+            token_cache_path=os.getenv("KIWOOM_TOKEN_CACHE_PATH", "~/.kiwoom_mcp/token_cache.json") or None,
+            record_path=os.getenv("KIWOOM_RECORD_PATH") or None,
+            replay_path=os.getenv("KIWOOM_REPLAY_PATH") or None,
+            replay_speed=float(os.getenv("KIWOOM_REPLAY_SPEED", "1")),
+            paper_trading=os.getenv("KIWOOM_PAPER_TRADING", "false").lower() == "true",
+            paper_cash=int(os.getenv("KIWOOM_PAPER_CASH", "100000000")),
+            paper_quote_depth=_env_int("KIWOOM_PAPER_QUOTE_DEPTH"),
+            warmup_time=os.getenv("KIWOOM_WARMUP_TIME", "08:50") or None,
+            warmup_symbols=[
+                code.strip() for code in os.getenv("KIWOOM_WARMUP_SYMBOLS", "").split(",") if code.strip()
+            ],
+            warmup_connections=int(os.getenv("KIWOOM_WARMUP_CONNECTIONS", "4")),
+            market_holidays=[
+                day.strip() for day in os.getenv("KIWOOM_MARKET_HOLIDAYS", "").split(",") if day.strip()
+            ],
+            session_policy=os.getenv("KIWOOM_SESSION_POLICY", "reject")
         )
 
 
@@ -34,6 +73,29 @@ class ServerConfig:
     name: str = "kiwoom-stock-mcp"
     version: str = "1.0.0"
     log_level: str = "INFO"
+    log_format: str = "text"
+    # Per-logger sampling of DEBUG/INFO records, e.g. "kiwoom.client=0.1"
+    log_sampling: Optional[str] = None
+    audit_log_path: Optional[str] = "~/.kiwoom_mcp/order_audit.log"
+    # Response cache for read-only tools (0 entries disables it)
+    response_cache_entries: int = 1024
+    response_cache_bytes: int = 8 * 1024 * 1024
+    # Worker processes for CPU-bound analytics tools (None = CPU count, 0 = run on a thread)
+    analytics_workers: Optional[int] = None
+    # Directory run_backtest may load strategy files from (None = backtests are CLI-only)
+    strategy_dir: Optional[str] = None
+    # JSON codec ("json", "orjson"; None picks orjson when installed)
+    json_codec: Optional[str] = None
+    # Per-stage order latency tracing (also toggled at runtime with set_profiling)
+    latency_profiling: bool = False
+    profile_dir: str = "~/.kiwoom_mcp/profiles"
+    # Admission control for concurrent tool calls (0 concurrent calls disables it)
+    max_concurrent_calls: int = 32
+    max_session_calls: int = 8
+    admission_queue_size: int = 128
+    admission_timeout: float = 10.0
+    # Slots kept for order/cancel tools
+    order_reserved_calls: int = 4
     
     @classmethod
     def from_env(cls) -> "ServerConfig":
@@ -41,5 +103,81 @@ class ServerConfig:
         return cls(
             name=os.getenv("MCP_SERVER_NAME", "kiwoom-stock-mcp"),
             version=os.getenv("MCP_SERVER_VERSION", "1.0.0"),
-            log_level=os.getenv("LOG_LEVEL", "INFO")
-        ) 
\ No newline at end of file
+            log_level=os.getenv("LOG_LEVEL", "INFO"),
+            log_format=os.getenv("LOG_FORMAT", "text"),
+            log_sampling=os.getenv("LOG_SAMPLING") or None,
+            audit_log_path=os.getenv("AUDIT_LOG_PATH", "~/.kiwoom_mcp/order_audit.log") or None,
+            response_cache_entries=int(os.getenv("RESPONSE_CACHE_ENTRIES", "1024")),
+            response_cache_bytes=int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(8 * 1024 * 1024))),
+            analytics_workers=_env_int("ANALYTICS_WORKERS"),
+            strategy_dir=os.getenv("STRATEGY_DIR") or None,
+            json_codec=os.getenv("JSON_CODEC") or None,
+            latency_profiling=os.getenv("LATENCY_PROFILING", "false").lower() == "true",
+            profile_dir=os.getenv("PROFILE_DIR", "~/.kiwoom_mcp/profiles"),
+            max_concurrent_calls=int(os.getenv("MAX_CONCURRENT_CALLS", "32")),
+            max_session_calls=int(os.getenv("MAX_SESSION_CALLS", "8")),
+            admission_queue_size=int(os.getenv("ADMISSION_QUEUE_SIZE", "128")),
+            admission_timeout=float(os.getenv("ADMISSION_TIMEOUT", "10")),
+            order_reserved_calls=int(os.getenv("ORDER_RESERVED_CALLS", "4"))
+        )
+
+
+def _env_int(name: str) -> Optional[int]:
+    """Read an optional integer environment variable"""
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+@dataclass
+class RiskConfig:
+    """Pre-trade risk limits (None disables a limit)"""
+    max_order_notional: Optional[int] = None
+    max_symbol_notional: Optional[int] = None
+    max_symbol_quantity: Optional[int] = None
+    max_sector_notional: Optional[int] = None
+    max_gross_notional: Optional[int] = None
+    symbol_notional: Dict[str, int] = field(default_factory=dict)
+    symbol_quantity: Dict[str, int] = field(default_factory=dict)
+    sector_notional: Dict[str, int] = field(default_factory=dict)
+    sectors: Dict[str, str] = field(default_factory=dict)
+    
+    @property
+    def uses_notional(self) -> bool:
+        """Whether any limit needs an order price"""
+        return any((
+            self.max_order_notional, self.max_symbol_notional, self.max_sector_notional,
+            self.max_gross_notional, self.symbol_notional, self.sector_notional
+        ))
+    
+    def symbol_notional_limit(self, stock_code: str) -> Optional[int]:
+        """Notional limit for a symbol (override or default)"""
+        return self.symbol_notional.get(stock_code, self.max_symbol_notional)
+    
+    def symbol_quantity_limit(self, stock_code: str) -> Optional[int]:
+        """Quantity limit for a symbol (override or default)"""
+        return self.symbol_quantity.get(stock_code, self.max_symbol_quantity)
+    
+    def sector_notional_limit(self, sector: str) -> Optional[int]:
+        """Notional limit for a sector (override or default)"""
+        return self.sector_notional.get(sector, self.max_sector_notional)
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RiskConfig":
+        """Create config from a dict (e.g. a JSON limits file)"""
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+    
+    @classmethod
+    def from_env(cls) -> "RiskConfig":
+        """Create config from environment variables and an optional JSON limits file"""
+        config = cls()
+        limits_file = os.getenv("KIWOOM_RISK_LIMITS_FILE")
+        if limits_file:
+            with open(os.path.expanduser(limits_file), "r", encoding="utf-8") as f:
+                config = cls.from_dict(json.load(f))
+        
+        for name in ("max_order_notional", "max_symbol_notional", "max_symbol_quantity",
+                     "max_sector_notional", "max_gross_notional"):
+            value = _env_int(f"KIWOOM_RISK_{name.upper()}")
+            if value is not None:
+                setattr(config, name, value)
+        return config
@@ -0,0 +1,47 @@
+"""Trading engine components for Kiwoom MCP Server"""
+
+from engine.algo import AlgoEngine, AlgoOrder, ChildOrder
+from engine.conditions import ConditionSearchEngine, ConditionDiff, ConditionState
+from engine.executor import AnalyticsExecutor
+from engine.history import HistoricalBars, HistoryStore, SymbolBars
+from engine.journal import OrderJournal, JournalEntry
+from engine.market_data import MarketDataCache, Quote, TopOfBook
+from engine.order_book import OrderBook, BookOrder, Fill, FillLog
+from engine.reference import ReferenceDataCache
+from engine.risk import RiskGate, ExposureBook
+from engine.router import SmartOrderRouter, RouteDecision, RouteLeg
+from engine.sessions import MarketCalendar, SessionOrderQueue, QueuedOrder
+from engine.triggers import TriggerEngine, TriggerCondition
+
+__all__ = [
+    "AlgoEngine",
+    "AlgoOrder",
+    "ChildOrder",
+    "ConditionSearchEngine",
+    "ConditionDiff",
+    "ConditionState",
+    "AnalyticsExecutor",
+    "HistoricalBars",
+    "HistoryStore",
+    "SymbolBars",
+    "OrderJournal",
+    "JournalEntry",
+    "MarketDataCache",
+    "Quote",
+    "TopOfBook",
+    "OrderBook",
+    "BookOrder",
+    "Fill",
+    "FillLog",
+    "ReferenceDataCache",
+    "RiskGate",
+    "ExposureBook",
+    "SmartOrderRouter",
+    "RouteDecision",
+    "RouteLeg",
+    "MarketCalendar",
+    "SessionOrderQueue",
+    "QueuedOrder",
+    "TriggerEngine",
+    "TriggerCondition"
+]
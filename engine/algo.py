@@ -0,0 +1,291 @@
+"""
+Algorithmic execution engine (TWAP/VWAP/iceberg order slicing)
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable, List, Dict, Optional
+
+from config.settings import KiwoomConfig
+from config.constants import (
+    DEFAULT_VOLUME_PROFILE,
+    REGULAR_SESSION_OPEN,
+    VOLUME_PROFILE_BUCKET_MINUTES,
+)
+from engine.sessions import KST
+from models.types import OrderRequest, OrderResponse
+from models.exceptions import KiwoomAPIError
+from utils.profiling import order_trace, mark
+from utils.rate_limiter import AsyncRateLimiter
+
+
+@dataclass
+class ChildOrder:
+    """Single slice of a parent algo order"""
+    seq: int
+    quantity: int
+    scheduled_at: float
+    status: str = "pending"
+    order_number: Optional[str] = None
+    message: Optional[str] = None
+    sent_at: Optional[float] = None
+
+
+@dataclass
+class AlgoOrder:
+    """Parent order executed by the algo engine"""
+    algo_id: str
+    algo_type: str
+    is_buy: bool
+    order_request: OrderRequest
+    children: List[ChildOrder]
+    status: str = "running"
+    created_at: float = field(default_factory=time.time)
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+    # Set by cancel(); checked between children so an in-flight child is never abandoned
+    stop: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def sent_quantity(self) -> int:
+        """Quantity submitted to Kiwoom so far"""
+        return sum(c.quantity for c in self.children if c.status == "sent")
+
+    @property
+    def sending_quantity(self) -> int:
+        """Quantity of children whose order request is in flight"""
+        return sum(c.quantity for c in self.children if c.status == "sending")
+
+    @property
+    def remaining_quantity(self) -> int:
+        """Quantity not yet submitted"""
+        return sum(c.quantity for c in self.children if c.status == "pending")
+
+
+def allocate_quantity(total: int, weights: List[float]) -> List[int]:
+    """Split an integer quantity proportionally to weights (largest remainder)"""
+    weight_sum = sum(weights)
+    if total <= 0 or not weights or weight_sum <= 0:
+        raise ValueError("Quantity and weights must be positive")
+
+    shares = [total * w / weight_sum for w in weights]
+    allocated = [int(s) for s in shares]
+    by_remainder = sorted(range(len(shares)), key=lambda i: shares[i] - allocated[i], reverse=True)
+    for i in by_remainder[:total - sum(allocated)]:
+        allocated[i] += 1
+    return allocated
+
+
+def _build_children(quantities: List[int], times: List[float]) -> List[ChildOrder]:
+    """Create child orders, dropping empty slices"""
+    children = []
+    for quantity, scheduled_at in zip(quantities, times):
+        if quantity > 0:
+            children.append(ChildOrder(seq=len(children) + 1, quantity=quantity, scheduled_at=scheduled_at))
+    return children
+
+
+def _slice_times(start: float, duration_sec: float, slices: int) -> List[float]:
+    """Evenly spaced child submission times over the window"""
+    interval = duration_sec / slices
+    return [start + i * interval for i in range(slices)]
+
+
+def twap_schedule(quantity: int, duration_sec: float, slices: int, start: Optional[float] = None) -> List[ChildOrder]:
+    """Equal slices at equal intervals"""
+    if quantity <= 0:
+        raise ValueError("quantity must be positive")
+    if slices <= 0 or duration_sec < 0:
+        raise ValueError("slices must be positive and duration non-negative")
+    slices = min(slices, quantity)
+    times = _slice_times(start or time.time(), duration_sec, slices)
+    return _build_children(allocate_quantity(quantity, [1.0] * slices), times)
+
+
+def _profile_weight(ts: float, profile: List[float]) -> float:
+    """Volume profile weight of the bucket containing the given time (KST session clock)"""
+    dt = datetime.fromtimestamp(ts, KST)
+    open_minutes = int(REGULAR_SESSION_OPEN[:2]) * 60 + int(REGULAR_SESSION_OPEN[2:])
+    bucket = (dt.hour * 60 + dt.minute - open_minutes) // VOLUME_PROFILE_BUCKET_MINUTES
+    if 0 <= bucket < len(profile):
+        return profile[bucket]
+    return 0.0
+
+
+def vwap_schedule(
+    quantity: int,
+    duration_sec: float,
+    slices: int,
+    start: Optional[float] = None,
+    volume_profile: Optional[List[float]] = None
+) -> List[ChildOrder]:
+    """Slices weighted by the intraday volume profile at each slice time"""
+    if quantity <= 0:
+        raise ValueError("quantity must be positive")
+    if slices <= 0 or duration_sec < 0:
+        raise ValueError("slices must be positive and duration non-negative")
+    profile = volume_profile or DEFAULT_VOLUME_PROFILE
+    times = _slice_times(start or time.time(), duration_sec, slices)
+    weights = [_profile_weight(t, profile) for t in times]
+    if sum(weights) <= 0:
+        # Window falls outside the profiled session - fall back to TWAP
+        weights = [1.0] * slices
+    return _build_children(allocate_quantity(quantity, weights), times)
+
+
+def iceberg_schedule(
+    quantity: int,
+    display_quantity: int,
+    interval_sec: float,
+    start: Optional[float] = None
+) -> List[ChildOrder]:
+    """Show at most display_quantity at a time, replenishing every interval"""
+    if quantity <= 0:
+        raise ValueError("quantity must be positive")
+    if display_quantity <= 0 or interval_sec < 0:
+        raise ValueError("display_quantity must be positive and interval non-negative")
+    full, rest = divmod(quantity, display_quantity)
+    quantities = [display_quantity] * full + ([rest] if rest else [])
+    start = start or time.time()
+    times = [start + i * interval_sec for i in range(len(quantities))]
+    return _build_children(quantities, times)
+
+
+OrderSubmitter = Callable[[OrderRequest, bool, str], Awaitable[OrderResponse]]
+
+
+class AlgoEngine:
+    """Run algo orders as asyncio tasks submitting child orders"""
+
+    def __init__(
+        self,
+        config: KiwoomConfig,
+        submit_order: OrderSubmitter,
+        rate_limiter: Optional[AsyncRateLimiter] = None
+    ):
+        self.config = config
+        self.submit_order = submit_order
+        self.rate_limiter = rate_limiter or AsyncRateLimiter(config.order_rate_limit)
+        self.logger = logging.getLogger(__name__)
+        self._algos: Dict[str, AlgoOrder] = {}
+
+    def start(
+        self,
+        algo_type: str,
+        order_request: OrderRequest,
+        is_buy: bool,
+        children: List[ChildOrder]
+    ) -> AlgoOrder:
+        """Register an algo order and start its execution task"""
+        algo = AlgoOrder(
+            algo_id=uuid.uuid4().hex[:12],
+            algo_type=algo_type,
+            is_buy=is_buy,
+            order_request=order_request,
+            children=children
+        )
+        self._algos[algo.algo_id] = algo
+        algo.task = asyncio.create_task(self._run(algo))
+        self.logger.info(
+            "Algo %s started: %s %s x%s", algo.algo_id, algo_type, order_request.stock_code, order_request.quantity
+        )
+        return algo
+
+    def get(self, algo_id: str) -> Optional[AlgoOrder]:
+        """Get algo order by id"""
+        return self._algos.get(algo_id)
+
+    def list(self) -> List[AlgoOrder]:
+        """List all algo orders, newest first"""
+        return sorted(self._algos.values(), key=lambda a: a.created_at, reverse=True)
+
+    def cancel(self, algo_id: str) -> Optional[AlgoOrder]:
+        """Stop submitting further children of an algo order
+
+        A child already being sent is left to finish, so its result and
+        bookkeeping are recorded; only pending children are cancelled.
+        """
+        algo = self._algos.get(algo_id)
+        if algo is None:
+            return None
+        if algo.status == "running":
+            algo.status = "cancelled"
+            algo.stop.set()
+            for child in algo.children:
+                if child.status == "pending":
+                    child.status = "cancelled"
+        return algo
+
+    async def shutdown(self) -> None:
+        """Cancel all running algos and wait for children in flight"""
+        for algo in list(self._algos.values()):
+            self.cancel(algo.algo_id)
+        tasks = [algo.task for algo in self._algos.values() if algo.task and not algo.task.done()]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, algo: AlgoOrder) -> None:
+        """Submit children at their scheduled times until done or stopped"""
+        for child in algo.children:
+            delay = child.scheduled_at - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(algo.stop.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+            if algo.stop.is_set():
+                break
+            await self._submit_child(algo, child)
+
+        if algo.stop.is_set():
+            algo.status = "cancelled"
+        elif all(c.status == "failed" for c in algo.children):
+            algo.status = "failed"
+        else:
+            algo.status = "completed"
+        self.logger.info(
+            "Algo %s %s: sent %s/%s", algo.algo_id, algo.status, algo.sent_quantity, algo.order_request.quantity
+        )
+
+    async def _submit_child(self, algo: AlgoOrder, child: ChildOrder) -> None:
+        """Send a single child order through the rate limiter"""
+        if not self.config.access_token:
+            child.status = "failed"
+            child.message = "접근 토큰이 설정되지 않았습니다."
+            return
+
+        parent = algo.order_request
+        child_request = OrderRequest(
+            stock_code=parent.stock_code,
+            quantity=child.quantity,
+            price=parent.price,
+            trade_type=parent.trade_type,
+            exchange=parent.exchange,
+            condition_price=parent.condition_price
+        )
+
+        source = f"algo:{algo.algo_id}"
+        with order_trace(source):
+            await self.rate_limiter.acquire()
+            mark("rate_limit")
+            if algo.stop.is_set():
+                # Cancelled while waiting for the rate limiter
+                return
+            child.status = "sending"
+            try:
+                response = await self.submit_order(child_request, algo.is_buy, source)
+                child.status = "sent" if response.success else "failed"
+                child.order_number = response.order_number
+                child.message = response.message
+            except KiwoomAPIError as e:
+                child.status = "failed"
+                child.message = str(e)
+                self.logger.error("Algo %s child %s failed: %s", algo.algo_id, child.seq, e)
+            except Exception as e:
+                child.status = "failed"
+                child.message = str(e)
+                self.logger.error("Algo %s child %s failed unexpectedly: %s", algo.algo_id, child.seq, e)
+        child.sent_at = time.time()
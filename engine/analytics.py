@@ -0,0 +1,133 @@
+"""
+Indicator screens over daily closes
+
+Functions here run in analytics worker processes: they take plain
+sequences (memoryview slices of shared price columns) and return small
+picklable results.
+"""
+
+import math
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+TRADING_DAYS = 252
+
+# (stock_code, offset, length) of each symbol's closes in a shared int64 column
+Layout = List[Tuple[str, int, int]]
+
+
+@dataclass
+class ScreenParams:
+    """Indicator windows for a screen"""
+    lookback: int = 20
+    sma_short: int = 5
+    sma_long: int = 20
+    rsi_period: int = 14
+
+
+@dataclass(slots=True)
+class ScreenRow:
+    """Indicators for one symbol as of its last close"""
+    stock_code: str
+    close: int
+    return_pct: Optional[float]
+    sma_short: Optional[float]
+    sma_long: Optional[float]
+    rsi: Optional[float]
+    volatility_pct: Optional[float]
+
+    @property
+    def trend_up(self) -> bool:
+        return self.sma_short is not None and self.sma_long is not None and self.sma_short > self.sma_long
+
+
+def sma(closes: Sequence[int], window: int) -> Optional[float]:
+    """Simple moving average of the last `window` closes"""
+    if window <= 0 or len(closes) < window:
+        return None
+    return sum(closes[-window:]) / window
+
+
+def rsi(closes: Sequence[int], period: int) -> Optional[float]:
+    """Wilder's RSI over the whole series"""
+    if period <= 0 or len(closes) <= period:
+        return None
+    gain = loss = 0.0
+    for i in range(1, period + 1):
+        change = closes[i] - closes[i - 1]
+        if change > 0:
+            gain += change
+        else:
+            loss -= change
+    gain /= period
+    loss /= period
+    for i in range(period + 1, len(closes)):
+        change = closes[i] - closes[i - 1]
+        gain = (gain * (period - 1) + max(change, 0)) / period
+        loss = (loss * (period - 1) + max(-change, 0)) / period
+    if loss == 0:
+        return 100.0 if gain else 50.0
+    return 100.0 - 100.0 / (1.0 + gain / loss)
+
+
+def volatility(closes: Sequence[int], window: int) -> Optional[float]:
+    """Annualized standard deviation of daily log returns over `window` days"""
+    if window < 2 or len(closes) <= window:
+        return None
+    returns = [
+        math.log(closes[i] / closes[i - 1])
+        for i in range(len(closes) - window, len(closes)) if closes[i - 1] > 0 and closes[i] > 0
+    ]
+    if len(returns) < 2:
+        return None
+    mean = sum(returns) / len(returns)
+    variance = sum((r - mean) ** 2 for r in returns) / (len(returns) - 1)
+    return math.sqrt(variance * TRADING_DAYS)
+
+
+def screen_symbol(stock_code: str, closes: Sequence[int], params: ScreenParams) -> Optional[ScreenRow]:
+    """Indicators for one symbol"""
+    if not len(closes):
+        return None
+    close = closes[-1]
+    base = closes[-params.lookback - 1] if len(closes) > params.lookback else None
+    vol = volatility(closes, params.lookback)
+    return ScreenRow(
+        stock_code=stock_code,
+        close=close,
+        return_pct=(close / base - 1) * 100 if base else None,
+        sma_short=sma(closes, params.sma_short),
+        sma_long=sma(closes, params.sma_long),
+        rsi=rsi(closes, params.rsi_period),
+        volatility_pct=vol * 100 if vol is not None else None
+    )
+
+
+def screen_shared(shm_name: str, layout: Layout, params: ScreenParams) -> List[ScreenRow]:
+    """Worker entry point: screen symbols whose closes live in a shared memory block"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        prices = shm.buf.cast("q")
+        try:
+            rows = []
+            for stock_code, offset, length in layout:
+                closes = prices[offset:offset + length]
+                try:
+                    row = screen_symbol(stock_code, closes, params)
+                finally:
+                    closes.release()
+                if row is not None:
+                    rows.append(row)
+            return rows
+        finally:
+            prices.release()
+    finally:
+        shm.close()
+
+
+def screen_local(columns: Dict[str, Sequence[int]], params: ScreenParams) -> List[ScreenRow]:
+    """Screen in-process (no worker pool)"""
+    rows = [screen_symbol(stock_code, closes, params) for stock_code, closes in columns.items()]
+    return [row for row in rows if row is not None]
@@ -0,0 +1,214 @@
+"""
+Kiwoom condition search (조건검색) over the real-time channel
+
+Each condition's matching symbols are held as a set. A scan or a live hit
+only produces an event for the symbols that actually entered or left the
+set, so subscribers see "newly matching" and "no longer matching" diffs
+instead of re-reading full result lists.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set
+
+from config.constants import (
+    CONDITION_EVENT_HISTORY, CONDITION_MESSAGES, CONDITION_REQUEST_TIMEOUT_SEC, CONDITION_SEARCH_TYPES,
+    REALTIME_TYPES
+)
+
+
+# REAL "02" value fields
+FIELD_SEQ = "841"
+FIELD_CODE = "9001"
+FIELD_ACTION = "843"  # "I" entered, "D" left
+
+DiffListener = Callable[["ConditionDiff"], None]
+
+
+def _stock_code(value: str) -> str:
+    """Strip the market prefix from codes such as 'A005930'"""
+    return value[1:] if value[:1].isalpha() else value
+
+
+@dataclass(slots=True)
+class ConditionDiff:
+    """Symbols that entered or left a condition's result set (event_id 0 when nothing changed)"""
+    event_id: int
+    seq: str
+    added: List[str]
+    removed: List[str]
+    source: str  # "scan" or "live"
+    at: float = field(default_factory=time.time)
+
+
+@dataclass
+class ConditionState:
+    """Current result set of one condition"""
+    seq: str
+    name: str = ""
+    codes: Set[str] = field(default_factory=set)
+    live: bool = False
+    scanned_at: Optional[float] = None
+
+
+class ConditionSearchEngine:
+    """List, run and stream saved condition searches"""
+
+    def __init__(self, realtime, history: int = CONDITION_EVENT_HISTORY):
+        self.realtime = realtime
+        self.logger = logging.getLogger(__name__)
+        self.conditions: Dict[str, ConditionState] = {}
+        self.events: Deque[ConditionDiff] = deque(maxlen=history)
+        self._event_ids = itertools.count(1)
+        self._listeners: List[DiffListener] = []
+        # One request of each kind in flight; replies carry no request id
+        self._locks = {trnm: asyncio.Lock() for trnm in CONDITION_MESSAGES.values()}
+        self._replies: Dict[str, asyncio.Future] = {}
+
+        for trnm in CONDITION_MESSAGES.values():
+            realtime.add_message_listener(trnm, self._on_reply)
+        realtime.add_real_listener(self.handle_real)
+        realtime.add_connect_listener(self._restore_live)
+
+    def add_listener(self, listener: DiffListener) -> None:
+        """Register a callback invoked with each ConditionDiff"""
+        self._listeners.append(listener)
+
+    def _state(self, seq: str) -> ConditionState:
+        state = self.conditions.get(seq)
+        if state is None:
+            state = self.conditions[seq] = ConditionState(seq)
+        return state
+
+    async def _request(self, message: Dict) -> Dict:
+        """Send a condition message and wait for the reply with the same trnm"""
+        trnm = message["trnm"]
+        async with self._locks[trnm]:
+            future = asyncio.get_running_loop().create_future()
+            self._replies[trnm] = future
+            try:
+                if not await self.realtime.send(message):
+                    raise ConnectionError("실시간 채널이 연결되지 않았습니다")
+                reply = await asyncio.wait_for(future, CONDITION_REQUEST_TIMEOUT_SEC)
+            finally:
+                self._replies.pop(trnm, None)
+        if reply.get("return_code", 0) != 0:
+            raise RuntimeError(reply.get("return_msg") or f"{trnm} 실패")
+        return reply
+
+    def _on_reply(self, message: Dict) -> None:
+        future = self._replies.get(message.get("trnm"))
+        if future is not None and not future.done():
+            future.set_result(message)
+
+    async def list_conditions(self) -> List[ConditionState]:
+        """Load the saved conditions (seq, name)"""
+        reply = await self._request({"trnm": CONDITION_MESSAGES["LIST"]})
+        for seq, name, *_ in reply.get("data") or []:
+            self._state(str(seq)).name = name
+        return sorted(self.conditions.values(), key=lambda state: int(state.seq) if state.seq.isdigit() else 0)
+
+    async def search(self, seq: str, live: bool = False) -> ConditionDiff:
+        """Run a condition and diff the result against the last known set
+
+        With `live` the server keeps pushing entries and exits for the
+        condition until stop() is called.
+        """
+        state = self._state(seq)
+        was_live = state.live
+        # Hits may arrive right after the request, before its reply
+        state.live = was_live or live
+        codes: Set[str] = set()
+        next_key = ""
+        try:
+            while True:
+                reply = await self._request({
+                    "trnm": CONDITION_MESSAGES["SEARCH"],
+                    "seq": seq,
+                    "search_type": CONDITION_SEARCH_TYPES["LIVE" if live else "ONCE"],
+                    "stex_tp": "K",
+                    "cont_yn": "Y" if next_key else "N",
+                    "next_key": next_key,
+                })
+                for row in reply.get("data") or []:
+                    code = row.get(FIELD_CODE) or row.get("jmcode")
+                    if code:
+                        codes.add(_stock_code(code))
+                next_key = reply.get("next_key") or ""
+                if live or reply.get("cont_yn") != "Y" or not next_key:
+                    break
+        except Exception:
+            state.live = was_live
+            raise
+
+        state.scanned_at = time.time()
+        return self._apply(state, codes - state.codes, state.codes - codes, "scan")
+
+    async def stop(self, seq: str) -> bool:
+        """Stop live hits for a condition (the last result set is kept)"""
+        state = self.conditions.get(seq)
+        if state is None or not state.live:
+            return False
+        state.live = False
+        await self._request({"trnm": CONDITION_MESSAGES["CLEAR"], "seq": seq})
+        return True
+
+    def handle_real(self, real_type: str, item: str, values: Dict[str, str]) -> None:
+        """Apply a live condition hit (REAL type "02")"""
+        if real_type != REALTIME_TYPES["CONDITION"]:
+            return
+        seq = values.get(FIELD_SEQ) or item
+        state = self.conditions.get(seq)
+        if state is None or not state.live:
+            return
+        code = _stock_code(values.get(FIELD_CODE) or "")
+        if not code:
+            return
+        action = values.get(FIELD_ACTION)
+        if action == "I" and code not in state.codes:
+            self._apply(state, {code}, (), "live")
+        elif action == "D" and code in state.codes:
+            self._apply(state, (), {code}, "live")
+
+    def _apply(
+        self,
+        state: ConditionState,
+        added: Iterable[str],
+        removed: Iterable[str],
+        source: str
+    ) -> ConditionDiff:
+        diff = ConditionDiff(0, state.seq, sorted(added), sorted(removed), source)
+        state.codes.update(diff.added)
+        state.codes.difference_update(diff.removed)
+        if diff.added or diff.removed:
+            diff.event_id = next(self._event_ids)
+            self.events.append(diff)
+            for listener in self._listeners:
+                try:
+                    listener(diff)
+                except Exception as e:
+                    self.logger.error("Condition listener failed for %s: %s", state.seq, e)
+        return diff
+
+    def events_since(self, event_id: int = 0, seq: Optional[str] = None) -> List[ConditionDiff]:
+        """Events after an event id, optionally for one condition"""
+        return [
+            event for event in self.events
+            if event.event_id > event_id and (seq is None or event.seq == seq)
+        ]
+
+    @property
+    def last_event_id(self) -> int:
+        return self.events[-1].event_id if self.events else 0
+
+    async def _restore_live(self) -> None:
+        """Re-run live conditions after a reconnect; hits missed while offline arrive as one diff"""
+        for state in [state for state in self.conditions.values() if state.live]:
+            try:
+                await self.search(state.seq, live=True)
+            except Exception as e:
+                self.logger.error("Failed to restore live condition %s: %s", state.seq, e)
@@ -0,0 +1,135 @@
+"""
+Process-pool executor for CPU-heavy analytics tools
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional
+
+from engine.analytics import Layout
+
+
+class SharedColumns:
+    """int64 columns packed into one shared memory block
+
+    Workers attach by name and read their slice of `layout` in place, so
+    only the block name and offsets are pickled per task.
+    """
+
+    def __init__(self, columns: Dict[str, array]):
+        self.layout: Layout = []
+        offset = 0
+        for stock_code, column in columns.items():
+            self.layout.append((stock_code, offset, len(column)))
+            offset += len(column)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1) * 8)
+        view = self.shm.buf.cast("q")
+        try:
+            for (_, start, length), column in zip(self.layout, columns.values()):
+                view[start:start + length] = column if column.typecode == "q" else array("q", column)
+        finally:
+            view.release()
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def chunks(self, count: int) -> List[Layout]:
+        """Split the layout into up to `count` chunks of similar total length"""
+        count = max(1, min(count, len(self.layout)))
+        chunks: List[Layout] = [[] for _ in range(count)]
+        sizes = [0] * count
+        for entry in sorted(self.layout, key=lambda e: -e[2]):
+            i = sizes.index(min(sizes))
+            chunks[i].append(entry)
+            sizes[i] += entry[2]
+        return [chunk for chunk in chunks if chunk]
+
+    def close(self) -> None:
+        """Release and remove the block"""
+        self.shm.close()
+        self.shm.unlink()
+
+
+class AnalyticsExecutor:
+    """Run CPU-bound tool work in worker processes, off the event loop
+
+    Order tools stay on the loop and the default thread pool (which carries
+    their blocking HTTP calls); analytics never touch either. At most
+    `max_workers` jobs run at once and the rest wait here, and file loading
+    for analytics has its own thread. The process pool starts on first use.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+        self.logger = logging.getLogger(__name__)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analytics-io")
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawned workers: forking would copy the logging and realtime threads' locks
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            self.logger.info("Started analytics pool with %d workers", self.max_workers)
+        return self._pool
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(max(self.max_workers, 1))
+        return self._slots
+
+    async def load(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run blocking I/O for analytics on the analytics thread"""
+        return await asyncio.get_running_loop().run_in_executor(self._io, fn, *args)
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a picklable top-level function in a worker process (inline on the I/O thread when disabled)"""
+        if not self.enabled:
+            return await self.load(fn, *args)
+        async with self._get_slots():
+            pool = self._get_pool()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+            except BrokenProcessPool:
+                # A worker died; start a fresh pool on the next call
+                if self._pool is pool:
+                    self._pool = None
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+
+    async def map_shared(
+        self,
+        fn: Callable[[str, Layout, Any], List[Any]],
+        columns: Dict[str, array],
+        params: Any
+    ) -> List[Any]:
+        """Fan `fn(shm_name, layout_chunk, params)` out over workers with columns in shared memory"""
+        if not columns:
+            return []
+        shared = SharedColumns(columns)
+        try:
+            chunks = shared.chunks(max(self.max_workers, 1))
+            results = await asyncio.gather(*(self.run(fn, shared.name, chunk, params) for chunk in chunks))
+        finally:
+            shared.close()
+        return [item for result in results for item in result]
+
+    def shutdown(self) -> None:
+        """Stop workers and the I/O thread"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self._io.shutdown(wait=False, cancel_futures=True)
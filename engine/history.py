@@ -0,0 +1,86 @@
+"""
+Columnar historical bars loaded from CSV
+"""
+
+import csv
+import os
+import threading
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+
+@dataclass
+class SymbolBars:
+    """Columnar daily bars for one symbol"""
+    stock_code: str
+    dates: List[str] = field(default_factory=list)
+    open: array = field(default_factory=lambda: array("q"))
+    high: array = field(default_factory=lambda: array("q"))
+    low: array = field(default_factory=lambda: array("q"))
+    close: array = field(default_factory=lambda: array("q"))
+    volume: array = field(default_factory=lambda: array("q"))
+
+
+class HistoricalBars:
+    """Bars for many symbols with a per-date index of (symbol, row)"""
+
+    def __init__(self, symbols: Dict[str, SymbolBars]):
+        self.symbols = symbols
+        by_date: Dict[str, List[Tuple[str, int]]] = {}
+        for stock_code, bars in symbols.items():
+            for row, date in enumerate(bars.dates):
+                by_date.setdefault(date, []).append((stock_code, row))
+        self.calendar = sorted(by_date)
+        self.days = [by_date[date] for date in self.calendar]
+
+    def __len__(self) -> int:
+        return sum(len(bars.dates) for bars in self.symbols.values())
+
+    @classmethod
+    def from_csv(cls, path: str) -> "HistoricalBars":
+        """Load bars from CSV (rows in any order)"""
+        rows: Dict[str, List[Tuple[str, int, int, int, int, int]]] = {}
+        with open(path, newline="", encoding="utf-8") as f:
+            for record in csv.DictReader(f):
+                stock_code = (record.get("stock_code") or record["code"]).lstrip("A")
+                date = record["date"].replace("-", "")
+                rows.setdefault(stock_code, []).append((
+                    date,
+                    int(float(record["open"])),
+                    int(float(record["high"])),
+                    int(float(record["low"])),
+                    int(float(record["close"])),
+                    int(float(record.get("volume") or 0)),
+                ))
+
+        symbols = {}
+        for stock_code, items in rows.items():
+            items.sort()
+            bars = SymbolBars(stock_code)
+            bars.dates = [item[0] for item in items]
+            for column, index in (("open", 1), ("high", 2), ("low", 3), ("close", 4), ("volume", 5)):
+                getattr(bars, column).extend(item[index] for item in items)
+            symbols[stock_code] = bars
+        return cls(symbols)
+
+
+class HistoryStore:
+    """Loaded bar files, reused until the file changes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._files: Dict[str, Tuple[float, HistoricalBars]] = {}
+
+    def load(self, path: str) -> HistoricalBars:
+        """Bars for a CSV path (parsed on first use and whenever its mtime moves)"""
+        path = os.path.abspath(os.path.expanduser(path))
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            cached = self._files.get(path)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+        bars = HistoricalBars.from_csv(path)
+        with self._lock:
+            self._files[path] = (mtime, bars)
+        return bars
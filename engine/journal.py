@@ -0,0 +1,329 @@
+"""
+Durable order journal (SQLite WAL with group commit)
+"""
+
+import asyncio
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from typing import Iterable, List, Dict, Any, Optional, Set, Tuple
+
+from engine.sessions import KST
+from models.types import OrderRequest, OrderHistoryItem
+
+
+# Journal entry states
+STATUS_INTENT = "intent"
+STATUS_SUBMITTED = "submitted"
+STATUS_FAILED = "failed"
+STATUS_NOT_SUBMITTED = "not_submitted"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS order_journal (
+    journal_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    source TEXT NOT NULL,
+    side TEXT NOT NULL,
+    stock_code TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    price TEXT,
+    trade_type TEXT,
+    exchange TEXT,
+    status TEXT NOT NULL,
+    order_number TEXT,
+    message TEXT,
+    route TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_order_journal_status ON order_journal (status);
+"""
+
+_INSERT_INTENT = """
+INSERT INTO order_journal (
+    journal_id, created_at, updated_at, source, side, stock_code,
+    quantity, price, trade_type, exchange, status, route
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_UPDATE_OUTCOME = """
+UPDATE order_journal SET status = ?, order_number = ?, message = ?, updated_at = ?
+WHERE journal_id = ?
+"""
+
+
+@dataclass
+class JournalEntry:
+    """Order journal record"""
+    journal_id: str
+    created_at: float
+    updated_at: float
+    source: str
+    side: str
+    stock_code: str
+    quantity: int
+    price: Optional[str]
+    trade_type: Optional[str]
+    exchange: Optional[str]
+    status: str
+    order_number: Optional[str] = None
+    message: Optional[str] = None
+    # Routing decision when the order was routed locally (exchange AUTO)
+    route: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to plain dict"""
+        return asdict(self)
+
+
+class OrderJournal:
+    """Append-only order journal recording intent before send and outcome after"""
+
+    def __init__(self, path: str, commit_interval_ms: float = 2.0, max_batch: int = 512):
+        self.path = os.path.expanduser(path)
+        self.commit_interval = commit_interval_ms / 1000
+        self.max_batch = max_batch
+        self.logger = logging.getLogger(__name__)
+        self._queue: "queue.Queue[Optional[Tuple[str, tuple, Optional[asyncio.Future]]]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._reader: Optional[sqlite3.Connection] = None
+        # Intents whose send has not returned yet; reconciliation leaves them alone
+        self._in_flight: Set[str] = set()
+
+    def open(self) -> None:
+        """Create the database and start the group commit writer"""
+        if self._writer:
+            return
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(order_journal)")}
+        if "route" not in columns:
+            # Journals created before local routing
+            conn.execute("ALTER TABLE order_journal ADD COLUMN route TEXT")
+            conn.commit()
+        conn.close()
+
+        self._reader = self._connect()
+        self._writer = threading.Thread(target=self._write_loop, name="order-journal", daemon=True)
+        self._writer.start()
+        self.logger.info("Order journal opened: %s", self.path)
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the journal accepts writes"""
+        return self._writer is not None
+
+    def close(self) -> None:
+        """Flush pending writes and stop the writer"""
+        if not self._writer:
+            return
+        self._queue.put(None)
+        self._writer.join()
+        self._writer = None
+        if self._reader:
+            self._reader.close()
+            self._reader = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a WAL-mode connection"""
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # FULL fsyncs the WAL on every commit; batching keeps that to one per group
+        conn.execute("PRAGMA synchronous=FULL")
+        return conn
+
+    def _write_loop(self) -> None:
+        """Drain the queue and commit batches in a single transaction each"""
+        conn = self._connect()
+        running = True
+        while running:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.commit_interval
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    running = False
+                    break
+                batch.append(item)
+
+            error: Optional[Exception] = None
+            try:
+                conn.execute("BEGIN")
+                for sql, params, _ in batch:
+                    conn.execute(sql, params)
+                conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                error = e
+                self.logger.error("Order journal commit failed (%s records): %s", len(batch), e)
+
+            for _, _, future in batch:
+                if future is not None:
+                    self._resolve(future, error)
+        conn.close()
+
+    def _resolve(self, future: asyncio.Future, error: Optional[Exception]) -> None:
+        """Complete a waiter future on its event loop"""
+        def _set():
+            if future.done():
+                return
+            if error:
+                future.set_exception(error)
+            else:
+                future.set_result(None)
+        future.get_loop().call_soon_threadsafe(_set)
+
+    def _enqueue(self, sql: str, params: tuple, wait: bool) -> Optional[asyncio.Future]:
+        """Queue a write, optionally returning a future resolved on commit"""
+        if not self._writer:
+            raise RuntimeError("Order journal is not open")
+        future = asyncio.get_running_loop().create_future() if wait else None
+        self._queue.put((sql, params, future))
+        return future
+
+    async def record_intent(
+        self,
+        order_request: OrderRequest,
+        is_buy: bool,
+        source: str = "manual",
+        route: Optional[str] = None
+    ) -> str:
+        """Durably record an order (and its routing decision) before it is sent; returns its journal id"""
+        journal_id = uuid.uuid4().hex
+        now = time.time()
+        params = (
+            journal_id, now, now, source, "buy" if is_buy else "sell",
+            order_request.stock_code, order_request.quantity, order_request.price,
+            order_request.trade_type, order_request.exchange, STATUS_INTENT, route
+        )
+        self._in_flight.add(journal_id)
+        try:
+            await self._enqueue(_INSERT_INTENT, params, wait=True)
+        except BaseException:
+            self._in_flight.discard(journal_id)
+            raise
+        return journal_id
+
+    def settle(self, journal_id: str) -> None:
+        """Mark an intent's send as finished, whatever its outcome"""
+        self._in_flight.discard(journal_id)
+
+    def record_outcome(
+        self,
+        journal_id: str,
+        status: str,
+        order_number: Optional[str] = None,
+        message: Optional[str] = None
+    ) -> None:
+        """Record the result of a sent order (committed with the next group)"""
+        self._enqueue(_UPDATE_OUTCOME, (status, order_number, message, time.time(), journal_id), wait=False)
+
+    def record_error(self, journal_id: str, error: Exception) -> None:
+        """Record a send error; errors without an upstream response stay in doubt"""
+        if getattr(error, "status_code", None) is None:
+            self.logger.warning("Order %s outcome unknown, left for reconciliation: %s", journal_id, error)
+            return
+        self.record_outcome(journal_id, STATUS_FAILED, message=str(error))
+
+    async def flush(self) -> None:
+        """Wait until everything queued so far is committed"""
+        await self._enqueue("SELECT 1", (), wait=True)
+
+    def _select(self, where: str = "", params: tuple = (), limit: Optional[int] = None) -> List[JournalEntry]:
+        """Read journal entries"""
+        sql = "SELECT * FROM order_journal"
+        if where:
+            sql += f" WHERE {where}"
+        sql += " ORDER BY created_at DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        rows = self._reader.execute(sql, params).fetchall()
+        return [JournalEntry(*row) for row in rows]
+
+    def in_doubt(self, include_in_flight: bool = True) -> List[JournalEntry]:
+        """Orders with a recorded intent but no recorded outcome"""
+        entries = self._select("status = ?", (STATUS_INTENT,))
+        if not include_in_flight:
+            in_flight = set(self._in_flight)
+            entries = [entry for entry in entries if entry.journal_id not in in_flight]
+        return entries
+
+    def recent(self, limit: int = 20) -> List[JournalEntry]:
+        """Most recent journal entries"""
+        return self._select(limit=limit)
+
+
+def history_dates(entry: JournalEntry, tolerance_sec: int = 5, window_sec: int = 60) -> List[str]:
+    """Order dates (YYYYMMDD, KST like the upstream history) an entry's match window spans"""
+    first = datetime.fromtimestamp(entry.created_at - tolerance_sec, KST).strftime("%Y%m%d")
+    last = datetime.fromtimestamp(entry.created_at + window_sec, KST).strftime("%Y%m%d")
+    return [first] if first == last else [first, last]
+
+
+def match_in_doubt(
+    entries: List[JournalEntry],
+    history: Dict[str, Iterable[OrderHistoryItem]],
+    tolerance_sec: int = 5,
+    window_sec: int = 60
+) -> Dict[str, Optional[OrderHistoryItem]]:
+    """Match in-doubt journal entries to upstream orders by code, side, quantity and time
+
+    `history` maps order dates (YYYYMMDD) to that day's orders. An order
+    matches when it was accepted between `tolerance_sec` before and
+    `window_sec` after the intent was recorded; the closest one wins and
+    each order resolves at most one entry.
+    """
+    # HHMMSS order times become datetimes on their history date, so windows can span midnight
+    timed: List[Tuple[datetime, OrderHistoryItem]] = []
+    for order_date, items in history.items():
+        day = datetime.strptime(order_date, "%Y%m%d")
+        for item in items:
+            if len(item.order_time) >= 6 and item.order_time[:6].isdigit():
+                hhmmss = item.order_time[:6]
+                accepted = day + timedelta(
+                    hours=int(hhmmss[:2]), minutes=int(hhmmss[2:4]), seconds=int(hhmmss[4:])
+                )
+                timed.append((accepted, item))
+
+    claimed = set()
+    matches: Dict[str, Optional[OrderHistoryItem]] = {}
+
+    for entry in sorted(entries, key=lambda e: e.created_at):
+        # Upstream times are KST with whole-second resolution, whatever the host's zone
+        created = datetime.fromtimestamp(int(entry.created_at), KST).replace(tzinfo=None)
+        earliest = created - timedelta(seconds=tolerance_sec)
+        latest = created + timedelta(seconds=window_sec)
+        match = None
+        best = None
+        for accepted, item in timed:
+            if item.order_number in claimed or not earliest <= accepted <= latest:
+                continue
+            if (item.stock_code == entry.stock_code
+                    and item.side == entry.side
+                    and item.quantity == entry.quantity):
+                distance = abs((accepted - created).total_seconds())
+                if best is None or distance < best:
+                    match, best = item, distance
+        if match:
+            claimed.add(match.order_number)
+        matches[entry.journal_id] = match
+
+    return matches
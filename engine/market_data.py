@@ -0,0 +1,145 @@
+"""
+In-memory market data cache fed by the real-time channel
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config.constants import NXT_ITEM_SUFFIX, REALTIME_TYPES
+
+
+@dataclass(slots=True)
+class Quote:
+    """Latest trade and top of book for a symbol"""
+    stock_code: str
+    price: int = 0
+    volume: int = 0
+    best_bid: int = 0
+    best_ask: int = 0
+    updated_at: float = 0.0
+
+
+@dataclass(slots=True)
+class TopOfBook:
+    """Best bid/ask and their sizes on one venue"""
+    bid: int = 0
+    bid_size: int = 0
+    ask: int = 0
+    ask_size: int = 0
+    updated_at: float = 0.0
+
+
+TickListener = Callable[[str, int], None]
+
+
+def parse_price(value: Optional[str]) -> int:
+    """Parse a signed real-time price field such as '+60700' or '-60700'"""
+    if not value:
+        return 0
+    try:
+        return abs(int(value))
+    except ValueError:
+        return abs(int(float(value)))
+
+
+class MarketDataCache:
+    """Latest quotes per symbol with tick listeners"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._quotes: Dict[str, Quote] = {}
+        # (stock_code, venue) -> top of book, updated in place
+        self._books: Dict[Tuple[str, str], TopOfBook] = {}
+        self._tick_listeners: List[TickListener] = []
+
+    def add_tick_listener(self, listener: TickListener) -> None:
+        """Register a callback invoked with (stock_code, price) on every trade"""
+        self._tick_listeners.append(listener)
+
+    def get(self, stock_code: str) -> Optional[Quote]:
+        """Get cached quote"""
+        return self._quotes.get(stock_code)
+
+    def book(self, stock_code: str, venue: str) -> Optional[TopOfBook]:
+        """Get cached top of book for a venue ("KRX" or "NXT")"""
+        return self._books.get((stock_code, venue))
+
+    def update_book(
+        self,
+        stock_code: str,
+        venue: str,
+        bid: int,
+        bid_size: int,
+        ask: int,
+        ask_size: int
+    ) -> None:
+        """Apply a top-of-book update for a venue"""
+        book = self._books.get((stock_code, venue))
+        if book is None:
+            book = self._books[(stock_code, venue)] = TopOfBook()
+        book.bid = bid
+        book.bid_size = bid_size
+        book.ask = ask
+        book.ask_size = ask_size
+        book.updated_at = time.time()
+
+    def last_price(self, stock_code: str) -> Optional[int]:
+        """Get last traded price if known"""
+        quote = self._quotes.get(stock_code)
+        return quote.price if quote and quote.price else None
+
+    def update_trade(
+        self,
+        stock_code: str,
+        price: int,
+        volume: int = 0,
+        best_bid: int = 0,
+        best_ask: int = 0
+    ) -> None:
+        """Apply a trade tick and notify listeners"""
+        quote = self._quotes.get(stock_code)
+        if quote is None:
+            quote = self._quotes[stock_code] = Quote(stock_code)
+        quote.price = price
+        quote.volume = volume
+        if best_bid:
+            quote.best_bid = best_bid
+        if best_ask:
+            quote.best_ask = best_ask
+        quote.updated_at = time.time()
+
+        for listener in self._tick_listeners:
+            try:
+                listener(stock_code, price)
+            except Exception as e:
+                self.logger.error("Tick listener failed for %s: %s", stock_code, e, extra={"stock_code": stock_code})
+
+    def handle_real(self, real_type: str, item: str, values: Dict[str, str]) -> None:
+        """Apply a REAL message from the Kiwoom WebSocket"""
+        if real_type == REALTIME_TYPES["TRADE"]:
+            price = parse_price(values.get("10"))
+            if price:
+                self.update_trade(
+                    item,
+                    price,
+                    volume=abs(int(values.get("15") or 0)),
+                    best_bid=parse_price(values.get("28")),
+                    best_ask=parse_price(values.get("27"))
+                )
+        elif real_type == REALTIME_TYPES["ORDERBOOK"]:
+            if item.endswith(NXT_ITEM_SUFFIX):
+                stock_code, venue = item[:-len(NXT_ITEM_SUFFIX)], "NXT"
+            elif "_" in item:
+                return  # other suffixes (e.g. _AL, the combined book) are not a single venue
+            else:
+                stock_code, venue = item, "KRX"
+            self.update_book(
+                stock_code,
+                venue,
+                bid=parse_price(values.get("51")),
+                bid_size=parse_price(values.get("71")),
+                ask=parse_price(values.get("41")),
+                ask_size=parse_price(values.get("61"))
+            )
@@ -0,0 +1,308 @@
+"""
+Per-symbol limit order book for simulated (paper) execution
+"""
+
+import heapq
+import itertools
+import math
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple, Union, overload
+
+
+# Trade type codes (TRADE_TYPES) grouped by execution semantics
+MARKET_CODES = {"3", "13", "23"}
+BEST_COUNTER_CODES = {"6", "16", "26"}
+BEST_OWN_CODES = {"7"}
+MID_CODES = {"29", "30", "31"}
+STOP_CODES = {"28"}
+IOC_CODES = {"10", "13", "16", "30"}
+FOK_CODES = {"20", "23", "26", "31"}
+
+STATUS_OPEN = "open"
+STATUS_FILLED = "filled"
+STATUS_CANCELLED = "cancelled"
+STATUS_REJECTED = "rejected"
+STATUS_STOP = "stop_pending"
+
+
+@dataclass(slots=True)
+class BookOrder:
+    """Simulated order and its fill state"""
+    order_number: str
+    stock_code: str
+    is_buy: bool
+    quantity: int
+    trade_type_code: str
+    price: int = 0
+    stop_price: int = 0
+    filled_quantity: int = 0
+    fill_notional: int = 0
+    reserved_price: Optional[int] = None
+    status: str = STATUS_OPEN
+    message: str = ""
+    created_at: float = field(default_factory=time.time)
+
+    @property
+    def remaining(self) -> int:
+        """Unfilled quantity"""
+        return self.quantity - self.filled_quantity
+
+    @property
+    def average_price(self) -> float:
+        """Average fill price"""
+        return self.fill_notional / self.filled_quantity if self.filled_quantity else 0.0
+
+
+@dataclass(slots=True)
+class Fill:
+    """Single execution"""
+    order_number: str
+    stock_code: str
+    is_buy: bool
+    quantity: int
+    price: int
+    filled_at: float
+
+
+class FillLog:
+    """Append-only executions stored column-wise
+
+    A long session or backtest accumulates many fills, so they are kept
+    as parallel arrays (about 40 bytes a fill) rather than one object
+    each. Indexing and iteration build Fill records on demand.
+    """
+
+    __slots__ = ("order_numbers", "stock_codes", "sides", "quantities", "prices", "filled_at")
+
+    def __init__(self):
+        self.order_numbers: List[str] = []
+        self.stock_codes: List[str] = []
+        self.sides = bytearray()
+        self.quantities = array("q")
+        self.prices = array("q")
+        self.filled_at = array("d")
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def append(self, fill: Fill) -> None:
+        self.order_numbers.append(fill.order_number)
+        self.stock_codes.append(fill.stock_code)
+        self.sides.append(fill.is_buy)
+        self.quantities.append(fill.quantity)
+        self.prices.append(fill.price)
+        self.filled_at.append(fill.filled_at)
+
+    def _record(self, i: int) -> Fill:
+        return Fill(
+            self.order_numbers[i], self.stock_codes[i], bool(self.sides[i]),
+            self.quantities[i], self.prices[i], self.filled_at[i]
+        )
+
+    @overload
+    def __getitem__(self, index: int) -> Fill: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Fill]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Fill, List[Fill]]:
+        if isinstance(index, slice):
+            return [self._record(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("fill index out of range")
+        return self._record(index)
+
+    def __iter__(self) -> Iterator[Fill]:
+        return (self._record(i) for i in range(len(self)))
+
+    def notional(self) -> int:
+        """Traded value across all fills"""
+        return sum(q * p for q, p in zip(self.quantities, self.prices))
+
+
+class OrderBook:
+    """Resting orders for one symbol matched against the market's top of book
+
+    Market liquidity is the latest quote: up to `quote_depth` shares at the
+    best ask/bid per market update (unlimited when None). Resting orders
+    keep price-time priority in heaps and fill at their limit when the
+    quote or a trade reaches them. Cancelled and filled orders are dropped
+    lazily from the heaps.
+    """
+
+    def __init__(self, stock_code: str, quote_depth: Optional[int] = None):
+        self.stock_code = stock_code
+        self.quote_depth = quote_depth
+        self.last_price = 0
+        self.best_bid = 0
+        self.best_ask = 0
+        self.clock = time.time
+        self._ask_liquidity = math.inf
+        self._bid_liquidity = math.inf
+        self._seq = itertools.count()
+        # Buys: max-heap on price; sells: min-heap on price
+        self._bids: List[Tuple[int, int, BookOrder]] = []
+        self._asks: List[Tuple[int, int, BookOrder]] = []
+        # Buy stops fire on price >= stop (min-heap); sell stops on price <= stop (max-heap)
+        self._buy_stops: List[Tuple[int, int, BookOrder]] = []
+        self._sell_stops: List[Tuple[int, int, BookOrder]] = []
+
+    def _counter_price(self, is_buy: bool) -> int:
+        """Price an incoming order would trade at (falls back to the last trade)"""
+        return (self.best_ask if is_buy else self.best_bid) or self.last_price
+
+    def _take_liquidity(self, is_buy: bool, quantity: int) -> int:
+        """Consume up to `quantity` of the opposite side's quote"""
+        if is_buy:
+            taken = int(min(quantity, self._ask_liquidity))
+            self._ask_liquidity -= taken
+        else:
+            taken = int(min(quantity, self._bid_liquidity))
+            self._bid_liquidity -= taken
+        return taken
+
+    def _available(self, is_buy: bool) -> float:
+        return self._ask_liquidity if is_buy else self._bid_liquidity
+
+    def _fill(self, order: BookOrder, quantity: int, price: int, fills: List[Fill]) -> None:
+        order.filled_quantity += quantity
+        order.fill_notional += quantity * price
+        if order.remaining == 0:
+            order.status = STATUS_FILLED
+        fills.append(Fill(order.order_number, order.stock_code, order.is_buy, quantity, price, self.clock()))
+
+    def _rest(self, order: BookOrder) -> None:
+        order.status = STATUS_OPEN
+        if order.is_buy:
+            heapq.heappush(self._bids, (-order.price, next(self._seq), order))
+        else:
+            heapq.heappush(self._asks, (order.price, next(self._seq), order))
+
+    def limit_price(self, order: BookOrder) -> Optional[int]:
+        """Effective limit for the order's trade type (None = market)"""
+        code = order.trade_type_code
+        if code in MARKET_CODES:
+            return None
+        if code in BEST_COUNTER_CODES:
+            return self._counter_price(order.is_buy) or None
+        if code in BEST_OWN_CODES:
+            return (self.best_bid if order.is_buy else self.best_ask) or self.last_price or None
+        if code in MID_CODES:
+            if self.best_bid and self.best_ask:
+                return (self.best_bid + self.best_ask) // 2
+            return self.last_price or None
+        return order.price or None
+
+    def submit(self, order: BookOrder) -> List[Fill]:
+        """Execute an incoming order; returns fills (order status is updated in place)"""
+        fills: List[Fill] = []
+        code = order.trade_type_code
+
+        if code in STOP_CODES:
+            if not order.stop_price or not order.price:
+                order.status, order.message = STATUS_REJECTED, "스톱지정가 주문에는 조건가격과 주문가격이 필요합니다"
+                return fills
+            triggered = self.last_price and (
+                self.last_price >= order.stop_price if order.is_buy else self.last_price <= order.stop_price
+            )
+            if not triggered:
+                order.status = STATUS_STOP
+                stops = self._buy_stops if order.is_buy else self._sell_stops
+                key = order.stop_price if order.is_buy else -order.stop_price
+                heapq.heappush(stops, (key, next(self._seq), order))
+                return fills
+
+        limit = self.limit_price(order)
+        counter = self._counter_price(order.is_buy)
+        if limit is None and not counter:
+            order.status, order.message = STATUS_REJECTED, "시세가 없어 주문을 체결할 수 없습니다"
+            return fills
+        if code not in MARKET_CODES and limit is None:
+            order.status, order.message = STATUS_REJECTED, "주문가격을 정할 수 없습니다"
+            return fills
+
+        marketable = bool(counter) and (
+            limit is None or (limit >= counter if order.is_buy else limit <= counter)
+        )
+        fillable = int(min(order.remaining, self._available(order.is_buy))) if marketable else 0
+
+        if code in FOK_CODES and fillable < order.quantity:
+            order.status, order.message = STATUS_CANCELLED, "전량 체결 불가 (FOK)"
+            return fills
+
+        if fillable:
+            self._fill(order, self._take_liquidity(order.is_buy, fillable), counter, fills)
+
+        if order.remaining:
+            if code in IOC_CODES or code in FOK_CODES:
+                order.status, order.message = STATUS_CANCELLED, "미체결 잔량 취소 (IOC)"
+            else:
+                # Unfilled market orders rest at the quote they could not take
+                order.price = limit if limit is not None else counter
+                self._rest(order)
+        return fills
+
+    def has_resting(self) -> bool:
+        """Whether any resting or stop orders may still be live"""
+        return bool(self._bids or self._asks or self._buy_stops or self._sell_stops)
+
+    def cancel(self, order: BookOrder) -> bool:
+        """Cancel a resting or pending stop order (removed lazily)"""
+        if order.status in (STATUS_OPEN, STATUS_STOP):
+            order.status = STATUS_CANCELLED
+            return True
+        return False
+
+    def update(self, price: int, best_bid: int = 0, best_ask: int = 0) -> List[Fill]:
+        """Apply a market update and fill resting orders it reaches"""
+        fills: List[Fill] = []
+        if price:
+            self.last_price = price
+        if best_bid:
+            self.best_bid = best_bid
+        if best_ask:
+            self.best_ask = best_ask
+        depth = math.inf if self.quote_depth is None else self.quote_depth
+        self._ask_liquidity = self._bid_liquidity = depth
+
+        # Activate stops crossed by the trade
+        activated = []
+        while self._buy_stops and self.last_price and self._buy_stops[0][0] <= self.last_price:
+            activated.append(heapq.heappop(self._buy_stops)[2])
+        while self._sell_stops and self.last_price and -self._sell_stops[0][0] >= self.last_price:
+            activated.append(heapq.heappop(self._sell_stops)[2])
+        for order in activated:
+            if order.status == STATUS_STOP:
+                order.trade_type_code = "0"
+                fills.extend(self.submit(order))
+
+        # Buys fill when the ask (or a trade) is at or below their limit
+        while self._bids and self._available(True) > 0:
+            neg_price, _, order = self._bids[0]
+            if order.status != STATUS_OPEN:
+                heapq.heappop(self._bids)
+                continue
+            limit = -neg_price
+            if not ((self.best_ask and self.best_ask <= limit) or (price and price < limit)):
+                break
+            self._fill(order, self._take_liquidity(True, order.remaining), limit, fills)
+            if order.status == STATUS_FILLED:
+                heapq.heappop(self._bids)
+
+        # Sells fill when the bid (or a trade) is at or above their limit
+        while self._asks and self._available(False) > 0:
+            limit, _, order = self._asks[0]
+            if order.status != STATUS_OPEN:
+                heapq.heappop(self._asks)
+                continue
+            if not ((self.best_bid and self.best_bid >= limit) or (price and price > limit)):
+                break
+            self._fill(order, self._take_liquidity(False, order.remaining), limit, fills)
+            if order.status == STATUS_FILLED:
+                heapq.heappop(self._asks)
+
+        return fills
@@ -0,0 +1,67 @@
+"""
+Reference data preloaded before the open: symbol master, price limits and holdings
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from models.types import HoldingItem, StockInfo, SymbolInfo
+
+
+class ReferenceDataCache:
+    """Latest symbol master, daily price limits and holdings
+
+    Each section is replaced as a whole when it is refreshed, so readers
+    never see a half-loaded map.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.symbols: Dict[str, SymbolInfo] = {}
+        self.limits: Dict[str, StockInfo] = {}
+        self.holdings: Dict[str, HoldingItem] = {}
+        self.loaded_at: Dict[str, float] = {}
+        self._holdings_listeners: List[Callable[[List[HoldingItem]], None]] = []
+
+    def add_holdings_listener(self, listener: Callable[[List[HoldingItem]], None]) -> None:
+        """Register a callback run with the holdings after each refresh"""
+        self._holdings_listeners.append(listener)
+
+    def set_symbols(self, symbols: Iterable[SymbolInfo]) -> None:
+        mapping = {symbol.stock_code: symbol for symbol in symbols}
+        with self._lock:
+            self.symbols = mapping
+            self.loaded_at["symbols"] = time.time()
+
+    def update_limits(self, infos: Iterable[StockInfo]) -> None:
+        """Merge price limits (the day's limits are fixed, so older entries stay valid)"""
+        with self._lock:
+            limits = dict(self.limits)
+            limits.update((info.stock_code, info) for info in infos)
+            self.limits = limits
+            self.loaded_at["limits"] = time.time()
+
+    def set_holdings(self, holdings: Iterable[HoldingItem]) -> None:
+        mapping = {holding.stock_code: holding for holding in holdings}
+        with self._lock:
+            self.holdings = mapping
+            self.loaded_at["holdings"] = time.time()
+        for listener in self._holdings_listeners:
+            listener(list(mapping.values()))
+
+    def symbol(self, stock_code: str) -> Optional[SymbolInfo]:
+        return self.symbols.get(stock_code)
+
+    def nxt_enabled(self, stock_code: str) -> Optional[bool]:
+        """Whether a symbol trades on NXT (None before the symbol master is loaded)"""
+        if not self.symbols:
+            return None
+        symbol = self.symbols.get(stock_code)
+        return symbol.nxt_enabled if symbol else False
+
+    def limit(self, stock_code: str) -> Optional[StockInfo]:
+        return self.limits.get(stock_code)
+
+    def holding_codes(self) -> List[str]:
+        return [code for code, holding in self.holdings.items() if holding.quantity]
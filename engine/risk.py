@@ -0,0 +1,339 @@
+"""
+Pre-trade risk gate with incrementally maintained exposure aggregates
+
+Exposure is the account's holdings plus the unfilled part of accepted
+orders. It is seeded from kt00018 holdings, a submitted order books its
+full quantity, and fills, cancels and rejects move that booking into the
+position or release it.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from config.constants import REALTIME_TYPES
+from config.settings import RiskConfig
+from engine.market_data import parse_price
+from models.types import HoldingItem, OrderRequest
+from models.exceptions import RiskLimitError
+
+
+# (stock_code, signed quantity, signed notional)
+Delta = Tuple[str, int, int]
+
+# REAL "00" (order execution) value fields
+FIELD_ORDER_NUMBER = "9203"
+FIELD_ORIGINAL_ORDER = "904"
+FIELD_CODE = "9001"
+FIELD_SIDE = "905"         # "+매수", "-매도", "매수취소", ...
+FIELD_ORDER_QUANTITY = "900"
+FIELD_FILLED_TOTAL = "911"  # cumulative filled quantity of the order
+FIELD_FILL_PRICE = "910"
+FIELD_REMAINING = "902"
+
+
+@dataclass(slots=True)
+class WorkingOrder:
+    """Order whose unfilled quantity is booked at its order price"""
+    stock_code: str
+    sign: int
+    # None for orders the gate never booked (placed elsewhere, or seen before their response)
+    price: Optional[int]
+    remaining: int = 0
+    filled: int = 0
+    closed: bool = False
+    created_at: float = field(default_factory=time.time)
+
+
+class ExposureBook:
+    """Signed per-symbol exposure with per-sector and gross aggregates kept in step"""
+
+    def __init__(self, sectors: Dict[str, str]):
+        self.sectors = sectors
+        self.quantity: Dict[str, int] = {}
+        self.notional: Dict[str, int] = {}
+        self.sector_gross: Dict[str, int] = {}
+        self.gross = 0
+
+    def sector_of(self, stock_code: str) -> str:
+        """Sector of a symbol ('기타' when unmapped)"""
+        return self.sectors.get(stock_code, "기타")
+
+    def apply(self, stock_code: str, quantity: int, notional: int) -> None:
+        """Add a signed quantity/notional change and update the aggregates"""
+        old = self.notional.get(stock_code, 0)
+        new_quantity = self.quantity.get(stock_code, 0) + quantity
+        # A flat symbol has no exposure, whatever prices it was traded at
+        new = old + notional if new_quantity else 0
+        self.quantity[stock_code] = new_quantity
+        self.notional[stock_code] = new
+
+        change = abs(new) - abs(old)
+        sector = self.sector_of(stock_code)
+        self.sector_gross[sector] = self.sector_gross.get(sector, 0) + change
+        self.gross += change
+
+    def reset(self, positions: Dict[str, Tuple[int, int]]) -> None:
+        """Replace exposure with (quantity, price) holdings"""
+        self.quantity = {code: quantity for code, (quantity, _) in positions.items()}
+        self.notional = {code: quantity * price for code, (quantity, price) in positions.items()}
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """Recompute sector and gross aggregates from per-symbol notional"""
+        self.sector_gross = {}
+        for stock_code, notional in self.notional.items():
+            sector = self.sector_of(stock_code)
+            self.sector_gross[sector] = self.sector_gross.get(sector, 0) + abs(notional)
+        self.gross = sum(self.sector_gross.values())
+
+
+class RiskGate:
+    """Check orders against limits in O(symbols in the order) time"""
+
+    def __init__(self, limits: RiskConfig, price_lookup: Callable[[str], Optional[int]]):
+        self.limits = limits
+        self.price_lookup = price_lookup
+        self.exposure = ExposureBook(limits.sectors)
+        self.logger = logging.getLogger(__name__)
+        # Accepted orders by order number; paper fills arrive on worker threads
+        self.orders: Dict[str, WorkingOrder] = {}
+        # Bookings of sends whose outcome is unknown, by journal id, until reconciled
+        self.in_doubt: Dict[str, Delta] = {}
+        self._lock = threading.RLock()
+
+    def set_limits(self, limits: RiskConfig) -> None:
+        """Replace limits, keeping current exposure"""
+        self.limits = limits
+        self.exposure.sectors = limits.sectors
+        self.exposure.rebuild()
+
+    def _price(self, order_request: OrderRequest) -> Optional[int]:
+        """Order price, falling back to the last traded price for market orders"""
+        if order_request.price:
+            try:
+                return int(float(order_request.price))
+            except ValueError:
+                pass
+        return self.price_lookup(order_request.stock_code)
+
+    def deltas(self, orders: List[Tuple[OrderRequest, bool]]) -> List[Delta]:
+        """Exposure changes for orders, assuming full fills"""
+        deltas = []
+        for order_request, is_buy in orders:
+            price = self._price(order_request)
+            if price is None:
+                if self.limits.uses_notional:
+                    raise RiskLimitError(
+                        f"{order_request.stock_code}: 가격을 알 수 없어 한도를 확인할 수 없습니다 (지정가 또는 실시간 시세 필요)"
+                    )
+                price = 0
+            sign = 1 if is_buy else -1
+            deltas.append((order_request.stock_code, sign * order_request.quantity, sign * order_request.quantity * price))
+        return deltas
+
+    def check(self, deltas: List[Delta]) -> None:
+        """Raise RiskLimitError if the combined deltas breach a limit
+
+        Changes that shrink an exposure always pass, so positions over a
+        limit can still be reduced.
+        """
+        limits = self.limits
+        exposure = self.exposure
+
+        by_symbol: Dict[str, List[int]] = {}
+        for stock_code, quantity, notional in deltas:
+            if limits.max_order_notional and abs(notional) > limits.max_order_notional:
+                raise RiskLimitError(
+                    f"{stock_code}: 주문금액 {abs(notional):,}원이 주문당 한도 {limits.max_order_notional:,}원을 초과합니다"
+                )
+            total = by_symbol.setdefault(stock_code, [0, 0])
+            total[0] += quantity
+            total[1] += notional
+
+        sector_change: Dict[str, int] = {}
+        gross_change = 0
+        for stock_code, (quantity, notional) in by_symbol.items():
+            old_qty = exposure.quantity.get(stock_code, 0)
+            old_notional = exposure.notional.get(stock_code, 0)
+            new_qty = old_qty + quantity
+            new_notional = old_notional + notional
+
+            qty_limit = limits.symbol_quantity_limit(stock_code)
+            if qty_limit is not None and abs(new_qty) > qty_limit and abs(new_qty) > abs(old_qty):
+                raise RiskLimitError(
+                    f"{stock_code}: 보유수량 {abs(new_qty):,}주가 종목 수량 한도 {qty_limit:,}주를 초과합니다"
+                )
+
+            notional_limit = limits.symbol_notional_limit(stock_code)
+            change = abs(new_notional) - abs(old_notional)
+            if notional_limit is not None and abs(new_notional) > notional_limit and change > 0:
+                raise RiskLimitError(
+                    f"{stock_code}: 종목 노출 {abs(new_notional):,}원이 종목 한도 {notional_limit:,}원을 초과합니다"
+                )
+
+            sector = exposure.sector_of(stock_code)
+            sector_change[sector] = sector_change.get(sector, 0) + change
+            gross_change += change
+
+        for sector, change in sector_change.items():
+            limit = limits.sector_notional_limit(sector)
+            new_sector = exposure.sector_gross.get(sector, 0) + change
+            if limit is not None and new_sector > limit and change > 0:
+                raise RiskLimitError(
+                    f"섹터 '{sector}': 노출 {new_sector:,}원이 섹터 한도 {limit:,}원을 초과합니다"
+                )
+
+        new_gross = exposure.gross + gross_change
+        if limits.max_gross_notional is not None and new_gross > limits.max_gross_notional and gross_change > 0:
+            raise RiskLimitError(
+                f"총 노출 {new_gross:,}원이 총 한도 {limits.max_gross_notional:,}원을 초과합니다"
+            )
+
+    def reserve(self, orders: List[Tuple[OrderRequest, bool]]) -> List[Delta]:
+        """Check orders as a whole and book their exposure; returns deltas for release"""
+        deltas = self.deltas(orders)
+        with self._lock:
+            self.check(deltas)
+            for delta in deltas:
+                self.exposure.apply(*delta)
+        return deltas
+
+    def release(self, deltas: List[Delta]) -> None:
+        """Undo reserved exposure for orders that were not accepted"""
+        with self._lock:
+            for stock_code, quantity, notional in deltas:
+                self.exposure.apply(stock_code, -quantity, -notional)
+
+    def track(self, order_number: Optional[str], delta: Delta) -> None:
+        """Keep an accepted order's booking until fills or a cancel settle it
+
+        Fills or a close seen for the order before its response came back
+        have already been applied, so the matching part of the booking is
+        released here.
+        """
+        if not order_number:
+            return
+        stock_code, quantity, notional = delta
+        if not quantity:
+            return
+        sign = 1 if quantity > 0 else -1
+        size = abs(quantity)
+        price = notional // quantity
+        with self._lock:
+            early = self.orders.pop(order_number, None)
+            filled = min(early.filled, size) if early else 0
+            remaining = size - filled
+            if early and early.closed:
+                filled, remaining = size, 0
+            if filled:
+                self.exposure.apply(stock_code, -sign * filled, -sign * filled * price)
+            if remaining:
+                self.orders[order_number] = WorkingOrder(
+                    stock_code, sign, price, remaining, early.filled if early else 0
+                )
+
+    def hold(self, journal_id: str, delta: Delta) -> None:
+        """Keep the booking of a send with no upstream response until reconcile settles it"""
+        with self._lock:
+            self.in_doubt[journal_id] = delta
+
+    def settle_in_doubt(self, journal_id: str, order_number: Optional[str]) -> None:
+        """Track a reconciled order under its order number, or release it when it never went out"""
+        with self._lock:
+            delta = self.in_doubt.pop(journal_id, None)
+            if delta is None:
+                return
+            if order_number:
+                self.track(order_number, delta)
+            else:
+                self.release([delta])
+
+    def on_fill(self, order_number: str, stock_code: str, is_buy: bool, quantity: int, price: int) -> None:
+        """Move a fill from the order's booking into the position"""
+        if quantity <= 0:
+            return
+        sign = 1 if is_buy else -1
+        with self._lock:
+            order = self.orders.get(order_number)
+            if order is None:
+                order = self.orders[order_number] = WorkingOrder(stock_code, sign, None)
+            order.filled += quantity
+            booked = min(quantity, order.remaining) if order.price is not None else 0
+            if booked:
+                # Same quantity, now valued at the fill price
+                self.exposure.apply(stock_code, 0, sign * booked * (price - order.price))
+                order.remaining -= booked
+            extra = quantity - booked
+            if extra:
+                self.exposure.apply(stock_code, sign * extra, sign * extra * price)
+            if order.price is not None and not order.remaining:
+                del self.orders[order_number]
+
+    def on_close(self, order_number: str, quantity: Optional[int] = None) -> None:
+        """Release the unfilled booking of a cancelled, rejected or expired order (or `quantity` of it)"""
+        with self._lock:
+            order = self.orders.get(order_number)
+            if order is None or order.price is None:
+                # Not booked yet: remember the close for track()
+                if quantity is None:
+                    if order is None:
+                        order = self.orders[order_number] = WorkingOrder("", 0, None)
+                    order.closed = True
+                return
+            released = order.remaining if quantity is None else min(quantity, order.remaining)
+            self.exposure.apply(order.stock_code, -order.sign * released, -order.sign * released * order.price)
+            order.remaining -= released
+            if not order.remaining:
+                del self.orders[order_number]
+
+    def load_holdings(self, holdings: Iterable[HoldingItem], today: Optional[date] = None) -> None:
+        """Seed exposure from account holdings, keeping today's working orders on top
+
+        Orders from earlier days have expired and are dropped.
+        """
+        start = datetime.combine(today or date.today(), datetime.min.time()).timestamp()
+        positions = {
+            holding.stock_code: (holding.quantity, holding.current_price or holding.average_price)
+            for holding in holdings if holding.quantity
+        }
+        with self._lock:
+            self.orders = {
+                number: order for number, order in self.orders.items()
+                if order.created_at >= start and order.price is not None
+            }
+            self.exposure.reset(positions)
+            for order in self.orders.values():
+                self.exposure.apply(order.stock_code, order.sign * order.remaining, order.sign * order.remaining * order.price)
+            for delta in self.in_doubt.values():
+                self.exposure.apply(*delta)
+
+    def handle_real(self, real_type: str, item: str, values: Dict[str, str]) -> None:
+        """Apply a live order execution event (REAL type "00")"""
+        if real_type != REALTIME_TYPES["ORDER_EXECUTION"]:
+            return
+        order_number = values.get(FIELD_ORDER_NUMBER, "").strip()
+        side = values.get(FIELD_SIDE, "")
+        if not order_number:
+            return
+
+        if "취소" in side:
+            original = values.get(FIELD_ORIGINAL_ORDER, "").strip()
+            if original:
+                self.on_close(original, parse_price(values.get(FIELD_ORDER_QUANTITY)) or None)
+            return
+
+        stock_code = values.get(FIELD_CODE, "").lstrip("A")
+        filled_total = parse_price(values.get(FIELD_FILLED_TOTAL))
+        with self._lock:
+            order = self.orders.get(order_number)
+            new = filled_total - (order.filled if order else 0)
+            if new > 0:
+                self.on_fill(order_number, stock_code, "매수" in side, new, parse_price(values.get(FIELD_FILL_PRICE)))
+            if FIELD_REMAINING in values and not parse_price(values[FIELD_REMAINING]):
+                # Fully filled orders are already settled; this only releases a leftover booking
+                if order_number in self.orders:
+                    self.on_close(order_number)
@@ -0,0 +1,174 @@
+"""
+Local smart order routing across KRX and NXT
+
+Orders sent with exchange "AUTO" are routed from the cached top of book
+of each venue: the quantity goes to the venue with the better touch price,
+spills to the other venue when it exceeds the size shown there, and any
+rest beyond both displayed sizes goes to KRX, the deeper book. Venues
+whose current session does not take the trade type are left out. The
+decision reads only in-memory quotes, so it adds no upstream round-trip.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Set
+
+from config.constants import (
+    LIMIT_TRADE_TYPES, NXT_ITEM_SUFFIX, NXT_TRADE_TYPES, REALTIME_TYPES, ROUTE_QUOTE_MAX_AGE_SEC, ROUTE_VENUES
+)
+from engine.market_data import MarketDataCache
+from models.types import OrderRequest
+
+
+# Venue that takes the whole order when nothing better is known, and any remainder
+PRIMARY_VENUE = "KRX"
+
+
+@dataclass(slots=True)
+class RouteLeg:
+    """Quantity sent to one venue and the touch price seen there"""
+    venue: str
+    quantity: int
+    price: int = 0
+
+
+@dataclass(slots=True)
+class RouteDecision:
+    """Where an AUTO order went and why"""
+    stock_code: str
+    is_buy: bool
+    legs: List[RouteLeg]
+    reason: str
+    decided_us: float = 0.0
+
+    def summary(self) -> str:
+        legs = " + ".join(
+            f"{leg.venue} {leg.quantity:,}주" + (f"@{leg.price:,}" if leg.price else "") for leg in self.legs
+        )
+        return f"{legs} ({self.reason})"
+
+
+class SmartOrderRouter:
+    """Pick a venue, or split across venues, from cached top of book"""
+
+    def __init__(
+        self,
+        market_data: MarketDataCache,
+        realtime=None,
+        nxt_enabled: Optional[Callable[[str], Optional[bool]]] = None,
+        accepts: Optional[Callable[[str, str], bool]] = None,
+        max_age: float = ROUTE_QUOTE_MAX_AGE_SEC,
+        clock: Callable[[], float] = time.time
+    ):
+        self.market_data = market_data
+        self.realtime = realtime
+        self.nxt_enabled = nxt_enabled
+        # (venue, trade_type) -> whether the venue's current session takes it
+        self.accepts = accepts
+        self.max_age = max_age
+        self.clock = clock
+        self.logger = logging.getLogger(__name__)
+        self._watched: Set[str] = set()
+
+    async def watch(self, codes: List[str]) -> None:
+        """Subscribe both venues' order books for symbols"""
+        new = [code for code in codes if code not in self._watched]
+        if not new or self.realtime is None:
+            return
+        self._watched.update(new)
+        await self.realtime.subscribe(new, REALTIME_TYPES["ORDERBOOK"])
+        await self.realtime.subscribe([code + NXT_ITEM_SUFFIX for code in new], REALTIME_TYPES["ORDERBOOK"])
+
+    def _watch_later(self, stock_code: str) -> None:
+        """Start quoting a symbol first seen on the order path (used from the next order on)"""
+        if self.realtime is None or stock_code in self._watched:
+            return
+        try:
+            asyncio.get_running_loop().create_task(self.watch([stock_code]))
+        except RuntimeError:
+            pass  # no loop (e.g. a synchronous caller); quotes stay unwatched
+
+    def route(self, order_request: OrderRequest, is_buy: bool) -> RouteDecision:
+        """Split an order across venues by touch price, then displayed size"""
+        started = time.perf_counter()
+        decision = self._decide(order_request, is_buy)
+        decision.decided_us = (time.perf_counter() - started) * 1e6
+        return decision
+
+    def _decide(self, order_request: OrderRequest, is_buy: bool) -> RouteDecision:
+        stock_code = order_request.stock_code
+        quantity = int(order_request.quantity)
+
+        def primary(reason: str, price: int = 0) -> RouteDecision:
+            return RouteDecision(stock_code, is_buy, [RouteLeg(PRIMARY_VENUE, quantity, price)], reason)
+
+        if order_request.trade_type not in NXT_TRADE_TYPES:
+            return primary("NXT 미지원 매매구분")
+        if self.nxt_enabled is not None and self.nxt_enabled(stock_code) is False:
+            return primary("NXT 거래 불가 종목")
+
+        venues = ROUTE_VENUES
+        if self.accepts is not None:
+            venues = tuple(venue for venue in ROUTE_VENUES if self.accepts(venue, order_request.trade_type))
+            if venues and PRIMARY_VENUE not in venues:
+                # Only NXT is in session (pre-market, after-market)
+                return RouteDecision(
+                    stock_code, is_buy, [RouteLeg(venues[0], quantity)], f"{PRIMARY_VENUE} 장 운영시간 아님"
+                )
+            if len(venues) < len(ROUTE_VENUES):
+                return primary("NXT 장 운영시간 아님" if venues else "장 운영시간 아님")
+
+        # (venue, touch price, size) on the side this order takes
+        now = self.clock()
+        touches = []
+        for venue in venues:
+            book = self.market_data.book(stock_code, venue)
+            if book is None or now - book.updated_at > self.max_age:
+                continue
+            price, size = (book.ask, book.ask_size) if is_buy else (book.bid, book.bid_size)
+            if price and size:
+                touches.append((venue, price, size))
+        if not touches:
+            self._watch_later(stock_code)
+            return primary("호가 없음")
+
+        limit = None
+        if order_request.trade_type in LIMIT_TRADE_TYPES and order_request.price:
+            limit = int(float(order_request.price))
+        marketable = [
+            touch for touch in touches
+            if limit is None or (touch[1] <= limit if is_buy else touch[1] >= limit)
+        ]
+        if not marketable:
+            return primary("지정가 미도달, 주시장 대기")
+
+        # Better price first; larger size breaks ties, then venue order (KRX first)
+        marketable.sort(key=lambda t: (t[1] if is_buy else -t[1], -t[2], ROUTE_VENUES.index(t[0])))
+        legs = []
+        remaining = quantity
+        for venue, price, size in marketable:
+            take = min(remaining, size)
+            legs.append(RouteLeg(venue, take, price))
+            remaining -= take
+            if not remaining:
+                break
+
+        side = "매도호가" if is_buy else "매수호가"
+        best = legs[0]
+        if remaining:
+            # Beyond the displayed sizes the primary venue's deeper book takes the rest
+            primary_leg = next((leg for leg in legs if leg.venue == PRIMARY_VENUE), None)
+            if primary_leg is None:
+                legs.append(RouteLeg(PRIMARY_VENUE, remaining))
+            else:
+                primary_leg.quantity += remaining
+        if len(legs) == 1:
+            reason = f"최우선 {side} {best.venue} {best.price:,}"
+            if len(touches) > 1:
+                other = next(t for t in touches if t[0] != best.venue)
+                reason += f" vs {other[0]} {other[1]:,}"
+        else:
+            reason = f"{best.venue} {side} 잔량 {marketable[0][2]:,}주 소진 후 {legs[1].venue}"
+        return RouteDecision(stock_code, is_buy, legs, reason)
@@ -0,0 +1,310 @@
+"""
+KRX/NXT trading calendar and the queue for orders held until a session opens
+
+Each day profile (regular, first trading day, exam day) is expanded once
+into a per-second table of session indexes per venue, so "which session is
+it" is a holiday set lookup plus an index into that table.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config.constants import (
+    CSAT_DAY_SHIFT, CSAT_DAYS, EXCHANGE_VENUES, FIRST_TRADING_DAY_SHIFT, KRX_HOLIDAYS, MARKET_SESSIONS,
+    SESSION_NAMES, SESSION_REMAP, SESSION_TRADE_TYPES
+)
+from models.exceptions import MarketClosedError
+from models.types import OrderRequest, OrderResponse
+
+
+# Korea has no daylight saving time
+KST = timezone(timedelta(hours=9), "KST")
+SECONDS_PER_DAY = 24 * 60 * 60
+# How far ahead next_open() looks for a session
+LOOKAHEAD_DAYS = 14
+
+# (minutes, last shifted boundary in seconds), or None for a regular day
+Profile = Optional[Tuple[int, int]]
+
+
+def kst_now() -> datetime:
+    """Current Korean time as a naive datetime"""
+    return datetime.now(KST).replace(tzinfo=None)
+
+
+def _seconds(hhmmss: str) -> int:
+    return int(hhmmss[:2]) * 3600 + int(hhmmss[2:4]) * 60 + int(hhmmss[4:6] or 0)
+
+
+def _parse_day(yyyymmdd: str) -> date:
+    return datetime.strptime(yyyymmdd, "%Y%m%d").date()
+
+
+@dataclass(slots=True)
+class SessionCheck:
+    """Whether an order can be sent now and what to do otherwise"""
+    accepted: bool
+    venue: Optional[str] = None
+    session: Optional[str] = None
+    remap: Optional[str] = None
+    next_open: Optional[datetime] = None
+    reason: str = ""
+
+
+class MarketCalendar:
+    """Trading days and session boundaries for KRX and NXT"""
+
+    def __init__(
+        self,
+        extra_holidays: Iterable[str] = (),
+        clock: Callable[[], datetime] = kst_now
+    ):
+        self.clock = clock
+        self.holidays = {_parse_day(d) for d in KRX_HOLIDAYS}
+        self.holidays.update(_parse_day(d) for d in extra_holidays)
+        self.csat_days = {_parse_day(d) for d in CSAT_DAYS}
+        self._first_days: Dict[int, date] = {}
+        # (profile, venue) -> [(start, end, session)] and per-second session indexes
+        self._windows: Dict[Tuple[Profile, str], List[Tuple[int, int, str]]] = {}
+        self._tables: Dict[Tuple[Profile, str], bytes] = {}
+
+    def is_trading_day(self, day: date) -> bool:
+        return day.weekday() < 5 and day not in self.holidays
+
+    def _first_trading_day(self, year: int) -> date:
+        first = self._first_days.get(year)
+        if first is None:
+            first = date(year, 1, 1)
+            while not self.is_trading_day(first):
+                first += timedelta(days=1)
+            self._first_days[year] = first
+        return first
+
+    def _profile(self, day: date) -> Profile:
+        if day in self.csat_days:
+            minutes, through = CSAT_DAY_SHIFT
+        elif day.month == 1 and day.day <= 7 and day == self._first_trading_day(day.year):
+            minutes, through = FIRST_TRADING_DAY_SHIFT
+        else:
+            return None
+        return minutes, _seconds(through)
+
+    def windows(self, venue: str, day: date) -> List[Tuple[int, int, str]]:
+        """(start, end, session) in seconds since midnight for a trading day"""
+        if not self.is_trading_day(day):
+            return []
+        return self._build(self._profile(day), venue)[0]
+
+    def _build(self, profile: Profile, venue: str) -> Tuple[List[Tuple[int, int, str]], bytes]:
+        key = (profile, venue)
+        windows = self._windows.get(key)
+        if windows is None:
+            def shift(boundary: int) -> int:
+                if profile is not None and boundary <= profile[1]:
+                    return boundary + profile[0] * 60
+                return boundary
+
+            windows = [
+                (shift(_seconds(start)), shift(_seconds(end)), name)
+                for name, start, end in MARKET_SESSIONS[venue]
+            ]
+            table = bytearray(SECONDS_PER_DAY)
+            for index, (start, end, _) in enumerate(windows, start=1):
+                table[start:end] = bytes([index]) * (end - start)
+            self._windows[key] = windows
+            self._tables[key] = bytes(table)
+        return windows, self._tables[key]
+
+    def session(self, venue: str, at: Optional[datetime] = None) -> Optional[str]:
+        """Session running on a venue at a time (None when closed)"""
+        at = at or self.clock()
+        day = at.date()
+        if not self.is_trading_day(day):
+            return None
+        windows, table = self._build(self._profile(day), venue)
+        index = table[at.hour * 3600 + at.minute * 60 + at.second]
+        return windows[index - 1][2] if index else None
+
+    def accepts(self, venue: str, trade_type: str, at: Optional[datetime] = None) -> bool:
+        """Whether a venue takes a trade type now"""
+        session = self.session(venue, at)
+        return session is not None and trade_type in SESSION_TRADE_TYPES[session]
+
+    def next_open(
+        self,
+        venues: Sequence[str],
+        trade_type: str,
+        at: Optional[datetime] = None
+    ) -> Optional[Tuple[datetime, str]]:
+        """Earliest (time, venue) from `at` on when one of the venues takes the trade type"""
+        at = at or self.clock()
+        best = None
+        for offset in range(LOOKAHEAD_DAYS):
+            day = at.date() + timedelta(days=offset)
+            midnight = datetime.combine(day, datetime.min.time())
+            now = (at - midnight).total_seconds() if offset == 0 else 0
+            for venue in venues:
+                for start, end, session in self.windows(venue, day):
+                    if end > now and trade_type in SESSION_TRADE_TYPES[session]:
+                        candidate = midnight + timedelta(seconds=max(start, now))
+                        if best is None or candidate < best[0]:
+                            best = (candidate, venue)
+                        break
+            if best is not None:
+                return best
+        return None
+
+    def check(self, order_request: OrderRequest, at: Optional[datetime] = None) -> SessionCheck:
+        """Session check for an order on its exchange's venues"""
+        at = at or self.clock()
+        venues = EXCHANGE_VENUES.get(order_request.exchange, ("KRX",))
+        trade_type = order_request.trade_type
+        for venue in venues:
+            session = self.session(venue, at)
+            if session is not None and trade_type in SESSION_TRADE_TYPES[session]:
+                return SessionCheck(True, venue, session)
+
+        upcoming = self.next_open(venues, trade_type, at)
+        next_open = upcoming[0] if upcoming else None
+        for venue in venues:
+            session = self.session(venue, at)
+            remap = SESSION_REMAP.get(session, {}).get(trade_type)
+            if remap:
+                return SessionCheck(
+                    False, venue, session, remap, next_open, self._reason(venue, session, trade_type, at)
+                )
+
+        venue = venues[0]
+        session = self.session(venue, at)
+        return SessionCheck(False, venue, session, None, next_open, self._reason(venue, session, trade_type, at))
+
+    def _reason(self, venue: str, session: Optional[str], trade_type: str, at: datetime) -> str:
+        if session is None:
+            closed = "" if self.is_trading_day(at.date()) else " (휴장일)"
+            return f"{venue} 장 운영시간이 아닙니다{closed}"
+        return f"{venue} {SESSION_NAMES[session]}에는 {trade_type} 주문을 받지 않습니다"
+
+
+@dataclass
+class QueuedOrder:
+    """Order held until a session accepts it"""
+    queue_id: str
+    order_request: OrderRequest
+    is_buy: bool
+    release_at: datetime
+    created_at: float = field(default_factory=time.time)
+    status: str = "queued"
+    result: Optional[str] = None
+
+
+SubmitOrder = Callable[[OrderRequest, bool, str], Awaitable[OrderResponse]]
+
+
+class SessionOrderQueue:
+    """Release held orders when their session opens
+
+    Orders are risk-checked and journaled at release, not when queued, and
+    the queue lives in memory only.
+    """
+
+    def __init__(self, submit_order: SubmitOrder, calendar: MarketCalendar):
+        self.submit_order = submit_order
+        self.calendar = calendar
+        self.logger = logging.getLogger(__name__)
+        self.orders: Dict[str, QueuedOrder] = {}
+        self._heap: List[Tuple[datetime, int, str]] = []
+        self._seq = itertools.count(1)
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def enqueue(self, order_request: OrderRequest, is_buy: bool, release_at: datetime) -> QueuedOrder:
+        seq = next(self._seq)
+        queued = QueuedOrder(f"Q{seq:04d}", order_request, is_buy, release_at)
+        self.orders[queued.queue_id] = queued
+        self._schedule(queued, seq)
+        return queued
+
+    def _schedule(self, queued: QueuedOrder, seq: int) -> None:
+        heapq.heappush(self._heap, (queued.release_at, seq, queued.queue_id))
+        self._wake.set()
+        self.logger.info("Order %s queued until %s", queued.queue_id, queued.release_at)
+
+    def cancel(self, queue_id: str) -> Optional[QueuedOrder]:
+        queued = self.orders.get(queue_id)
+        if queued and queued.status == "queued":
+            queued.status = "cancelled"
+        return queued
+
+    def pending(self) -> List[QueuedOrder]:
+        return sorted(
+            (queued for queued in self.orders.values() if queued.status == "queued"),
+            key=lambda q: q.release_at
+        )
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            if not self._heap:
+                await self._wake.wait()
+                continue
+            delay = (self._heap[0][0] - self.calendar.clock()).total_seconds()
+            if delay > 0:
+                try:
+                    # Sleep in bounded steps so a clock jump cannot hold orders for long
+                    await asyncio.wait_for(self._wake.wait(), timeout=min(delay, 60.0))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            due = []
+            now = self.calendar.clock()
+            while self._heap and self._heap[0][0] <= now:
+                _, _, queue_id = heapq.heappop(self._heap)
+                queued = self.orders[queue_id]
+                if queued.status == "queued":
+                    due.append(queued)
+            if due:
+                await asyncio.gather(*(self._release(queued) for queued in due))
+
+    async def _release(self, queued: QueuedOrder) -> None:
+        queued.status = "sending"
+        try:
+            response = await self.submit_order(queued.order_request, queued.is_buy, "session_queue")
+            if response.success:
+                queued.status = "sent"
+                queued.result = f"주문번호 {response.order_number}"
+            else:
+                queued.status = "failed"
+                queued.result = response.message
+        except MarketClosedError as e:
+            if e.next_open is None:
+                queued.status = "failed"
+                queued.result = str(e)
+                return
+            # Released a moment early (or the calendar changed): wait for the next open
+            queued.status = "queued"
+            queued.release_at = e.next_open
+            self._schedule(queued, next(self._seq))
+        except Exception as e:
+            queued.status = "failed"
+            queued.result = str(e)
+            self.logger.error("Queued order %s failed: %s", queued.queue_id, e)
@@ -0,0 +1,377 @@
+"""
+Local trigger engine for conditional orders evaluated on streaming prices
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config.constants import TRIGGER_HISTORY
+from models.types import OrderRequest, OrderResponse
+
+
+# Rebuild a symbol's heaps once cancelled entries outnumber armed ones (and at least this many)
+COMPACT_MIN_STALE = 64
+
+
+@dataclass
+class TriggerCondition:
+    """Armed price condition with an optional order to send when it fires"""
+    trigger_id: str
+    stock_code: str
+    condition: str
+    trigger_price: Optional[int] = None
+    trail_amount: Optional[float] = None
+    trail_percent: Optional[float] = None
+    order_request: Optional[OrderRequest] = None
+    is_buy: bool = False
+    oco_group: Optional[str] = None
+    status: str = "armed"
+    created_at: float = field(default_factory=time.time)
+    fired_at: Optional[float] = None
+    fire_price: Optional[int] = None
+    result: Optional[str] = None
+
+    @property
+    def is_armed(self) -> bool:
+        """Whether the condition can still fire"""
+        return self.status == "armed"
+
+
+class _TrailGroup:
+    """Trailing conditions sharing the same running peak"""
+    __slots__ = ("peak", "heap", "version")
+
+    def __init__(self, peak: float):
+        self.peak = peak
+        self.heap: List[Tuple[float, int, TriggerCondition]] = []
+        self.version = 0
+
+    def level(self) -> Optional[float]:
+        """Highest stop level in the group (peak minus the tightest trail)"""
+        return self.peak - self.heap[0][0] if self.heap else None
+
+
+class TrailingBook:
+    """Fire conditions when value falls `trail` below its running peak since arming
+
+    Conditions are grouped by peak. A new high merges every group whose peak
+    is below it into one group (smaller heaps pushed into the largest), so each
+    condition is merged O(log n) times over its life. A lazy max-heap over the
+    groups' stop levels finds triggered groups in O(log n) per tick.
+    """
+
+    def __init__(self):
+        # Sorted by peak, descending: the lowest peaks are at the end
+        self._groups: List[_TrailGroup] = []
+        self._levels: List[Tuple[float, int, int, _TrailGroup]] = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return sum(len(g.heap) for g in self._groups)
+
+    def _push_level(self, group: _TrailGroup) -> None:
+        """Publish the group's current stop level"""
+        group.version += 1
+        level = group.level()
+        if level is not None:
+            heapq.heappush(self._levels, (-level, next(self._seq), group.version, group))
+
+    def add(self, value: float, trail: float, condition: TriggerCondition) -> None:
+        """Arm a condition at the current value"""
+        lo, hi = 0, len(self._groups)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._groups[mid].peak > value:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self._groups) and self._groups[lo].peak == value:
+            group = self._groups[lo]
+        else:
+            group = _TrailGroup(value)
+            self._groups.insert(lo, group)
+        heapq.heappush(group.heap, (trail, next(self._seq), condition))
+        self._push_level(group)
+
+    def update(self, value: float) -> List[TriggerCondition]:
+        """Apply a new value and return the conditions that fired"""
+        # Raise every group with a lower peak to the new high
+        if self._groups and self._groups[-1].peak < value:
+            merged = self._groups.pop()
+            while self._groups and self._groups[-1].peak < value:
+                other = self._groups.pop()
+                if len(other.heap) > len(merged.heap):
+                    merged, other = other, merged
+                for entry in other.heap:
+                    heapq.heappush(merged.heap, entry)
+                other.heap = []
+                other.version += 1
+            merged.peak = value
+            self._groups.append(merged)
+            self._push_level(merged)
+
+        fired = []
+        while self._levels:
+            neg_level, _, version, group = self._levels[0]
+            if version != group.version:
+                heapq.heappop(self._levels)
+                continue
+            if -neg_level < value:
+                break
+            heapq.heappop(self._levels)
+            while group.heap and group.peak - group.heap[0][0] >= value:
+                _, _, condition = heapq.heappop(group.heap)
+                if condition.is_armed:
+                    fired.append(condition)
+            # Emptied groups stay in place until the next new high merges them
+            self._push_level(group)
+        return fired
+
+    def compact(self) -> None:
+        """Drop disarmed conditions and empty groups, and rebuild the level heap"""
+        groups = []
+        for group in self._groups:
+            group.heap = [entry for entry in group.heap if entry[2].is_armed]
+            heapq.heapify(group.heap)
+            group.version += 1
+            if group.heap:
+                groups.append(group)
+        self._groups = groups
+        self._levels = []
+        for group in groups:
+            self._push_level(group)
+
+
+class SymbolTriggers:
+    """All armed conditions for one symbol"""
+
+    def __init__(self):
+        self.seq = itertools.count()
+        self.armed = 0
+        # Cancelled conditions still sitting in a heap
+        self.stale = 0
+        # Fire when price >= threshold (min-heap)
+        self.above: List[Tuple[int, int, TriggerCondition]] = []
+        # Fire when price <= threshold (max-heap via negated threshold)
+        self.below: List[Tuple[int, int, TriggerCondition]] = []
+        # Trailing books: falling from peak / rising from trough, by amount and by percent
+        self.trail_down = TrailingBook()
+        self.trail_up = TrailingBook()
+        self.trail_down_pct = TrailingBook()
+        self.trail_up_pct = TrailingBook()
+
+    def on_price(self, price: int) -> List[TriggerCondition]:
+        """Collect conditions crossed by the price"""
+        fired = []
+        while self.above and self.above[0][0] <= price:
+            condition = heapq.heappop(self.above)[2]
+            if condition.is_armed:
+                fired.append(condition)
+        while self.below and -self.below[0][0] >= price:
+            condition = heapq.heappop(self.below)[2]
+            if condition.is_armed:
+                fired.append(condition)
+
+        log_price = math.log(price)
+        fired.extend(self.trail_down.update(price))
+        fired.extend(self.trail_up.update(-price))
+        fired.extend(self.trail_down_pct.update(log_price))
+        fired.extend(self.trail_up_pct.update(-log_price))
+        return fired
+
+    def compact(self) -> None:
+        """Rebuild the heaps without cancelled conditions"""
+        for name in ("above", "below"):
+            heap = [entry for entry in getattr(self, name) if entry[2].is_armed]
+            heapq.heapify(heap)
+            setattr(self, name, heap)
+        for book in (self.trail_down, self.trail_up, self.trail_down_pct, self.trail_up_pct):
+            book.compact()
+        self.stale = 0
+
+
+OrderSubmitter = Callable[[OrderRequest, bool, str], Awaitable[OrderResponse]]
+
+
+class TriggerEngine:
+    """Index armed conditions by symbol and fire orders on crossing ticks"""
+
+    def __init__(self, submit_order: OrderSubmitter, last_price: Callable[[str], Optional[int]]):
+        self.submit_order = submit_order
+        self.last_price = last_price
+        self.logger = logging.getLogger(__name__)
+        self._symbols: Dict[str, SymbolTriggers] = {}
+        # Armed conditions; fired and cancelled ones move to a bounded history
+        self._conditions: Dict[str, TriggerCondition] = {}
+        self._finished: "OrderedDict[str, TriggerCondition]" = OrderedDict()
+        self._oco_groups: Dict[str, List[str]] = {}
+        self._pending: set = set()
+
+    def arm(self, condition: TriggerCondition, reference_price: Optional[int] = None) -> TriggerCondition:
+        """Index a condition for its symbol"""
+        book = self._symbols.get(condition.stock_code) or SymbolTriggers()
+
+        if condition.condition == "price_above":
+            heapq.heappush(book.above, (condition.trigger_price, next(book.seq), condition))
+        elif condition.condition == "price_below":
+            heapq.heappush(book.below, (-condition.trigger_price, next(book.seq), condition))
+        elif condition.condition in ("trailing_stop", "trailing_buy"):
+            price = reference_price or self.last_price(condition.stock_code)
+            if not price:
+                raise ValueError("추적 조건은 현재가(reference_price) 또는 실시간 시세가 필요합니다.")
+            falling = condition.condition == "trailing_stop"
+            if condition.trail_percent:
+                if not 0 < condition.trail_percent < 100:
+                    raise ValueError("trail_percent는 0과 100 사이여야 합니다.")
+                trail = -math.log(1 - condition.trail_percent / 100)
+                if falling:
+                    book.trail_down_pct.add(math.log(price), trail, condition)
+                else:
+                    # Rising by p% from trough: log(p) >= log(trough) + log(1 + p%)
+                    trail = math.log(1 + condition.trail_percent / 100)
+                    book.trail_up_pct.add(-math.log(price), trail, condition)
+            elif condition.trail_amount and condition.trail_amount > 0:
+                if falling:
+                    book.trail_down.add(price, condition.trail_amount, condition)
+                else:
+                    book.trail_up.add(-price, condition.trail_amount, condition)
+            else:
+                raise ValueError("추적 조건에는 trail_amount 또는 trail_percent가 필요합니다.")
+        else:
+            raise ValueError(f"지원하지 않는 조건입니다: {condition.condition}")
+
+        book.armed += 1
+        self._symbols[condition.stock_code] = book
+        self._conditions[condition.trigger_id] = condition
+        if condition.oco_group:
+            self._oco_groups.setdefault(condition.oco_group, []).append(condition.trigger_id)
+        return condition
+
+    @staticmethod
+    def new_id() -> str:
+        """Generate a trigger id"""
+        return uuid.uuid4().hex[:12]
+
+    def get(self, trigger_id: str) -> Optional[TriggerCondition]:
+        """Get a condition by id (recently fired or cancelled ones included)"""
+        return self._conditions.get(trigger_id) or self._finished.get(trigger_id)
+
+    def list(self, include_inactive: bool = False) -> List[TriggerCondition]:
+        """List conditions, newest first"""
+        conditions = list(self._conditions.values())
+        if include_inactive:
+            conditions.extend(self._finished.values())
+        return sorted(conditions, key=lambda c: c.created_at, reverse=True)
+
+    def armed_symbols(self) -> List[str]:
+        """Symbols with at least one armed condition"""
+        return sorted(self._symbols)
+
+    def has_conditions(self, stock_code: str) -> bool:
+        """Whether the symbol has armed conditions (cheap per-tick check)"""
+        return stock_code in self._symbols
+
+    def cancel(self, trigger_id: str) -> Optional[TriggerCondition]:
+        """Disarm a condition"""
+        condition = self.get(trigger_id)
+        if condition and condition.is_armed:
+            condition.status = "cancelled"
+            self._retire(condition, in_heap=True)
+            if condition.oco_group in self._oco_groups:
+                group = self._oco_groups[condition.oco_group]
+                group.remove(trigger_id)
+                if not group:
+                    del self._oco_groups[condition.oco_group]
+        return condition
+
+    def _retire(self, condition: TriggerCondition, in_heap: bool) -> None:
+        """Move a fired or cancelled condition out of the armed index
+
+        A symbol's book is dropped with its last armed condition; otherwise its
+        heaps are compacted once cancelled entries outnumber armed ones.
+        """
+        self._conditions.pop(condition.trigger_id, None)
+        self._finished[condition.trigger_id] = condition
+        while len(self._finished) > TRIGGER_HISTORY:
+            self._finished.popitem(last=False)
+
+        book = self._symbols.get(condition.stock_code)
+        if book is None:
+            return
+        book.armed -= 1
+        if book.armed <= 0:
+            del self._symbols[condition.stock_code]
+            return
+        if in_heap:
+            book.stale += 1
+            if book.stale >= COMPACT_MIN_STALE and book.stale > book.armed:
+                book.compact()
+
+    def on_tick(self, stock_code: str, price: int) -> None:
+        """Evaluate a trade tick; only crossed thresholds are touched"""
+        book = self._symbols.get(stock_code)
+        if book is None or price <= 0:
+            return
+
+        for condition in book.on_price(price):
+            # An OCO sibling may have fired earlier in this tick
+            if not condition.is_armed:
+                continue
+            condition.status = "fired"
+            condition.fired_at = time.time()
+            condition.fire_price = price
+            # Fired conditions were popped off their heap by on_price
+            self._retire(condition, in_heap=False)
+            self._cancel_siblings(condition)
+            self.logger.info(
+                "Trigger %s fired: %s %s @ %s", condition.trigger_id, stock_code, condition.condition, price,
+                extra={"stock_code": stock_code}
+            )
+            if condition.order_request:
+                self._dispatch(condition)
+            else:
+                condition.result = "알림"
+
+    async def drain(self) -> None:
+        """Wait for orders sent by fired conditions to complete"""
+        while self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    def _cancel_siblings(self, condition: TriggerCondition) -> None:
+        """Cancel the other legs of an OCO group"""
+        if not condition.oco_group:
+            return
+        for trigger_id in self._oco_groups.pop(condition.oco_group, []):
+            if trigger_id != condition.trigger_id:
+                sibling = self._conditions.get(trigger_id)
+                if sibling and sibling.is_armed:
+                    sibling.status = "cancelled"
+                    sibling.result = f"OCO 상대 조건 {condition.trigger_id} 체결로 취소"
+                    self._retire(sibling, in_heap=True)
+
+    def _dispatch(self, condition: TriggerCondition) -> None:
+        """Send the condition's order without blocking the tick path"""
+        async def _send():
+            try:
+                response = await self.submit_order(
+                    condition.order_request, condition.is_buy, f"trigger:{condition.trigger_id}"
+                )
+                if response.success:
+                    condition.result = f"주문 전송 (주문번호 {response.order_number})"
+                else:
+                    condition.result = f"주문 실패: {response.message}"
+            except Exception as e:
+                condition.result = f"주문 실패: {e}"
+                self.logger.error("Trigger %s order failed: %s", condition.trigger_id, e)
+
+        task = asyncio.get_running_loop().create_task(_send())
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
@@ -0,0 +1,309 @@
+"""
+Pre-market warmup: token, pooled connections, reference data and a health probe
+
+The scheduler wakes at the configured time on trading days, runs the steps in
+order and then keeps the pooled connections alive until the open, so the
+first orders of the day go out on a fresh token and open sockets.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from config.constants import (
+    HEALTH_PROBE_SYMBOL, REGULAR_SESSION_OPEN, SYMBOL_MARKETS, WARMUP_KEEPALIVE_SEC,
+    WARMUP_MAX_LIMIT_SYMBOLS, WARMUP_STEPS, WARMUP_TOKEN_MIN_VALID_SEC
+)
+from config.settings import KiwoomConfig
+from engine.journal import OrderJournal
+from engine.reference import ReferenceDataCache
+from kiwoom.client import create_client
+from utils.datetime_utils import get_remaining_time
+from utils.logging import elapsed_ms
+from utils.rate_limiter import AsyncRateLimiter
+
+
+STEP_OK = "ok"
+STEP_SKIPPED = "skipped"
+STEP_FAILED = "failed"
+
+# (ok, message) for a token that must stay valid for at least the given seconds
+EnsureToken = Callable[[float], Awaitable[Tuple[bool, str]]]
+
+
+class StepSkipped(Exception):
+    """Raised by a step that does not apply in the current mode"""
+
+
+@dataclass(slots=True)
+class WarmupStep:
+    """Outcome of one warmup step"""
+    name: str
+    status: str
+    elapsed_ms: float
+    detail: str = ""
+
+
+@dataclass
+class WarmupReport:
+    """Outcome of one warmup run"""
+    trigger: str
+    started_at: float
+    steps: List[WarmupStep] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return all(step.status != STEP_FAILED for step in self.steps)
+
+    @property
+    def elapsed_ms(self) -> float:
+        return sum(step.elapsed_ms for step in self.steps)
+
+
+def _at(day: datetime, hhmm: str) -> datetime:
+    """`day` at HH:MM or HHMM"""
+    digits = hhmm.replace(":", "")
+    return day.replace(hour=int(digits[:2]), minute=int(digits[2:4]), second=0, microsecond=0)
+
+
+class WarmupScheduler:
+    """Run the warmup steps on a daily schedule or on demand"""
+
+    def __init__(
+        self,
+        config: KiwoomConfig,
+        ensure_token: EnsureToken,
+        reference: ReferenceDataCache,
+        realtime=None,
+        journal: Optional[OrderJournal] = None,
+        is_trading_day: Optional[Callable[[date], bool]] = None,
+        clock: Callable[[], datetime] = datetime.now
+    ):
+        self.config = config
+        self.ensure_token = ensure_token
+        self.reference = reference
+        self.realtime = realtime
+        self.journal = journal
+        self.is_trading_day = is_trading_day or (lambda day: day.weekday() < 5)
+        self.clock = clock
+        self.logger = logging.getLogger(__name__)
+        self.last_report: Optional[WarmupReport] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.config.warmup_time)
+
+    def next_run(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        """Next scheduled warmup (now, when started between warmup time and the open)"""
+        if not self.enabled:
+            return None
+        now = now or self.clock()
+        if self.is_trading_day(now.date()) and _at(now, self.config.warmup_time) <= now < _at(now, REGULAR_SESSION_OPEN):
+            return now
+        day = now
+        while True:
+            at = _at(day, self.config.warmup_time)
+            if self.is_trading_day(day.date()) and at > now:
+                return at
+            day += timedelta(days=1)
+
+    async def start(self) -> None:
+        """Start the daily schedule"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """Stop the daily schedule"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            next_at = self.next_run()
+            self.logger.info("Next warmup at %s", next_at.strftime("%Y-%m-%d %H:%M"))
+            await self._sleep_until(next_at)
+            try:
+                await self.run("scheduled")
+                await self._keepalive()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error("Warmup failed: %s", e)
+            # Leave the warmup window so the same morning is not warmed twice
+            await self._sleep_until(_at(self.clock(), REGULAR_SESSION_OPEN))
+
+    async def _sleep_until(self, at: datetime) -> None:
+        await asyncio.sleep(max(0.0, (at - self.clock()).total_seconds()))
+
+    async def _keepalive(self) -> None:
+        """Re-probe pooled connections until the open"""
+        client = create_client(self.config)
+        open_at = _at(self.clock(), REGULAR_SESSION_OPEN)
+        while True:
+            remaining = (open_at - self.clock()).total_seconds()
+            if remaining <= WARMUP_KEEPALIVE_SEC:
+                return
+            await asyncio.sleep(WARMUP_KEEPALIVE_SEC)
+            await asyncio.to_thread(client.preconnect, self.config.warmup_connections)
+
+    async def run(self, trigger: str = "manual", steps: Optional[Sequence[str]] = None) -> WarmupReport:
+        """Run the warmup steps in order (all of them by default)"""
+        selected = [name for name in WARMUP_STEPS if steps is None or name in steps]
+        async with self._lock:
+            report = WarmupReport(trigger, time.time())
+            client = create_client(self.config)
+            for name in selected:
+                started = time.perf_counter()
+                try:
+                    status, detail = STEP_OK, await getattr(self, f"_step_{name}")(client)
+                except StepSkipped as e:
+                    status, detail = STEP_SKIPPED, str(e)
+                except Exception as e:
+                    self.logger.error("Warmup step %s failed: %s", name, e)
+                    status, detail = STEP_FAILED, str(e)
+                report.steps.append(WarmupStep(name, status, elapsed_ms(started), detail))
+                if name == "token" and status == STEP_FAILED:
+                    # Everything after needs a token
+                    for rest in selected[selected.index(name) + 1:]:
+                        report.steps.append(WarmupStep(rest, STEP_SKIPPED, 0.0, "토큰 없음"))
+                    break
+            self.last_report = report
+            self.logger.info(
+                "Warmup (%s) finished in %.0fms: %s", trigger, report.elapsed_ms,
+                ", ".join(f"{step.name}={step.status}" for step in report.steps)
+            )
+            return report
+
+    def _require_token(self) -> str:
+        if not self.config.access_token:
+            raise RuntimeError("접근 토큰이 없습니다")
+        return self.config.access_token
+
+    def _require_rest(self) -> None:
+        if self.config.paper_trading:
+            raise StepSkipped("모의 브로커 모드")
+
+    async def _step_token(self, client) -> str:
+        ok, message = await self.ensure_token(WARMUP_TOKEN_MIN_VALID_SEC)
+        if not ok:
+            raise RuntimeError(message)
+        return message
+
+    async def _step_connections(self, client) -> str:
+        self._require_rest()
+        count = self.config.warmup_connections
+        opened = await asyncio.to_thread(client.preconnect, count)
+        if count and not opened:
+            raise RuntimeError(f"{client.base_url} 연결 실패")
+        return f"{opened}/{count}개 연결 ({client.base_url})"
+
+    async def _step_holdings(self, client) -> str:
+        token = self._require_token()
+        response = await asyncio.to_thread(client.get_holdings, token)
+        if not response.success:
+            raise RuntimeError(response.message or "잔고 조회 실패")
+        self.reference.set_holdings(response.items)
+        if not response.complete:
+            return f"{len(response.items)}종목 (일부만 조회됨)"
+        return f"{len(response.items)}종목"
+
+    async def _step_symbols(self, client) -> str:
+        self._require_rest()
+        token = self._require_token()
+        symbols = []
+        counts = []
+        for market, code in SYMBOL_MARKETS.items():
+            response = await asyncio.to_thread(client.get_symbol_list, token, code)
+            if not response.success:
+                raise RuntimeError(f"{market}: {response.message or '종목 조회 실패'}")
+            symbols.extend(response.items)
+            counts.append(f"{market} {len(response.items):,}")
+        self.reference.set_symbols(symbols)
+        return ", ".join(counts)
+
+    async def _step_limits(self, client) -> str:
+        self._require_rest()
+        token = self._require_token()
+        codes = list(dict.fromkeys(self.config.warmup_symbols + self.reference.holding_codes()))
+        if not codes:
+            raise StepSkipped("대상 종목 없음 (KIWOOM_WARMUP_SYMBOLS)")
+        skipped = len(codes) - WARMUP_MAX_LIMIT_SYMBOLS
+        codes = codes[:WARMUP_MAX_LIMIT_SYMBOLS]
+
+        # Stay under the API rate limit without serializing the round-trips
+        limiter = AsyncRateLimiter(self.config.order_rate_limit)
+
+        async def fetch(stock_code: str):
+            await limiter.acquire()
+            return await asyncio.to_thread(client.get_stock_info, token, stock_code)
+
+        results = await asyncio.gather(*(fetch(code) for code in codes), return_exceptions=True)
+        infos = [
+            result.items[0] for result in results
+            if not isinstance(result, BaseException) and result.success and result.items
+        ]
+        self.reference.update_limits(infos)
+        failed = len(codes) - len(infos)
+        if not infos:
+            raise RuntimeError(f"{failed}종목 조회 실패")
+        detail = f"{len(infos)}종목"
+        if failed:
+            detail += f", {failed}종목 실패"
+        if skipped > 0:
+            detail += f", {skipped}종목 생략 (최대 {WARMUP_MAX_LIMIT_SYMBOLS})"
+        return detail
+
+    async def _step_health(self, client) -> str:
+        problems = []
+        parts = []
+
+        if self.config.paper_trading:
+            parts.append("REST: 모의 브로커")
+        else:
+            token = self._require_token()
+            stock_code = self.config.warmup_symbols[0] if self.config.warmup_symbols else HEALTH_PROBE_SYMBOL
+            started = time.perf_counter()
+            try:
+                response = await asyncio.to_thread(client.get_stock_info, token, stock_code)
+                latency = f"{elapsed_ms(started):.0f}ms"
+                if response.success:
+                    parts.append(f"REST {latency}")
+                else:
+                    problems.append(f"REST 오류 ({response.message})")
+            except Exception as e:
+                problems.append(f"REST 실패 ({e})")
+
+        if self.realtime is not None and self.realtime.available:
+            parts.append(f"실시간 {'연결됨' if self.realtime.connected else '미연결'}")
+
+        if self.journal is not None:
+            if not self.journal.is_open:
+                problems.append("주문 기록 닫힘")
+            else:
+                in_doubt = len(self.journal.in_doubt())
+                parts.append(f"미확인 주문 {in_doubt}건")
+
+        if self.config.token_expires_dt:
+            parts.append(f"토큰 남은 시간 {get_remaining_time(self.config.token_expires_dt) or '만료'}")
+
+        if problems:
+            raise RuntimeError(", ".join(problems + parts))
+        return ", ".join(parts)
+
+    def reference_summary(self) -> Dict[str, int]:
+        """Entry counts per reference section"""
+        return {
+            "symbols": len(self.reference.symbols),
+            "limits": len(self.reference.limits),
+            "holdings": len(self.reference.holdings),
+        }
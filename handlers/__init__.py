@@ -2,6 +2,19 @@
 
 from handlers.auth import AuthHandler
 from handlers.orders import OrderHandler
+from handlers.algo import AlgoHandler
+from handlers.journal import JournalHandler
+from handlers.triggers import TriggerHandler
+from handlers.risk import RiskHandler
+from handlers.paper import PaperHandler
+from handlers.market import MarketHandler
+from handlers.cache import CacheHandler
+from handlers.analytics import AnalyticsHandler
+from handlers.profiling import ProfilingHandler
+from handlers.warmup import WarmupHandler
+from handlers.session import SessionHandler
+from handlers.conditions import ConditionHandler
+from handlers.admission import AdmissionHandler
 from handlers.base import BaseHandler
 
-__all__ = ["AuthHandler", "OrderHandler", "BaseHandler"] 
\ No newline at end of file
+__all__ = ["AuthHandler", "OrderHandler", "AlgoHandler", "JournalHandler", "TriggerHandler", "RiskHandler", "PaperHandler", "MarketHandler", "CacheHandler", "AnalyticsHandler", "ProfilingHandler", "WarmupHandler", "SessionHandler", "ConditionHandler", "AdmissionHandler", "BaseHandler"] 
\ No newline at end of file
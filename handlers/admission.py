@@ -0,0 +1,67 @@
+"""
+Admission control handler
+"""
+
+from typing import List
+
+import mcp.types as types
+
+from handlers.base import BaseHandler
+from config.constants import PRIORITY_NAMES
+from utils.admission import AdmissionController, SHED_EVICTED, SHED_QUEUE_FULL, SHED_TIMEOUT
+
+
+SHED_NAMES = {
+    SHED_QUEUE_FULL: "대기열 초과",
+    SHED_EVICTED: "우선순위 밀림",
+    SHED_TIMEOUT: "대기 시간 초과",
+}
+
+
+class AdmissionHandler(BaseHandler):
+    """Handle admission control statistics"""
+
+    def __init__(self, admission: AdmissionController):
+        super().__init__()
+        self.admission = admission
+
+    async def get_admission_stats(self) -> List[types.TextContent]:
+        """Show in-flight and queued calls, waits and shed calls per priority"""
+        try:
+            admission = self.admission
+            if not admission.enabled:
+                return self.create_info_response("동시 호출 제한이 비활성화되어 있습니다 (MAX_CONCURRENT_CALLS=0).")
+
+            stats = admission.stats
+            queued = admission.queued()
+            message = "🚦 동시 호출 제어\n\n"
+            message += (
+                f"- 실행 중: {admission.in_flight}/{admission.max_concurrent} "
+                f"(주문/취소 전용 {admission.order_reserved}), 세션 {admission.sessions}개 "
+                f"(세션당 최대 {admission.max_per_session or '제한 없음'})\n"
+            )
+            message += (
+                f"- 대기: {sum(queued.values())}/{admission.queue_size}건 "
+                f"(최대 {admission.queue_timeout:g}초)\n\n"
+            )
+
+            for priority, name in PRIORITY_NAMES.items():
+                admitted = stats.admitted.get(priority, 0)
+                waited = stats.waited.get(priority, 0)
+                line = f"{name}: 처리 {admitted:,}건, 대기 중 {queued.get(priority, 0)}건"
+                if waited:
+                    mean = stats.wait_ms_total[priority] / waited
+                    line += f", 대기 후 처리 {waited:,}건 (평균 {mean:.1f}ms, 최대 {stats.wait_ms_max[priority]:.1f}ms)"
+                shed = [
+                    f"{SHED_NAMES[reason]} {counts[priority]:,}"
+                    for reason, counts in stats.shed.items() if counts.get(priority)
+                ]
+                if shed:
+                    line += f", 거부 {', '.join(shed)}"
+                message += line + "\n"
+
+            return self.create_info_response(message)
+
+        except Exception as e:
+            self.logger.error("Failed to get admission stats: %s", e)
+            return self.create_error_response(f"동시 호출 통계 조회 실패: {str(e)}")
@@ -0,0 +1,147 @@
+"""
+Algo order handler for sliced order execution
+"""
+
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+import mcp.types as types
+
+from handlers.base import BaseHandler
+from config.settings import KiwoomConfig
+from config.constants import ALGO_TYPES
+from engine.algo import AlgoEngine, AlgoOrder, twap_schedule, vwap_schedule, iceberg_schedule
+from engine.risk import RiskGate
+from models.types import OrderRequest
+from models.exceptions import RiskLimitError
+
+
+class AlgoHandler(BaseHandler):
+    """Handle algorithmic execution operations"""
+
+    def __init__(self, config: KiwoomConfig, engine: AlgoEngine, risk_gate: Optional[RiskGate] = None):
+        super().__init__()
+        self.config = config
+        self.engine = engine
+        self.risk_gate = risk_gate
+
+    async def start_algo_order(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        """Start a TWAP/VWAP/iceberg algo order"""
+        try:
+            if not self.config.access_token:
+                return self.create_error_response(
+                    "접근 토큰이 설정되지 않았습니다. 먼저 set_access_token을 사용하세요."
+                )
+
+            algo_type = arguments.get("algo_type", "TWAP").upper()
+            if algo_type not in ALGO_TYPES:
+                return self.create_error_response(f"지원하지 않는 알고리즘입니다: {algo_type}")
+
+            side = arguments.get("side", "buy")
+            if side not in ("buy", "sell"):
+                return self.create_error_response(f"주문 방향은 buy 또는 sell이어야 합니다: {side}")
+            is_buy = side == "buy"
+            order_request = OrderRequest(
+                stock_code=arguments["stock_code"],
+                quantity=arguments["quantity"],
+                price=arguments.get("price", ""),
+                trade_type=arguments.get("trade_type", "시장가"),
+                exchange=arguments.get("exchange", "KRX"),
+            )
+
+            # Check the parent as a whole; children book exposure as they are sent
+            if self.risk_gate:
+                self.risk_gate.check(self.risk_gate.deltas([(order_request, is_buy)]))
+
+            duration_sec = arguments.get("duration_minutes", 30) * 60
+            slices = arguments.get("slices", 10)
+
+            if algo_type == "TWAP":
+                children = twap_schedule(order_request.quantity, duration_sec, slices)
+            elif algo_type == "VWAP":
+                children = vwap_schedule(
+                    order_request.quantity, duration_sec, slices,
+                    volume_profile=arguments.get("volume_profile")
+                )
+            else:
+                if not arguments.get("display_quantity"):
+                    return self.create_error_response("빙산주문에는 display_quantity가 필요합니다.")
+                children = iceberg_schedule(
+                    order_request.quantity,
+                    arguments["display_quantity"],
+                    arguments.get("interval_seconds", 30)
+                )
+
+            algo = self.engine.start(algo_type, order_request, is_buy, children)
+
+            message = f"{ALGO_TYPES[algo_type]}({algo_type}) 주문이 시작되었습니다.\n\n"
+            message += self._format_algo(algo)
+            return self.create_success_response(message)
+
+        except RiskLimitError as e:
+            return self.create_error_response(f"리스크 한도 초과로 알고리즘 주문이 거부되었습니다: {str(e)}")
+        except ValueError as e:
+            return self.create_error_response(f"알고리즘 주문 설정 오류: {str(e)}")
+        except Exception as e:
+            self.logger.error("Failed to start algo order: %s", e)
+            return self.create_error_response(f"알고리즘 주문 시작 실패: {str(e)}")
+
+    async def get_algo_status(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        """Get status of one or all algo orders"""
+        try:
+            algo_id = arguments.get("algo_id")
+            if algo_id:
+                algo = self.engine.get(algo_id)
+                if algo is None:
+                    return self.create_error_response(f"알고리즘 주문을 찾을 수 없습니다: {algo_id}")
+                message = self._format_algo(algo, include_children=True)
+            else:
+                algos = self.engine.list()
+                if not algos:
+                    return self.create_info_response("실행된 알고리즘 주문이 없습니다.")
+                message = "알고리즘 주문 목록:\n\n"
+                message += "\n".join(self._format_algo(algo) for algo in algos)
+
+            return self.create_info_response(message)
+
+        except Exception as e:
+            self.logger.error("Failed to get algo status: %s", e)
+            return self.create_error_response(f"알고리즘 주문 조회 실패: {str(e)}")
+
+    async def cancel_algo_order(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        """Cancel remaining children of an algo order"""
+        try:
+            algo = self.engine.cancel(arguments["algo_id"])
+            if algo is None:
+                return self.create_error_response(f"알고리즘 주문을 찾을 수 없습니다: {arguments['algo_id']}")
+
+            message = f"알고리즘 주문의 남은 분할주문이 취소되었습니다.\n"
+            message += f"(이미 전송된 주문은 취소되지 않으며, 전송 중인 분할주문은 결과가 기록됩니다)\n\n"
+            message += self._format_algo(algo)
+            return self.create_success_response(message)
+
+        except Exception as e:
+            self.logger.error("Failed to cancel algo order: %s", e)
+            return self.create_error_response(f"알고리즘 주문 취소 실패: {str(e)}")
+
+    def _format_algo(self, algo: AlgoOrder, include_children: bool = False) -> str:
+        """Format algo order summary"""
+        request = algo.order_request
+        message = f"🧮 [{algo.algo_id}] {algo.algo_type} {'매수' if algo.is_buy else '매도'} - {algo.status}\n"
+        message += f"- 종목코드: {request.stock_code}\n"
+        sending = f" / 전송 중 {algo.sending_quantity:,}" if algo.sending_quantity else ""
+        message += f"- 총수량: {request.quantity:,}주 (전송 {algo.sent_quantity:,}{sending} / 대기 {algo.remaining_quantity:,})\n"
+        message += f"- 분할수: {len(algo.children)}\n"
+
+        if include_children:
+            message += "\n분할주문:\n"
+            for child in algo.children:
+                scheduled = datetime.fromtimestamp(child.scheduled_at).strftime("%H:%M:%S")
+                message += f"  #{child.seq} {scheduled} {child.quantity:,}주 {child.status}"
+                if child.order_number:
+                    message += f" (주문번호 {child.order_number})"
+                if child.status == "failed" and child.message:
+                    message += f" - {child.message}"
+                message += "\n"
+
+        return message
@@ -0,0 +1,124 @@
+"""
+Analytics handler for indicator screens and backtests run off the event loop
+"""
+
+import os
+from typing import List, Dict, Any, Optional
+
+import mcp.types as types
+
+from handlers.base import BaseHandler
+from engine.analytics import ScreenParams, ScreenRow, screen_shared
+from engine.executor import AnalyticsExecutor
+from engine.history import HistoryStore
+
+
+SORT_KEYS = {
+    "return": lambda row: row.return_pct,
+    "rsi": lambda row: row.rsi,
+    "volatility": lambda row: row.volatility_pct
+}
+
+
+def _fmt(value, spec: str = ".1f") -> str:
+    return format(value, spec) if value is not None else "-"
+
+
+class AnalyticsHandler(BaseHandler):
+    """Handle CPU-bound analytics tools through the process-pool executor"""
+
+    def __init__(self, executor: AnalyticsExecutor, history: HistoryStore, strategy_dir: Optional[str] = None):
+        super().__init__()
+        self.executor = executor
+        self.history = history
+        self.strategy_dir = os.path.realpath(os.path.expanduser(strategy_dir)) if strategy_dir else None
+
+    def strategy_file(self, path: str) -> str:
+        """Resolve a strategy path inside strategy_dir, or raise ValueError
+
+        Strategy files are executed, so a tool call may only name one under
+        the configured directory (symlinks are resolved before the check).
+        """
+        if not self.strategy_dir:
+            raise ValueError("STRATEGY_DIR가 설정되지 않아 백테스트는 CLI(backtest.py)에서만 실행할 수 있습니다")
+        resolved = os.path.realpath(os.path.join(self.strategy_dir, os.path.expanduser(path)))
+        if os.path.commonpath([resolved, self.strategy_dir]) != self.strategy_dir:
+            raise ValueError(f"전략 파일은 STRATEGY_DIR({self.strategy_dir}) 안에 있어야 합니다: {path}")
+        if not resolved.endswith(".py") or not os.path.isfile(resolved):
+            raise ValueError(f"전략 파일(.py)을 찾을 수 없습니다: {path}")
+        return resolved
+
+    async def screen_indicators(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        """Rank symbols in a bars file by return, RSI or volatility"""
+        try:
+            sort_by = arguments.get("sort_by", "return")
+            if sort_by not in SORT_KEYS:
+                return self.create_error_response(
+                    f"지원하지 않는 정렬 기준입니다: {sort_by} (사용 가능: {', '.join(SORT_KEYS)})"
+                )
+            params = ScreenParams(
+                lookback=int(arguments.get("lookback", 20)),
+                sma_short=int(arguments.get("sma_short", 5)),
+                sma_long=int(arguments.get("sma_long", 20)),
+                rsi_period=int(arguments.get("rsi_period", 14))
+            )
+
+            bars = await self.executor.load(self.history.load, arguments["data_path"])
+            codes = arguments.get("stock_codes") or list(bars.symbols)
+            missing = [code for code in codes if code not in bars.symbols]
+            columns = {code: bars.symbols[code].close for code in codes if code in bars.symbols}
+            rows: List[ScreenRow] = await self.executor.map_shared(screen_shared, columns, params)
+
+            min_rsi, max_rsi = arguments.get("min_rsi"), arguments.get("max_rsi")
+            if min_rsi is not None or max_rsi is not None:
+                rows = [
+                    row for row in rows if row.rsi is not None
+                    and (min_rsi is None or row.rsi >= min_rsi)
+                    and (max_rsi is None or row.rsi <= max_rsi)
+                ]
+            if arguments.get("trend_up"):
+                rows = [row for row in rows if row.trend_up]
+
+            key = SORT_KEYS[sort_by]
+            rows.sort(key=lambda row: (key(row) is None, -(key(row) or 0)))
+            limit = arguments.get("limit", 20)
+            shown = rows[:limit] if limit else rows
+
+            message = f"📊 지표 스크리닝 ({len(columns):,}종목 중 {len(rows):,}종목, {sort_by} 기준)\n"
+            message += f"수익률 {params.lookback}일, SMA {params.sma_short}/{params.sma_long}, RSI {params.rsi_period}\n\n"
+            for row in shown:
+                trend = "↑" if row.trend_up else "↓" if row.sma_short is not None and row.sma_long is not None else "-"
+                message += f"- {row.stock_code}: 종가 {row.close:,}원, 수익률 {_fmt(row.return_pct, '+.2f')}%, "
+                message += f"RSI {_fmt(row.rsi)}, 변동성 {_fmt(row.volatility_pct)}%, 추세 {trend}\n"
+            if missing:
+                message += f"\n⚠️ 데이터 없는 종목: {', '.join(missing)}"
+
+            return self.create_info_response(message)
+
+        except Exception as e:
+            self.logger.error("Failed to screen indicators: %s", e)
+            return self.create_error_response(f"지표 스크리닝 실패: {str(e)}")
+
+    async def run_backtest(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        """Run a strategy file over a bars file in a worker process"""
+        try:
+            # backtest imports the server module, which imports this handler
+            from backtest import run_report
+
+            try:
+                strategy_path = self.strategy_file(arguments["strategy_path"])
+            except ValueError as e:
+                return self.create_error_response(str(e))
+
+            report = await self.executor.run(
+                run_report,
+                arguments["data_path"],
+                strategy_path,
+                int(arguments.get("cash", 100_000_000)),
+                arguments.get("quote_depth")
+            )
+            return self.create_info_response(report)
+
+        except Exception as e:
+            self.logger.error("Failed to run backtest: %s", e)
+            return self.create_error_response(f"백테스트 실패: {str(e)}")
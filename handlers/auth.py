@@ -2,26 +2,48 @@
 Authentication handler for Kiwoom API
 """
 
-import json
-from typing import List, Dict, Any
+import asyncio
+from typing import List, Dict, Any, Optional, Tuple
 
 import mcp.types as types
 
 from handlers.base import BaseHandler
 from config.settings import KiwoomConfig
-from kiwoom.client import KiwoomAPIClient
-from models.types import TokenRequest
+from kiwoom.client import create_client
+from kiwoom.token_cache import TokenCache
+from models.types import TokenRequest, TokenResponse
 from models.exceptions import AuthenticationError, ConfigurationError
-from utils.datetime_utils import is_token_expired, format_datetime, get_remaining_time
+from utils.datetime_utils import is_token_expired, format_datetime, get_remaining_time, seconds_until_expiry
+from utils import json_codec
 
 
 class AuthHandler(BaseHandler):
     """Handle authentication related operations"""
     
-    def __init__(self, config: KiwoomConfig):
+    def __init__(self, config: KiwoomConfig, token_cache: Optional[TokenCache] = None):
         super().__init__()
         self.config = config
-        self.client = KiwoomAPIClient(config.is_mock)
+        self.token_cache = token_cache
+        self.client = create_client(config)
+    
+    async def load_cached_token(self) -> bool:
+        """Adopt a still-valid token issued by another process"""
+        if not self.token_cache or not self.config.appkey:
+            return False
+        
+        try:
+            # The cache lock may be held by another process; wait for it off the event loop
+            cached = await asyncio.to_thread(self.token_cache.load, self.config.appkey, self.config.is_mock)
+        except OSError as e:
+            self.logger.warning("Token cache unavailable: %s", e)
+            return False
+        
+        if cached:
+            self.config.access_token = cached.token
+            self.config.token_expires_dt = cached.expires_dt
+            self.logger.info("Reusing cached access token")
+            return True
+        return False
     
     async def set_credentials(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
         """Set API credentials"""
@@ -31,40 +53,83 @@ class AuthHandler(BaseHandler):
             self.config.is_mock = arguments.get("is_mock", False)
             
             # Update client with new mock setting
-            self.client = KiwoomAPIClient(self.config.is_mock)
+            self.client = create_client(self.config)
             
             mode = "모의투자" if self.config.is_mock else "실전투자"
             message = f"키움증권 API 인증 정보가 설정되었습니다. ({mode} 모드)\n"
-            message += "이제 get_access_token을 사용하여 접근 토큰을 발급받으세요."
+            
+            if await self.load_cached_token():
+                message += "캐시된 유효한 접근 토큰을 불러왔습니다."
+            else:
+                message += "이제 get_access_token을 사용하여 접근 토큰을 발급받으세요."
             
             return self.create_success_response(message)
             
         except Exception as e:
-            self.logger.error(f"Failed to set credentials: {e}")
+            self.logger.error("Failed to set credentials: %s", e)
             return self.create_error_response(f"인증 정보 설정 실패: {str(e)}")
     
-    async def get_access_token(self) -> List[types.TextContent]:
-        """Get access token from Kiwoom API"""
+    async def _issue_token(self, force_refresh: bool = False, min_valid_sec: float = 0) -> Tuple[TokenResponse, bool]:
+        """Issue (or reuse a cached) token and adopt it on success; returns (response, from_cache)"""
+        token_request = TokenRequest(
+            appkey=self.config.appkey,
+            secretkey=self.config.secretkey
+        )
+        
+        from_cache = False
+        if self.token_cache:
+            response, from_cache = await asyncio.to_thread(
+                self.token_cache.get_or_issue,
+                self.config.appkey,
+                self.config.is_mock,
+                lambda: self.client.get_token(token_request),
+                force_refresh,
+                min_valid_sec
+            )
+        else:
+            response = self.client.get_token(token_request)
+        
+        if response.success:
+            # Update config with new token
+            self.config.access_token = response.token
+            self.config.token_expires_dt = response.expires_dt
+        return response, from_cache
+    
+    async def ensure_token(self, min_valid_sec: float) -> Tuple[bool, str]:
+        """Make sure the token stays valid for at least `min_valid_sec`; returns (ok, message)"""
+        remaining = seconds_until_expiry(self.config.token_expires_dt)
+        if self.config.access_token and remaining is not None and remaining >= min_valid_sec:
+            return True, f"유효 (남은 시간: {get_remaining_time(self.config.token_expires_dt)})"
+        
+        if not self.config.appkey or not self.config.secretkey:
+            if self.config.access_token and remaining is None:
+                return True, "만료시간 정보 없음 (갱신 불가: 앱키/시크릿키 미설정)"
+            return False, "앱키와 시크릿키가 설정되지 않아 토큰을 갱신할 수 없습니다"
+        
+        # Another process may already have refreshed it; issue only when the cache has nothing that lasts
+        response, from_cache = await self._issue_token(min_valid_sec=min_valid_sec)
+        if not response.success:
+            return False, f"토큰 발급 실패: {response.message or 'Unknown error'}"
+        if from_cache:
+            return True, f"캐시 토큰 사용 (만료일시: {format_datetime(response.expires_dt)})"
+        return True, f"재발급 (만료일시: {format_datetime(response.expires_dt) if response.expires_dt else 'N/A'})"
+    
+    async def get_access_token(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        """Get access token from Kiwoom API (reusing a cached one when valid)"""
         try:
             if not self.config.appkey or not self.config.secretkey:
                 return self.create_error_response(
                     "앱키와 시크릿키가 설정되지 않았습니다. 먼저 set_credentials를 사용하세요."
                 )
             
-            token_request = TokenRequest(
-                appkey=self.config.appkey,
-                secretkey=self.config.secretkey
-            )
-            
-            response = self.client.get_token(token_request)
+            response, from_cache = await self._issue_token(arguments.get("force_refresh", False))
             
             if response.success:
-                # Update config with new token
-                self.config.access_token = response.token
-                self.config.token_expires_dt = response.expires_dt
-                
                 mode = "모의투자" if self.config.is_mock else "실전투자"
-                message = f"접근 토큰이 성공적으로 발급되었습니다! ({mode} 모드)\n\n"
+                if from_cache:
+                    message = f"캐시된 유효한 접근 토큰을 재사용합니다. ({mode} 모드)\n\n"
+                else:
+                    message = f"접근 토큰이 성공적으로 발급되었습니다! ({mode} 모드)\n\n"
                 message += f"🔑 토큰 정보:\n"
                 message += f"- 토큰 타입: {response.token_type or 'N/A'}\n"
                 message += f"- 만료일시: {format_datetime(response.expires_dt) if response.expires_dt else 'N/A'}\n"
@@ -74,13 +139,13 @@ class AuthHandler(BaseHandler):
                 return self.create_success_response(message)
             else:
                 message = f"토큰 발급 실패\n\n"
-                message += f"응답: {json.dumps(response.raw_response, indent=2, ensure_ascii=False)}"
+                message += f"응답: {json_codec.dumps(response.raw_response, indent=True)}"
                 return self.create_error_response(message)
                 
         except AuthenticationError as e:
             return self.create_error_response(f"인증 오류: {str(e)}")
         except Exception as e:
-            self.logger.error(f"Token request failed: {e}")
+            self.logger.error("Token request failed: %s", e)
             return self.create_error_response(f"토큰 발급 중 오류가 발생했습니다: {str(e)}")
     
     async def set_access_token(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
@@ -91,7 +156,7 @@ class AuthHandler(BaseHandler):
             self.config.is_mock = arguments.get("is_mock", False)
             
             # Update client with new mock setting
-            self.client = KiwoomAPIClient(self.config.is_mock)
+            self.client = create_client(self.config)
             
             mode = "모의투자" if self.config.is_mock else "실전투자"
             message = f"키움증권 API 접근 토큰이 설정되었습니다. ({mode} 모드)\n"
@@ -102,7 +167,7 @@ class AuthHandler(BaseHandler):
             return self.create_success_response(message)
             
         except Exception as e:
-            self.logger.error(f"Failed to set access token: {e}")
+            self.logger.error("Failed to set access token: %s", e)
             return self.create_error_response(f"토큰 설정 실패: {str(e)}")
     
     async def check_token_status(self) -> List[types.TextContent]:
@@ -128,5 +193,5 @@ class AuthHandler(BaseHandler):
             return self.create_info_response(message)
             
         except Exception as e:
-            self.logger.error(f"Failed to check token status: {e}")
+            self.logger.error("Failed to check token status: %s", e)
             return self.create_error_response(f"토큰 상태 확인 실패: {str(e)}") 
\ No newline at end of file
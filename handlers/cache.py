@@ -0,0 +1,49 @@
+"""
+Response cache handler
+"""
+
+from typing import List, Dict, Any
+
+import mcp.types as types
+
+from handlers.base import BaseHandler
+from utils.response_cache import ResponseCache
+
+
+class CacheHandler(BaseHandler):
+    """Handle response cache statistics"""
+
+    def __init__(self, cache: ResponseCache):
+        super().__init__()
+        self.cache = cache
+
+    async def get_cache_stats(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        """Show hit rates and size, optionally clearing the cache"""
+        try:
+            cache = self.cache
+            if not cache.enabled:
+                return self.create_info_response("응답 캐시가 비활성화되어 있습니다 (RESPONSE_CACHE_ENTRIES=0).")
+
+            stats = cache.stats
+            lookups = stats.hits + stats.coalesced + stats.misses
+            hit_rate = (stats.hits + stats.coalesced) / lookups * 100 if lookups else 0.0
+
+            message = "🗄️ 응답 캐시\n\n"
+            message += f"- 항목: {len(cache):,}/{cache.max_entries:,}개 ({cache.bytes:,}/{cache.max_bytes:,} bytes)\n"
+            message += f"- 적중: {stats.hits:,}회, 병합: {stats.coalesced:,}회, 미스: {stats.misses:,}회 (적중률 {hit_rate:.1f}%)\n"
+            message += f"- 축출: {stats.evictions:,}건, 무효화: {stats.invalidations:,}건\n"
+
+            if stats.by_tool:
+                message += "\n도구별 (적중/미스):\n"
+                for tool, (hits, misses) in sorted(stats.by_tool.items()):
+                    message += f"- {tool}: {hits:,}/{misses:,}\n"
+
+            if arguments.get("clear"):
+                cleared = cache.invalidate()
+                message += f"\n🧹 캐시 항목 {cleared:,}개를 비웠습니다."
+
+            return self.create_info_response(message)
+
+        except Exception as e:
+            self.logger.error("Failed to get cache stats: %s", e)
+            return self.create_error_response(f"캐시 통계 조회 실패: {str(e)}")
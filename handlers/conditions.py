@@ -0,0 +1,150 @@
+"""
+Condition search handler for saved Kiwoom conditions and their live hits
+"""
+
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+import mcp.types as types
+
+from handlers.base import BaseHandler
+from engine.conditions import ConditionDiff, ConditionSearchEngine
+from engine.reference import ReferenceDataCache
+
+
+# Symbols listed per condition in tool output
+MAX_LISTED_CODES = 100
+
+
+class ConditionHandler(BaseHandler):
+    """Handle condition search listing, scans and live result events"""
+
+    def __init__(self, engine: ConditionSearchEngine, reference: Optional[ReferenceDataCache] = None):
+        super().__init__()
+        self.engine = engine
+        self.reference = reference
+
+    def _unavailable(self) -> Optional[List[types.TextContent]]:
+        realtime = self.engine.realtime
+        if not realtime.available:
+            return self.create_error_response(
+                "조건검색에는 실시간 채널이 필요합니다. `pip install kiwoom-mcp[realtime]`로 설치하세요."
+            )
+        if not realtime.connected:
+            return self.create_error_response("실시간 채널이 연결되지 않았습니다. 접근 토큰을 확인하세요.")
+        return None
+
+    def _label(self, stock_code: str) -> str:
+        symbol = self.reference.symbol(stock_code) if self.reference else None
+        return f"{stock_code} {symbol.name}" if symbol else stock_code
+
+    def _codes(self, codes: List[str]) -> str:
+        listed = ", ".join(self._label(code) for code in codes[:MAX_LISTED_CODES])
+        if len(codes) > MAX_LISTED_CODES:
+            listed += f" 외 {len(codes) - MAX_LISTED_CODES}종목"
+        return listed
+
+    def _format_diff(self, diff: ConditionDiff) -> str:
+        at = datetime.fromtimestamp(diff.at).strftime("%H:%M:%S")
+        state = self.engine.conditions.get(diff.seq)
+        name = f" ({state.name})" if state and state.name else ""
+        source = "실시간" if diff.source == "live" else "검색"
+        line = f"#{diff.event_id} [{at}] 조건 {diff.seq}{name} {source}:"
+        if diff.added:
+            line += f" ➕ {self._codes(diff.added)}"
+        if diff.removed:
+            line += f" ➖ {self._codes(diff.removed)}"
+        return line
+
+    async def list_conditions(self) -> List[types.TextContent]:
+        """List the saved conditions of the account"""
+        try:
+            unavailable = self._unavailable()
+            if unavailable:
+                return unavailable
+
+            conditions = await self.engine.list_conditions()
+            if not conditions:
+                return self.create_info_response("저장된 조건검색식이 없습니다. 영웅문에서 조건식을 저장하세요.")
+
+            message = f"조건검색식 {len(conditions)}개:\n\n"
+            for state in conditions:
+                message += f"- {state.seq}: {state.name}"
+                if state.live:
+                    message += f" (실시간, {len(state.codes)}종목)"
+                elif state.scanned_at:
+                    message += f" ({len(state.codes)}종목)"
+                message += "\n"
+            return self.create_info_response(message)
+
+        except Exception as e:
+            self.logger.error("Failed to list conditions: %s", e)
+            return self.create_error_response(f"조건검색식 조회 실패: {str(e)}")
+
+    async def run_condition_search(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        """Run a condition once or start its live hits"""
+        try:
+            unavailable = self._unavailable()
+            if unavailable:
+                return unavailable
+
+            seq = str(arguments["seq"])
+            live = arguments.get("live", False)
+            if seq not in self.engine.conditions or not self.engine.conditions[seq].name:
+                await self.engine.list_conditions()
+            if seq not in self.engine.conditions:
+                return self.create_error_response(f"조건검색식을 찾을 수 없습니다: {seq}")
+
+            diff = await self.engine.search(seq, live)
+            state = self.engine.conditions[seq]
+            codes = sorted(state.codes)
+
+            message = f"🔎 조건 {seq} ({state.name}) 검색 결과: {len(codes)}종목\n\n"
+            if codes:
+                message += self._codes(codes) + "\n\n"
+            if diff.event_id:
+                message += f"직전 결과 대비 편입 {len(diff.added)} / 이탈 {len(diff.removed)} (이벤트 #{diff.event_id})\n"
+            if live:
+                message += (
+                    "📡 실시간 감시 중입니다. 편입/이탈은 get_condition_events 또는 "
+                    f"kiwoom://conditions/{seq} 리소스 구독으로 받을 수 있습니다."
+                )
+            return self.create_success_response(message)
+
+        except Exception as e:
+            self.logger.error("Failed to run condition search: %s", e)
+            return self.create_error_response(f"조건검색 실행 실패: {str(e)}")
+
+    async def stop_condition_search(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        """Stop live hits for a condition"""
+        try:
+            seq = str(arguments["seq"])
+            if not await self.engine.stop(seq):
+                return self.create_warning_response(f"실시간 감시 중인 조건이 아닙니다: {seq}")
+            return self.create_success_response(f"조건 {seq} 실시간 감시를 중지했습니다.")
+
+        except Exception as e:
+            self.logger.error("Failed to stop condition search: %s", e)
+            return self.create_error_response(f"조건검색 중지 실패: {str(e)}")
+
+    async def get_condition_events(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        """Show entries and exits after an event id"""
+        try:
+            since = int(arguments.get("since_event_id", 0))
+            seq = arguments.get("seq")
+            limit = int(arguments.get("limit", 50))
+            events = self.engine.events_since(since, str(seq) if seq is not None else None)
+
+            message = f"조건검색 이벤트 (마지막 이벤트 #{self.engine.last_event_id})\n\n"
+            if not events:
+                message += "새 이벤트가 없습니다."
+            else:
+                if len(events) > limit:
+                    message += f"... 이전 {len(events) - limit}건 생략\n"
+                message += "\n".join(self._format_diff(diff) for diff in events[-limit:])
+                message += f"\n\n다음 조회 시 since_event_id={events[-1].event_id}를 사용하세요."
+            return self.create_info_response(message)
+
+        except Exception as e:
+            self.logger.error("Failed to get condition events: %s", e)
+            return self.create_error_response(f"조건검색 이벤트 조회 실패: {str(e)}")
@@ -0,0 +1,144 @@
+"""
+Order journal handler for recovery and reconciliation
+"""
+
+import asyncio
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+import mcp.types as types
+
+from handlers.base import BaseHandler
+from config.settings import KiwoomConfig
+from engine.journal import (
+    OrderJournal, JournalEntry, history_dates, match_in_doubt, STATUS_SUBMITTED, STATUS_NOT_SUBMITTED
+)
+from engine.risk import RiskGate
+from kiwoom.client import create_client
+from models.exceptions import KiwoomAPIError
+
+
+class JournalHandler(BaseHandler):
+    """Handle order journal operations"""
+
+    def __init__(
+        self,
+        config: KiwoomConfig,
+        journal: Optional[OrderJournal],
+        risk_gate: Optional[RiskGate] = None
+    ):
+        super().__init__()
+        self.config = config
+        self.journal = journal
+        self.risk_gate = risk_gate
+
+    async def get_order_journal(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        """Show recent or in-doubt journal entries"""
+        try:
+            if not self.journal:
+                return self.create_error_response("주문 기록이 비활성화되어 있습니다. (KIWOOM_JOURNAL_PATH)")
+
+            if arguments.get("in_doubt_only", False):
+                entries = self.journal.in_doubt()
+                title = "결과 미확인 주문"
+            else:
+                entries = self.journal.recent(arguments.get("limit", 20))
+                title = "최근 주문 기록"
+
+            if not entries:
+                return self.create_info_response(f"{title}이 없습니다.")
+
+            message = f"{title} ({len(entries)}건):\n\n"
+            message += "\n".join(self._format_entry(entry) for entry in entries)
+            return self.create_info_response(message)
+
+        except Exception as e:
+            self.logger.error("Failed to read order journal: %s", e)
+            return self.create_error_response(f"주문 기록 조회 실패: {str(e)}")
+
+    async def reconcile_order_journal(self) -> List[types.TextContent]:
+        """Reconcile in-doubt orders against Kiwoom order history"""
+        try:
+            if not self.journal:
+                return self.create_error_response("주문 기록이 비활성화되어 있습니다. (KIWOOM_JOURNAL_PATH)")
+            if not self.config.access_token:
+                return self.create_error_response(
+                    "접근 토큰이 설정되지 않았습니다. 먼저 set_access_token을 사용하세요."
+                )
+
+            # History paging and SQLite reads block; keep them off the event loop
+            resolved, unresolved = await asyncio.to_thread(self.reconcile)
+            if not resolved and not unresolved:
+                return self.create_info_response("결과 미확인 주문이 없습니다.")
+
+            message = f"주문 기록 대사 완료: {len(resolved)}건 확인, {len(unresolved)}건 미확인\n\n"
+            for entry in resolved:
+                message += self._format_entry(entry) + "\n"
+            for entry in unresolved:
+                message += self._format_entry(entry) + " (주문내역 조회 실패 또는 일부만 조회됨, 재시도 필요)\n"
+            return self.create_success_response(message)
+
+        except Exception as e:
+            self.logger.error("Order journal reconciliation failed: %s", e)
+            return self.create_error_response(f"주문 기록 대사 실패: {str(e)}")
+
+    def reconcile(self) -> tuple:
+        """Resolve in-doubt entries; returns (resolved, unresolved) entries
+
+        An entry matched in Kiwoom's order history is marked submitted. An
+        unmatched one is marked not submitted only when every day its match
+        window spans was read in full; otherwise it stays in doubt. Intents
+        whose send is still in flight are skipped. Risk exposure held for a
+        resolved entry is settled the same way.
+        """
+        entries = self.journal.in_doubt(include_in_flight=False)
+        if not entries:
+            return [], []
+
+        client = create_client(self.config)
+        histories: Dict[str, List] = {}
+        complete = set()
+        for order_date in sorted({day for entry in entries for day in history_dates(entry)}):
+            try:
+                history = client.get_order_history(self.config.access_token, order_date)
+            except KiwoomAPIError as e:
+                self.logger.warning("Order history lookup failed for %s: %s", order_date, e)
+                continue
+            if not history.success:
+                self.logger.warning("Order history lookup failed for %s: %s", order_date, history.message)
+                continue
+            histories[order_date] = history.items
+            if history.complete:
+                complete.add(order_date)
+
+        matches = match_in_doubt(entries, histories)
+        resolved, unresolved = [], []
+        for entry in entries:
+            match = matches.get(entry.journal_id)
+            if match:
+                entry.status, entry.order_number = STATUS_SUBMITTED, match.order_number
+                entry.message = "재시작 후 대사로 확인됨"
+            elif all(day in complete for day in history_dates(entry)):
+                entry.status = STATUS_NOT_SUBMITTED
+                entry.message = "키움 주문내역에 없음"
+            else:
+                unresolved.append(entry)
+                continue
+            self.journal.record_outcome(entry.journal_id, entry.status, entry.order_number, entry.message)
+            if self.risk_gate:
+                # Exposure booked for the send follows the order, or is freed if it never went out
+                self.risk_gate.settle_in_doubt(entry.journal_id, entry.order_number if match else None)
+            resolved.append(entry)
+
+        return resolved, unresolved
+
+    def _format_entry(self, entry: JournalEntry) -> str:
+        """Format a journal entry line"""
+        created = datetime.fromtimestamp(entry.created_at).strftime("%Y-%m-%d %H:%M:%S")
+        line = f"- {created} [{entry.status}] {'매수' if entry.side == 'buy' else '매도'} "
+        line += f"{entry.stock_code} {entry.quantity:,}주 {entry.price or '시장가'} ({entry.source})"
+        if entry.order_number:
+            line += f" 주문번호 {entry.order_number}"
+        if entry.route:
+            line += f" [{entry.exchange}] 경로 {entry.route}"
+        return line
@@ -0,0 +1,49 @@
+"""
+Market data handler for cached quotes
+"""
+
+from datetime import datetime
+from typing import List, Dict, Any
+
+import mcp.types as types
+
+from handlers.base import BaseHandler
+from config.constants import ROUTE_VENUES
+from engine.market_data import MarketDataCache
+
+
+class MarketHandler(BaseHandler):
+    """Handle quote lookups served from the local market data cache"""
+
+    def __init__(self, market_data: MarketDataCache):
+        super().__init__()
+        self.market_data = market_data
+
+    async def get_quote(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        """Show the cached last trade and top of book for symbols"""
+        try:
+            codes = arguments.get("stock_codes") or [arguments["stock_code"]]
+            lines = []
+            for stock_code in codes:
+                quote = self.market_data.get(stock_code)
+                if quote is None or not quote.price:
+                    lines.append(f"- {stock_code}: 시세 없음 (실시간 등록 필요)")
+                    continue
+                updated = datetime.fromtimestamp(quote.updated_at).strftime("%H:%M:%S")
+                line = f"- {stock_code}: 현재가 {quote.price:,}원"
+                if quote.best_bid or quote.best_ask:
+                    line += f" (매수호가 {quote.best_bid:,} / 매도호가 {quote.best_ask:,})"
+                line += f" 거래량 {quote.volume:,} [{updated}]"
+                for venue in ROUTE_VENUES:
+                    book = self.market_data.book(stock_code, venue)
+                    if book is not None:
+                        line += (
+                            f"\n  {venue}: 매수 {book.bid:,} ({book.bid_size:,}) / 매도 {book.ask:,} ({book.ask_size:,})"
+                        )
+                lines.append(line)
+
+            return self.create_info_response("시세:\n\n" + "\n".join(lines))
+
+        except Exception as e:
+            self.logger.error("Failed to get quote: %s", e)
+            return self.create_error_response(f"시세 조회 실패: {str(e)}")
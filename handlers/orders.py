@@ -2,26 +2,53 @@
 Order handler for stock trading operations
 """
 
-import json
-from typing import List, Dict, Any
+import asyncio
+import dataclasses
+import time
+from typing import Callable, List, Dict, Any, Optional, Tuple, Union
 
 import mcp.types as types
 
 from handlers.base import BaseHandler
 from config.settings import KiwoomConfig
-from config.constants import EXCHANGE_TYPES, TRADE_TYPES
-from kiwoom.client import KiwoomAPIClient
-from models.types import OrderRequest
-from models.exceptions import OrderError, AuthenticationError
+from config.constants import EXCHANGE_TYPES, TRADE_TYPES, API_IDS, ROUTE_AUTO, SESSION_POLICIES
+from engine.journal import OrderJournal, STATUS_SUBMITTED, STATUS_FAILED
+from engine.risk import RiskGate, Delta
+from engine.router import SmartOrderRouter, RouteDecision, RouteLeg, PRIMARY_VENUE
+from engine.sessions import MarketCalendar, QueuedOrder, SessionOrderQueue
+from kiwoom.client import create_client
+from models.types import OrderRequest, OrderResponse
+from models.exceptions import OrderError, AuthenticationError, RiskLimitError, MarketClosedError
+from utils.logging import audit, elapsed_ms
+from utils.profiling import order_trace, leg_trace, mark
+from utils import json_codec
 
 
 class OrderHandler(BaseHandler):
     """Handle stock order operations"""
     
-    def __init__(self, config: KiwoomConfig):
+    def __init__(
+        self,
+        config: KiwoomConfig,
+        journal: Optional[OrderJournal] = None,
+        risk_gate: Optional[RiskGate] = None,
+        router: Optional[SmartOrderRouter] = None,
+        calendar: Optional[MarketCalendar] = None
+    ):
         super().__init__()
         self.config = config
-        self.client = KiwoomAPIClient(config.is_mock)
+        self.journal = journal
+        self.risk_gate = risk_gate
+        self.router = router
+        self.calendar = calendar
+        # Orders held until a session takes them (session_policy "queue")
+        self.session_queue = SessionOrderQueue(self.submit_order, calendar) if calendar else None
+        self.client = create_client(config)
+        self._order_listeners: List[Callable[[OrderRequest, bool, OrderResponse], None]] = []
+    
+    def add_order_listener(self, listener: Callable[[OrderRequest, bool, OrderResponse], None]) -> None:
+        """Register a callback invoked with (order_request, is_buy, response) after each send"""
+        self._order_listeners.append(listener)
     
     async def stock_buy_order(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
         """Handle stock buy order"""
@@ -32,6 +59,13 @@ class OrderHandler(BaseHandler):
         return await self._stock_order(arguments, is_buy=False)
     
     async def _stock_order(self, arguments: Dict[str, Any], is_buy: bool) -> List[types.TextContent]:
+        """Execute stock order (traced end to end when latency profiling is on)"""
+        with order_trace("manual"):
+            result = await self._execute_stock_order(arguments, is_buy)
+            mark("render")
+            return result
+    
+    async def _execute_stock_order(self, arguments: Dict[str, Any], is_buy: bool) -> List[types.TextContent]:
         """Execute stock order"""
         try:
             if not self.config.access_token:
@@ -48,24 +82,27 @@ class OrderHandler(BaseHandler):
                 exchange=arguments.get("exchange", "KRX"),
                 condition_price=arguments.get("condition_price", "")
             )
+            mark("parse")
             
-            # Get exchange and trade type codes
-            exchange_code = EXCHANGE_TYPES.get(order_request.exchange, "KRX")
-            trade_type_code = TRADE_TYPES.get(order_request.trade_type, "3")
-            
-            # Update client with current mock setting
-            self.client = KiwoomAPIClient(self.config.is_mock)
-            
-            # Place order
-            response = self.client.place_order(
-                order_request=order_request,
-                access_token=self.config.access_token,
-                is_buy=is_buy,
-                exchange_code=exchange_code,
-                trade_type_code=trade_type_code
-            )
-            
+            policy = arguments.get("session_policy")
             order_type = "매수" if is_buy else "매도"
+            try:
+                response = await self.submit_order(order_request, is_buy, session_policy=policy)
+            except MarketClosedError as e:
+                queued = self._enqueue_closed(order_request, is_buy, e, policy)
+                if queued is None:
+                    raise
+                return self.create_info_response(
+                    f"{order_type} 주문이 대기열에 등록되었습니다 ({e}).\n\n"
+                    f"- 대기번호: {queued.queue_id}\n"
+                    f"- 종목코드: {order_request.stock_code}\n"
+                    f"- 주문수량: {order_request.quantity:,}주\n"
+                    f"- 매매구분: {order_request.trade_type}\n"
+                    f"- 발송 예정: {queued.release_at:%Y-%m-%d %H:%M:%S}\n\n"
+                    "리스크 점검과 주문 기록은 발송 시점에 수행됩니다. cancel_queued_order로 취소할 수 있습니다."
+                )
+            
+            trade_type_code = TRADE_TYPES.get(order_request.trade_type, "3")
             
             if response.success:
                 message = f"{order_type} 주문이 성공적으로 처리되었습니다.\n\n"
@@ -74,7 +111,10 @@ class OrderHandler(BaseHandler):
                 message += f"- 주문수량: {order_request.quantity:,}주\n"
                 message += f"- 주문단가: {order_request.price or '시장가'}\n"
                 message += f"- 매매구분: {order_request.trade_type} ({trade_type_code})\n"
-                message += f"- 거래소: {order_request.exchange}\n\n"
+                message += f"- 거래소: {order_request.exchange}\n"
+                if response.route:
+                    message += f"- 주문경로: {response.route}\n"
+                message += "\n"
                 
                 if response.order_number:
                     message += f"🔢 주문번호: {response.order_number}\n"
@@ -83,26 +123,398 @@ class OrderHandler(BaseHandler):
                     message += f"💬 응답메시지: {response.message}\n"
                 
                 if response.raw_response:
-                    message += f"\n📊 전체 응답:\n```json\n{json.dumps(response.raw_response, indent=2, ensure_ascii=False)}\n```"
+                    message += f"\n📊 전체 응답:\n```json\n{json_codec.dumps(response.raw_response, indent=True)}\n```"
                 
                 return self.create_success_response(message)
             else:
                 message = f"{order_type} 주문 실패\n\n"
                 if response.raw_response:
-                    message += f"응답: {json.dumps(response.raw_response, indent=2, ensure_ascii=False)}"
+                    message += f"응답: {json_codec.dumps(response.raw_response, indent=True)}"
                 else:
                     message += f"오류: {response.message or 'Unknown error'}"
                 
                 return self.create_error_response(message)
                 
+        except RiskLimitError as e:
+            return self.create_error_response(f"리스크 한도 초과로 주문이 거부되었습니다: {str(e)}")
+        except MarketClosedError as e:
+            message = f"장 운영시간 외 주문이 거부되었습니다: {str(e)}"
+            if e.next_open:
+                message += f"\n다음 접수 가능 시각: {e.next_open:%Y-%m-%d %H:%M:%S} (session_policy=queue로 예약할 수 있습니다)"
+            return self.create_error_response(message)
         except OrderError as e:
             return self.create_error_response(f"주문 오류: {str(e)}")
         except AuthenticationError as e:
             return self.create_error_response(f"인증 오류: {str(e)}")
         except Exception as e:
-            self.logger.error(f"Order processing failed: {e}")
+            self.logger.error("Order processing failed: %s", e)
             return self.create_error_response(f"주문 처리 중 오류가 발생했습니다: {str(e)}")
     
+    async def stock_batch_order(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        """Risk-check a batch of orders as a whole, then send each"""
+        try:
+            if not self.config.access_token:
+                return self.create_error_response(
+                    "접근 토큰이 설정되지 않았습니다. 먼저 set_access_token을 사용하세요."
+                )
+            
+            orders = [
+                (
+                    OrderRequest(
+                        stock_code=item["stock_code"],
+                        quantity=item["quantity"],
+                        price=item.get("price", ""),
+                        trade_type=item.get("trade_type", "시장가"),
+                        exchange=item.get("exchange", "KRX"),
+                        condition_price=item.get("condition_price", "")
+                    ),
+                    item.get("side", "buy") == "buy"
+                )
+                for item in arguments["orders"]
+            ]
+            if not orders:
+                return self.create_error_response("주문 목록이 비어 있습니다.")
+            
+            policy = arguments.get("session_policy")
+            results = await self.submit_batch(orders, session_policy=policy)
+            
+            succeeded = sum(1 for r in results if isinstance(r, OrderResponse) and r.success)
+            message = f"일괄 주문 처리 결과: {succeeded}/{len(orders)}건 성공\n\n"
+            for (order_request, is_buy), result in zip(orders, results):
+                line = f"- {'매수' if is_buy else '매도'} {order_request.stock_code} {order_request.quantity:,}주 "
+                line += f"{order_request.price or '시장가'}: "
+                queued = None
+                if isinstance(result, MarketClosedError):
+                    queued = self._enqueue_closed(order_request, is_buy, result, policy)
+                if queued is not None:
+                    line += f"⏳ 대기번호 {queued.queue_id} ({queued.release_at:%m-%d %H:%M:%S} 발송)"
+                elif isinstance(result, Exception):
+                    line += f"❌ {result}"
+                elif result.success:
+                    line += f"✅ 주문번호 {result.order_number or 'N/A'}"
+                else:
+                    line += f"❌ {result.message or 'Unknown error'}"
+                message += line + "\n"
+            
+            if succeeded == len(orders):
+                return self.create_success_response(message)
+            return self.create_warning_response(message)
+            
+        except RiskLimitError as e:
+            return self.create_error_response(f"리스크 한도 초과로 일괄 주문 전체가 거부되었습니다: {str(e)}")
+        except Exception as e:
+            self.logger.error("Batch order processing failed: %s", e)
+            return self.create_error_response(f"일괄 주문 처리 중 오류가 발생했습니다: {str(e)}")
+    
+    async def submit_order(
+        self,
+        order_request: OrderRequest,
+        is_buy: bool,
+        source: str = "manual",
+        session_policy: Optional[str] = None
+    ) -> OrderResponse:
+        """Route, risk-check, journal and send an order (shared by tools and engine components)"""
+        with order_trace(source):
+            requested = order_request.trade_type
+            order_request = self._check_session(order_request, is_buy, source, session_policy)
+            mark("session")
+            
+            decision, legs = self._legs(order_request, is_buy)
+            if decision is not None:
+                mark("route")
+            
+            try:
+                reserved = self.risk_gate.reserve([(leg, is_buy) for leg in legs]) if self.risk_gate else None
+            except RiskLimitError as e:
+                self._audit("risk_reject", order_request, is_buy, source, message=str(e))
+                raise
+            mark("risk")
+            
+            if decision is None:
+                response = await self._send(order_request, is_buy, source, reserved)
+            else:
+                response = await self._send_routed(decision, legs, is_buy, source, reserved)
+            if order_request.trade_type != requested:
+                note = f"매매구분 {requested} → {order_request.trade_type} 변경"
+                response.message = f"{response.message} ({note})" if response.message else note
+            return response
+    
+    def _check_session(
+        self,
+        order_request: OrderRequest,
+        is_buy: bool,
+        source: str,
+        session_policy: Optional[str] = None
+    ) -> OrderRequest:
+        """Order to send now, re-mapped when allowed, or MarketClosedError"""
+        policy = session_policy or self.config.session_policy
+        if self.calendar is None or policy == "off":
+            return order_request
+        if policy not in SESSION_POLICIES:
+            raise OrderError(f"알 수 없는 session_policy입니다: {policy} (사용 가능: {', '.join(SESSION_POLICIES)})")
+        
+        check = self.calendar.check(order_request)
+        if check.accepted:
+            return order_request
+        if check.remap and policy == "remap":
+            return dataclasses.replace(order_request, trade_type=check.remap, exchange=check.venue)
+        
+        self._audit("session_reject", order_request, is_buy, source, message=check.reason)
+        raise MarketClosedError(check.reason, check.next_open)
+    
+    def _enqueue_closed(
+        self,
+        order_request: OrderRequest,
+        is_buy: bool,
+        error: MarketClosedError,
+        session_policy: Optional[str] = None
+    ) -> Optional[QueuedOrder]:
+        """Hold a rejected order for its next session under the "queue" policy"""
+        policy = session_policy or self.config.session_policy
+        if policy != "queue" or self.session_queue is None or error.next_open is None:
+            return None
+        return self.session_queue.enqueue(order_request, is_buy, error.next_open)
+    
+    def _route(self, order_request: OrderRequest, is_buy: bool) -> RouteDecision:
+        """Routing decision for an AUTO order (everything to the primary venue without a router)"""
+        if self.router is None:
+            return RouteDecision(
+                order_request.stock_code, is_buy,
+                [RouteLeg(PRIMARY_VENUE, int(order_request.quantity))], "라우터 없음"
+            )
+        return self.router.route(order_request, is_buy)
+    
+    def _legs(self, order_request: OrderRequest, is_buy: bool) -> Tuple[Optional[RouteDecision], List[OrderRequest]]:
+        """Routing decision (None for a fixed venue) and the per-venue orders to send"""
+        if order_request.exchange != ROUTE_AUTO:
+            return None, [order_request]
+        decision = self._route(order_request, is_buy)
+        return decision, [
+            dataclasses.replace(order_request, exchange=leg.venue, quantity=leg.quantity)
+            for leg in decision.legs
+        ]
+    
+    async def _send_routed(
+        self,
+        decision: RouteDecision,
+        legs: List[OrderRequest],
+        is_buy: bool,
+        source: str,
+        reserved: Optional[List[Delta]]
+    ) -> OrderResponse:
+        """Send the legs of a routed order at once and merge their responses
+        
+        The merged response succeeds if any leg was accepted, so callers that
+        resend failures (algos) never double up on an accepted leg.
+        """
+        route = decision.summary()
+        deltas = reserved or [None] * len(legs)
+        
+        async def send_leg(leg: OrderRequest, delta: Optional[Delta]) -> OrderResponse:
+            if len(legs) == 1:
+                return await self._send(leg, is_buy, source, [delta] if delta else None, route)
+            # Concurrent legs would interleave their stage marks on one trace
+            with leg_trace(leg.exchange):
+                return await self._send(leg, is_buy, source, [delta] if delta else None, route)
+        
+        results = await asyncio.gather(
+            *(send_leg(leg, delta) for leg, delta in zip(legs, deltas)),
+            return_exceptions=True
+        )
+        if len(legs) == 1:
+            if isinstance(results[0], BaseException):
+                raise results[0]
+            results[0].route = route
+            return results[0]
+        
+        accepted = [r for r in results if isinstance(r, OrderResponse) and r.success]
+        if not accepted:
+            errors = [r for r in results if isinstance(r, BaseException)]
+            if errors:
+                raise errors[0]
+        
+        leg_results = []
+        messages = []
+        for leg, result in zip(legs, results):
+            if isinstance(result, BaseException):
+                ok, order_number, text = False, None, str(result)
+            else:
+                ok, order_number, text = result.success, result.order_number, result.message
+            leg_results.append({
+                "exchange": leg.exchange, "quantity": leg.quantity, "success": ok,
+                "ord_no": order_number, "message": text
+            })
+            messages.append(f"{leg.exchange} {leg.quantity:,}주 {'접수' if ok else '실패'}: {text or ''}".rstrip())
+        
+        return OrderResponse(
+            success=bool(accepted),
+            order_number=",".join(r.order_number for r in accepted if r.order_number) or None,
+            message=" / ".join(messages),
+            raw_response={"route": route, "legs": leg_results},
+            status_code=200,
+            route=route
+        )
+    
+    async def submit_batch(
+        self,
+        orders: List[Tuple[OrderRequest, bool]],
+        source: str = "batch",
+        session_policy: Optional[str] = None
+    ) -> List[Union[OrderResponse, Exception]]:
+        """Risk-check orders as a whole, then send each; per-order errors are returned
+        
+        Orders no session takes now are returned as MarketClosedError and
+        left out of the risk check. AUTO orders are routed first and each
+        venue leg is booked on its own.
+        """
+        results: List[Union[OrderResponse, Exception, None]] = [None] * len(orders)
+        sendable = []
+        for index, (order_request, is_buy) in enumerate(orders):
+            try:
+                order_request = self._check_session(order_request, is_buy, source, session_policy)
+            except MarketClosedError as e:
+                results[index] = e
+                continue
+            sendable.append((index, order_request, is_buy, *self._legs(order_request, is_buy)))
+        
+        checked = [(leg, is_buy) for _, _, is_buy, _, legs in sendable for leg in legs]
+        try:
+            reserved = self.risk_gate.reserve(checked) if self.risk_gate else [None] * len(checked)
+        except RiskLimitError as e:
+            for order_request, is_buy in checked:
+                self._audit("risk_reject", order_request, is_buy, source, message=str(e))
+            raise
+        
+        offset = 0
+        for index, order_request, is_buy, decision, legs in sendable:
+            deltas = reserved[offset:offset + len(legs)]
+            offset += len(legs)
+            try:
+                with order_trace(source):
+                    if decision is None:
+                        results[index] = await self._send(order_request, is_buy, source, deltas if deltas[0] else None)
+                    else:
+                        results[index] = await self._send_routed(decision, legs, is_buy, source, deltas)
+            except (OrderError, AuthenticationError) as e:
+                results[index] = e
+        return results
+    
+    async def _send(
+        self,
+        order_request: OrderRequest,
+        is_buy: bool,
+        source: str,
+        reserved: Optional[List[Delta]],
+        route: Optional[str] = None
+    ) -> OrderResponse:
+        """Journal and send an order whose risk has already been booked"""
+        if not self.config.access_token:
+            if reserved:
+                self.risk_gate.release(reserved)
+            raise AuthenticationError("접근 토큰이 설정되지 않았습니다.")
+        
+        # Get exchange and trade type codes
+        exchange_code = EXCHANGE_TYPES.get(order_request.exchange, "KRX")
+        trade_type_code = TRADE_TYPES.get(order_request.trade_type, "3")
+        
+        # Update client with current mock setting
+        client = self.client = create_client(self.config)
+        mark("codes")
+        
+        # Record intent before the order leaves the process
+        journal_id = None
+        if self.journal:
+            journal_id = await self.journal.record_intent(order_request, is_buy, source, route)
+            mark("journal")
+        
+        def place() -> OrderResponse:
+            mark("handoff")
+            response = client.place_order(
+                order_request=order_request,
+                access_token=self.config.access_token,
+                is_buy=is_buy,
+                exchange_code=exchange_code,
+                trade_type_code=trade_type_code
+            )
+            mark("response")
+            return response
+        
+        # Place order
+        started = time.perf_counter()
+        try:
+            response = await asyncio.to_thread(place)
+            mark("resume")
+        except OrderError as e:
+            if reserved:
+                if e.status_code is None and journal_id:
+                    # Outcome unknown: keep exposure booked until reconcile finds the order or not
+                    self.risk_gate.hold(journal_id, reserved[0])
+                else:
+                    self.risk_gate.release(reserved)
+            if journal_id:
+                self.journal.record_error(journal_id, e)
+            self._audit(
+                "order_error", order_request, is_buy, source,
+                journal_id=journal_id, latency_ms=elapsed_ms(started), message=str(e), route=route
+            )
+            raise
+        finally:
+            if journal_id:
+                self.journal.settle(journal_id)
+        
+        if reserved and not response.success:
+            self.risk_gate.release(reserved)
+        elif reserved:
+            # Fills and cancels settle the booking from here on
+            self.risk_gate.track(response.order_number, reserved[0])
+        
+        if journal_id:
+            self.journal.record_outcome(
+                journal_id,
+                STATUS_SUBMITTED if response.success else STATUS_FAILED,
+                response.order_number,
+                response.message
+            )
+        
+        self._audit(
+            "order_sent" if response.success else "order_failed", order_request, is_buy, source,
+            journal_id=journal_id, latency_ms=elapsed_ms(started),
+            ord_no=response.order_number, message=response.message, route=route
+        )
+        for listener in self._order_listeners:
+            try:
+                listener(order_request, is_buy, response)
+            except Exception as e:
+                self.logger.error("Order listener failed: %s", e)
+        mark("bookkeeping")
+        return response
+    
+    def _audit(
+        self,
+        event: str,
+        order_request: OrderRequest,
+        is_buy: bool,
+        source: str,
+        message: Optional[str] = None,
+        **fields: Any
+    ) -> None:
+        """Write an order event to the audit trail"""
+        audit(
+            event,
+            "%s %s %s %s@%s (%s): %s",
+            "BUY" if is_buy else "SELL",
+            order_request.stock_code,
+            order_request.quantity,
+            order_request.trade_type,
+            order_request.price or "MKT",
+            source,
+            message or "",
+            stock_code=order_request.stock_code,
+            source=source,
+            api_id=API_IDS["BUY_ORDER"] if is_buy else API_IDS["SELL_ORDER"],
+            **fields
+        )
+    
     async def get_trade_types(self) -> List[types.TextContent]:
         """Get available trade types"""
         try:
@@ -114,5 +526,5 @@ class OrderHandler(BaseHandler):
             return self.create_info_response(message)
             
         except Exception as e:
-            self.logger.error(f"Failed to get trade types: {e}")
+            self.logger.error("Failed to get trade types: %s", e)
             return self.create_error_response(f"매매구분 조회 실패: {str(e)}") 
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""
+Paper-trading account handler
+"""
+
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+import mcp.types as types
+
+from handlers.base import BaseHandler
+from kiwoom.paper import PaperBroker
+
+
+class PaperHandler(BaseHandler):
+    """Handle paper-trading account queries"""
+
+    def __init__(self, broker: Optional[PaperBroker] = None):
+        super().__init__()
+        self.broker = broker
+
+    async def get_paper_account(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        """Show simulated cash, positions, open orders and recent fills"""
+        try:
+            if self.broker is None:
+                return self.create_error_response(
+                    "모의 브로커가 활성화되지 않았습니다. KIWOOM_PAPER_TRADING=true로 실행하세요."
+                )
+
+            broker = self.broker
+            equity = broker.equity()
+            pnl = equity - broker.initial_cash
+            message = "🧪 모의 브로커 계좌\n\n"
+            message += f"- 예수금: {broker.cash:,.0f}원 (주문 예약 {broker.reserved_cash:,.0f}원)\n"
+            message += f"- 평가금액: {equity:,.0f}원 (손익 {pnl:+,.0f}원)\n"
+
+            positions = [p for p in broker.positions_snapshot() if p.quantity or p.realized_pnl]
+            if positions:
+                message += "\n보유종목:\n"
+                for position in positions:
+                    message += f"- {position.stock_code}: {position.quantity:,}주 @ {position.average_price:,.0f}원"
+                    message += f" (실현손익 {position.realized_pnl:+,.0f}원)\n"
+
+            open_orders = broker.open_orders()
+            if open_orders:
+                message += "\n미체결 주문:\n"
+                for order in open_orders:
+                    message += f"- [{order.order_number}] {'매수' if order.is_buy else '매도'} {order.stock_code} "
+                    message += f"{order.remaining:,}/{order.quantity:,}주 @ {order.price:,}원 [{order.status}]\n"
+
+            limit = arguments.get("fills_limit", 20)
+            fills = broker.fills[-limit:] if limit else []
+            if fills:
+                message += f"\n최근 체결 ({len(fills)}건):\n"
+                for fill in reversed(fills):
+                    filled = datetime.fromtimestamp(fill.filled_at).strftime("%H:%M:%S")
+                    message += f"- {filled} [{fill.order_number}] {'매수' if fill.is_buy else '매도'} "
+                    message += f"{fill.stock_code} {fill.quantity:,}주 @ {fill.price:,}원\n"
+
+            return self.create_info_response(message)
+
+        except Exception as e:
+            self.logger.error("Failed to get paper account: %s", e)
+            return self.create_error_response(f"모의 브로커 계좌 조회 실패: {str(e)}")
@@ -0,0 +1,121 @@
+"""
+Profiling handler for order-entry latency breakdowns and runtime profilers
+"""
+
+from datetime import datetime
+from typing import List, Dict, Any
+
+import mcp.types as types
+
+from handlers.base import BaseHandler
+from utils.profiling import ORDER_STAGES, MIN_SAMPLING_INTERVAL, LatencyProfiler, RuntimeProfiler
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.2f}ms"
+
+
+class ProfilingHandler(BaseHandler):
+    """Handle latency breakdown queries and profiler toggles"""
+
+    def __init__(self, latency: LatencyProfiler, runtime: RuntimeProfiler):
+        super().__init__()
+        self.latency = latency
+        self.runtime = runtime
+
+    async def get_order_latency(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        """Show per-stage order latency aggregates and the slowest recent orders"""
+        try:
+            latency = self.latency
+            state = "켜짐" if latency.enabled else "꺼짐 (set_profiling으로 켜기)"
+            message = f"⏱️ 주문 지연 분석 [단계 계측 {state}]\n\n"
+
+            totals = latency.totals
+            if not totals.count:
+                message += "계측된 주문이 없습니다."
+                return self.create_info_response(message)
+
+            message += f"전체 ({totals.count:,}건): 평균 {_ms(totals.mean)}, p50 {_ms(totals.percentile(50))}, "
+            message += f"p95 {_ms(totals.percentile(95))}, p99 {_ms(totals.percentile(99))}, 최대 {_ms(totals.max)}\n\n"
+
+            message += "단계별 (평균 / p95 / 최대, 평균 대비 비중):\n"
+            order = {stage: i for i, stage in enumerate(ORDER_STAGES)}
+            stage_total = sum(stats.total for stats in latency.stages.values()) or 1.0
+            for stage, stats in sorted(latency.stages.items(), key=lambda kv: order.get(kv[0], len(order))):
+                share = stats.total / stage_total * 100
+                message += f"- {stage}: {_ms(stats.mean)} / {_ms(stats.percentile(95))} / {_ms(stats.max)} "
+                message += f"({share:.1f}%, {stats.count:,}건)\n"
+
+            slowest = latency.slowest(arguments.get("slowest", 3))
+            if slowest:
+                message += "\n가장 느린 주문:\n"
+                for trace in slowest:
+                    stages = ", ".join(f"{stage} {_ms(seconds)}" for stage, seconds in trace.durations())
+                    failed = " ❌" if trace.failed else ""
+                    message += f"- {_ms(trace.total)} [{trace.source}]{failed}: {stages}\n"
+
+            if arguments.get("reset"):
+                latency.reset()
+                message += "\n🧹 집계를 초기화했습니다."
+
+            return self.create_info_response(message)
+
+        except Exception as e:
+            self.logger.error("Failed to get order latency: %s", e)
+            return self.create_error_response(f"주문 지연 분석 조회 실패: {str(e)}")
+
+    async def set_profiling(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        """Toggle stage timing and start/stop the sampling or cProfile profiler"""
+        try:
+            lines = []
+
+            if "stage_timing" in arguments:
+                self.latency.enabled = bool(arguments["stage_timing"])
+                lines.append(f"단계 계측: {'켜짐' if self.latency.enabled else '꺼짐'}")
+
+            profiler = arguments.get("profiler")
+            if profiler == "off":
+                if self.runtime.mode is None:
+                    lines.append("실행 중인 프로파일러가 없습니다.")
+                else:
+                    mode = self.runtime.mode
+                    try:
+                        path, count = self.runtime.stop(arguments.get("output_name"))
+                    except ValueError:
+                        return self.create_error_response(
+                            "output_name은 경로 없는 파일 이름이어야 합니다 (PROFILE_DIR 아래에 저장됩니다)."
+                        )
+                    unit = "샘플" if mode == "sampling" else "호출"
+                    lines.append(f"{mode} 프로파일러 중지: {path} ({count:,} {unit})")
+            elif profiler:
+                if profiler not in self.runtime.MODES:
+                    return self.create_error_response(
+                        f"지원하지 않는 프로파일러입니다: {profiler} (사용 가능: off, {', '.join(self.runtime.MODES)})"
+                    )
+                if self.runtime.mode is not None:
+                    return self.create_error_response(
+                        f"{self.runtime.mode} 프로파일러가 이미 실행 중입니다. 먼저 profiler=off로 중지하세요."
+                    )
+                interval = arguments.get("interval_ms", 5) / 1000
+                if profiler == "sampling" and not interval >= MIN_SAMPLING_INTERVAL:
+                    return self.create_error_response(
+                        f"interval_ms는 {MIN_SAMPLING_INTERVAL * 1000:g} 이상이어야 합니다."
+                    )
+                self.runtime.start(profiler, interval)
+                lines.append(f"{profiler} 프로파일러 시작")
+
+            if not lines:
+                running = self.runtime.mode
+                started = (
+                    datetime.fromtimestamp(self.runtime.started_at).strftime("%H:%M:%S")
+                    if self.runtime.started_at else None
+                )
+                lines.append(f"단계 계측: {'켜짐' if self.latency.enabled else '꺼짐'}")
+                lines.append(f"프로파일러: {f'{running} ({started} 시작)' if running else '꺼짐'}")
+                return self.create_info_response("\n".join(lines))
+
+            return self.create_success_response("\n".join(lines))
+
+        except Exception as e:
+            self.logger.error("Failed to set profiling: %s", e)
+            return self.create_error_response(f"프로파일링 설정 실패: {str(e)}")
@@ -0,0 +1,299 @@
+"""
+MCP resource handler for account and market state with change subscriptions
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set
+
+import mcp.types as types
+
+from config.settings import KiwoomConfig
+from engine.algo import AlgoEngine
+from engine.conditions import ConditionDiff, ConditionSearchEngine
+from engine.journal import OrderJournal
+from engine.market_data import MarketDataCache
+from engine.reference import ReferenceDataCache
+from engine.triggers import TriggerEngine
+from kiwoom.paper import PaperBroker
+from utils.datetime_utils import is_token_expired, get_remaining_time
+from utils import json_codec
+
+
+TOKEN_URI = "kiwoom://token"
+POSITIONS_URI = "kiwoom://positions"
+OPEN_ORDERS_URI = "kiwoom://orders/open"
+QUOTE_URI_PREFIX = "kiwoom://quote/"
+CONDITION_URI_PREFIX = "kiwoom://conditions/"
+# Recent add/remove events included in a condition resource
+CONDITION_RESOURCE_EVENTS = 20
+
+
+class ResourceHandler:
+    """Serve state from in-memory caches as MCP resources and push change notifications
+
+    Changes are coalesced per URI: a subscribed URI is notified at most once
+    per `notify_interval` seconds however often the underlying state moves,
+    and unsubscribed URIs cost one dict lookup.
+    """
+
+    def __init__(
+        self,
+        config: KiwoomConfig,
+        market_data: MarketDataCache,
+        reference: ReferenceDataCache,
+        algo_engine: AlgoEngine,
+        trigger_engine: TriggerEngine,
+        journal: Optional[OrderJournal] = None,
+        paper_broker: Optional[PaperBroker] = None,
+        conditions: Optional[ConditionSearchEngine] = None,
+        notify_interval: float = 0.2
+    ):
+        self.config = config
+        self.market_data = market_data
+        self.reference = reference
+        self.algo_engine = algo_engine
+        self.trigger_engine = trigger_engine
+        self.journal = journal
+        self.paper_broker = paper_broker
+        self.conditions = conditions
+        self.notify_interval = notify_interval
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._subscriptions: Dict[str, Set[Any]] = {}
+        self._dirty: Set[str] = set()
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def list_resources(self) -> List[types.Resource]:
+        """Fixed resources"""
+        return [
+            types.Resource(
+                uri=TOKEN_URI,
+                name="토큰 상태",
+                description="접근 토큰 유효 여부와 남은 시간",
+                mimeType="application/json"
+            ),
+            types.Resource(
+                uri=POSITIONS_URI,
+                name="보유 포지션",
+                description="모의 브로커 보유종목 또는 마지막으로 조회한 계좌 잔고 (kt00018)",
+                mimeType="application/json"
+            ),
+            types.Resource(
+                uri=OPEN_ORDERS_URI,
+                name="미체결/대기 주문",
+                description="미체결 모의 주문, 실행 중 알고리즘 주문, 대기 중 조건, 결과 미확인 주문",
+                mimeType="application/json"
+            ),
+        ]
+
+    def list_resource_templates(self) -> List[types.ResourceTemplate]:
+        """Parameterized resources"""
+        return [
+            types.ResourceTemplate(
+                uriTemplate=QUOTE_URI_PREFIX + "{stock_code}",
+                name="실시간 시세",
+                description="실시간 캐시의 현재가와 최우선 호가",
+                mimeType="application/json"
+            ),
+            types.ResourceTemplate(
+                uriTemplate=CONDITION_URI_PREFIX + "{seq}",
+                name="조건검색 결과",
+                description="조건검색식의 현재 편입 종목과 최근 편입/이탈 이벤트",
+                mimeType="application/json"
+            )
+        ]
+
+    def read(self, uri: str) -> str:
+        """Render a resource as JSON"""
+        if uri == TOKEN_URI:
+            data = self._token()
+        elif uri == POSITIONS_URI:
+            data = self._positions()
+        elif uri == OPEN_ORDERS_URI:
+            data = self._open_orders()
+        elif uri.startswith(QUOTE_URI_PREFIX):
+            data = self._quote(uri[len(QUOTE_URI_PREFIX):])
+        elif uri.startswith(CONDITION_URI_PREFIX):
+            data = self._condition(uri[len(CONDITION_URI_PREFIX):])
+        else:
+            raise ValueError(f"Unknown resource: {uri}")
+        return json_codec.dumps(data)
+
+    def _token(self) -> Dict[str, Any]:
+        expires_dt = self.config.token_expires_dt
+        return {
+            "has_token": bool(self.config.access_token),
+            "mode": "paper" if self.config.paper_trading else ("mock" if self.config.is_mock else "real"),
+            "expires_dt": expires_dt,
+            "expired": is_token_expired(expires_dt) if expires_dt else None,
+            "remaining": get_remaining_time(expires_dt) if expires_dt else None,
+        }
+
+    def _positions(self) -> Dict[str, Any]:
+        if self.paper_broker:
+            return {
+                "source": "paper",
+                "cash": self.paper_broker.cash,
+                "reserved_cash": self.paper_broker.reserved_cash,
+                "positions": [
+                    {
+                        "stock_code": p.stock_code,
+                        "quantity": p.quantity,
+                        "average_price": round(p.average_price, 2),
+                        "realized_pnl": round(p.realized_pnl, 2),
+                    }
+                    for p in self.paper_broker.positions_snapshot() if p.quantity
+                ],
+            }
+        # Account holdings as of the last kt00018 load (startup, warmup, run_warmup)
+        loaded_at = self.reference.loaded_at.get("holdings")
+        return {
+            "source": "holdings",
+            "loaded_at": loaded_at,
+            "positions": [
+                {
+                    "stock_code": h.stock_code,
+                    "name": h.name,
+                    "quantity": h.quantity,
+                    "available_quantity": h.available_quantity,
+                    "average_price": h.average_price,
+                    "current_price": h.current_price,
+                }
+                for h in self.reference.holdings.values() if h.quantity
+            ],
+        }
+
+    def _open_orders(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "algos": [
+                {
+                    "algo_id": algo.algo_id,
+                    "algo_type": algo.algo_type,
+                    "stock_code": algo.order_request.stock_code,
+                    "side": "buy" if algo.is_buy else "sell",
+                    "sent_quantity": algo.sent_quantity,
+                    "remaining_quantity": algo.remaining_quantity,
+                }
+                for algo in self.algo_engine.list() if algo.status == "running"
+            ],
+            "triggers": [
+                {
+                    "trigger_id": c.trigger_id,
+                    "stock_code": c.stock_code,
+                    "condition": c.condition,
+                    "trigger_price": c.trigger_price,
+                    "quantity": c.order_request.quantity if c.order_request else None,
+                }
+                for c in self.trigger_engine.list()
+            ],
+            "in_doubt": len(self.journal.in_doubt()) if self.journal and self.journal.is_open else 0,
+        }
+        if self.paper_broker:
+            data["orders"] = [
+                {
+                    "order_number": o.order_number,
+                    "stock_code": o.stock_code,
+                    "side": "buy" if o.is_buy else "sell",
+                    "price": o.price,
+                    "quantity": o.quantity,
+                    "remaining": o.remaining,
+                    "status": o.status,
+                }
+                for o in self.paper_broker.open_orders()
+            ]
+        return data
+
+    def _quote(self, stock_code: str) -> Dict[str, Any]:
+        quote = self.market_data.get(stock_code)
+        if quote is None:
+            return {"stock_code": stock_code, "available": False}
+        return {
+            "stock_code": stock_code,
+            "available": True,
+            "price": quote.price,
+            "volume": quote.volume,
+            "best_bid": quote.best_bid,
+            "best_ask": quote.best_ask,
+            "updated_at": quote.updated_at,
+        }
+
+    def _condition(self, seq: str) -> Dict[str, Any]:
+        state = self.conditions.conditions.get(seq) if self.conditions else None
+        if state is None:
+            return {"seq": seq, "available": False}
+        return {
+            "seq": seq,
+            "available": True,
+            "name": state.name,
+            "live": state.live,
+            "codes": sorted(state.codes),
+            "scanned_at": state.scanned_at,
+            "events": [
+                {
+                    "event_id": event.event_id,
+                    "added": event.added,
+                    "removed": event.removed,
+                    "source": event.source,
+                    "at": event.at,
+                }
+                for event in self.conditions.events_since(0, seq)[-CONDITION_RESOURCE_EVENTS:]
+            ],
+        }
+
+    def subscribe(self, uri: str, session: Any) -> None:
+        """Register a session for change notifications on a URI"""
+        self._loop = asyncio.get_running_loop()
+        self._subscriptions.setdefault(uri, set()).add(session)
+
+    def unsubscribe(self, uri: str, session: Any) -> None:
+        """Drop a session's subscription"""
+        sessions = self._subscriptions.get(uri)
+        if sessions:
+            sessions.discard(session)
+            if not sessions:
+                del self._subscriptions[uri]
+
+    def mark_changed(self, uri: str) -> None:
+        """Note that a resource changed (safe to call from any thread)"""
+        if uri not in self._subscriptions or self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._mark, uri)
+
+    def on_tick(self, stock_code: str, price: int) -> None:
+        """Tick listener for quote resources"""
+        self.mark_changed(QUOTE_URI_PREFIX + stock_code)
+
+    def on_order(self, *_: Any) -> None:
+        """Order/fill listener for account resources"""
+        self.mark_changed(POSITIONS_URI)
+        self.mark_changed(OPEN_ORDERS_URI)
+
+    def on_holdings(self, *_: Any) -> None:
+        """Holdings refresh listener for the positions resource"""
+        self.mark_changed(POSITIONS_URI)
+
+    def on_condition(self, diff: ConditionDiff) -> None:
+        """Condition diff listener for condition resources"""
+        self.mark_changed(CONDITION_URI_PREFIX + diff.seq)
+
+    def _mark(self, uri: str) -> None:
+        self._dirty.add(uri)
+        if self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(self.notify_interval, self._flush)
+
+    def _flush(self) -> None:
+        self._flush_handle = None
+        dirty, self._dirty = self._dirty, set()
+        for uri in dirty:
+            for session in list(self._subscriptions.get(uri, ())):
+                task = self._loop.create_task(self._send(uri, session))
+                task.add_done_callback(lambda t: t.exception())
+
+    async def _send(self, uri: str, session: Any) -> None:
+        try:
+            await session.send_resource_updated(uri)
+        except Exception as e:
+            # Session is gone; stop notifying it
+            self.logger.debug("Dropping subscriber for %s: %s", uri, e)
+            self.unsubscribe(uri, session)
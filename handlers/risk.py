@@ -0,0 +1,59 @@
+"""
+Risk handler for pre-trade limits and exposure
+"""
+
+from typing import List
+
+import mcp.types as types
+
+from handlers.base import BaseHandler
+from engine.risk import RiskGate
+
+
+LIMIT_LABELS = {
+    "max_order_notional": "주문당 금액 한도",
+    "max_symbol_notional": "종목별 노출 한도",
+    "max_symbol_quantity": "종목별 수량 한도",
+    "max_sector_notional": "섹터별 노출 한도",
+    "max_gross_notional": "총 노출 한도"
+}
+
+
+class RiskHandler(BaseHandler):
+    """Handle risk limit operations"""
+
+    def __init__(self, risk_gate: RiskGate):
+        super().__init__()
+        self.risk_gate = risk_gate
+
+    async def get_risk_status(self) -> List[types.TextContent]:
+        """Show limits and current exposure aggregates"""
+        try:
+            limits = self.risk_gate.limits
+            exposure = self.risk_gate.exposure
+
+            message = "리스크 한도:\n"
+            for name, label in LIMIT_LABELS.items():
+                value = getattr(limits, name)
+                unit = "주" if name == "max_symbol_quantity" else "원"
+                message += f"- {label}: {f'{value:,}{unit}' if value is not None else '없음'}\n"
+            for stock_code, value in limits.symbol_notional.items():
+                message += f"- {stock_code} 노출 한도: {value:,}원\n"
+            for stock_code, value in limits.symbol_quantity.items():
+                message += f"- {stock_code} 수량 한도: {value:,}주\n"
+            for sector, value in limits.sector_notional.items():
+                message += f"- 섹터 '{sector}' 한도: {value:,}원\n"
+
+            message += f"\n📊 현재 노출 (보유 + 미체결 {len(self.risk_gate.orders)}건):\n- 총 노출: {exposure.gross:,}원\n"
+            for sector, value in sorted(exposure.sector_gross.items(), key=lambda kv: -kv[1]):
+                if value:
+                    message += f"- 섹터 '{sector}': {value:,}원\n"
+            for stock_code, quantity in sorted(exposure.quantity.items()):
+                if quantity:
+                    message += f"- {stock_code}: {quantity:,}주 / {exposure.notional[stock_code]:,}원\n"
+
+            return self.create_info_response(message)
+
+        except Exception as e:
+            self.logger.error("Failed to get risk status: %s", e)
+            return self.create_error_response(f"리스크 상태 조회 실패: {str(e)}")
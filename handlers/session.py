@@ -0,0 +1,98 @@
+"""
+Session handler for the market calendar and orders held until the open
+"""
+
+from typing import List, Dict, Any, Optional
+
+import mcp.types as types
+
+from handlers.base import BaseHandler
+from config.constants import MARKET_SESSIONS, SESSION_NAMES, SESSION_TRADE_TYPES
+from engine.sessions import MarketCalendar, SessionOrderQueue
+
+
+STATUS_NAMES = {
+    "queued": "대기",
+    "sending": "발송 중",
+    "sent": "발송",
+    "failed": "실패",
+    "cancelled": "취소",
+}
+
+
+def _hhmmss(seconds: int) -> str:
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+class SessionHandler(BaseHandler):
+    """Handle market session status and the session order queue"""
+
+    def __init__(self, calendar: MarketCalendar, queue: Optional[SessionOrderQueue], session_policy: str):
+        super().__init__()
+        self.calendar = calendar
+        self.queue = queue
+        self.session_policy = session_policy
+
+    async def get_market_session(self) -> List[types.TextContent]:
+        """Show current sessions, today's schedule and queued orders"""
+        try:
+            now = self.calendar.clock()
+            today = now.date()
+            trading_day = self.calendar.is_trading_day(today)
+            message = f"🕘 장 운영 현황 ({now:%Y-%m-%d %H:%M:%S} KST, {'거래일' if trading_day else '휴장일'})\n"
+            message += f"- 장외 주문 처리: {self.session_policy}\n\n"
+
+            for venue in MARKET_SESSIONS:
+                session = self.calendar.session(venue, now)
+                if session is None:
+                    message += f"{venue}: 운영시간 아님\n"
+                else:
+                    trade_types = ", ".join(sorted(SESSION_TRADE_TYPES[session]))
+                    message += f"{venue}: {SESSION_NAMES[session]} (접수: {trade_types})\n"
+                for start, end, name in self.calendar.windows(venue, today):
+                    marker = " ◀" if name == session else ""
+                    message += f"  - {_hhmmss(start)}~{_hhmmss(end)} {SESSION_NAMES[name]}{marker}\n"
+                upcoming = self.calendar.next_open((venue,), "보통", now)
+                if upcoming and session is None:
+                    message += f"  - 다음 접수 (보통): {upcoming[0]:%Y-%m-%d %H:%M:%S}\n"
+                message += "\n"
+
+            pending = self.queue.pending() if self.queue else []
+            if not pending:
+                message += "대기 중인 주문이 없습니다."
+            else:
+                message += f"⏳ 대기 주문 {len(pending)}건:\n"
+                for queued in pending:
+                    order = queued.order_request
+                    price = f"@{order.price} " if order.price else ""
+                    message += (
+                        f"- {queued.queue_id}: {'매수' if queued.is_buy else '매도'} {order.stock_code} "
+                        f"{order.quantity:,}주 {price}{order.trade_type} ({order.exchange}) "
+                        f"→ {queued.release_at:%m-%d %H:%M:%S}\n"
+                    )
+            return self.create_info_response(message)
+
+        except Exception as e:
+            self.logger.error("Failed to get market session: %s", e)
+            return self.create_error_response(f"장 운영 현황 조회 실패: {str(e)}")
+
+    async def cancel_queued_order(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        """Cancel an order held until the open"""
+        try:
+            if self.queue is None:
+                return self.create_error_response("주문 대기열이 없습니다.")
+
+            queue_id = arguments["queue_id"]
+            queued = self.queue.cancel(queue_id)
+            if queued is None:
+                return self.create_error_response(f"대기 주문을 찾을 수 없습니다: {queue_id}")
+            if queued.status != "cancelled":
+                status = STATUS_NAMES.get(queued.status, queued.status)
+                return self.create_warning_response(
+                    f"{queue_id}는 이미 처리되어 취소할 수 없습니다 (상태: {status}, {queued.result or '-'})"
+                )
+            return self.create_success_response(f"대기 주문 {queue_id}를 취소했습니다.")
+
+        except Exception as e:
+            self.logger.error("Failed to cancel queued order: %s", e)
+            return self.create_error_response(f"대기 주문 취소 실패: {str(e)}")
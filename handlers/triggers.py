@@ -0,0 +1,189 @@
+"""
+Trigger order handler for locally evaluated conditional orders
+"""
+
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+import mcp.types as types
+
+from handlers.base import BaseHandler
+from config.settings import KiwoomConfig
+from config.constants import TRIGGER_CONDITIONS, REALTIME_TYPES
+from engine.triggers import TriggerEngine, TriggerCondition
+from kiwoom.realtime import KiwoomRealtimeClient
+from models.types import OrderRequest
+from models.exceptions import OrderError, AuthenticationError
+
+
+class TriggerHandler(BaseHandler):
+    """Handle conditional (trigger) order operations"""
+
+    def __init__(
+        self,
+        config: KiwoomConfig,
+        engine: TriggerEngine,
+        realtime: Optional[KiwoomRealtimeClient] = None
+    ):
+        super().__init__()
+        self.config = config
+        self.engine = engine
+        self.realtime = realtime
+
+    async def arm_trigger_order(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        """Arm a price condition, optionally with an order to send when it fires"""
+        try:
+            condition_name = arguments["condition"]
+            if condition_name not in TRIGGER_CONDITIONS:
+                return self.create_error_response(f"지원하지 않는 조건입니다: {condition_name}")
+            if condition_name.startswith("price_") and not arguments.get("trigger_price"):
+                return self.create_error_response("가격 조건에는 trigger_price가 필요합니다.")
+
+            order_request = None
+            if arguments.get("quantity"):
+                order_request = self._order_request(arguments, arguments["quantity"])
+
+            condition = TriggerCondition(
+                trigger_id=self.engine.new_id(),
+                stock_code=arguments["stock_code"],
+                condition=condition_name,
+                trigger_price=arguments.get("trigger_price"),
+                trail_amount=arguments.get("trail_amount"),
+                trail_percent=arguments.get("trail_percent"),
+                order_request=order_request,
+                is_buy=arguments.get("side", "sell") == "buy",
+                oco_group=arguments.get("oco_group")
+            )
+            self.engine.arm(condition, arguments.get("reference_price"))
+            warning = await self._ensure_streaming(condition.stock_code)
+
+            message = "조건이 등록되었습니다.\n\n" + self._format_condition(condition)
+            if warning:
+                message += f"\n⚠️ {warning}"
+            return self.create_success_response(message)
+
+        except ValueError as e:
+            return self.create_error_response(f"조건 설정 오류: {str(e)}")
+        except Exception as e:
+            self.logger.error("Failed to arm trigger: %s", e)
+            return self.create_error_response(f"조건 등록 실패: {str(e)}")
+
+    async def arm_bracket_order(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        """Send an entry order and arm take-profit/stop-loss exits as an OCO pair"""
+        try:
+            take_profit = arguments["take_profit_price"]
+            stop_loss = arguments["stop_loss_price"]
+            is_buy = arguments.get("side", "buy") == "buy"
+            if is_buy and not stop_loss < take_profit:
+                return self.create_error_response("매수 브래킷은 손절가 < 익절가 여야 합니다.")
+            if not is_buy and not take_profit < stop_loss:
+                return self.create_error_response("매도 브래킷은 익절가 < 손절가 여야 합니다.")
+
+            entry = self._order_request(arguments, arguments["quantity"])
+            response = await self.engine.submit_order(entry, is_buy, "bracket")
+            if not response.success:
+                return self.create_error_response(f"진입 주문 실패: {response.message or 'Unknown error'}")
+
+            # Exits close the position on the opposite side
+            exit_args = dict(arguments, price="", trade_type=arguments.get("exit_trade_type", "시장가"))
+            group = f"bracket-{self.engine.new_id()}"
+            legs = []
+            for condition_name, price in (
+                ("price_above" if is_buy else "price_below", take_profit),
+                ("price_below" if is_buy else "price_above", stop_loss),
+            ):
+                legs.append(self.engine.arm(TriggerCondition(
+                    trigger_id=self.engine.new_id(),
+                    stock_code=entry.stock_code,
+                    condition=condition_name,
+                    trigger_price=price,
+                    order_request=self._order_request(exit_args, entry.quantity),
+                    is_buy=not is_buy,
+                    oco_group=group
+                )))
+            warning = await self._ensure_streaming(entry.stock_code)
+
+            message = f"브래킷 주문이 등록되었습니다. (진입 주문번호: {response.order_number or 'N/A'})\n\n"
+            message += f"🎯 익절: {take_profit:,}원 / 🛑 손절: {stop_loss:,}원 (OCO 그룹 {group})\n\n"
+            message += "\n".join(self._format_condition(leg) for leg in legs)
+            if warning:
+                message += f"\n⚠️ {warning}"
+            return self.create_success_response(message)
+
+        except (OrderError, AuthenticationError) as e:
+            return self.create_error_response(f"진입 주문 오류: {str(e)}")
+        except Exception as e:
+            self.logger.error("Failed to arm bracket order: %s", e)
+            return self.create_error_response(f"브래킷 주문 실패: {str(e)}")
+
+    async def list_triggers(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        """List armed (and optionally finished) conditions"""
+        try:
+            conditions = self.engine.list(arguments.get("include_inactive", False))
+            if not conditions:
+                return self.create_info_response("등록된 조건이 없습니다.")
+
+            message = f"조건 목록 ({len(conditions)}건):\n\n"
+            message += "\n".join(self._format_condition(c) for c in conditions)
+            return self.create_info_response(message)
+
+        except Exception as e:
+            self.logger.error("Failed to list triggers: %s", e)
+            return self.create_error_response(f"조건 조회 실패: {str(e)}")
+
+    async def cancel_trigger(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        """Disarm a condition"""
+        try:
+            condition = self.engine.cancel(arguments["trigger_id"])
+            if condition is None:
+                return self.create_error_response(f"조건을 찾을 수 없습니다: {arguments['trigger_id']}")
+
+            if self.realtime and condition.stock_code not in self.engine.armed_symbols():
+                await self.realtime.unsubscribe([condition.stock_code], REALTIME_TYPES["TRADE"])
+
+            return self.create_success_response("조건이 해제되었습니다.\n\n" + self._format_condition(condition))
+
+        except Exception as e:
+            self.logger.error("Failed to cancel trigger: %s", e)
+            return self.create_error_response(f"조건 해제 실패: {str(e)}")
+
+    async def _ensure_streaming(self, stock_code: str) -> Optional[str]:
+        """Subscribe to trades for the symbol; returns a warning if prices won't stream"""
+        if not self.realtime or not self.realtime.available:
+            return "실시간 시세 연결을 사용할 수 없습니다 (websockets 미설치). 조건이 평가되지 않습니다."
+        await self.realtime.subscribe([stock_code], REALTIME_TYPES["TRADE"])
+        if not self.realtime.connected:
+            return "실시간 시세가 아직 연결되지 않았습니다. 연결 후 자동 등록됩니다."
+        return None
+
+    def _order_request(self, arguments: Dict[str, Any], quantity: int) -> OrderRequest:
+        """Build the order sent when a condition fires"""
+        return OrderRequest(
+            stock_code=arguments["stock_code"],
+            quantity=quantity,
+            price=arguments.get("price", ""),
+            trade_type=arguments.get("trade_type", "시장가"),
+            exchange=arguments.get("exchange", "KRX")
+        )
+
+    def _format_condition(self, condition: TriggerCondition) -> str:
+        """Format a condition summary line"""
+        line = f"- [{condition.trigger_id}] {condition.stock_code} {TRIGGER_CONDITIONS[condition.condition]}"
+        if condition.trigger_price:
+            line += f" {condition.trigger_price:,}원"
+        if condition.trail_amount:
+            line += f" (추적폭 {condition.trail_amount:,}원)"
+        if condition.trail_percent:
+            line += f" (추적폭 {condition.trail_percent}%)"
+        if condition.order_request:
+            line += f" → {'매수' if condition.is_buy else '매도'} {condition.order_request.quantity:,}주"
+            line += f" {condition.order_request.trade_type}"
+        else:
+            line += " → 알림"
+        line += f" [{condition.status}]"
+        if condition.fired_at:
+            fired = datetime.fromtimestamp(condition.fired_at).strftime("%H:%M:%S")
+            line += f" {fired} @ {condition.fire_price:,}원"
+        if condition.result:
+            line += f" - {condition.result}"
+        return line
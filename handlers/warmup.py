@@ -0,0 +1,87 @@
+"""
+Warmup handler for running and inspecting the pre-market warmup
+"""
+
+from datetime import datetime
+from typing import List, Dict, Any
+
+import mcp.types as types
+
+from handlers.base import BaseHandler
+from config.constants import WARMUP_STEPS
+from engine.warmup import WarmupReport, WarmupScheduler, STEP_OK, STEP_SKIPPED
+
+
+STEP_ICONS = {STEP_OK: "✅", STEP_SKIPPED: "⏭️"}
+STEP_NAMES = {
+    "token": "토큰",
+    "connections": "연결 풀",
+    "holdings": "보유잔고",
+    "symbols": "종목 마스터",
+    "limits": "가격제한폭",
+    "health": "상태 점검",
+}
+
+
+def format_report(report: WarmupReport) -> str:
+    """Render a warmup report, one line per step"""
+    started = datetime.fromtimestamp(report.started_at).strftime("%Y-%m-%d %H:%M:%S")
+    trigger = "예약" if report.trigger == "scheduled" else "수동"
+    lines = [f"{started} ({trigger}, {report.elapsed_ms:.0f}ms)"]
+    for step in report.steps:
+        icon = STEP_ICONS.get(step.status, "❌")
+        lines.append(f"{icon} {STEP_NAMES.get(step.name, step.name)} ({step.elapsed_ms:.0f}ms): {step.detail}")
+    return "\n".join(lines)
+
+
+class WarmupHandler(BaseHandler):
+    """Handle warmup runs and status"""
+
+    def __init__(self, scheduler: WarmupScheduler):
+        super().__init__()
+        self.scheduler = scheduler
+
+    async def run_warmup(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        """Run the warmup now (all steps or the selected ones)"""
+        try:
+            steps = arguments.get("steps")
+            if steps:
+                unknown = [step for step in steps if step not in WARMUP_STEPS]
+                if unknown:
+                    return self.create_error_response(
+                        f"알 수 없는 단계입니다: {', '.join(unknown)} (사용 가능: {', '.join(WARMUP_STEPS)})"
+                    )
+
+            report = await self.scheduler.run("manual", steps or None)
+            message = f"🔥 장전 준비 {'완료' if report.ok else '일부 실패'}\n\n{format_report(report)}"
+            if report.ok:
+                return self.create_success_response(message)
+            return self.create_warning_response(message)
+
+        except Exception as e:
+            self.logger.error("Failed to run warmup: %s", e)
+            return self.create_error_response(f"장전 준비 실행 실패: {str(e)}")
+
+    async def get_warmup_status(self) -> List[types.TextContent]:
+        """Show the schedule, the last warmup and preloaded reference data"""
+        try:
+            scheduler = self.scheduler
+            next_at = scheduler.next_run()
+            message = "🔥 장전 준비 상태\n\n"
+            message += f"- 예약: {next_at.strftime('%Y-%m-%d %H:%M') if next_at else '꺼짐 (KIWOOM_WARMUP_TIME)'}\n"
+
+            counts = scheduler.reference_summary()
+            message += (
+                f"- 캐시: 종목 마스터 {counts['symbols']:,}, 가격제한폭 {counts['limits']:,}, "
+                f"보유잔고 {counts['holdings']:,}\n\n"
+            )
+
+            if scheduler.last_report is None:
+                message += "실행 기록이 없습니다. run_warmup으로 바로 실행할 수 있습니다."
+            else:
+                message += "최근 실행:\n" + format_report(scheduler.last_report)
+            return self.create_info_response(message)
+
+        except Exception as e:
+            self.logger.error("Failed to get warmup status: %s", e)
+            return self.create_error_response(f"장전 준비 상태 조회 실패: {str(e)}")
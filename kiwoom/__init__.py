@@ -1,5 +1,19 @@
 """Kiwoom API client package"""
 
-from kiwoom.client import KiwoomAPIClient
+from kiwoom.client import KiwoomAPIClient, create_client
+from kiwoom.paper import PaperBroker, PaperTradingClient
+from kiwoom.realtime import KiwoomRealtimeClient
+from kiwoom.token_cache import TokenCache
+from kiwoom.transport import HttpTransport, RecordingTransport, ReplayTransport
 
-__all__ = ["KiwoomAPIClient"] 
\ No newline at end of file
+__all__ = [
+    "KiwoomAPIClient",
+    "create_client",
+    "PaperBroker",
+    "PaperTradingClient",
+    "KiwoomRealtimeClient",
+    "TokenCache",
+    "HttpTransport",
+    "RecordingTransport",
+    "ReplayTransport",
+] 
\ No newline at end of file
@@ -4,20 +4,35 @@ Kiwoom API Client
 
 import requests
 import logging
+import time
 from typing import Dict, Any, Optional
 
-from config.constants import KIWOOM_REAL_HOST, KIWOOM_MOCK_HOST, ENDPOINTS, API_IDS
-from models.types import TokenRequest, TokenResponse, OrderRequest, OrderResponse
+from config.settings import KiwoomConfig
+from config.constants import KIWOOM_REAL_HOST, KIWOOM_MOCK_HOST, ENDPOINTS, API_IDS, MAX_CONTINUATION_PAGES
+from models.types import (
+    TokenRequest, TokenResponse, OrderRequest, OrderResponse,
+    OrderHistoryItem, OrderHistoryResponse,
+    SymbolInfo, StockInfo, HoldingItem, ReferenceResponse
+)
 from models.exceptions import KiwoomAPIError, AuthenticationError, OrderError
+from kiwoom.transport import HttpTransport, get_transport
+from kiwoom.paper import PaperTradingClient, get_paper_broker
+from utils.logging import elapsed_ms
+from utils.profiling import mark
 
 
 class KiwoomAPIClient:
     """Kiwoom API client"""
     
-    def __init__(self, is_mock: bool = False):
+    def __init__(self, is_mock: bool = False, transport=None):
         self.is_mock = is_mock
         self.base_url = KIWOOM_MOCK_HOST if is_mock else KIWOOM_REAL_HOST
+        self.transport = transport or HttpTransport()
         self.logger = logging.getLogger(__name__)
+    
+    def preconnect(self, count: int = 1) -> int:
+        """Open pooled connections to the API host ahead of the first request"""
+        return self.transport.preconnect(self.base_url, count)
         
     def _make_request(
         self, 
@@ -36,27 +51,33 @@ class KiwoomAPIClient:
         if headers:
             default_headers.update(headers)
         
-        self.logger.debug(f"Making {method} request to {url}")
+        api_id = default_headers.get("api-id")
+        self.logger.debug("Making %s request to %s", method, url, extra={"api_id": api_id})
         
+        started = time.perf_counter()
+        mark("build")
         try:
-            if method.upper() == "POST":
-                response = requests.post(url, headers=default_headers, json=data)
-            else:
-                response = requests.get(url, headers=default_headers, params=data)
-            
-            response_data = response.json()
+            status_code, response_data = self.transport.send(method, url, default_headers, data)
+            latency_ms = elapsed_ms(started)
+            self.logger.debug(
+                "%s %s -> %s in %.1fms", method, endpoint, status_code, latency_ms,
+                extra={"api_id": api_id, "latency_ms": latency_ms}
+            )
             
-            if response.status_code != 200:
+            if status_code != 200:
                 raise KiwoomAPIError(
-                    f"API request failed: {response.status_code}",
-                    status_code=response.status_code,
+                    f"API request failed: {status_code}",
+                    status_code=status_code,
                     response_data=response_data
                 )
             
             return response_data
             
         except requests.RequestException as e:
-            self.logger.error(f"Request error: {e}")
+            self.logger.error(
+                "Request error: %s", e,
+                extra={"api_id": api_id, "latency_ms": elapsed_ms(started)}
+            )
             raise KiwoomAPIError(f"Request failed: {str(e)}")
     
     def get_token(self, token_request: TokenRequest) -> TokenResponse:
@@ -84,7 +105,7 @@ class KiwoomAPIClient:
                 )
                 
         except Exception as e:
-            self.logger.error(f"Token request failed: {e}")
+            self.logger.error("Token request failed: %s", e)
             raise AuthenticationError(f"Token request failed: {str(e)}")
     
     def place_order(
@@ -96,9 +117,9 @@ class KiwoomAPIClient:
         trade_type_code: str
     ) -> OrderResponse:
         """Place stock order"""
+        api_id = API_IDS["BUY_ORDER"] if is_buy else API_IDS["SELL_ORDER"]
+        
         try:
-            api_id = API_IDS["BUY_ORDER"] if is_buy else API_IDS["SELL_ORDER"]
-            
             headers = {
                 "authorization": f"Bearer {access_token}",
                 "cont-yn": "N",
@@ -124,5 +145,157 @@ class KiwoomAPIClient:
             )
             
         except Exception as e:
-            self.logger.error(f"Order request failed: {e}")
-            raise OrderError(f"Order request failed: {str(e)}") 
\ No newline at end of file
+            self.logger.error("Order request failed: %s", e, extra={"api_id": api_id})
+            raise OrderError(
+                f"Order request failed: {str(e)}",
+                status_code=getattr(e, "status_code", None),
+                response_data=getattr(e, "response_data", None)
+            )
+    
+    def get_order_history(
+        self,
+        access_token: str,
+        order_date: str,
+        stock_code: str = "",
+        max_pages: int = MAX_CONTINUATION_PAGES
+    ) -> OrderHistoryResponse:
+        """Get account order history for a date, following continuation pages"""
+        try:
+            data = {
+                "ord_dt": order_date,
+                "qry_tp": "1",
+                "stk_bond_tp": "1",
+                "sell_tp": "0",
+                "stk_cd": stock_code,
+                "fr_ord_no": "",
+                "dmst_stex_tp": "%"
+            }
+            
+            items = []
+            next_key = ""
+            for _ in range(max_pages):
+                headers = {
+                    "authorization": f"Bearer {access_token}",
+                    "cont-yn": "Y" if next_key else "N",
+                    "next-key": next_key,
+                    "api-id": API_IDS["ORDER_HISTORY"]
+                }
+                response_data = self._make_request("POST", ENDPOINTS["ACCOUNT"], data, headers)
+                
+                if response_data.get("return_code", 0) != 0:
+                    return OrderHistoryResponse(
+                        success=False,
+                        items=[],
+                        message=response_data.get("return_msg", "Unknown error"),
+                        raw_response=response_data
+                    )
+                
+                items.extend(
+                    OrderHistoryItem.from_api_dict(item)
+                    for item in response_data.get("acnt_ord_cntr_prps_dtl", [])
+                )
+                next_key = response_data.get("next-key") or ""
+                if response_data.get("cont-yn") != "Y" or not next_key:
+                    return OrderHistoryResponse(
+                        success=True,
+                        items=items,
+                        message=response_data.get("return_msg")
+                    )
+            
+            self.logger.warning("Order history for %s truncated after %s pages", order_date, max_pages)
+            return OrderHistoryResponse(
+                success=True,
+                items=items,
+                message=response_data.get("return_msg"),
+                complete=False
+            )
+            
+        except KiwoomAPIError:
+            raise
+        except Exception as e:
+            self.logger.error("Order history request failed: %s", e)
+            raise KiwoomAPIError(f"Order history request failed: {str(e)}")
+
+    def _reference_query(
+        self,
+        access_token: str,
+        endpoint: str,
+        api_id: str,
+        data: Dict[str, Any],
+        parse,
+        max_pages: int = MAX_CONTINUATION_PAGES
+    ) -> ReferenceResponse:
+        """Run a read-only query, following continuation pages, and parse its items"""
+        try:
+            items = []
+            next_key = ""
+            for _ in range(max_pages):
+                headers = {
+                    "authorization": f"Bearer {access_token}",
+                    "cont-yn": "Y" if next_key else "N",
+                    "next-key": next_key,
+                    "api-id": api_id
+                }
+                response_data = self._make_request("POST", endpoint, data, headers)
+                
+                if response_data.get("return_code", 0) != 0:
+                    return ReferenceResponse(
+                        success=False,
+                        items=[],
+                        message=response_data.get("return_msg", "Unknown error"),
+                        raw_response=response_data
+                    )
+                
+                items.extend(parse(response_data))
+                next_key = response_data.get("next-key") or ""
+                if response_data.get("cont-yn") != "Y" or not next_key:
+                    return ReferenceResponse(
+                        success=True,
+                        items=items,
+                        message=response_data.get("return_msg")
+                    )
+            
+            self.logger.warning("%s truncated after %d pages", api_id, max_pages, extra={"api_id": api_id})
+            return ReferenceResponse(
+                success=True,
+                items=items,
+                message=response_data.get("return_msg"),
+                complete=False
+            )
+            
+        except KiwoomAPIError:
+            raise
+        except Exception as e:
+            self.logger.error("Reference request failed: %s", e, extra={"api_id": api_id})
+            raise KiwoomAPIError(f"Reference request failed: {str(e)}")
+    
+    def get_symbol_list(self, access_token: str, market_code: str) -> ReferenceResponse:
+        """Symbol master for a market (ka10099)"""
+        return self._reference_query(
+            access_token, ENDPOINTS["STOCK_INFO"], API_IDS["SYMBOL_LIST"], {"mrkt_tp": market_code},
+            lambda data: [SymbolInfo.from_api_dict(item) for item in data.get("list", [])]
+        )
+    
+    def get_stock_info(self, access_token: str, stock_code: str) -> ReferenceResponse:
+        """Base price and daily price limits for a stock (ka10001); items holds one StockInfo"""
+        return self._reference_query(
+            access_token, ENDPOINTS["STOCK_INFO"], API_IDS["STOCK_INFO"], {"stk_cd": stock_code},
+            lambda data: [StockInfo.from_api_dict(data)]
+        )
+    
+    def get_holdings(self, access_token: str) -> ReferenceResponse:
+        """Account holdings (kt00018)"""
+        return self._reference_query(
+            access_token, ENDPOINTS["ACCOUNT"], API_IDS["HOLDINGS"], {"qry_tp": "1", "dmst_stex_tp": "KRX"},
+            lambda data: [HoldingItem.from_api_dict(item) for item in data.get("acnt_evlt_remn_indv_tot", [])]
+        )
+
+
+def create_client(config: KiwoomConfig):
+    """Client for the configured backend: paper broker, or REST with live/recording/replay transport"""
+    if config.paper_trading:
+        return PaperTradingClient(get_paper_broker(config.paper_cash, config.paper_quote_depth))
+    return KiwoomAPIClient(
+        config.is_mock,
+        get_transport(config.record_path, config.replay_path, config.replay_speed)
+    )
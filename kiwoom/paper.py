@@ -0,0 +1,355 @@
+"""
+Local paper-trading broker with the same interface as KiwoomAPIClient
+"""
+
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config.constants import API_IDS
+from engine.order_book import (
+    OrderBook, BookOrder, Fill, FillLog, MARKET_CODES,
+    STATUS_CANCELLED, STATUS_OPEN, STATUS_REJECTED, STATUS_STOP
+)
+from engine.market_data import Quote
+from engine.sessions import KST
+from models.types import (
+    TokenRequest, TokenResponse, OrderRequest, OrderResponse,
+    OrderHistoryItem, OrderHistoryResponse, HoldingItem, ReferenceResponse
+)
+
+
+@dataclass(slots=True)
+class PaperPosition:
+    """Simulated holding"""
+    stock_code: str
+    quantity: int = 0
+    average_price: float = 0.0
+    realized_pnl: float = 0.0
+
+
+class PaperBroker:
+    """Simulated account and per-symbol order books
+
+    Orders match against the latest market data pushed with update_market()
+    (live ticks from the real-time cache, or bars from a backtest). Cash and
+    sellable quantity are reserved for open orders, so the account never
+    goes negative.
+    """
+
+    def __init__(
+        self,
+        initial_cash: int = 100_000_000,
+        quote_depth: Optional[int] = None,
+        quote_lookup: Optional[Callable[[str], Optional[Quote]]] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        self.initial_cash = initial_cash
+        self.quote_depth = quote_depth
+        self.quote_lookup = quote_lookup
+        self.clock = clock
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._fill_listeners: List[Callable[[List[Fill]], None]] = []
+        self._close_listeners: List[Callable[[BookOrder], None]] = []
+        self.reset(initial_cash)
+
+    def add_fill_listener(self, listener: Callable[[List[Fill]], None]) -> None:
+        """Register a callback invoked with new fills (may run on a worker thread)"""
+        self._fill_listeners.append(listener)
+
+    def add_close_listener(self, listener: Callable[[BookOrder], None]) -> None:
+        """Register a callback invoked when an order is cancelled with quantity left unfilled"""
+        self._close_listeners.append(listener)
+
+    def _notify_close(self, order: BookOrder) -> None:
+        for listener in self._close_listeners:
+            try:
+                listener(order)
+            except Exception as e:
+                self.logger.error("Close listener failed: %s", e)
+
+    def reset(self, initial_cash: Optional[int] = None) -> None:
+        """Clear orders, fills and positions"""
+        with self._lock:
+            if initial_cash is not None:
+                self.initial_cash = initial_cash
+            self.cash = self.initial_cash
+            self.reserved_cash = 0
+            self.positions: Dict[str, PaperPosition] = {}
+            self.reserved_quantity: Dict[str, int] = {}
+            self.orders: Dict[str, BookOrder] = {}
+            self.fills = FillLog()
+            self.books: Dict[str, OrderBook] = {}
+            self._order_seq = itertools.count(1)
+
+    def _book(self, stock_code: str) -> OrderBook:
+        book = self.books.get(stock_code)
+        if book is None:
+            book = self.books[stock_code] = OrderBook(stock_code, self.quote_depth)
+            book.clock = self.clock
+            if self.quote_lookup:
+                quote = self.quote_lookup(stock_code)
+                if quote:
+                    book.update(quote.price, quote.best_bid, quote.best_ask)
+        return book
+
+    def update_market(self, stock_code: str, price: int, best_bid: int = 0, best_ask: int = 0) -> List[Fill]:
+        """Apply a trade/quote and fill resting orders it reaches"""
+        with self._lock:
+            book = self._book(stock_code)
+            fills = book.update(price, best_bid, best_ask)
+            self._apply_fills(fills)
+            return fills
+
+    def on_tick(self, stock_code: str, price: int) -> None:
+        """Tick listener for MarketDataCache (quotes are read from quote_lookup)"""
+        if self.quote_lookup is None:
+            self.update_market(stock_code, price)
+            return
+        # Books created later start from the cached quote, so untouched symbols can be skipped
+        if stock_code not in self.books:
+            return
+        quote = self.quote_lookup(stock_code)
+        if quote:
+            self.update_market(stock_code, price, quote.best_bid, quote.best_ask)
+        else:
+            self.update_market(stock_code, price)
+
+    def place(self, order_request: OrderRequest, is_buy: bool, trade_type_code: str) -> BookOrder:
+        """Validate, reserve and execute an order"""
+        with self._lock:
+            order = BookOrder(
+                order_number=f"{next(self._order_seq):07d}",
+                stock_code=order_request.stock_code,
+                is_buy=is_buy,
+                quantity=int(order_request.quantity),
+                trade_type_code=trade_type_code,
+                price=int(float(order_request.price)) if order_request.price else 0,
+                stop_price=int(float(order_request.condition_price)) if order_request.condition_price else 0,
+                created_at=self.clock()
+            )
+            self.orders[order.order_number] = order
+            if order.quantity <= 0:
+                order.status, order.message = STATUS_REJECTED, "주문수량이 올바르지 않습니다"
+                return order
+
+            book = self._book(order.stock_code)
+            reserve_price = order.price if trade_type_code not in MARKET_CODES and order.price else (
+                book.limit_price(order) or book.best_ask or book.last_price
+            )
+            if is_buy:
+                needed = order.quantity * (reserve_price or 0)
+                if needed > self.cash - self.reserved_cash:
+                    order.status, order.message = STATUS_REJECTED, "주문가능금액이 부족합니다"
+                    return order
+            else:
+                held = self.positions.get(order.stock_code)
+                sellable = (held.quantity if held else 0) - self.reserved_quantity.get(order.stock_code, 0)
+                if order.quantity > sellable:
+                    order.status, order.message = STATUS_REJECTED, "매도가능수량이 부족합니다"
+                    return order
+
+            fills = book.submit(order)
+            self._apply_fills(fills)
+            if order.status in (STATUS_OPEN, STATUS_STOP):
+                self._reserve(order, reserve_price or order.price)
+            elif order.status == STATUS_CANCELLED:
+                # IOC/FOK and market remainders the book could not fill
+                self._notify_close(order)
+            return order
+
+    def cancel(self, order_number: str) -> Optional[BookOrder]:
+        """Cancel an open order and free its reservation"""
+        with self._lock:
+            order = self.orders.get(order_number)
+            if order and self._book(order.stock_code).cancel(order):
+                self._unreserve(order, order.remaining)
+                self._notify_close(order)
+            return order
+
+    def _reserve(self, order: BookOrder, price: int) -> None:
+        order.reserved_price = price
+        if order.is_buy:
+            self.reserved_cash += order.remaining * price
+        else:
+            self.reserved_quantity[order.stock_code] = self.reserved_quantity.get(order.stock_code, 0) + order.remaining
+
+    def _unreserve(self, order: BookOrder, quantity: int) -> None:
+        price = order.reserved_price
+        if price is None:
+            return
+        if order.is_buy:
+            self.reserved_cash -= quantity * price
+        else:
+            self.reserved_quantity[order.stock_code] -= quantity
+
+    def _apply_fills(self, fills: List[Fill]) -> None:
+        """Update cash, positions and reservations for executions"""
+        for fill in fills:
+            self.fills.append(fill)
+            order = self.orders[fill.order_number]
+            self._unreserve(order, fill.quantity)
+
+            position = self.positions.get(fill.stock_code)
+            if position is None:
+                position = self.positions[fill.stock_code] = PaperPosition(fill.stock_code)
+            if fill.is_buy:
+                self.cash -= fill.quantity * fill.price
+                total = position.quantity + fill.quantity
+                position.average_price = (
+                    position.average_price * position.quantity + fill.price * fill.quantity
+                ) / total
+                position.quantity = total
+            else:
+                self.cash += fill.quantity * fill.price
+                position.realized_pnl += (fill.price - position.average_price) * fill.quantity
+                position.quantity -= fill.quantity
+                if position.quantity == 0:
+                    position.average_price = 0.0
+
+        if fills:
+            for listener in self._fill_listeners:
+                try:
+                    listener(fills)
+                except Exception as e:
+                    self.logger.error("Fill listener failed: %s", e)
+
+    def equity(self) -> float:
+        """Cash plus holdings at last price"""
+        with self._lock:
+            value = self.cash
+            for position in self.positions.values():
+                book = self.books.get(position.stock_code)
+                price = book.last_price if book and book.last_price else position.average_price
+                value += position.quantity * price
+            return value
+
+    def positions_snapshot(self) -> List[PaperPosition]:
+        """Copies of the positions, taken under the lock"""
+        with self._lock:
+            return [replace(position) for position in self.positions.values()]
+
+    def open_orders(self) -> List[BookOrder]:
+        """Resting and pending stop orders, taken under the lock"""
+        with self._lock:
+            return [order for order in self.orders.values() if order.status in (STATUS_OPEN, STATUS_STOP)]
+
+    def holdings(self) -> List[HoldingItem]:
+        """Open positions with sellable quantity and last price, read under the lock"""
+        with self._lock:
+            return [
+                HoldingItem(
+                    stock_code=position.stock_code,
+                    name="",
+                    quantity=position.quantity,
+                    available_quantity=position.quantity - self.reserved_quantity.get(position.stock_code, 0),
+                    average_price=round(position.average_price),
+                    current_price=self.books[position.stock_code].last_price
+                    if position.stock_code in self.books else 0
+                )
+                for position in self.positions.values() if position.quantity
+            ]
+
+    def history(self, order_date: str, stock_code: str = "") -> List[BookOrder]:
+        """Orders placed on a date (YYYYMMDD), newest first"""
+        with self._lock:
+            orders = [
+                order for order in self.orders.values()
+                if datetime.fromtimestamp(order.created_at, KST).strftime("%Y%m%d") == order_date
+                and (not stock_code or order.stock_code == stock_code)
+                and order.status != STATUS_REJECTED
+            ]
+        return sorted(orders, key=lambda o: o.created_at, reverse=True)
+
+
+class PaperTradingClient:
+    """Drop-in replacement for KiwoomAPIClient backed by a PaperBroker"""
+
+    def __init__(self, broker: PaperBroker):
+        self.broker = broker
+        self.is_mock = True
+        self.logger = logging.getLogger(__name__)
+
+    def get_token(self, token_request: TokenRequest) -> TokenResponse:
+        """Issue a local token (no credentials are checked)"""
+        expires = datetime.now() + timedelta(days=1)
+        token = f"paper-{int(time.time())}"
+        return TokenResponse(
+            success=True,
+            token=token,
+            token_type="bearer",
+            expires_dt=expires.strftime("%Y%m%d%H%M%S"),
+            raw_response={"return_code": 0, "return_msg": "모의 브로커 토큰", "token": token}
+        )
+
+    def place_order(
+        self,
+        order_request: OrderRequest,
+        access_token: str,
+        is_buy: bool,
+        exchange_code: str,
+        trade_type_code: str
+    ) -> OrderResponse:
+        """Execute an order against the local books"""
+        order = self.broker.place(order_request, is_buy, trade_type_code)
+        raw = {
+            "api_id": API_IDS["BUY_ORDER"] if is_buy else API_IDS["SELL_ORDER"],
+            "ord_no": order.order_number,
+            "status": order.status,
+            "cntr_qty": order.filled_quantity,
+            "cntr_uv": round(order.average_price, 2),
+            "return_code": 1 if order.status == STATUS_REJECTED else 0,
+            "return_msg": order.message or "정상적으로 처리되었습니다",
+        }
+        if order.status == STATUS_REJECTED:
+            return OrderResponse(success=False, message=order.message, raw_response=raw, status_code=200)
+        return OrderResponse(
+            success=True,
+            order_number=order.order_number,
+            message=raw["return_msg"],
+            raw_response=raw,
+            status_code=200
+        )
+
+    def get_order_history(self, access_token: str, order_date: str, stock_code: str = "") -> OrderHistoryResponse:
+        """Orders placed on a date, in kt00007 form"""
+        items = [
+            OrderHistoryItem(
+                order_number=order.order_number,
+                stock_code=order.stock_code,
+                side="buy" if order.is_buy else "sell",
+                quantity=order.quantity,
+                price=str(order.price or ""),
+                filled_quantity=order.filled_quantity,
+                order_time=datetime.fromtimestamp(order.created_at, KST).strftime("%H%M%S")
+            )
+            for order in self.broker.history(order_date, stock_code)
+        ]
+        return OrderHistoryResponse(success=True, items=items, message="모의 브로커 주문내역")
+
+    def preconnect(self, count: int = 1) -> int:
+        """Nothing to connect for the local broker"""
+        return 0
+
+    def get_holdings(self, access_token: str) -> ReferenceResponse:
+        """Simulated positions, in kt00018 form"""
+        return ReferenceResponse(success=True, items=self.broker.holdings(), message="모의 브로커 잔고")
+
+
+_brokers: Dict[Tuple[int, Optional[int]], PaperBroker] = {}
+_brokers_lock = threading.Lock()
+
+
+def get_paper_broker(initial_cash: int = 100_000_000, quote_depth: Optional[int] = None) -> PaperBroker:
+    """Shared broker for the process"""
+    with _brokers_lock:
+        key = (initial_cash, quote_depth)
+        broker = _brokers.get(key)
+        if broker is None:
+            broker = _brokers[key] = PaperBroker(initial_cash, quote_depth)
+        return broker
@@ -0,0 +1,183 @@
+"""
+Kiwoom real-time WebSocket client
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from config.settings import KiwoomConfig
+from config.constants import KIWOOM_REAL_WS_HOST, KIWOOM_MOCK_WS_HOST, ENDPOINTS
+from utils import json_codec
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+
+RealListener = Callable[[str, str, Dict[str, str]], None]
+MessageListener = Callable[[Dict], None]
+ConnectListener = Callable[[], Awaitable[None]]
+
+
+class KiwoomRealtimeClient:
+    """Maintain the real-time connection and registered items"""
+
+    def __init__(self, config: KiwoomConfig, group_no: str = "1"):
+        self.config = config
+        self.group_no = group_no
+        self.logger = logging.getLogger(__name__)
+        self._real_listeners: List[RealListener] = []
+        self._message_listeners: Dict[str, List[MessageListener]] = {}
+        self._connect_listeners: List[ConnectListener] = []
+        self._subscriptions: Set[Tuple[str, str]] = set()
+        self._ws = None
+        self._task: Optional[asyncio.Task] = None
+        self._connected = asyncio.Event()
+
+    @property
+    def available(self) -> bool:
+        """Whether the websockets dependency is installed"""
+        return websockets is not None
+
+    @property
+    def connected(self) -> bool:
+        """Whether the socket is logged in"""
+        return self._connected.is_set()
+
+    @property
+    def url(self) -> str:
+        """WebSocket URL for the current mode"""
+        host = KIWOOM_MOCK_WS_HOST if self.config.is_mock else KIWOOM_REAL_WS_HOST
+        return host + ENDPOINTS["WEBSOCKET"]
+
+    def add_real_listener(self, listener: RealListener) -> None:
+        """Register a callback invoked with (type, item, values) for REAL data"""
+        self._real_listeners.append(listener)
+
+    def add_message_listener(self, trnm: str, listener: MessageListener) -> None:
+        """Register a callback for non-REAL messages with the given trnm"""
+        self._message_listeners.setdefault(trnm, []).append(listener)
+
+    def add_connect_listener(self, listener: ConnectListener) -> None:
+        """Register a coroutine run after each (re)login, outside the read loop"""
+        self._connect_listeners.append(listener)
+
+    async def start(self) -> None:
+        """Start the background connection task"""
+        if not self.available:
+            self.logger.warning("websockets is not installed; real-time data disabled")
+            return
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background connection task"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._connected.clear()
+
+    async def send(self, message: Dict) -> bool:
+        """Send a message if connected; returns False when offline"""
+        if not self._ws or not self.connected:
+            return False
+        await self._ws.send(json_codec.dumps(message))
+        return True
+
+    async def subscribe(self, codes: List[str], real_type: str) -> None:
+        """Register items for real-time data (re-sent on reconnect)"""
+        new = [code for code in codes if (code, real_type) not in self._subscriptions]
+        if not new:
+            return
+        self._subscriptions.update((code, real_type) for code in new)
+        await self.send(self._registration("REG", new, real_type))
+
+    async def unsubscribe(self, codes: List[str], real_type: str) -> None:
+        """Remove items from real-time data"""
+        removed = [code for code in codes if (code, real_type) in self._subscriptions]
+        if not removed:
+            return
+        self._subscriptions.difference_update((code, real_type) for code in removed)
+        await self.send(self._registration("REMOVE", removed, real_type))
+
+    def _registration(self, trnm: str, codes: List[str], real_type: str) -> Dict:
+        """Build a REG/REMOVE message"""
+        return {
+            "trnm": trnm,
+            "grp_no": self.group_no,
+            "refresh": "1",
+            "data": [{"item": codes, "type": [real_type]}]
+        }
+
+    async def _run(self) -> None:
+        """Connect, log in, register and read until cancelled"""
+        backoff = 1.0
+        while True:
+            if not self.config.access_token:
+                await asyncio.sleep(5)
+                continue
+            try:
+                async with websockets.connect(self.url, ping_interval=None) as ws:
+                    self._ws = ws
+                    await ws.send(json_codec.dumps({"trnm": "LOGIN", "token": self.config.access_token}))
+                    await self._read(ws)
+                backoff = 1.0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.warning("Real-time connection lost: %s; reconnecting in %.0fs", e, backoff)
+            finally:
+                self._ws = None
+                self._connected.clear()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60.0)
+
+    async def _read(self, ws) -> None:
+        """Dispatch incoming messages"""
+        async for raw in ws:
+            message = json_codec.loads(raw)
+            trnm = message.get("trnm")
+
+            if trnm == "REAL":
+                for data in message.get("data", []):
+                    for listener in self._real_listeners:
+                        try:
+                            listener(data.get("type", ""), data.get("item", ""), data.get("values", {}))
+                        except Exception as e:
+                            self.logger.error("Real-time listener failed: %s", e)
+            elif trnm == "PING":
+                await ws.send(raw)
+            elif trnm == "LOGIN":
+                if message.get("return_code") != 0:
+                    raise ConnectionError(f"Real-time login failed: {message.get('return_msg')}")
+                self._connected.set()
+                self.logger.info("Real-time channel connected")
+                await self._resubscribe()
+                for listener in self._connect_listeners:
+                    # A listener may await replies that only this loop can read
+                    task = asyncio.create_task(listener())
+                    task.add_done_callback(self._log_listener_error)
+            else:
+                for listener in self._message_listeners.get(trnm, []):
+                    try:
+                        listener(message)
+                    except Exception as e:
+                        self.logger.error("Real-time %s listener failed: %s", trnm, e)
+
+    def _log_listener_error(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception():
+            self.logger.error("Real-time connect listener failed: %s", task.exception())
+
+    async def _resubscribe(self) -> None:
+        """Re-register all items after (re)connecting"""
+        by_type: Dict[str, List[str]] = {}
+        for code, real_type in self._subscriptions:
+            by_type.setdefault(real_type, []).append(code)
+        for real_type, codes in by_type.items():
+            await self.send(self._registration("REG", codes, real_type))
@@ -0,0 +1,185 @@
+"""
+Persistent access token cache shared across server processes
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from models.types import TokenResponse
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@dataclass
+class CachedToken:
+    """Token entry stored in the cache file"""
+    token: str
+    expires_dt: str
+    token_type: Optional[str] = None
+
+    def is_valid(self, margin_sec: int) -> bool:
+        """Check the token is not expired or about to expire"""
+        try:
+            expire_dt = datetime.strptime(self.expires_dt, "%Y%m%d%H%M%S")
+        except (ValueError, TypeError):
+            return False
+        return datetime.now() + timedelta(seconds=margin_sec) < expire_dt
+
+    def to_response(self) -> TokenResponse:
+        """Convert to a token response"""
+        return TokenResponse(
+            success=True,
+            token=self.token,
+            token_type=self.token_type,
+            expires_dt=self.expires_dt,
+            message="cached"
+        )
+
+
+class TokenCache:
+    """File-locked token cache keyed by appkey and mock flag"""
+
+    def __init__(self, path: str, refresh_margin_sec: int = 300):
+        self.path = os.path.expanduser(path)
+        self.lock_path = self.path + ".lock"
+        self.refresh_margin_sec = refresh_margin_sec
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def cache_key(appkey: str, is_mock: bool) -> str:
+        """Cache key that does not reveal the appkey"""
+        digest = hashlib.sha256(appkey.encode("utf-8")).hexdigest()[:32]
+        return f"{digest}:{'mock' if is_mock else 'real'}"
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold an exclusive inter-process lock on the cache"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            os.close(fd)
+
+    def _read(self) -> Dict[str, Dict[str, str]]:
+        """Read all entries (caller holds the lock)"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (ValueError, OSError) as e:
+            self.logger.warning("Ignoring unreadable token cache %s: %s", self.path, e)
+            return {}
+        if not isinstance(entries, dict):
+            self.logger.warning("Ignoring token cache %s: not a JSON object", self.path)
+            return {}
+        return entries
+
+    def _write(self, entries: Dict[str, Dict[str, str]]) -> None:
+        """Atomically replace the cache file with owner-only permissions"""
+        directory = os.path.dirname(self.path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".token_cache.")
+        try:
+            os.chmod(tmp_path, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    @staticmethod
+    def _parse(data) -> Optional[CachedToken]:
+        """Entry as a CachedToken, or None when malformed or from another schema"""
+        try:
+            return CachedToken(**data)
+        except (TypeError, ValueError):
+            return None
+
+    def _valid_entry(
+        self,
+        entries: Dict[str, Dict[str, str]],
+        key: str,
+        min_valid_sec: float = 0
+    ) -> Optional[CachedToken]:
+        """Return the entry for key if it stays usable for at least `min_valid_sec`"""
+        cached = self._parse(entries.get(key) or {})
+        return cached if cached and cached.is_valid(max(self.refresh_margin_sec, min_valid_sec)) else None
+
+    def load(self, appkey: str, is_mock: bool) -> Optional[CachedToken]:
+        """Get a still-valid cached token"""
+        with self._locked():
+            return self._valid_entry(self._read(), self.cache_key(appkey, is_mock))
+
+    def store(self, appkey: str, is_mock: bool, response: TokenResponse) -> None:
+        """Store an issued token"""
+        with self._locked():
+            self._store_locked(appkey, is_mock, response)
+
+    def _store_locked(self, appkey: str, is_mock: bool, response: TokenResponse) -> None:
+        """Store an issued token (caller holds the lock)"""
+        entries = self._read()
+        entries[self.cache_key(appkey, is_mock)] = asdict(CachedToken(
+            token=response.token,
+            expires_dt=response.expires_dt,
+            token_type=response.token_type
+        ))
+        # Drop entries other processes left behind after expiry, and ones that do not parse
+        entries = {
+            k: v for k, v in entries.items()
+            if (cached := self._parse(v)) is not None and cached.is_valid(0)
+        }
+        self._write(entries)
+
+    def get_or_issue(
+        self,
+        appkey: str,
+        is_mock: bool,
+        issue: Callable[[], TokenResponse],
+        force_refresh: bool = False,
+        min_valid_sec: float = 0
+    ) -> Tuple[TokenResponse, bool]:
+        """Reuse a cached token or issue one while holding the lock
+
+        Processes racing for a refresh serialize on the lock, so only the
+        first one calls issue() and the rest pick up its token. A cached
+        token must stay valid for `min_valid_sec` to be reused.
+        Returns (response, from_cache).
+        """
+        key = self.cache_key(appkey, is_mock)
+        with self._locked():
+            if not force_refresh:
+                cached = self._valid_entry(self._read(), key, min_valid_sec)
+                if cached:
+                    return cached.to_response(), True
+
+            response = issue()
+            if response.success and response.token and response.expires_dt:
+                self._store_locked(appkey, is_mock, response)
+            return response, False
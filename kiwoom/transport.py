@@ -0,0 +1,241 @@
+"""
+Pluggable HTTP transports for the Kiwoom REST client: live, recording and replay
+"""
+
+import gzip
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+import requests.adapters
+
+from models.exceptions import KiwoomAPIError
+from utils import json_codec
+from utils.profiling import mark
+
+
+# Header and body keys whose values never reach a session file
+REDACTED_KEYS = {"authorization", "appkey", "secretkey", "token"}
+REDACTED = "***"
+
+# Response headers of paged queries, copied into response_data so recordings keep them
+CONTINUATION_HEADERS = ("cont-yn", "next-key")
+
+# (status_code, response_data)
+TransportResult = Tuple[int, Dict[str, Any]]
+
+
+def redact(data: Any) -> Any:
+    """Copy of headers/bodies with secret values masked"""
+    if isinstance(data, dict):
+        return {
+            key: REDACTED if key.lower() in REDACTED_KEYS and value else redact(value)
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [redact(item) for item in data]
+    return data
+
+
+def _open_session(path: str, mode: str):
+    """Open a session file, gzip-compressed when the name ends in .gz"""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class HttpTransport:
+    """Send requests to the Kiwoom REST API over pooled keep-alive connections"""
+
+    def __init__(self, pool_size: int = 8):
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def preconnect(self, base_url: str, count: int = 1) -> int:
+        """Open up to `count` pooled connections (DNS, TCP and TLS done now); returns how many answered"""
+        def probe(_: int) -> bool:
+            try:
+                self.session.head(base_url, timeout=10)
+                return True
+            except requests.RequestException:
+                return False
+
+        # Concurrent probes so each one checks out (and then returns) its own connection
+        with ThreadPoolExecutor(max_workers=max(count, 1), thread_name_prefix="preconnect") as pool:
+            return sum(pool.map(probe, range(max(count, 1))))
+
+    def send(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        data: Optional[Dict[str, Any]]
+    ) -> TransportResult:
+        """Send a request; raises requests.RequestException on network errors"""
+        sent = time.perf_counter()
+        if method.upper() == "POST":
+            response = self.session.post(url, headers=headers, json=data)
+        else:
+            response = self.session.get(url, headers=headers, params=data)
+        # requests times connect + send + wait for headers; the rest is reading the body
+        mark("upstream", sent + response.elapsed.total_seconds())
+        mark("download")
+        decoded = json_codec.loads(response.content)
+        mark("decode")
+        if isinstance(decoded, dict):
+            for header in CONTINUATION_HEADERS:
+                if header in response.headers:
+                    decoded[header] = response.headers[header]
+        return response.status_code, decoded
+
+
+class RecordingTransport:
+    """Pass requests through to another transport and append them to a session file
+
+    Each line is one exchange: offset from session start, method, endpoint,
+    api-id, redacted headers and bodies, status and latency.
+    """
+
+    def __init__(self, path: str, inner: Optional[HttpTransport] = None):
+        self.path = os.path.expanduser(path)
+        self.inner = inner or HttpTransport()
+        self._lock = threading.Lock()
+        self._started = time.time()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = _open_session(self.path, "a")
+
+    def send(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        data: Optional[Dict[str, Any]]
+    ) -> TransportResult:
+        """Send through the inner transport and record the exchange"""
+        sent_at = time.time()
+        started = time.perf_counter()
+        status_code, response_data = self.inner.send(method, url, headers, data)
+        latency = time.perf_counter() - started
+
+        record = {
+            "t": round(sent_at - self._started, 6),
+            "method": method.upper(),
+            "endpoint": urlsplit(url).path,
+            "api_id": headers.get("api-id"),
+            "headers": redact(headers),
+            "request": redact(data),
+            "status": status_code,
+            "response": redact(response_data),
+            "latency": round(latency, 6),
+        }
+        line = json_codec.dumps(record)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+        return status_code, response_data
+
+    def preconnect(self, base_url: str, count: int = 1) -> int:
+        """Warm the inner transport's connections (not recorded)"""
+        return self.inner.preconnect(base_url, count)
+
+    def close(self) -> None:
+        """Close the session file"""
+        with self._lock:
+            self._file.close()
+
+
+class ReplayTransport:
+    """Serve recorded responses without touching the network
+
+    Responses are matched by (method, endpoint, api-id) and served in
+    recorded order, so a replay is deterministic. Each response is delayed
+    by its recorded latency divided by `speed` (0 disables delays). With
+    `loop`, a key's responses start over when exhausted, for load tests.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0, loop: bool = True):
+        self.path = os.path.expanduser(path)
+        self.speed = speed
+        self.loop = loop
+        self._lock = threading.Lock()
+        self._records: Dict[Tuple[str, str, Optional[str]], List[Dict[str, Any]]] = {}
+        self._queues: Dict[Tuple[str, str, Optional[str]], Deque[Dict[str, Any]]] = {}
+
+        with _open_session(self.path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json_codec.loads(line)
+                key = (record["method"], record["endpoint"], record.get("api_id"))
+                self._records.setdefault(key, []).append(record)
+        self._queues = {key: deque(records) for key, records in self._records.items()}
+
+    def __len__(self) -> int:
+        return sum(len(records) for records in self._records.values())
+
+    def send(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        data: Optional[Dict[str, Any]]
+    ) -> TransportResult:
+        """Return the next recorded response for the request's key"""
+        key = (method.upper(), urlsplit(url).path, headers.get("api-id"))
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue and self.loop and key in self._records:
+                queue = self._queues[key] = deque(self._records[key])
+            if not queue:
+                raise KiwoomAPIError(f"No recorded response for {key[0]} {key[1]} ({key[2]})")
+            record = queue.popleft()
+
+        if self.speed > 0:
+            time.sleep(record["latency"] / self.speed)
+        return record["status"], record["response"]
+
+    def preconnect(self, base_url: str, count: int = 1) -> int:
+        """Nothing to connect during replay"""
+        return 0
+
+
+_transports: Dict[Tuple[str, str], Any] = {}
+_transports_lock = threading.Lock()
+
+
+def get_transport(
+    record_path: Optional[str] = None,
+    replay_path: Optional[str] = None,
+    replay_speed: float = 1.0
+):
+    """Shared transport for the configured mode (replay takes precedence over record)"""
+    if replay_path:
+        key = ("replay", replay_path)
+    elif record_path:
+        key = ("record", record_path)
+    else:
+        key = ("http", "")
+
+    with _transports_lock:
+        transport = _transports.get(key)
+        if transport is None:
+            if key[0] == "replay":
+                transport = ReplayTransport(replay_path, replay_speed)
+            elif key[0] == "record":
+                transport = RecordingTransport(record_path)
+            else:
+                transport = HttpTransport()
+            _transports[key] = transport
+        elif key[0] == "replay":
+            transport.speed = replay_speed
+        return transport
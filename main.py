@@ -5,7 +5,7 @@ Kiwoom MCP Server - Entry Point
 
 import asyncio
 from server import KiwoomMCPServer
-from config.settings import KiwoomConfig, ServerConfig
+from config.settings import KiwoomConfig, ServerConfig, RiskConfig
 
 
 async def main():
@@ -13,9 +13,10 @@ async def main():
     # Load configuration from environment or use defaults
     kiwoom_config = KiwoomConfig.from_env()
     server_config = ServerConfig.from_env()
+    risk_config = RiskConfig.from_env()
     
     # Create and run server
-    server = KiwoomMCPServer(kiwoom_config, server_config)
+    server = KiwoomMCPServer(kiwoom_config, server_config, risk_config)
     await server.run()
 
 
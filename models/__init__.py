@@ -1,13 +1,25 @@
 """Data models for Kiwoom MCP Server"""
 
-from models.types import OrderRequest, OrderResponse, TokenResponse
-from models.exceptions import KiwoomAPIError, AuthenticationError, OrderError
+from models.types import (
+    OrderRequest, OrderResponse, TokenResponse, OrderHistoryItem, OrderHistoryResponse,
+    SymbolInfo, StockInfo, HoldingItem, ReferenceResponse
+)
+from models.exceptions import KiwoomAPIError, AuthenticationError, OrderError, RiskLimitError, MarketClosedError, OverloadError
 
 __all__ = [
     "OrderRequest",
     "OrderResponse", 
     "TokenResponse",
+    "OrderHistoryItem",
+    "OrderHistoryResponse",
+    "SymbolInfo",
+    "StockInfo",
+    "HoldingItem",
+    "ReferenceResponse",
     "KiwoomAPIError",
     "AuthenticationError",
-    "OrderError"
+    "OrderError",
+    "RiskLimitError",
+    "MarketClosedError",
+    "OverloadError"
 ] 
\ No newline at end of file
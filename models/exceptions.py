@@ -22,6 +22,11 @@ class OrderError(KiwoomAPIError):
     pass
 
 
+class RiskLimitError(OrderError):
+    """Order rejected by the pre-trade risk gate"""
+    pass
+
+
 class ConfigurationError(Exception):
     """Configuration related errors"""
     pass
@@ -29,4 +34,19 @@ class ConfigurationError(Exception):
 
 class TokenExpiredError(AuthenticationError):
     """Token expired error"""
-    pass 
\ No newline at end of file
+    pass 
+
+class MarketClosedError(OrderError):
+    """Order rejected locally because no session accepts it now"""
+    
+    def __init__(self, message: str, next_open=None):
+        super().__init__(message)
+        self.next_open = next_open
+
+
+class OverloadError(Exception):
+    """Tool call shed by admission control"""
+    
+    def __init__(self, message: str, reason: str):
+        super().__init__(message)
+        self.reason = reason
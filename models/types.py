@@ -1,12 +1,16 @@
 """
 Data types and models for Kiwoom API
+
+Models are slotted: one is built per request, response or history row, so
+they skip the per-instance __dict__. They are not frozen because a frozen
+__init__ costs about three times as much per instance.
 """
 
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 
-@dataclass
+@dataclass(slots=True)
 class OrderRequest:
     """Stock order request model"""
     stock_code: str
@@ -28,7 +32,7 @@ class OrderRequest:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class OrderResponse:
     """Stock order response model"""
     success: bool
@@ -36,9 +40,11 @@ class OrderResponse:
     message: Optional[str] = None
     raw_response: Optional[Dict[str, Any]] = None
     status_code: Optional[int] = None
+    # Routing decision for orders sent with exchange AUTO
+    route: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class TokenRequest:
     """Token request model"""
     appkey: str
@@ -54,7 +60,7 @@ class TokenRequest:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class TokenResponse:
     """Token response model"""
     success: bool
@@ -62,4 +68,128 @@ class TokenResponse:
     token_type: Optional[str] = None
     expires_dt: Optional[str] = None
     message: Optional[str] = None
-    raw_response: Optional[Dict[str, Any]] = None 
\ No newline at end of file
+    raw_response: Optional[Dict[str, Any]] = None
+
+
+@dataclass(slots=True)
+class OrderHistoryItem:
+    """Single order from account order history (kt00007)"""
+    order_number: str
+    stock_code: str
+    side: str
+    quantity: int
+    price: str
+    filled_quantity: int
+    order_time: str
+    
+    @classmethod
+    def from_api_dict(cls, data: Dict[str, Any]) -> "OrderHistoryItem":
+        """Create from API response item"""
+        return cls(
+            order_number=data.get("ord_no", ""),
+            stock_code=data.get("stk_cd", "").lstrip("A"),
+            side="buy" if "매수" in data.get("io_tp_nm", "") else "sell",
+            quantity=int(data.get("ord_qty") or 0),
+            price=data.get("ord_uv", ""),
+            filled_quantity=int(data.get("cntr_qty") or 0),
+            order_time=data.get("ord_tm", "").replace(":", "")
+        )
+
+
+@dataclass(slots=True)
+class OrderHistoryResponse:
+    """Account order history response model (raw_response is kept on failure only)"""
+    success: bool
+    items: List[OrderHistoryItem]
+    message: Optional[str] = None
+    raw_response: Optional[Dict[str, Any]] = None
+    # False when continuation pages were left unread
+    complete: bool = True
+
+
+def _unsigned(value: Any) -> int:
+    """Parse a Kiwoom numeric field such as '+60700', '-1200' or '000000000003'"""
+    if not value:
+        return 0
+    try:
+        return abs(int(value))
+    except ValueError:
+        return abs(int(float(value)))
+
+
+@dataclass(slots=True)
+class SymbolInfo:
+    """Symbol master entry (ka10099)"""
+    stock_code: str
+    name: str
+    market: str
+    last_price: int = 0
+    nxt_enabled: bool = False
+    
+    @classmethod
+    def from_api_dict(cls, data: Dict[str, Any]) -> "SymbolInfo":
+        """Create from API response item"""
+        return cls(
+            stock_code=data.get("code", "").lstrip("A"),
+            name=data.get("name", ""),
+            market=data.get("marketName", ""),
+            last_price=_unsigned(data.get("lastPrice")),
+            nxt_enabled=data.get("nxtEnable") == "Y"
+        )
+
+
+@dataclass(slots=True)
+class StockInfo:
+    """Basic stock information with daily price limits (ka10001)"""
+    stock_code: str
+    name: str
+    base_price: int
+    upper_limit: int
+    lower_limit: int
+    current_price: int = 0
+    
+    @classmethod
+    def from_api_dict(cls, data: Dict[str, Any]) -> "StockInfo":
+        """Create from API response"""
+        return cls(
+            stock_code=data.get("stk_cd", "").lstrip("A"),
+            name=data.get("stk_nm", ""),
+            base_price=_unsigned(data.get("base_pric")),
+            upper_limit=_unsigned(data.get("upl_pric")),
+            lower_limit=_unsigned(data.get("lst_pric")),
+            current_price=_unsigned(data.get("cur_prc"))
+        )
+
+
+@dataclass(slots=True)
+class HoldingItem:
+    """Single holding from the account evaluation (kt00018)"""
+    stock_code: str
+    name: str
+    quantity: int
+    available_quantity: int
+    average_price: int
+    current_price: int
+    
+    @classmethod
+    def from_api_dict(cls, data: Dict[str, Any]) -> "HoldingItem":
+        """Create from API response item"""
+        return cls(
+            stock_code=data.get("stk_cd", "").lstrip("A"),
+            name=data.get("stk_nm", ""),
+            quantity=_unsigned(data.get("rmnd_qty")),
+            available_quantity=_unsigned(data.get("trde_able_qty")),
+            average_price=_unsigned(data.get("pur_pric")),
+            current_price=_unsigned(data.get("cur_prc"))
+        )
+
+
+@dataclass(slots=True)
+class ReferenceResponse:
+    """Symbol list, stock info or holdings response (raw_response is kept on failure only)"""
+    success: bool
+    items: List[Any]
+    message: Optional[str] = None
+    raw_response: Optional[Dict[str, Any]] = None
+    # False when continuation pages were left unread
+    complete: bool = True
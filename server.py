@@ -2,37 +2,229 @@
 Main MCP Server for Kiwoom Securities API
 """
 
+import asyncio
+import time
 from typing import List, Dict, Any
 
-from mcp.server import Server
+from mcp.server import Server, NotificationOptions
 from mcp.server.models import InitializationOptions
 import mcp.server.stdio
 import mcp.types as types
 
-from config.settings import KiwoomConfig, ServerConfig
-from config.constants import TRADE_TYPES, EXCHANGE_TYPES
+from config.settings import KiwoomConfig, ServerConfig, RiskConfig
+from config.constants import (
+    TRADE_TYPES, EXCHANGE_TYPES, ALGO_TYPES, TRIGGER_CONDITIONS, CACHEABLE_TOOLS, CACHE_INVALIDATIONS,
+    SESSION_POLICIES, ADMISSION_EXEMPT_TOOLS, REALTIME_TYPES, TICK_INVALIDATIONS, FILL_INVALIDATIONS,
+    ORDER_INVALIDATIONS
+)
+from engine.algo import AlgoEngine
+from engine.conditions import ConditionSearchEngine
+from engine.executor import AnalyticsExecutor
+from engine.history import HistoryStore
+from engine.journal import OrderJournal
+from engine.market_data import MarketDataCache
+from engine.reference import ReferenceDataCache
+from engine.router import SmartOrderRouter
+from engine.sessions import MarketCalendar
+from engine.risk import RiskGate
+from engine.triggers import TriggerEngine
+from engine.warmup import WarmupScheduler
+from kiwoom.realtime import KiwoomRealtimeClient
+from kiwoom.token_cache import TokenCache
+from kiwoom.paper import get_paper_broker
 from handlers.auth import AuthHandler
 from handlers.orders import OrderHandler
-from utils.logging import setup_logging
+from handlers.algo import AlgoHandler
+from handlers.journal import JournalHandler
+from handlers.triggers import TriggerHandler
+from handlers.risk import RiskHandler
+from handlers.paper import PaperHandler
+from handlers.market import MarketHandler
+from handlers.cache import CacheHandler
+from handlers.analytics import AnalyticsHandler
+from handlers.profiling import ProfilingHandler
+from handlers.warmup import WarmupHandler
+from handlers.session import SessionHandler
+from handlers.conditions import ConditionHandler
+from handlers.admission import AdmissionHandler
+from handlers.resources import ResourceHandler, TOKEN_URI
+from models.exceptions import OverloadError
+from utils.admission import AdmissionController
+from utils.logging import setup_logging, shutdown_logging, elapsed_ms
+from utils.response_cache import ResponseCache, make_key
+from utils import json_codec
+from utils.profiling import RuntimeProfiler, get_latency_profiler
+
+
+# Tools that can change the token resource
+AUTH_TOOLS = {"set_credentials", "get_access_token", "set_access_token", "run_warmup"}
 
 
 class KiwoomMCPServer:
     """Kiwoom MCP Server"""
     
-    def __init__(self, kiwoom_config: KiwoomConfig = None, server_config: ServerConfig = None):
+    def __init__(
+        self,
+        kiwoom_config: KiwoomConfig = None,
+        server_config: ServerConfig = None,
+        risk_config: RiskConfig = None
+    ):
         # Initialize configs
         self.kiwoom_config = kiwoom_config or KiwoomConfig()
         self.server_config = server_config or ServerConfig()
+        self.risk_config = risk_config or RiskConfig()
         
         # Setup logging
-        self.logger = setup_logging(self.server_config.log_level, "kiwoom-mcp-server")
+        self.logger = setup_logging(
+            self.server_config.log_level,
+            "kiwoom-mcp-server",
+            log_format=self.server_config.log_format,
+            sampling=self.server_config.log_sampling,
+            audit_path=self.server_config.audit_log_path
+        )
+        
+        # Select JSON codec for upstream decode and rendered output
+        json_codec.set_codec(self.server_config.json_codec)
         
         # Initialize MCP server
         self.server = Server(self.server_config.name)
         
+        # Initialize order journal
+        self.order_journal = (
+            OrderJournal(self.kiwoom_config.journal_path)
+            if self.kiwoom_config.journal_path else None
+        )
+        
+        # Initialize shared token cache (paper tokens are never cached)
+        self.token_cache = (
+            TokenCache(self.kiwoom_config.token_cache_path)
+            if self.kiwoom_config.token_cache_path and not self.kiwoom_config.paper_trading else None
+        )
+        
+        # Initialize real-time market data
+        self.market_data = MarketDataCache()
+        self.realtime = KiwoomRealtimeClient(self.kiwoom_config)
+        self.realtime.add_real_listener(self.market_data.handle_real)
+        
+        # Feed the paper broker from the same market data
+        self.paper_broker = None
+        if self.kiwoom_config.paper_trading:
+            self.paper_broker = get_paper_broker(
+                self.kiwoom_config.paper_cash, self.kiwoom_config.paper_quote_depth
+            )
+            self.paper_broker.quote_lookup = self.market_data.get
+            self.market_data.add_tick_listener(self.paper_broker.on_tick)
+        
+        # Initialize pre-trade risk gate
+        self.risk_gate = RiskGate(self.risk_config, self.market_data.last_price)
+        
+        # KRX/NXT trading calendar for local session checks
+        self.calendar = MarketCalendar(self.kiwoom_config.market_holidays)
+        
+        # Route AUTO orders across KRX/NXT (venues in session) from cached top of book
+        self.reference_data = ReferenceDataCache()
+        
+        # Keep risk exposure on actual positions: holdings seed it, fills and cancels move it
+        self.reference_data.add_holdings_listener(self.risk_gate.load_holdings)
+        if self.paper_broker:
+            self.paper_broker.add_fill_listener(self._on_paper_fills)
+            self.paper_broker.add_close_listener(lambda order: self.risk_gate.on_close(order.order_number))
+        else:
+            self.realtime.add_real_listener(self.risk_gate.handle_real)
+        self.router = SmartOrderRouter(
+            self.market_data, self.realtime, self.reference_data.nxt_enabled, self.calendar.accepts
+        )
+        
         # Initialize handlers
-        self.auth_handler = AuthHandler(self.kiwoom_config)
-        self.order_handler = OrderHandler(self.kiwoom_config)
+        self.auth_handler = AuthHandler(self.kiwoom_config, self.token_cache)
+        self.order_handler = OrderHandler(
+            self.kiwoom_config, self.order_journal, self.risk_gate, self.router, self.calendar
+        )
+        self.session_handler = SessionHandler(
+            self.calendar, self.order_handler.session_queue, self.kiwoom_config.session_policy
+        )
+        self.algo_engine = AlgoEngine(self.kiwoom_config, self.order_handler.submit_order)
+        self.algo_handler = AlgoHandler(self.kiwoom_config, self.algo_engine, self.risk_gate)
+        self.journal_handler = JournalHandler(self.kiwoom_config, self.order_journal, self.risk_gate)
+        self.risk_handler = RiskHandler(self.risk_gate)
+        self.paper_handler = PaperHandler(self.paper_broker)
+        self.market_handler = MarketHandler(self.market_data)
+        
+        # Cache rendered results of read-only tools
+        self.response_cache = ResponseCache(
+            self.server_config.response_cache_entries, self.server_config.response_cache_bytes
+        )
+        self.cache_handler = CacheHandler(self.response_cache)
+        self.market_data.add_tick_listener(
+            lambda stock_code, price: self.response_cache.invalidate_threadsafe(TICK_INVALIDATIONS)
+        )
+        self.order_handler.add_order_listener(
+            lambda *_: self.response_cache.invalidate_threadsafe(ORDER_INVALIDATIONS)
+        )
+        if self.paper_broker:
+            self.paper_broker.add_fill_listener(
+                lambda fills: self.response_cache.invalidate_threadsafe(FILL_INVALIDATIONS)
+            )
+        else:
+            self.realtime.add_real_listener(self._on_real_execution)
+        
+        # Bound concurrent tool calls; orders and cancels go ahead of reads
+        self.admission = AdmissionController(
+            self.server_config.max_concurrent_calls,
+            self.server_config.max_session_calls,
+            self.server_config.admission_queue_size,
+            self.server_config.admission_timeout,
+            self.server_config.order_reserved_calls
+        )
+        self.admission_handler = AdmissionHandler(self.admission)
+        
+        # Run CPU-heavy analytics in worker processes, off the order path
+        self.analytics = AnalyticsExecutor(self.server_config.analytics_workers)
+        self.analytics_handler = AnalyticsHandler(self.analytics, HistoryStore(), self.server_config.strategy_dir)
+        
+        # Order-entry stage timing and runtime profilers
+        latency = get_latency_profiler()
+        latency.enabled = self.server_config.latency_profiling
+        self.profiling_handler = ProfilingHandler(latency, RuntimeProfiler(self.server_config.profile_dir))
+        
+        # Pre-market warmup of token, connections and reference data
+        self.warmup = WarmupScheduler(
+            self.kiwoom_config,
+            self.auth_handler.ensure_token,
+            self.reference_data,
+            self.realtime,
+            self.order_journal,
+            self.calendar.is_trading_day,
+            self.calendar.clock
+        )
+        self.warmup_handler = WarmupHandler(self.warmup)
+        
+        # Initialize trigger engine on trade ticks
+        self.trigger_engine = TriggerEngine(self.order_handler.submit_order, self.market_data.last_price)
+        self.market_data.add_tick_listener(self.trigger_engine.on_tick)
+        self.trigger_handler = TriggerHandler(self.kiwoom_config, self.trigger_engine, self.realtime)
+        
+        # Saved condition searches and their live hits over the real-time channel
+        self.condition_engine = ConditionSearchEngine(self.realtime)
+        self.condition_handler = ConditionHandler(self.condition_engine, self.reference_data)
+        
+        # Initialize resources backed by the in-memory state above
+        self.resource_handler = ResourceHandler(
+            self.kiwoom_config,
+            self.market_data,
+            self.reference_data,
+            self.algo_engine,
+            self.trigger_engine,
+            self.order_journal,
+            self.paper_broker,
+            self.condition_engine
+        )
+        self.market_data.add_tick_listener(self.resource_handler.on_tick)
+        self.condition_engine.add_listener(self.resource_handler.on_condition)
+        self.order_handler.add_order_listener(self.resource_handler.on_order)
+        self.reference_data.add_holdings_listener(self.resource_handler.on_holdings)
+        if self.paper_broker:
+            self.paper_broker.add_fill_listener(self.resource_handler.on_order)
         
         # Setup handlers
         self._setup_handlers()
@@ -69,10 +261,16 @@ class KiwoomMCPServer:
                 ),
                 types.Tool(
                     name="get_access_token",
-                    description="키움증권 API 접근 토큰 발급 (au10001)",
+                    description="키움증권 API 접근 토큰 발급 (au10001, 유효한 캐시 토큰이 있으면 재사용)",
                     inputSchema={
                         "type": "object",
-                        "properties": {}
+                        "properties": {
+                            "force_refresh": {
+                                "type": "boolean",
+                                "description": "캐시를 무시하고 새 토큰 발급",
+                                "default": False
+                            }
+                        }
                     }
                 ),
                 types.Tool(
@@ -134,7 +332,7 @@ class KiwoomMCPServer:
                             },
                             "exchange": {
                                 "type": "string",
-                                "description": "거래소구분",
+                                "description": "거래소구분 (AUTO: 캐시된 KRX/NXT 최우선호가로 시장 선택·분할)",
                                 "enum": list(EXCHANGE_TYPES.keys()),
                                 "default": "KRX"
                             },
@@ -142,6 +340,11 @@ class KiwoomMCPServer:
                                 "type": "string",
                                 "description": "조건단가",
                                 "default": ""
+                            },
+                            "session_policy": {
+                                "type": "string",
+                                "description": "장 운영시간 외 주문 처리 (reject: 거부, remap: 시간외 매매구분으로 변환, queue: 다음 접수 시각까지 대기 후 발송, off: 확인 안 함; 생략 시 KIWOOM_SESSION_POLICY)",
+                                "enum": list(SESSION_POLICIES)
                             }
                         },
                         "required": ["stock_code", "quantity"]
@@ -174,7 +377,7 @@ class KiwoomMCPServer:
                             },
                             "exchange": {
                                 "type": "string",
-                                "description": "거래소구분",
+                                "description": "거래소구분 (AUTO: 캐시된 KRX/NXT 최우선호가로 시장 선택·분할)",
                                 "enum": list(EXCHANGE_TYPES.keys()),
                                 "default": "KRX"
                             },
@@ -182,11 +385,369 @@ class KiwoomMCPServer:
                                 "type": "string",
                                 "description": "조건단가",
                                 "default": ""
+                            },
+                            "session_policy": {
+                                "type": "string",
+                                "description": "장 운영시간 외 주문 처리 (reject: 거부, remap: 시간외 매매구분으로 변환, queue: 다음 접수 시각까지 대기 후 발송, off: 확인 안 함; 생략 시 KIWOOM_SESSION_POLICY)",
+                                "enum": list(SESSION_POLICIES)
                             }
                         },
                         "required": ["stock_code", "quantity"]
                     }
                 ),
+                types.Tool(
+                    name="stock_batch_order",
+                    description="일괄 주문 - 리스크 한도를 배치 전체로 확인한 뒤 각 주문 전송",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "orders": {
+                                "type": "array",
+                                "description": "주문 목록",
+                                "items": {
+                                    "type": "object",
+                                    "properties": {
+                                        "side": {
+                                            "type": "string",
+                                            "enum": ["buy", "sell"],
+                                            "default": "buy"
+                                        },
+                                        "stock_code": {"type": "string"},
+                                        "quantity": {"type": "integer"},
+                                        "price": {"type": "string", "default": ""},
+                                        "trade_type": {
+                                            "type": "string",
+                                            "enum": list(TRADE_TYPES.keys()),
+                                            "default": "시장가"
+                                        },
+                                        "exchange": {
+                                            "type": "string",
+                                            "enum": list(EXCHANGE_TYPES.keys()),
+                                            "default": "KRX"
+                                        }
+                                    },
+                                    "required": ["stock_code", "quantity"]
+                                }
+                            },
+                            "session_policy": {
+                                "type": "string",
+                                "description": "장 운영시간 외 주문 처리 (reject: 거부, remap: 시간외 매매구분으로 변환, queue: 다음 접수 시각까지 대기 후 발송, off: 확인 안 함; 생략 시 KIWOOM_SESSION_POLICY)",
+                                "enum": list(SESSION_POLICIES)
+                            }
+                        },
+                        "required": ["orders"]
+                    }
+                ),
+                types.Tool(
+                    name="get_risk_status",
+                    description="리스크 한도 및 현재 노출(종목/섹터/총) 조회",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {}
+                    }
+                ),
+                types.Tool(
+                    name="get_quote",
+                    description="실시간 캐시 시세 조회 (현재가, 최우선 호가, 거래량)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "stock_code": {
+                                "type": "string",
+                                "description": "종목코드 (예: 005930)"
+                            },
+                            "stock_codes": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "여러 종목코드"
+                            }
+                        }
+                    }
+                ),
+                types.Tool(
+                    name="get_paper_account",
+                    description="모의 브로커(페이퍼 트레이딩) 계좌 조회 - 예수금, 보유종목, 미체결, 최근 체결",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "fills_limit": {
+                                "type": "integer",
+                                "description": "표시할 최근 체결 수",
+                                "default": 20
+                            }
+                        }
+                    }
+                ),
+                types.Tool(
+                    name="screen_indicators",
+                    description="일봉 CSV로 종목 지표 스크리닝 (수익률, SMA 추세, RSI, 변동성) - 별도 프로세스에서 계산",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "data_path": {
+                                "type": "string",
+                                "description": "일봉 CSV 경로 (date, stock_code, open, high, low, close, volume)"
+                            },
+                            "stock_codes": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "대상 종목코드 (생략 시 파일의 전 종목)"
+                            },
+                            "lookback": {
+                                "type": "integer",
+                                "description": "수익률/변동성 기간 (일)",
+                                "default": 20
+                            },
+                            "sma_short": {
+                                "type": "integer",
+                                "description": "단기 이동평균 기간",
+                                "default": 5
+                            },
+                            "sma_long": {
+                                "type": "integer",
+                                "description": "장기 이동평균 기간",
+                                "default": 20
+                            },
+                            "rsi_period": {
+                                "type": "integer",
+                                "description": "RSI 기간",
+                                "default": 14
+                            },
+                            "min_rsi": {
+                                "type": "number",
+                                "description": "RSI 하한 필터"
+                            },
+                            "max_rsi": {
+                                "type": "number",
+                                "description": "RSI 상한 필터"
+                            },
+                            "trend_up": {
+                                "type": "boolean",
+                                "description": "단기 이동평균이 장기 이동평균 위인 종목만",
+                                "default": False
+                            },
+                            "sort_by": {
+                                "type": "string",
+                                "enum": ["return", "rsi", "volatility"],
+                                "description": "정렬 기준 (내림차순)",
+                                "default": "return"
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "표시할 종목 수",
+                                "default": 20
+                            }
+                        },
+                        "required": ["data_path"]
+                    }
+                ),
+                types.Tool(
+                    name="run_backtest",
+                    description="전략 파일을 일봉 CSV로 백테스트 (모의 브로커, 별도 프로세스에서 실행)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "data_path": {
+                                "type": "string",
+                                "description": "일봉 CSV 경로"
+                            },
+                            "strategy_path": {
+                                "type": "string",
+                                "description": "on_bar(ctx)를 정의한 전략 모듈 경로 (STRATEGY_DIR 기준)"
+                            },
+                            "cash": {
+                                "type": "integer",
+                                "description": "초기자금",
+                                "default": 100000000
+                            },
+                            "quote_depth": {
+                                "type": "integer",
+                                "description": "호가 갱신당 체결 가능 수량 (생략 시 무제한)"
+                            }
+                        },
+                        "required": ["data_path", "strategy_path"]
+                    }
+                ),
+                types.Tool(
+                    name="get_order_latency",
+                    description="주문 지연 단계별 분석 (파싱, 리스크, 저널, 스레드 전환, 업스트림, 응답 생성 등)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "slowest": {
+                                "type": "integer",
+                                "description": "표시할 가장 느린 주문 수",
+                                "default": 3
+                            },
+                            "reset": {
+                                "type": "boolean",
+                                "description": "조회 후 집계 초기화",
+                                "default": False
+                            }
+                        }
+                    }
+                ),
+                types.Tool(
+                    name="set_profiling",
+                    description="주문 단계 계측 켜기/끄기 및 샘플링/cProfile 프로파일러 시작/중지 (재시작 불필요)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "stage_timing": {
+                                "type": "boolean",
+                                "description": "주문 단계별 시간 계측"
+                            },
+                            "profiler": {
+                                "type": "string",
+                                "enum": ["off", "sampling", "cprofile"],
+                                "description": "sampling: 전체 스레드 스택 샘플링 (py-spy raw 형식), cprofile: 이벤트 루프 스레드 cProfile, off: 중지 후 파일 저장"
+                            },
+                            "interval_ms": {
+                                "type": "number",
+                                "description": "샘플링 간격 (ms, 최소 1)",
+                                "minimum": 1,
+                                "default": 5
+                            },
+                            "output_name": {
+                                "type": "string",
+                                "description": "중지 시 PROFILE_DIR 아래 저장할 파일 이름 (생략 시 자동 생성)"
+                            }
+                        }
+                    }
+                ),
+                types.Tool(
+                    name="run_warmup",
+                    description="장전 준비 즉시 실행 (토큰 갱신, 연결 풀 예열, 보유잔고/종목 마스터/가격제한폭 적재, 상태 점검)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "steps": {
+                                "type": "array",
+                                "items": {
+                                    "type": "string",
+                                    "enum": ["token", "connections", "holdings", "symbols", "limits", "health"]
+                                },
+                                "description": "실행할 단계 (생략 시 전체)"
+                            }
+                        }
+                    }
+                ),
+                types.Tool(
+                    name="get_warmup_status",
+                    description="장전 준비 예약 시각, 최근 실행 결과, 적재된 참조 데이터 조회",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {}
+                    }
+                ),
+                types.Tool(
+                    name="list_conditions",
+                    description="저장된 조건검색식 목록 조회 (CNSRLST, 실시간 채널 필요)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {}
+                    }
+                ),
+                types.Tool(
+                    name="run_condition_search",
+                    description="조건검색 실행 (CNSRREQ) - live=true면 편입/이탈을 실시간으로 계속 수신",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "seq": {
+                                "type": "string",
+                                "description": "조건검색식 일련번호 (list_conditions 참고)"
+                            },
+                            "live": {
+                                "type": "boolean",
+                                "description": "실시간 감시 여부 (기본값: false)",
+                                "default": False
+                            }
+                        },
+                        "required": ["seq"]
+                    }
+                ),
+                types.Tool(
+                    name="stop_condition_search",
+                    description="조건검색 실시간 감시 중지 (CNSRCLR)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "seq": {
+                                "type": "string",
+                                "description": "조건검색식 일련번호"
+                            }
+                        },
+                        "required": ["seq"]
+                    }
+                ),
+                types.Tool(
+                    name="get_condition_events",
+                    description="조건검색 편입/이탈 이벤트 조회 (since_event_id 이후의 새 종목만)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "since_event_id": {
+                                "type": "integer",
+                                "description": "이 이벤트 이후만 조회 (기본값: 0)",
+                                "default": 0
+                            },
+                            "seq": {
+                                "type": "string",
+                                "description": "조건검색식 일련번호 (생략 시 전체)"
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "최대 이벤트 수 (기본값: 50)",
+                                "default": 50
+                            }
+                        }
+                    }
+                ),
+                types.Tool(
+                    name="get_market_session",
+                    description="KRX/NXT 현재 세션, 오늘 운영 시간표, 다음 접수 시각, 대기 주문 조회",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {}
+                    }
+                ),
+                types.Tool(
+                    name="cancel_queued_order",
+                    description="장 시작 대기 중인 주문 취소 (session_policy=queue로 등록된 주문)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "queue_id": {
+                                "type": "string",
+                                "description": "대기번호 (예: Q0001)"
+                            }
+                        },
+                        "required": ["queue_id"]
+                    }
+                ),
+                types.Tool(
+                    name="get_admission_stats",
+                    description="동시 호출 제어 현황 조회 (실행/대기 중 호출, 우선순위별 대기 시간, 거부 건수)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {}
+                    }
+                ),
+                types.Tool(
+                    name="get_cache_stats",
+                    description="읽기 전용 도구 응답 캐시 통계 조회 (적중률, 항목 수)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "clear": {
+                                "type": "boolean",
+                                "description": "조회 후 캐시 비우기",
+                                "default": False
+                            }
+                        }
+                    }
+                ),
                 types.Tool(
                     name="get_trade_types",
                     description="사용 가능한 매매구분 목록 조회",
@@ -195,57 +756,532 @@ class KiwoomMCPServer:
                         "properties": {}
                     }
                 ),
+                types.Tool(
+                    name="start_algo_order",
+                    description="알고리즘 분할주문 시작 (TWAP/VWAP/ICEBERG)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "algo_type": {
+                                "type": "string",
+                                "description": "알고리즘 유형",
+                                "enum": list(ALGO_TYPES.keys()),
+                                "default": "TWAP"
+                            },
+                            "side": {
+                                "type": "string",
+                                "description": "매수/매도 구분",
+                                "enum": ["buy", "sell"],
+                                "default": "buy"
+                            },
+                            "stock_code": {
+                                "type": "string",
+                                "description": "종목코드 (예: 005930)"
+                            },
+                            "quantity": {
+                                "type": "integer",
+                                "description": "총 주문수량"
+                            },
+                            "price": {
+                                "type": "string",
+                                "description": "주문단가 (시장가의 경우 빈 문자열)",
+                                "default": ""
+                            },
+                            "trade_type": {
+                                "type": "string",
+                                "description": "분할주문 매매구분",
+                                "enum": list(TRADE_TYPES.keys()),
+                                "default": "시장가"
+                            },
+                            "exchange": {
+                                "type": "string",
+                                "description": "거래소구분 (AUTO: 캐시된 KRX/NXT 최우선호가로 시장 선택·분할)",
+                                "enum": list(EXCHANGE_TYPES.keys()),
+                                "default": "KRX"
+                            },
+                            "duration_minutes": {
+                                "type": "number",
+                                "description": "실행 시간 (분, TWAP/VWAP)",
+                                "default": 30
+                            },
+                            "slices": {
+                                "type": "integer",
+                                "description": "분할 횟수 (TWAP/VWAP)",
+                                "default": 10
+                            },
+                            "volume_profile": {
+                                "type": "array",
+                                "items": {"type": "number"},
+                                "description": "09:00부터 30분 단위 거래량 비중 (VWAP, 기본값: KRX 평균 프로파일)"
+                            },
+                            "display_quantity": {
+                                "type": "integer",
+                                "description": "노출 수량 (ICEBERG)"
+                            },
+                            "interval_seconds": {
+                                "type": "number",
+                                "description": "노출 수량 재주문 간격 (초, ICEBERG)",
+                                "default": 30
+                            }
+                        },
+                        "required": ["stock_code", "quantity"]
+                    }
+                ),
+                types.Tool(
+                    name="get_algo_status",
+                    description="알고리즘 분할주문 진행 상태 조회",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "algo_id": {
+                                "type": "string",
+                                "description": "알고리즘 주문 ID (생략 시 전체 목록)"
+                            }
+                        }
+                    }
+                ),
+                types.Tool(
+                    name="get_order_journal",
+                    description="주문 기록(저널) 조회 - 전송 전 기록된 주문과 결과",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "limit": {
+                                "type": "integer",
+                                "description": "조회 건수",
+                                "default": 20
+                            },
+                            "in_doubt_only": {
+                                "type": "boolean",
+                                "description": "결과 미확인 주문만 조회",
+                                "default": False
+                            }
+                        }
+                    }
+                ),
+                types.Tool(
+                    name="reconcile_order_journal",
+                    description="결과 미확인 주문을 키움 주문내역(kt00007)과 대사",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {}
+                    }
+                ),
+                types.Tool(
+                    name="cancel_algo_order",
+                    description="알고리즘 분할주문의 남은 주문 취소",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "algo_id": {
+                                "type": "string",
+                                "description": "알고리즘 주문 ID"
+                            }
+                        },
+                        "required": ["algo_id"]
+                    }
+                ),
+                types.Tool(
+                    name="arm_trigger_order",
+                    description="로컬 조건주문 등록 - 실시간 체결가가 조건을 충족하면 주문 전송 (가격 돌파, 추적손절/추적매수, OCO)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "stock_code": {
+                                "type": "string",
+                                "description": "종목코드 (예: 005930)"
+                            },
+                            "condition": {
+                                "type": "string",
+                                "description": "조건 유형",
+                                "enum": list(TRIGGER_CONDITIONS.keys())
+                            },
+                            "trigger_price": {
+                                "type": "integer",
+                                "description": "기준가격 (price_above/price_below)"
+                            },
+                            "trail_amount": {
+                                "type": "number",
+                                "description": "추적폭 (원, trailing_stop/trailing_buy)"
+                            },
+                            "trail_percent": {
+                                "type": "number",
+                                "description": "추적폭 (%, trailing_stop/trailing_buy)"
+                            },
+                            "reference_price": {
+                                "type": "integer",
+                                "description": "추적 시작가격 (생략 시 실시간 현재가)"
+                            },
+                            "side": {
+                                "type": "string",
+                                "description": "조건 충족 시 주문 방향",
+                                "enum": ["buy", "sell"],
+                                "default": "sell"
+                            },
+                            "quantity": {
+                                "type": "integer",
+                                "description": "조건 충족 시 주문수량 (생략 시 알림만)"
+                            },
+                            "price": {
+                                "type": "string",
+                                "description": "조건 충족 시 주문단가 (시장가의 경우 빈 문자열)",
+                                "default": ""
+                            },
+                            "trade_type": {
+                                "type": "string",
+                                "description": "조건 충족 시 매매구분",
+                                "enum": list(TRADE_TYPES.keys()),
+                                "default": "시장가"
+                            },
+                            "exchange": {
+                                "type": "string",
+                                "description": "거래소구분 (AUTO: 캐시된 KRX/NXT 최우선호가로 시장 선택·분할)",
+                                "enum": list(EXCHANGE_TYPES.keys()),
+                                "default": "KRX"
+                            },
+                            "oco_group": {
+                                "type": "string",
+                                "description": "OCO 그룹명 (같은 그룹의 조건은 하나가 충족되면 나머지 취소)"
+                            }
+                        },
+                        "required": ["stock_code", "condition"]
+                    }
+                ),
+                types.Tool(
+                    name="arm_bracket_order",
+                    description="브래킷 주문 - 진입 주문 전송 후 익절/손절 청산 조건을 OCO로 등록",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "stock_code": {
+                                "type": "string",
+                                "description": "종목코드 (예: 005930)"
+                            },
+                            "side": {
+                                "type": "string",
+                                "description": "진입 방향",
+                                "enum": ["buy", "sell"],
+                                "default": "buy"
+                            },
+                            "quantity": {
+                                "type": "integer",
+                                "description": "주문수량"
+                            },
+                            "price": {
+                                "type": "string",
+                                "description": "진입 주문단가 (시장가의 경우 빈 문자열)",
+                                "default": ""
+                            },
+                            "trade_type": {
+                                "type": "string",
+                                "description": "진입 매매구분",
+                                "enum": list(TRADE_TYPES.keys()),
+                                "default": "시장가"
+                            },
+                            "exchange": {
+                                "type": "string",
+                                "description": "거래소구분 (AUTO: 캐시된 KRX/NXT 최우선호가로 시장 선택·분할)",
+                                "enum": list(EXCHANGE_TYPES.keys()),
+                                "default": "KRX"
+                            },
+                            "take_profit_price": {
+                                "type": "integer",
+                                "description": "익절 가격"
+                            },
+                            "stop_loss_price": {
+                                "type": "integer",
+                                "description": "손절 가격"
+                            },
+                            "exit_trade_type": {
+                                "type": "string",
+                                "description": "청산 매매구분",
+                                "enum": list(TRADE_TYPES.keys()),
+                                "default": "시장가"
+                            }
+                        },
+                        "required": ["stock_code", "quantity", "take_profit_price", "stop_loss_price"]
+                    }
+                ),
+                types.Tool(
+                    name="list_triggers",
+                    description="등록된 로컬 조건주문 목록 조회",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "include_inactive": {
+                                "type": "boolean",
+                                "description": "충족/해제된 조건 포함",
+                                "default": False
+                            }
+                        }
+                    }
+                ),
+                types.Tool(
+                    name="cancel_trigger",
+                    description="로컬 조건주문 해제",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "trigger_id": {
+                                "type": "string",
+                                "description": "조건 ID"
+                            }
+                        },
+                        "required": ["trigger_id"]
+                    }
+                ),
             ]
 
+        @self.server.list_resources()
+        async def handle_list_resources() -> List[types.Resource]:
+            """List available resources"""
+            return self.resource_handler.list_resources()
+
+        @self.server.list_resource_templates()
+        async def handle_list_resource_templates() -> List[types.ResourceTemplate]:
+            """List resource templates"""
+            return self.resource_handler.list_resource_templates()
+
+        @self.server.read_resource()
+        async def handle_read_resource(uri) -> str:
+            """Read a resource"""
+            return self.resource_handler.read(str(uri))
+
+        @self.server.subscribe_resource()
+        async def handle_subscribe_resource(uri) -> None:
+            """Subscribe the calling session to resource updates"""
+            self.resource_handler.subscribe(str(uri), self.server.request_context.session)
+
+        @self.server.unsubscribe_resource()
+        async def handle_unsubscribe_resource(uri) -> None:
+            """Unsubscribe the calling session"""
+            self.resource_handler.unsubscribe(str(uri), self.server.request_context.session)
+
         @self.server.call_tool()
         async def handle_call_tool(
             name: str, arguments: Dict[str, Any]
         ) -> List[types.TextContent]:
             """Handle tool calls"""
+            return await self.call_tool(name, arguments)
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        """Dispatch a tool call (MCP requests and in-process drivers such as backtests)"""
+        
+        self.logger.info("Tool called: %s", name, extra={"tool": name})
+        started = time.perf_counter()
+        
+        try:
+            session = self._current_session()
+            ttl = CACHEABLE_TOOLS.get(name)
+            if ttl and self.response_cache.enabled:
+                # Cache hits and coalesced calls never take a slot
+                return await self.response_cache.get_or_call(
+                    make_key(name, arguments, self._account_key()),
+                    ttl,
+                    lambda: self._admitted_dispatch(name, arguments, session),
+                    cacheable=lambda result: not result[0].text.startswith("❌")
+                )
             
-            self.logger.info(f"Tool called: {name}")
-            
-            try:
-                if name == "set_credentials":
-                    return await self.auth_handler.set_credentials(arguments)
-                elif name == "get_access_token":
-                    return await self.auth_handler.get_access_token()
-                elif name == "set_access_token":
-                    return await self.auth_handler.set_access_token(arguments)
-                elif name == "check_token_status":
-                    return await self.auth_handler.check_token_status()
-                elif name == "stock_buy_order":
-                    return await self.order_handler.stock_buy_order(arguments)
-                elif name == "stock_sell_order":
-                    return await self.order_handler.stock_sell_order(arguments)
-                elif name == "get_trade_types":
-                    return await self.order_handler.get_trade_types()
-                else:
-                    raise ValueError(f"Unknown tool: {name}")
-                    
-            except Exception as e:
-                self.logger.error(f"Tool call failed: {name}, error: {e}")
-                return [
-                    types.TextContent(
-                        type="text",
-                        text=f"❌ 도구 실행 중 오류가 발생했습니다: {str(e)}"
-                    )
-                ]
+            result = await self._admitted_dispatch(name, arguments, session)
+            if not ttl:
+                self.response_cache.invalidate(CACHE_INVALIDATIONS.get(name))
+            return result
+        
+        except OverloadError as e:
+            self.logger.warning(
+                "Tool call shed: %s (%s)", name, e.reason, extra={"tool": name}
+            )
+            return [
+                types.TextContent(
+                    type="text",
+                    text=f"❌ 서버가 혼잡하여 요청이 거부되었습니다: {str(e)}. 잠시 후 다시 시도하세요."
+                )
+            ]
+        except Exception as e:
+            self.logger.error("Tool call failed: %s, error: %s", name, e, extra={"tool": name})
+            return [
+                types.TextContent(
+                    type="text",
+                    text=f"❌ 도구 실행 중 오류가 발생했습니다: {str(e)}"
+                )
+            ]
+        finally:
+            if name in AUTH_TOOLS:
+                self.resource_handler.mark_changed(TOKEN_URI)
+            latency_ms = elapsed_ms(started)
+            self.logger.debug(
+                "Tool %s finished in %.1fms", name, latency_ms,
+                extra={"tool": name, "latency_ms": latency_ms}
+            )
 
+    def _current_session(self) -> Any:
+        """MCP session of the current request (None for in-process calls)"""
+        try:
+            return self.server.request_context.session
+        except LookupError:
+            return None
+    
+    async def _admitted_dispatch(self, name: str, arguments: Dict[str, Any], session: Any) -> List[types.TextContent]:
+        """Dispatch once admission control grants a slot"""
+        if name in ADMISSION_EXEMPT_TOOLS:
+            return await self._dispatch(name, arguments)
+        async with self.admission.admit(name, session):
+            return await self._dispatch(name, arguments)
+    
+    async def _dispatch(self, name: str, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        """Route a tool call to its handler"""
+        if name == "set_credentials":
+            return await self.auth_handler.set_credentials(arguments)
+        elif name == "get_access_token":
+            return await self.auth_handler.get_access_token(arguments)
+        elif name == "set_access_token":
+            return await self.auth_handler.set_access_token(arguments)
+        elif name == "check_token_status":
+            return await self.auth_handler.check_token_status()
+        elif name == "stock_buy_order":
+            return await self.order_handler.stock_buy_order(arguments)
+        elif name == "stock_sell_order":
+            return await self.order_handler.stock_sell_order(arguments)
+        elif name == "stock_batch_order":
+            return await self.order_handler.stock_batch_order(arguments)
+        elif name == "screen_indicators":
+            return await self.analytics_handler.screen_indicators(arguments)
+        elif name == "run_backtest":
+            return await self.analytics_handler.run_backtest(arguments)
+        elif name == "get_order_latency":
+            return await self.profiling_handler.get_order_latency(arguments)
+        elif name == "set_profiling":
+            return await self.profiling_handler.set_profiling(arguments)
+        elif name == "run_warmup":
+            return await self.warmup_handler.run_warmup(arguments)
+        elif name == "get_warmup_status":
+            return await self.warmup_handler.get_warmup_status()
+        elif name == "list_conditions":
+            return await self.condition_handler.list_conditions()
+        elif name == "run_condition_search":
+            return await self.condition_handler.run_condition_search(arguments)
+        elif name == "stop_condition_search":
+            return await self.condition_handler.stop_condition_search(arguments)
+        elif name == "get_condition_events":
+            return await self.condition_handler.get_condition_events(arguments)
+        elif name == "get_admission_stats":
+            return await self.admission_handler.get_admission_stats()
+        elif name == "get_market_session":
+            return await self.session_handler.get_market_session()
+        elif name == "cancel_queued_order":
+            return await self.session_handler.cancel_queued_order(arguments)
+        elif name == "get_cache_stats":
+            return await self.cache_handler.get_cache_stats(arguments)
+        elif name == "get_trade_types":
+            return await self.order_handler.get_trade_types()
+        elif name == "get_quote":
+            return await self.market_handler.get_quote(arguments)
+        elif name == "get_paper_account":
+            return await self.paper_handler.get_paper_account(arguments)
+        elif name == "get_risk_status":
+            return await self.risk_handler.get_risk_status()
+        elif name == "start_algo_order":
+            return await self.algo_handler.start_algo_order(arguments)
+        elif name == "get_algo_status":
+            return await self.algo_handler.get_algo_status(arguments)
+        elif name == "cancel_algo_order":
+            return await self.algo_handler.cancel_algo_order(arguments)
+        elif name == "get_order_journal":
+            return await self.journal_handler.get_order_journal(arguments)
+        elif name == "reconcile_order_journal":
+            return await self.journal_handler.reconcile_order_journal()
+        elif name == "arm_trigger_order":
+            return await self.trigger_handler.arm_trigger_order(arguments)
+        elif name == "arm_bracket_order":
+            return await self.trigger_handler.arm_bracket_order(arguments)
+        elif name == "list_triggers":
+            return await self.trigger_handler.list_triggers(arguments)
+        elif name == "cancel_trigger":
+            return await self.trigger_handler.cancel_trigger(arguments)
+        else:
+            raise ValueError(f"Unknown tool: {name}")
+    
+    def _on_paper_fills(self, fills) -> None:
+        """Move paper broker fills into risk exposure"""
+        for fill in fills:
+            self.risk_gate.on_fill(fill.order_number, fill.stock_code, fill.is_buy, fill.quantity, fill.price)
+    
+    def _on_real_execution(self, real_type: str, item: str, values: Dict[str, str]) -> None:
+        """Drop cached account views when a live order event arrives"""
+        if real_type == REALTIME_TYPES["ORDER_EXECUTION"]:
+            self.response_cache.invalidate_threadsafe(FILL_INVALIDATIONS)
+    
+    def _account_key(self) -> str:
+        """Account component of response cache keys"""
+        mode = "paper" if self.kiwoom_config.paper_trading else ("mock" if self.kiwoom_config.is_mock else "real")
+        return f"{self.kiwoom_config.appkey or ''}:{mode}"
+    
     async def run(self):
         """Run the MCP server"""
-        self.logger.info(f"Starting {self.server_config.name} v{self.server_config.version}")
-        
-        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-            await self.server.run(
-                read_stream,
-                write_stream,
-                InitializationOptions(
-                    server_name=self.server_config.name,
-                    server_version=self.server_config.version,
-                    capabilities=self.server.get_capabilities(
-                        notification_options=None,
-                        experimental_capabilities=None,
+        self.logger.info("Starting %s v%s", self.server_config.name, self.server_config.version)
+        
+        if not self.kiwoom_config.access_token:
+            await self.auth_handler.load_cached_token()
+        
+        # Seed risk exposure from current holdings (skipped without a token)
+        await self.warmup.run("startup", steps=("holdings",))
+        
+        if self.order_journal:
+            self.order_journal.open()
+            await self._recover_journal()
+        
+        await self.realtime.start()
+        if not self.paper_broker:
+            # Order execution events for the account (fills, cancels)
+            await self.realtime.subscribe([""], REALTIME_TYPES["ORDER_EXECUTION"])
+        await self.router.watch(self.kiwoom_config.warmup_symbols)
+        await self.warmup.start()
+        await self.order_handler.session_queue.start()
+        
+        try:
+            async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+                await self.server.run(
+                    read_stream,
+                    write_stream,
+                    InitializationOptions(
+                        server_name=self.server_config.name,
+                        server_version=self.server_config.version,
+                        capabilities=self._capabilities()
                     )
                 )
-            ) 
\ No newline at end of file
+        finally:
+            await self.order_handler.session_queue.stop()
+            await self.warmup.stop()
+            await self.realtime.stop()
+            await self.algo_engine.shutdown()
+            self.analytics.shutdown()
+            if self.order_journal:
+                self.order_journal.close()
+            shutdown_logging()
+    
+    def _capabilities(self) -> types.ServerCapabilities:
+        """Server capabilities, advertising resource subscriptions"""
+        capabilities = self.server.get_capabilities(
+            notification_options=NotificationOptions(resources_changed=True),
+            experimental_capabilities={},
+        )
+        if capabilities.resources is not None:
+            capabilities.resources.subscribe = True
+        return capabilities
+    
+    async def _recover_journal(self):
+        """Reconcile orders left in doubt by a previous process"""
+        in_doubt = self.order_journal.in_doubt()
+        if not in_doubt:
+            return
+        
+        self.logger.warning("%s journaled orders have no recorded outcome", len(in_doubt))
+        if not self.kiwoom_config.access_token:
+            self.logger.warning("No access token; run reconcile_order_journal after authenticating")
+            return
+        
+        try:
+            resolved, unresolved = await asyncio.to_thread(self.journal_handler.reconcile)
+            self.logger.info("Journal reconciled: %s resolved, %s unresolved", len(resolved), len(unresolved))
+        except Exception as e:
+            self.logger.error("Journal reconciliation failed: %s", e) 
\ No newline at end of file
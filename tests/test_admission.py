@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from config.constants import PRIORITY_ORDER, PRIORITY_READ
+from models.exceptions import OverloadError
+from utils import admission
+from utils.admission import SHED_EVICTED, SHED_QUEUE_FULL, AdmissionController
+
+
+def test_grant_racing_the_deadline_runs_instead_of_leaking_the_slot(monkeypatch):
+    async def granted_then_timed_out(future, timeout):
+        # The slot is handed over in the same loop iteration the deadline fires
+        controller._release("a")
+        assert future.done()
+        raise asyncio.TimeoutError
+
+    controller = AdmissionController(max_concurrent=1, order_reserved=0)
+
+    async def main():
+        await controller._acquire(PRIORITY_READ, "a")
+        monkeypatch.setattr(admission.asyncio, "wait_for", granted_then_timed_out)
+        await controller._acquire(PRIORITY_READ, "b")
+        assert controller.in_flight == 1
+        controller._release("b")
+
+    asyncio.run(main())
+    assert controller.in_flight == 0 and controller.sessions == 0
+    assert not controller.stats.shed
+
+
+def test_waiters_are_granted_by_priority_then_arrival():
+    controller = AdmissionController(max_concurrent=1, order_reserved=0)
+    granted = []
+
+    async def call(tool, name):
+        async with controller.admit(tool, name):
+            granted.append(name)
+
+    async def main():
+        async with controller.admit("get_quote", "holder"):
+            tasks = [
+                asyncio.create_task(call("get_quote", "read-1")),
+                asyncio.create_task(call("get_quote", "read-2")),
+                asyncio.create_task(call("stock_buy_order", "order")),
+            ]
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert granted == ["order", "read-1", "read-2"]
+
+
+def test_full_queue_evicts_newest_lower_priority_waiter():
+    controller = AdmissionController(max_concurrent=1, queue_size=2, order_reserved=0)
+
+    async def main():
+        await controller._acquire(PRIORITY_READ, "holder")
+        first = asyncio.create_task(controller._acquire(PRIORITY_READ, "r1"))
+        newest = asyncio.create_task(controller._acquire(PRIORITY_READ, "r2"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(OverloadError):
+            await controller._acquire(PRIORITY_READ, "r3")
+        order = asyncio.create_task(controller._acquire(PRIORITY_ORDER, "o"))
+        await asyncio.sleep(0)
+        with pytest.raises(OverloadError) as evicted:
+            await newest
+        assert evicted.value.reason == SHED_EVICTED
+
+        controller._release("holder")
+        await order
+        assert not first.done()
+        controller._release("o")
+        await first
+        controller._release("r1")
+
+    asyncio.run(main())
+    assert controller.stats.shed[SHED_QUEUE_FULL] == {PRIORITY_READ: 1}
+    assert controller.stats.shed[SHED_EVICTED] == {PRIORITY_READ: 1}
+    assert controller.in_flight == 0
+
+
+def test_reserved_slots_admit_orders_while_reads_wait():
+    controller = AdmissionController(max_concurrent=2, order_reserved=1)
+
+    async def main():
+        await controller._acquire(PRIORITY_READ, "r1")
+        read = asyncio.create_task(controller._acquire(PRIORITY_READ, "r2"))
+        await asyncio.sleep(0)
+        assert not read.done()
+
+        await asyncio.wait_for(controller._acquire(PRIORITY_ORDER, "o"), 1)
+        assert controller.in_flight == 2
+        controller._release("o")
+        controller._release("r1")
+        await read
+        controller._release("r2")
+
+    asyncio.run(main())
@@ -0,0 +1,116 @@
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+
+from config.constants import VOLUME_PROFILE_BUCKET_MINUTES
+from config.settings import KiwoomConfig
+from engine.algo import AlgoEngine, allocate_quantity, iceberg_schedule, twap_schedule, vwap_schedule
+from engine.sessions import KST
+from handlers.algo import AlgoHandler
+from models.types import OrderRequest, OrderResponse
+
+
+def test_allocate_quantity_keeps_total():
+    assert allocate_quantity(10, [1.0, 1.0, 1.0]) == [4, 3, 3]
+    assert sum(allocate_quantity(1_001, [0.2, 0.5, 0.3])) == 1_001
+
+
+def test_twap_caps_slices_at_quantity():
+    children = twap_schedule(3, 60, 10, start=1_000.0)
+    assert [c.quantity for c in children] == [1, 1, 1]
+    assert [c.scheduled_at for c in children] == [1_000.0, 1_020.0, 1_040.0]
+
+
+@pytest.mark.parametrize("schedule", [
+    lambda q: twap_schedule(q, 60, 5),
+    lambda q: vwap_schedule(q, 60, 5),
+    lambda q: iceberg_schedule(q, 10, 5),
+])
+@pytest.mark.parametrize("quantity", [0, -5])
+def test_schedules_reject_non_positive_quantity(schedule, quantity):
+    with pytest.raises(ValueError):
+        schedule(quantity)
+
+
+def test_cancel_lets_in_flight_child_finish():
+    async def scenario():
+        entered = asyncio.Event()
+        release = asyncio.Event()
+        submitted = []
+
+        async def submit(request, is_buy, source):
+            submitted.append(request.quantity)
+            entered.set()
+            await release.wait()
+            return OrderResponse(success=True, order_number=f"{len(submitted):04d}")
+
+        engine = AlgoEngine(KiwoomConfig(access_token="token", order_rate_limit=100), submit)
+        algo = engine.start("TWAP", OrderRequest("005930", 30), True, twap_schedule(30, 60, 3))
+
+        await asyncio.wait_for(entered.wait(), 1)
+        assert [c.status for c in algo.children] == ["sending", "pending", "pending"]
+
+        engine.cancel(algo.algo_id)
+        assert [c.status for c in algo.children] == ["sending", "cancelled", "cancelled"]
+        assert algo.sending_quantity == 10
+
+        release.set()
+        await asyncio.wait_for(algo.task, 1)
+        return algo, submitted
+
+    algo, submitted = asyncio.run(scenario())
+    assert submitted == [10]
+    assert algo.status == "cancelled"
+    assert algo.children[0].status == "sent"
+    assert algo.children[0].order_number == "0001"
+    assert algo.sent_quantity == 10
+    assert algo.remaining_quantity == 0
+
+
+def test_cancel_wakes_algo_waiting_for_next_child():
+    async def scenario():
+        async def submit(request, is_buy, source):
+            return OrderResponse(success=True)
+
+        engine = AlgoEngine(KiwoomConfig(access_token="token", order_rate_limit=100), submit)
+        algo = engine.start("TWAP", OrderRequest("005930", 20), False, twap_schedule(20, 3_600, 2))
+        while algo.children[0].status != "sent":
+            await asyncio.sleep(0)
+        engine.cancel(algo.algo_id)
+        await asyncio.wait_for(algo.task, 1)
+        return algo
+
+    algo = asyncio.run(scenario())
+    assert algo.status == "cancelled"
+    assert [c.status for c in algo.children] == ["sent", "cancelled"]
+
+
+@pytest.fixture
+def utc_host(monkeypatch):
+    if not hasattr(time, "tzset"):
+        pytest.skip("time.tzset is not available")
+    monkeypatch.setenv("TZ", "UTC")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_vwap_buckets_follow_the_kst_session_on_a_utc_host(utc_host):
+    open_at = datetime(2026, 10, 19, 9, 0, tzinfo=KST).timestamp()
+    step = VOLUME_PROFILE_BUCKET_MINUTES * 60
+    # Slices at 09:00 and 09:30 KST; only the second bucket trades
+    children = vwap_schedule(100, 2 * step, 2, start=open_at, volume_profile=[0.0, 1.0])
+    assert [(c.quantity, c.scheduled_at) for c in children] == [(100, open_at + step)]
+
+
+def test_algo_rejects_unknown_side():
+    class _Engine:
+        def start(self, *args):
+            raise AssertionError("must not start")
+
+    handler = AlgoHandler(KiwoomConfig(access_token="token"), _Engine())
+    result = asyncio.run(handler.start_algo_order({"stock_code": "005930", "quantity": 10, "side": "sel"}))
+    assert result[0].text.startswith("❌") and "sel" in result[0].text
@@ -0,0 +1,74 @@
+import asyncio
+import os
+from array import array
+
+import pytest
+
+from engine.analytics import ScreenParams, screen_shared
+from engine.executor import AnalyticsExecutor
+from handlers.analytics import AnalyticsHandler
+
+
+def _handler(strategy_dir):
+    return AnalyticsHandler(None, None, str(strategy_dir) if strategy_dir else None)
+
+
+def _write(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("async def on_bar(ctx):\n    pass\n")
+    return path
+
+
+def test_strategy_paths_resolve_inside_strategy_dir(tmp_path):
+    strategies = tmp_path / "strategies"
+    inside = _write(strategies / "nested" / "momentum.py")
+    handler = _handler(strategies)
+
+    assert handler.strategy_file("nested/momentum.py") == str(inside.resolve())
+    assert handler.strategy_file(str(inside)) == str(inside.resolve())
+
+
+def test_strategy_paths_outside_strategy_dir_are_rejected(tmp_path):
+    strategies = tmp_path / "strategies"
+    strategies.mkdir()
+    outside = _write(tmp_path / "evil.py")
+    handler = _handler(strategies)
+
+    for path in ("../evil.py", str(outside)):
+        with pytest.raises(ValueError):
+            handler.strategy_file(path)
+
+    os.symlink(outside, strategies / "link.py")
+    with pytest.raises(ValueError):
+        handler.strategy_file("link.py")
+
+
+def test_backtests_are_cli_only_without_strategy_dir(tmp_path):
+    strategy = _write(tmp_path / "momentum.py")
+    handler = _handler(None)
+
+    result = asyncio.run(handler.run_backtest({"data_path": "bars.csv", "strategy_path": str(strategy)}))
+    assert "STRATEGY_DIR" in result[0].text
+
+
+def test_shared_screen_matches_across_worker_processes():
+    columns = {
+        "UP": array("q", range(10_000, 10_060)),
+        "DOWN": array("q", range(20_000, 19_940, -1)),
+        "SHORT": array("q", [5_000, 5_100]),
+    }
+    params = ScreenParams(lookback=20, sma_short=5, sma_long=20, rsi_period=14)
+
+    async def screen(workers):
+        executor = AnalyticsExecutor(workers)
+        try:
+            rows = await executor.map_shared(screen_shared, columns, params)
+        finally:
+            executor.shutdown()
+        return {row.stock_code: row for row in rows}
+
+    inline = asyncio.run(screen(0))
+    pooled = asyncio.run(screen(2))
+    assert inline == pooled
+    assert inline["UP"].trend_up and not inline["DOWN"].trend_up
+    assert inline["SHORT"].rsi is None
@@ -0,0 +1,86 @@
+import asyncio
+import types
+
+import pytest
+from mcp.server import Server
+
+from backtest import Backtester, run_report
+from engine.history import HistoricalBars
+
+
+# The backtester builds the whole server, which registers tools through the decorator API
+pytestmark = pytest.mark.skipif(
+    not hasattr(Server, "list_tools"), reason="installed mcp has no decorator-based Server API"
+)
+
+
+BARS = (
+    "date,stock_code,open,high,low,close,volume\n"
+    "2026-10-15,A005930,70000,71000,69000,70500,1000\n"
+    "2026-10-16,A005930,70500,72000,68000,71500,1000\n"
+    "2026-10-19,A005930,71500,73000,71000,72000,1000\n"
+)
+
+
+def _bars(tmp_path):
+    path = tmp_path / "bars.csv"
+    path.write_text(BARS, encoding="utf-8")
+    return HistoricalBars.from_csv(str(path))
+
+
+def test_strategy_trades_at_the_open_and_resting_limits_fill_intraday(tmp_path):
+    seen = []
+
+    async def on_bar(ctx):
+        seen.append((ctx.date, list(ctx.closes("005930")), ctx.open_price("005930")))
+        if ctx.date == "20261015":
+            await ctx.buy("005930", 10)
+        elif ctx.date == "20261016":
+            await ctx.buy("005930", 5, price=68500)  # reached by the day's low
+
+    strategy = types.SimpleNamespace(on_bar=on_bar)
+    report = asyncio.run(Backtester(_bars(tmp_path), strategy, initial_cash=10_000_000).run())
+
+    assert seen[0] == ("20261015", [], 70000)
+    assert seen[2] == ("20261019", [70500, 71500], 71500)
+    assert (report.start, report.end, report.days, report.bars) == ("20261015", "20261019", 3, 3)
+    assert (report.orders, report.fills, report.rejected) == (2, 2, 0)
+    assert report.traded_notional == 10 * 70000 + 5 * 68500
+    assert report.final_equity == 10_000_000 - report.traded_notional + 15 * 72000
+    assert [date for date, _ in report.equity_curve] == ["20261015", "20261016", "20261019"]
+
+
+def test_run_report_loads_the_strategy_file(tmp_path):
+    (tmp_path / "bars.csv").write_text(BARS, encoding="utf-8")
+    strategy = tmp_path / "hold.py"
+    strategy.write_text("def setup(ctx):\n    ctx.state['ready'] = True\n", encoding="utf-8")
+
+    text = run_report(str(tmp_path / "bars.csv"), str(strategy), cash=5_000_000)
+    assert "20261015 ~ 20261019" in text
+    assert "손익: +0원" in text and "주문: 0건" in text
+
+
+def test_quotes_and_account_follow_the_bars_across_days(tmp_path):
+    path = tmp_path / "moving.csv"
+    path.write_text(
+        "date,stock_code,open,high,low,close,volume\n"
+        "20261015,005930,70000,70000,70000,70000,1\n"
+        "20261016,005930,80000,80000,80000,80000,1\n"
+        "20261019,005930,90000,90000,90000,90000,1\n",
+        encoding="utf-8"
+    )
+    quotes, accounts = [], []
+
+    async def on_bar(ctx):
+        if ctx.date == "20261015":
+            await ctx.buy("005930", 1)
+        quotes.append(await ctx.call_tool("get_quote", stock_code="005930"))
+        accounts.append(await ctx.call_tool("get_paper_account"))
+
+    backtester = Backtester(HistoricalBars.from_csv(str(path)), types.SimpleNamespace(on_bar=on_bar))
+    asyncio.run(backtester.run())
+
+    for text, price in zip(quotes, ("70,000", "80,000", "90,000")):
+        assert f"현재가 {price}원" in text
+    assert len(set(accounts)) == 3
+    assert backtester.server.response_cache.stats.hits == 0
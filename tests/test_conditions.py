@@ -0,0 +1,93 @@
+import asyncio
+
+from engine.conditions import ConditionSearchEngine
+
+
+class _Channel:
+    """Real-time channel double answering condition messages from a script"""
+
+    def __init__(self, replies):
+        self.replies = replies
+        self.sent = []
+        self.message_listeners = {}
+        self.real_listeners = []
+
+    def add_message_listener(self, trnm, listener):
+        self.message_listeners[trnm] = listener
+
+    def add_real_listener(self, listener):
+        self.real_listeners.append(listener)
+
+    def add_connect_listener(self, listener):
+        pass
+
+    async def send(self, message):
+        self.sent.append(message)
+        reply = dict(self.replies[message["trnm"]].pop(0), trnm=message["trnm"])
+        asyncio.get_running_loop().call_soon(self.message_listeners[message["trnm"]], reply)
+        return True
+
+    def push(self, seq, code, action):
+        for listener in self.real_listeners:
+            listener("02", seq, {"841": seq, "9001": code, "843": action})
+
+
+def _rows(*codes):
+    return [{"9001": "A" + code} for code in codes]
+
+
+def test_scans_page_through_results_and_report_only_changes():
+    channel = _Channel({"CNSRREQ": [
+        {"data": _rows("005930", "000660"), "cont_yn": "Y", "next_key": "k1"},
+        {"data": _rows("035420"), "cont_yn": "N"},
+        {"data": _rows("005930", "035420", "035720")},
+    ]})
+    engine = ConditionSearchEngine(channel)
+    diffs = []
+    engine.add_listener(diffs.append)
+
+    async def main():
+        return await engine.search("1"), await engine.search("1")
+
+    first, second = asyncio.run(main())
+    assert first.added == ["000660", "005930", "035420"] and not first.removed
+    assert (second.added, second.removed) == (["035720"], ["000660"])
+    assert [sent["cont_yn"] for sent in channel.sent] == ["N", "Y", "N"]
+    assert [diff.event_id for diff in diffs] == [1, 2]
+
+
+def test_live_hits_stream_entries_and_exits_until_stopped():
+    channel = _Channel({
+        "CNSRREQ": [{"data": _rows("005930")}],
+        "CNSRCLR": [{}],
+    })
+    engine = ConditionSearchEngine(channel)
+
+    async def main():
+        await engine.search("7", live=True)
+        channel.push("7", "A000660", "I")
+        channel.push("7", "A000660", "I")  # repeated entry is not a change
+        channel.push("7", "A005930", "D")
+        assert await engine.stop("7")
+        channel.push("7", "A035420", "I")
+
+    asyncio.run(main())
+    assert engine.conditions["7"].codes == {"000660"}
+    assert [(e.added, e.removed, e.source) for e in engine.events_since(1)] == [
+        (["000660"], [], "live"), ([], ["005930"], "live")
+    ]
+    assert channel.sent[0]["search_type"] == "1"
+
+
+def test_failed_live_request_leaves_the_condition_idle():
+    channel = _Channel({"CNSRREQ": [{"return_code": 1, "return_msg": "조건식 없음"}]})
+    engine = ConditionSearchEngine(channel)
+
+    async def main():
+        try:
+            await engine.search("9", live=True)
+        except RuntimeError as e:
+            return str(e)
+
+    assert asyncio.run(main()) == "조건식 없음"
+    assert not engine.conditions["9"].live
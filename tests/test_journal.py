@@ -0,0 +1,190 @@
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+
+import handlers.journal as journal_handlers
+from config.settings import KiwoomConfig
+from engine.journal import (
+    JournalEntry, OrderJournal, STATUS_INTENT, STATUS_NOT_SUBMITTED, STATUS_SUBMITTED, history_dates,
+    match_in_doubt
+)
+from engine.sessions import KST
+from handlers.journal import JournalHandler
+from kiwoom.client import KiwoomAPIClient
+from models.types import OrderHistoryItem, OrderRequest
+
+
+def _ts(text: str) -> float:
+    """Epoch seconds of a KST wall-clock time"""
+    return datetime.strptime(text, "%Y%m%d %H%M%S").replace(tzinfo=KST).timestamp()
+
+
+def _entry(created: str, quantity: int = 10, journal_id: str = "j1") -> JournalEntry:
+    at = _ts(created)
+    return JournalEntry(journal_id, at, at, "manual", "buy", "005930", quantity, "", "시장가", "KRX", STATUS_INTENT)
+
+
+def _item(order_number: str, order_time: str, quantity: int = 10) -> OrderHistoryItem:
+    return OrderHistoryItem(order_number, "005930", "buy", quantity, "", 0, order_time)
+
+
+def test_match_ignores_orders_after_the_window():
+    entry = _entry("20250102 100000")
+    later = _item("0002", "103000")
+    assert match_in_doubt([entry], {"20250102": [later]}) == {"j1": None}
+
+    sent = _item("0001", "100001")
+    assert match_in_doubt([entry], {"20250102": [later, sent]})["j1"] is sent
+
+
+def test_match_prefers_closest_and_claims_each_order_once():
+    first = _entry("20250102 100000", journal_id="a")
+    second = _entry("20250102 100010", journal_id="b")
+    early, late = _item("0001", "100001"), _item("0002", "100011")
+    matches = match_in_doubt([second, first], {"20250102": [late, early]})
+    assert matches["a"] is early
+    assert matches["b"] is late
+
+
+def test_match_window_spans_midnight():
+    entry = _entry("20250102 235958")
+    next_day = _item("0001", "000003")
+    assert match_in_doubt([entry], {"20250102": [], "20250103": [next_day]})["j1"] is next_day
+    # The same HHMMSS on the entry's own day is almost a day earlier
+    assert match_in_doubt([entry], {"20250102": [next_day]})["j1"] is None
+
+
+@pytest.fixture
+def utc_host(monkeypatch):
+    if not hasattr(time, "tzset"):
+        pytest.skip("time.tzset is not available")
+    monkeypatch.setenv("TZ", "UTC")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_match_uses_kst_on_a_utc_host(utc_host):
+    # 00:00:10 KST is still the previous day in UTC
+    entry = _entry("20250103 000010")
+    assert history_dates(entry) == ["20250103"]
+    sent = _item("0001", "000011")
+    assert match_in_doubt([entry], {"20250103": [sent]})["j1"] is sent
+
+
+class PagedTransport:
+    """Serves kt00007 pages keyed by next-key, recording the continuation headers sent"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+
+    def send(self, method, url, headers, data):
+        self.requests.append((headers["cont-yn"], headers["next-key"]))
+        return 200, dict(self.pages[headers["next-key"]])
+
+
+def _page(rows, next_key=None):
+    page = {
+        "return_code": 0,
+        "acnt_ord_cntr_prps_dtl": [
+            {"ord_no": no, "stk_cd": "A005930", "io_tp_nm": "현금매수", "ord_qty": "10", "ord_tm": tm}
+            for no, tm in rows
+        ],
+    }
+    if next_key:
+        page.update({"cont-yn": "Y", "next-key": next_key})
+    return page
+
+
+def test_order_history_follows_continuation_pages():
+    transport = PagedTransport({
+        "": _page([("0003", "10:05:00")], "k1"),
+        "k1": _page([("0002", "10:01:00")], "k2"),
+        "k2": _page([("0001", "10:00:01")]),
+    })
+    history = KiwoomAPIClient(transport=transport).get_order_history("token", "20250102")
+    assert [item.order_number for item in history.items] == ["0003", "0002", "0001"]
+    assert history.complete
+    assert transport.requests == [("N", ""), ("Y", "k1"), ("Y", "k2")]
+
+    truncated = KiwoomAPIClient(transport=transport).get_order_history("token", "20250102", max_pages=2)
+    assert truncated.success and not truncated.complete
+    assert len(truncated.items) == 2
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = OrderJournal(str(tmp_path / "journal.db"), commit_interval_ms=1)
+    journal.open()
+    yield journal
+    journal.close()
+
+
+def _reconcile(journal, transport, monkeypatch):
+    monkeypatch.setattr(journal_handlers, "create_client", lambda config: KiwoomAPIClient(transport=transport))
+    handler = JournalHandler(KiwoomConfig(access_token="token"), journal)
+    resolved, unresolved = handler.reconcile()
+    asyncio.run(journal.flush())
+    return resolved, unresolved
+
+
+def _intents(journal, count, settle=True):
+    async def record():
+        ids = await asyncio.gather(*(
+            journal.record_intent(OrderRequest("005930", 10), True) for _ in range(count)
+        ))
+        if settle:
+            for journal_id in ids:
+                journal.settle(journal_id)
+        return ids
+    return asyncio.run(record())
+
+
+def test_group_commit_persists_concurrent_intents(journal):
+    ids = _intents(journal, 50)
+    assert {entry.journal_id for entry in journal.in_doubt()} == set(ids)
+
+
+def test_reconcile_finds_order_on_a_later_page(journal, monkeypatch, utc_host):
+    _intents(journal, 1)
+    order_time = datetime.now(KST).strftime("%H:%M:%S")
+    transport = PagedTransport({
+        "": _page([("0009", "00:00:00")], "k1"),
+        "k1": _page([("0001", order_time)]),
+    })
+
+    resolved, unresolved = _reconcile(journal, transport, monkeypatch)
+    assert [entry.status for entry in resolved] == [STATUS_SUBMITTED]
+    assert resolved[0].order_number == "0001"
+    assert unresolved == []
+    assert journal.in_doubt() == []
+
+
+def test_reconcile_keeps_unmatched_in_doubt_when_history_is_partial(journal, monkeypatch):
+    _intents(journal, 1)
+    pages = {str(i): _page([(f"{i:04d}", "00:00:00")], str(i + 1)) for i in range(60)}
+    pages[""] = pages["0"]
+
+    resolved, unresolved = _reconcile(journal, PagedTransport(pages), monkeypatch)
+    assert resolved == []
+    assert len(unresolved) == 1
+    assert len(journal.in_doubt()) == 1
+
+
+def test_reconcile_marks_unmatched_not_submitted_after_full_read(journal, monkeypatch):
+    _intents(journal, 1)
+    resolved, unresolved = _reconcile(journal, PagedTransport({"": _page([])}), monkeypatch)
+    assert [entry.status for entry in resolved] == [STATUS_NOT_SUBMITTED]
+    assert unresolved == []
+
+
+def test_reconcile_skips_intents_still_being_sent(journal, monkeypatch):
+    _intents(journal, 1, settle=False)
+    transport = PagedTransport({"": _page([])})
+    assert _reconcile(journal, transport, monkeypatch) == ([], [])
+    assert transport.requests == []
+    assert len(journal.in_doubt()) == 1
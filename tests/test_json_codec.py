@@ -0,0 +1,39 @@
+import json
+from decimal import Decimal
+
+import pytest
+
+from models.types import HoldingItem, OrderResponse
+from utils import json_codec
+
+
+@pytest.fixture(params=sorted(json_codec.CODECS))
+def codec(request):
+    previous = json_codec.codec_name()
+    json_codec.set_codec(request.param)
+    yield request.param
+    json_codec.set_codec(previous)
+
+
+def test_codecs_agree_on_compact_non_ascii_output(codec):
+    data = {"return_msg": "정상적으로 처리되었습니다", "cntr_qty": 3, "items": [1.5, None, True]}
+    assert json_codec.dumps(data) == json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    assert json_codec.loads(json_codec.dumps(data).encode("utf-8")) == data
+    assert json_codec.dumps({"b": 1, "a": 2}, sort_keys=True) == '{"a":2,"b":1}'
+    assert json_codec.dumps({"a": [1]}, indent=True) == '{\n  "a": [\n    1\n  ]\n}'
+    assert json_codec.dumps({"price": Decimal("70000")}, default=str) == '{"price":"70000"}'
+
+
+def test_set_codec_rejects_unknown_names():
+    assert json_codec.set_codec("auto") == json_codec.DEFAULT_CODEC
+    with pytest.raises(ValueError):
+        json_codec.set_codec("simdjson")
+
+
+def test_hot_path_models_have_no_instance_dict():
+    response = OrderResponse(success=True, order_number="0000123")
+    holding = HoldingItem("005930", "삼성전자", 1, 1, 70_000, 70_000)
+    for model in (response, holding):
+        assert not hasattr(model, "__dict__")
+    with pytest.raises(AttributeError):
+        response.unknown = 1
@@ -0,0 +1,54 @@
+import json
+import logging
+
+import pytest
+
+from utils.logging import (
+    AUDIT_LOGGER_NAME, LazyQueueHandler, SamplingFilter, audit, parse_sampling, setup_logging, shutdown_logging
+)
+
+
+@pytest.fixture
+def root_level():
+    root = logging.getLogger()
+    level = root.level
+    yield
+    shutdown_logging()
+    root.setLevel(level)
+
+
+def _queue_handlers(logger):
+    return [h for h in logger.handlers if isinstance(h, LazyQueueHandler)]
+
+
+def test_shutdown_flushes_audit_records_and_detaches_queue_handlers(tmp_path, root_level):
+    path = tmp_path / "audit.log"
+    setup_logging("INFO", audit_path=str(path))
+    audit_logger = logging.getLogger(AUDIT_LOGGER_NAME)
+    assert _queue_handlers(logging.getLogger()) and _queue_handlers(audit_logger)
+
+    audit("order_sent", "sent %s", "005930", ord_no="0000123", latency_ms=1.5)
+    shutdown_logging()
+
+    assert not _queue_handlers(logging.getLogger())
+    assert not _queue_handlers(audit_logger)
+    record = json.loads(path.read_text(encoding="utf-8"))
+    assert (record["event"], record["msg"], record["ord_no"]) == ("order_sent", "sent 005930", "0000123")
+
+    # A later setup starts fresh pipelines instead of returning early
+    setup_logging("INFO")
+    assert len(_queue_handlers(logging.getLogger())) == 1
+
+
+def test_sampling_keeps_warnings_and_longest_prefix_wins():
+    rates = parse_sampling("kiwoom=1, kiwoom.client=0")
+    assert rates == {"kiwoom": 1.0, "kiwoom.client": 0.0}
+    sampler = SamplingFilter(rates)
+
+    def record(name, level=logging.INFO):
+        return logging.LogRecord(name, level, __file__, 1, "msg", (), None)
+
+    assert not sampler.filter(record("kiwoom.client.http"))
+    assert sampler.filter(record("kiwoom.client", logging.WARNING))
+    assert sampler.filter(record("kiwoom.realtime"))
+    assert sampler.filter(record("engine.triggers"))
@@ -0,0 +1,117 @@
+import itertools
+
+from engine.order_book import (
+    STATUS_CANCELLED, STATUS_FILLED, STATUS_OPEN, STATUS_REJECTED, STATUS_STOP, BookOrder, FillLog, OrderBook
+)
+from kiwoom.paper import PaperBroker, PaperTradingClient
+from models.types import OrderRequest
+
+_numbers = itertools.count(1)
+
+
+def _order(is_buy, quantity, code="0", price=0, stop_price=0):
+    return BookOrder(f"{next(_numbers):07d}", "005930", is_buy, quantity, code, price, stop_price)
+
+
+def _book(quote_depth=None, price=70_000, bid=69_900, ask=70_000):
+    book = OrderBook("005930", quote_depth)
+    book.update(price, bid, ask)
+    return book
+
+
+def test_resting_limits_fill_at_their_price_in_price_time_order():
+    book = _book()
+    low = _order(True, 10, price=69_500)
+    first = _order(True, 10, price=69_800)
+    second = _order(True, 10, price=69_800)
+    for order in (low, first, second):
+        assert book.submit(order) == [] and order.status == STATUS_OPEN
+
+    book.quote_depth = 15
+    fills = book.update(69_800, 69_700, 69_800)
+    assert [(f.order_number, f.quantity, f.price) for f in fills] == [
+        (first.order_number, 10, 69_800), (second.order_number, 5, 69_800)
+    ]
+    assert first.status == STATUS_FILLED and second.remaining == 5 and low.filled_quantity == 0
+
+
+def test_marketable_orders_take_the_quote_up_to_its_depth():
+    book = _book(quote_depth=30)
+    market = _order(True, 20, code="3")
+    fills = book.submit(market)
+    assert [(f.quantity, f.price) for f in fills] == [(20, 70_000)]
+
+    ioc = _order(True, 20, code="10", price=70_000)
+    book.submit(ioc)
+    assert (ioc.filled_quantity, ioc.status) == (10, STATUS_CANCELLED)
+
+
+def test_fok_is_all_or_nothing():
+    book = _book(quote_depth=10)
+    fok = _order(False, 11, code="20", price=69_900)
+    assert book.submit(fok) == []
+    assert fok.status == STATUS_CANCELLED
+
+    fok = _order(False, 10, code="20", price=69_900)
+    assert [(f.quantity, f.price) for f in book.submit(fok)] == [(10, 69_900)]
+
+
+def test_market_order_without_quotes_is_rejected():
+    book = OrderBook("005930")
+    order = _order(True, 1, code="3")
+    book.submit(order)
+    assert order.status == STATUS_REJECTED
+
+
+def test_stop_limit_activates_when_the_trade_crosses_the_stop():
+    book = _book()
+    stop = _order(False, 5, code="28", price=68_000, stop_price=69_000)
+    book.submit(stop)
+    assert stop.status == STATUS_STOP
+
+    assert book.update(69_500, 69_400, 69_500) == []
+    fills = book.update(68_900, 68_800, 68_900)
+    assert [(f.quantity, f.price) for f in fills] == [(5, 68_800)]
+
+
+def test_cancelled_orders_are_skipped_when_the_market_reaches_them():
+    book = _book()
+    order = _order(True, 10, price=69_800)
+    book.submit(order)
+    assert book.cancel(order) and not book.cancel(order)
+    assert book.update(69_700, 69_600, 69_700) == []
+    assert not book.has_resting()
+
+
+def test_fill_log_rebuilds_fills():
+    book = _book()
+    log = FillLog()
+    for fill in book.submit(_order(True, 3, code="3")) + book.submit(_order(False, 2, code="3")):
+        log.append(fill)
+    assert len(log) == 2
+    assert (log[-1].is_buy, log[-1].price) == (False, 69_900)
+    assert log.notional() == 3 * 70_000 + 2 * 69_900
+
+
+def test_paper_broker_reserves_cash_and_shares_for_open_orders():
+    broker = PaperBroker(initial_cash=1_000_000)
+    broker.update_market("005930", 70_000, 69_900, 70_000)
+
+    resting = broker.place(OrderRequest("005930", 10, "69000", "보통"), True, "0")
+    assert resting.status == STATUS_OPEN and broker.reserved_cash == 690_000
+    over = broker.place(OrderRequest("005930", 5, "70000", "보통"), True, "0")
+    assert over.status == STATUS_REJECTED
+
+    broker.cancel(resting.order_number)
+    assert broker.reserved_cash == 0
+    broker.place(OrderRequest("005930", 10, "", "시장가"), True, "3")
+    assert broker.cash == 300_000
+
+    sell = broker.place(OrderRequest("005930", 4, "75000", "보통"), False, "0")
+    assert broker.place(OrderRequest("005930", 7, "", "시장가"), False, "3").status == STATUS_REJECTED
+    assert [o.order_number for o in broker.open_orders()] == [sell.order_number]
+
+    [holding] = PaperTradingClient(broker).get_holdings("token").items
+    assert (holding.quantity, holding.available_quantity, holding.average_price, holding.current_price) == (
+        10, 6, 70_000, 70_000
+    )
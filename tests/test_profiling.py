@@ -0,0 +1,90 @@
+import asyncio
+import os
+import pstats
+
+import pytest
+
+from handlers.profiling import ProfilingHandler
+from utils.profiling import (
+    LatencyProfiler, OrderTrace, RuntimeProfiler, get_latency_profiler, leg_trace, mark, order_trace
+)
+
+
+def test_latency_profiler_aggregates_stage_durations():
+    latency = LatencyProfiler(enabled=True)
+    for scale in (1, 3):
+        latency.record(OrderTrace("manual", 0.0, [("risk", 0.001 * scale), ("upstream", 0.011 * scale)]))
+
+    assert latency.stages["risk"].count == 2
+    assert latency.stages["upstream"].mean == pytest.approx(0.020)
+    assert latency.totals.max == pytest.approx(0.033)
+    assert latency.slowest(1)[0].total == pytest.approx(0.033)
+
+
+def test_profile_dumps_stay_in_output_dir(tmp_path):
+    runtime = RuntimeProfiler(str(tmp_path))
+    runtime.start("cprofile")
+    for name in ("../escape.pstats", str(tmp_path.parent / "escape.pstats"), ".."):
+        with pytest.raises(ValueError):
+            runtime.stop(name)
+    assert runtime.mode == "cprofile"
+
+    path, calls = runtime.stop("run.pstats")
+    assert path == os.path.join(str(tmp_path), "run.pstats")
+    assert calls > 0
+    pstats.Stats(path)
+
+
+def test_set_profiling_refuses_paths_and_keeps_running(tmp_path):
+    runtime = RuntimeProfiler(str(tmp_path))
+    handler = ProfilingHandler(LatencyProfiler(), runtime)
+
+    async def main():
+        await handler.set_profiling({"profiler": "sampling", "interval_ms": 1})
+        refused = await handler.set_profiling({"profiler": "off", "output_name": "/tmp/x.folded"})
+        stopped = await handler.set_profiling({"profiler": "off", "output_name": "x.folded"})
+        return refused, stopped
+
+    refused, stopped = asyncio.run(main())
+    assert "output_name" in refused[0].text
+    assert str(tmp_path / "x.folded") in stopped[0].text
+    assert runtime.mode is None
+
+
+def test_sampling_interval_below_one_ms_is_refused(tmp_path):
+    runtime = RuntimeProfiler(str(tmp_path))
+    handler = ProfilingHandler(LatencyProfiler(), runtime)
+
+    refused = asyncio.run(handler.set_profiling({"profiler": "sampling", "interval_ms": 0}))
+    assert "interval_ms" in refused[0].text
+    assert runtime.mode is None
+    with pytest.raises(ValueError):
+        runtime.start("sampling", 0)
+
+
+def test_split_order_records_one_trace_per_leg():
+    latency = get_latency_profiler()
+    latency.reset()
+    latency.enabled = True
+
+    async def send(leg):
+        with leg_trace(leg):
+            mark("upstream")
+            await asyncio.sleep(0)
+            mark("response")
+
+    async def main():
+        with order_trace("manual"):
+            mark("risk")
+            await asyncio.gather(send("KRX"), send("NXT"))
+
+    try:
+        asyncio.run(main())
+        traces = sorted(latency.traces, key=lambda t: t.source)
+    finally:
+        latency.enabled = False
+        latency.reset()
+
+    assert [t.source for t in traces] == ["manual/KRX", "manual/NXT"]
+    for trace in traces:
+        assert [stage for stage, _ in trace.marks] == ["risk", "upstream", "response"]
@@ -0,0 +1,100 @@
+import asyncio
+import json
+
+from config.settings import KiwoomConfig
+from engine.market_data import MarketDataCache
+from engine.reference import ReferenceDataCache
+from handlers.resources import POSITIONS_URI, ResourceHandler
+from kiwoom.client import KiwoomAPIClient
+from kiwoom.paper import PaperBroker
+from models.types import HoldingItem, OrderRequest
+
+
+class _Session:
+    def __init__(self):
+        self.updated = []
+
+    async def send_resource_updated(self, uri):
+        self.updated.append(uri)
+
+
+def _handler(reference, paper_broker=None):
+    return ResourceHandler(
+        KiwoomConfig(), MarketDataCache(), reference, None, None,
+        paper_broker=paper_broker, notify_interval=0.01
+    )
+
+
+def test_live_positions_come_from_account_holdings():
+    reference = ReferenceDataCache()
+    handler = _handler(reference)
+    assert json.loads(handler.read(POSITIONS_URI)) == {"source": "holdings", "loaded_at": None, "positions": []}
+
+    reference.set_holdings([
+        HoldingItem("005930", "삼성전자", 10, 7, 70_000, 71_000),
+        HoldingItem("000660", "SK하이닉스", 0, 0, 0, 120_000),
+    ])
+    data = json.loads(handler.read(POSITIONS_URI))
+    assert data["loaded_at"] == reference.loaded_at["holdings"]
+    assert data["positions"] == [{
+        "stock_code": "005930", "name": "삼성전자", "quantity": 10, "available_quantity": 7,
+        "average_price": 70_000, "current_price": 71_000,
+    }]
+
+
+def test_paper_positions_come_from_the_broker():
+    broker = PaperBroker(initial_cash=10_000_000)
+    broker.update_market("005930", 70_000, 69_900, 70_000)
+    broker.place(OrderRequest("005930", 10, "70000", "보통"), True, "0")
+
+    data = json.loads(_handler(ReferenceDataCache(), broker).read(POSITIONS_URI))
+    assert data["source"] == "paper"
+    assert data["cash"] == 10_000_000 - 700_000
+    assert [(p["stock_code"], p["quantity"]) for p in data["positions"]] == [("005930", 10)]
+
+
+def test_holdings_refresh_notifies_subscribers_once():
+    reference = ReferenceDataCache()
+    handler = _handler(reference)
+    reference.add_holdings_listener(handler.on_holdings)
+    session = _Session()
+
+    async def main():
+        handler.subscribe(POSITIONS_URI, session)
+        for _ in range(3):
+            reference.set_holdings([HoldingItem("005930", "", 10, 10, 70_000, 71_000)])
+        await asyncio.sleep(0.05)
+
+    asyncio.run(main())
+    assert session.updated == [POSITIONS_URI]
+
+
+class _HoldingPages:
+    """kt00018 transport serving one holding per page, keyed by next-key"""
+
+    def __init__(self, codes):
+        self.codes = codes
+        self.headers = []
+
+    def send(self, method, url, headers, data):
+        self.headers.append((headers["cont-yn"], headers["next-key"]))
+        index = int(headers["next-key"] or 0)
+        page = {"return_code": 0, "acnt_evlt_remn_indv_tot": [
+            {"stk_cd": "A" + self.codes[index], "rmnd_qty": "10", "pur_pric": "1000", "cur_prc": "1100"}
+        ]}
+        if index + 1 < len(self.codes):
+            page.update({"cont-yn": "Y", "next-key": str(index + 1)})
+        return 200, page
+
+
+def test_holdings_follow_continuation_pages_into_positions():
+    transport = _HoldingPages(["005930", "000660", "035420"])
+    holdings = KiwoomAPIClient(transport=transport).get_holdings("token")
+    assert holdings.complete
+    assert [item.stock_code for item in holdings.items] == ["005930", "000660", "035420"]
+    assert transport.headers == [("N", ""), ("Y", "1"), ("Y", "2")]
+
+    reference = ReferenceDataCache()
+    reference.set_holdings(holdings.items)
+    positions = json.loads(_handler(reference).read(POSITIONS_URI))["positions"]
+    assert len(positions) == 3
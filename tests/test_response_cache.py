@@ -0,0 +1,128 @@
+import asyncio
+
+import mcp.types as types
+import pytest
+
+from utils.response_cache import ResponseCache, make_key
+
+
+def _text(value):
+    return [types.TextContent(type="text", text=value)]
+
+
+def test_concurrent_identical_calls_share_one_upstream_call():
+    cache = ResponseCache()
+    key = make_key("get_quote", {"stock_code": "005930"}, "acct")
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return _text("70,000원")
+
+    async def main():
+        results = await asyncio.gather(*(cache.get_or_call(key, 5, call) for _ in range(5)))
+        cached = await cache.get_or_call(key, 5, call)
+        return results, cached
+
+    results, cached = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(result[0].text == "70,000원" for result in results + [cached])
+    assert (cache.stats.misses, cache.stats.coalesced, cache.stats.hits) == (1, 4, 1)
+
+
+def test_cancelled_leader_does_not_cancel_joiners():
+    cache = ResponseCache()
+    key = make_key("get_quote", {"stock_code": "005930"}, "acct")
+
+    async def main():
+        leader_started = asyncio.Event()
+
+        async def slow():
+            leader_started.set()
+            await asyncio.sleep(10)
+
+        async def fast():
+            return _text("joined")
+
+        leader = asyncio.create_task(cache.get_or_call(key, 5, slow))
+        await leader_started.wait()
+        joiner = asyncio.create_task(cache.get_or_call(key, 5, fast))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await joiner
+
+    assert asyncio.run(main())[0].text == "joined"
+    assert not cache._inflight
+
+
+def test_cancelled_joiner_leaves_the_leader_running():
+    cache = ResponseCache()
+    key = make_key("get_quote", {}, "acct")
+
+    async def call():
+        await asyncio.sleep(0.01)
+        return _text("leader")
+
+    async def main():
+        leader = asyncio.create_task(cache.get_or_call(key, 5, call))
+        await asyncio.sleep(0)
+        joiner = asyncio.create_task(cache.get_or_call(key, 5, call))
+        await asyncio.sleep(0)
+        joiner.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await joiner
+        return await leader
+
+    assert asyncio.run(main())[0].text == "leader"
+
+
+def test_failures_are_not_cached_and_invalidation_drops_results():
+    cache = ResponseCache()
+    key = make_key("get_balance", {}, "acct")
+    outcomes = [RuntimeError("upstream"), _text("first"), _text("second")]
+
+    async def call():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            await cache.get_or_call(key, 5, call)
+        assert (await cache.get_or_call(key, 5, call))[0].text == "first"
+        assert (await cache.get_or_call(key, 5, call))[0].text == "first"
+        assert cache.invalidate(["get_balance"]) == 1
+        return await cache.get_or_call(key, 5, call)
+
+    assert asyncio.run(main())[0].text == "second"
+
+
+def test_invalidating_one_tool_keeps_others_and_works_from_threads():
+    cache = ResponseCache()
+    quote, journal = make_key("get_quote", {}, "acct"), make_key("get_order_journal", {}, "acct")
+    release = asyncio.Event()
+
+    async def _async(value):
+        return value
+
+    async def slow():
+        await release.wait()
+        return _text("journal")
+
+    async def main():
+        pending = asyncio.create_task(cache.get_or_call(journal, 5, slow))
+        await cache.get_or_call(quote, 5, lambda: _async(_text("70,000")))
+        await asyncio.sleep(0)
+        # A tick from a worker thread lands on the loop without touching the journal call
+        await asyncio.to_thread(cache.invalidate_threadsafe, ["get_quote"])
+        await asyncio.sleep(0)
+        release.set()
+        await pending
+        return await cache.get_or_call(quote, 5, lambda: _async(_text("80,000")))
+
+    assert asyncio.run(main())[0].text == "80,000"
+    assert len(cache) == 2 and cache.stats.invalidations == 1
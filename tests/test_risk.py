@@ -0,0 +1,179 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+import handlers.journal as journal_handlers
+from config.settings import KiwoomConfig, RiskConfig
+from engine.journal import OrderJournal
+from engine.risk import RiskGate
+from engine.sessions import KST
+from handlers import orders
+from handlers.journal import JournalHandler
+from kiwoom.client import KiwoomAPIClient
+from kiwoom.paper import PaperBroker
+from models.exceptions import OrderError, RiskLimitError
+from models.types import HoldingItem, OrderRequest
+
+
+def _gate(**limits):
+    return RiskGate(RiskConfig(**limits), lambda code: 70_000)
+
+
+def _order(quantity, price="70000"):
+    return OrderRequest("005930", quantity, price, "보통")
+
+
+def _send(gate, order_number, quantity, is_buy=True, price="70000"):
+    """Book an order the way OrderHandler does and track it once accepted"""
+    delta = gate.reserve([(_order(quantity, price), is_buy)])[0]
+    gate.track(order_number, delta)
+
+
+def test_filled_then_sold_position_frees_its_limit():
+    gate = _gate(max_symbol_quantity=100)
+    _send(gate, "1", 100)
+    gate.on_fill("1", "005930", True, 100, 70_000)
+    assert gate.exposure.quantity["005930"] == 100
+    with pytest.raises(RiskLimitError):
+        gate.reserve([(_order(1), True)])
+
+    _send(gate, "2", 100, is_buy=False)
+    gate.on_fill("2", "005930", False, 100, 71_000)
+    assert gate.exposure.quantity["005930"] == 0
+    assert gate.exposure.gross == 0
+    assert not gate.orders
+
+    _send(gate, "3", 100)
+
+
+def test_fill_reprices_booking_and_cancel_releases_remainder():
+    gate = _gate(max_symbol_quantity=100)
+    _send(gate, "1", 100)
+    gate.on_fill("1", "005930", True, 40, 69_000)
+    assert gate.exposure.notional["005930"] == 40 * 69_000 + 60 * 70_000
+
+    gate.on_close("1")
+    assert gate.exposure.quantity["005930"] == 40
+    assert gate.exposure.notional["005930"] == 40 * 69_000
+    assert "1" not in gate.orders
+    _send(gate, "2", 60)
+
+
+def test_fills_and_close_before_track_are_not_double_counted():
+    gate = _gate()
+    delta = gate.reserve([(_order(10), True)])[0]
+    gate.on_fill("1", "005930", True, 4, 70_000)
+    gate.on_close("1")
+    gate.track("1", delta)
+
+    assert gate.exposure.quantity["005930"] == 4
+    assert gate.exposure.notional["005930"] == 4 * 70_000
+    assert not gate.orders
+
+
+def test_holdings_seed_exposure_under_working_orders():
+    gate = _gate()
+    _send(gate, "1", 10)
+    gate.load_holdings([HoldingItem("000660", "", 5, 5, 100_000, 120_000)])
+
+    assert gate.exposure.quantity == {"000660": 5, "005930": 10}
+    assert gate.exposure.gross == 5 * 120_000 + 10 * 70_000
+
+
+def test_live_execution_events_fill_and_cancel():
+    gate = _gate()
+    _send(gate, "0000123", 10)
+    gate.handle_real("00", "", {
+        "9203": "0000123", "9001": "A005930", "905": "+매수",
+        "911": "4", "910": "-69900", "902": "6"
+    })
+    assert gate.exposure.notional["005930"] == 4 * 69_900 + 6 * 70_000
+
+    gate.handle_real("00", "", {
+        "9203": "0000124", "904": "0000123", "9001": "A005930", "905": "매수취소", "900": "6", "902": "0"
+    })
+    assert gate.exposure.quantity["005930"] == 4
+    assert not gate.orders
+
+
+def test_paper_broker_fills_and_cancels_update_exposure():
+    broker = PaperBroker(initial_cash=100_000_000)
+    gate = _gate(max_symbol_quantity=100)
+    broker.add_fill_listener(
+        lambda fills: [gate.on_fill(f.order_number, f.stock_code, f.is_buy, f.quantity, f.price) for f in fills]
+    )
+    broker.add_close_listener(lambda order: gate.on_close(order.order_number))
+    broker.update_market("005930", 70_000, 69_900, 70_000)
+
+    def send(quantity, is_buy, price):
+        delta = gate.reserve([(_order(quantity, price), is_buy)])[0]
+        order = broker.place(_order(quantity, price), is_buy, "0")
+        gate.track(order.order_number, delta)
+        return order
+
+    send(100, True, "70000")
+    assert gate.exposure.quantity["005930"] == 100
+    resting = send(100, False, "75000")
+    assert gate.exposure.quantity["005930"] == 0
+
+    broker.cancel(resting.order_number)
+    assert gate.exposure.quantity["005930"] == 100
+    send(100, False, "69000")
+    assert gate.exposure.quantity["005930"] == 0
+    send(100, True, "70000")
+
+
+class _LostClient:
+    """Order client whose sends never get an upstream response"""
+
+    def place_order(self, **kwargs):
+        raise OrderError("Read timed out")
+
+
+class _History:
+    """kt00007 transport serving one complete page"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def send(self, method, url, headers, data):
+        return 200, {"return_code": 0, "acnt_ord_cntr_prps_dtl": self.rows}
+
+
+def _lost_send(monkeypatch, journal):
+    gate = _gate()
+    config = KiwoomConfig(access_token="token", journal_path=None, session_policy="off")
+    monkeypatch.setattr(orders, "create_client", lambda config: _LostClient())
+    handler = orders.OrderHandler(config, journal, gate)
+    with pytest.raises(OrderError):
+        asyncio.run(handler.submit_order(_order(10), True))
+    return gate, config
+
+
+@pytest.mark.parametrize("found", [True, False])
+def test_unknown_send_outcome_stays_booked_until_reconciled(tmp_path, monkeypatch, found):
+    journal = OrderJournal(str(tmp_path / "journal.db"), commit_interval_ms=1)
+    journal.open()
+    gate, config = _lost_send(monkeypatch, journal)
+    assert gate.exposure.quantity["005930"] == 10 and len(gate.in_doubt) == 1
+
+    rows = [{
+        "ord_no": "0000077", "stk_cd": "A005930", "io_tp_nm": "현금매수", "ord_qty": "10",
+        "ord_tm": datetime.now(KST).strftime("%H:%M:%S")
+    }] if found else []
+    monkeypatch.setattr(journal_handlers, "create_client", lambda config: KiwoomAPIClient(transport=_History(rows)))
+    JournalHandler(config, journal, gate).reconcile()
+    asyncio.run(journal.flush())
+    journal.close()
+
+    assert not gate.in_doubt
+    if found:
+        assert gate.exposure.quantity["005930"] == 10 and gate.orders["0000077"].remaining == 10
+    else:
+        assert gate.exposure.quantity["005930"] == 0 and not gate.orders
+
+
+def test_unknown_send_outcome_without_a_journal_is_released(monkeypatch):
+    gate, _ = _lost_send(monkeypatch, None)
+    assert gate.exposure.quantity["005930"] == 0 and not gate.in_doubt
@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+from config.settings import KiwoomConfig, RiskConfig
+from engine.market_data import MarketDataCache
+from engine.risk import RiskGate
+from engine.router import SmartOrderRouter
+from handlers import orders
+from models.types import OrderRequest, OrderResponse
+
+
+def _market(krx=(69_900, 50, 70_000, 30), nxt=(69_800, 40, 69_900, 100)):
+    market = MarketDataCache()
+    market.update_book("005930", "KRX", *krx)
+    market.update_book("005930", "NXT", *nxt)
+    return market
+
+
+def _legs(decision):
+    return [(leg.venue, leg.quantity, leg.price) for leg in decision.legs]
+
+
+def _order(quantity, trade_type="시장가", price=""):
+    return OrderRequest("005930", quantity, price, trade_type, "AUTO")
+
+
+def test_better_touch_takes_the_whole_order_when_its_size_suffices():
+    router = SmartOrderRouter(_market())
+    assert _legs(router.route(_order(80), True)) == [("NXT", 80, 69_900)]
+    assert _legs(router.route(_order(40), False)) == [("KRX", 40, 69_900)]
+
+
+def test_order_spills_to_the_other_venue_and_rest_goes_to_krx():
+    router = SmartOrderRouter(_market())
+    decision = router.route(_order(150), True)
+    assert _legs(decision) == [("NXT", 100, 69_900), ("KRX", 50, 70_000)]
+    assert sum(leg.quantity for leg in decision.legs) == 150
+
+    # A limit that only one venue reaches leaves the rest on KRX
+    limited = router.route(_order(150, "보통", "69900"), True)
+    assert _legs(limited) == [("NXT", 100, 69_900), ("KRX", 50, 0)]
+
+
+def test_primary_venue_without_usable_quotes_or_nxt():
+    stale = SmartOrderRouter(_market(), clock=lambda: time.time() + 60)
+    assert _legs(stale.route(_order(10), True)) == [("KRX", 10, 0)]
+
+    unlisted = SmartOrderRouter(_market(), nxt_enabled=lambda code: False)
+    assert unlisted.route(_order(10), True).reason == "NXT 거래 불가 종목"
+
+    router = SmartOrderRouter(_market())
+    assert _legs(router.route(_order(10, "보통", "69000"), True)) == [("KRX", 10, 0)]
+    assert router.route(_order(10, "장마감후시간외"), True).reason == "NXT 미지원 매매구분"
+
+
+def test_sessions_decide_which_venues_may_take_the_order():
+    nxt_only = SmartOrderRouter(_market(), accepts=lambda venue, trade_type: venue == "NXT")
+    assert _legs(nxt_only.route(_order(500), True)) == [("NXT", 500, 0)]
+
+    krx_only = SmartOrderRouter(_market(), accepts=lambda venue, trade_type: venue == "KRX")
+    assert _legs(krx_only.route(_order(500), True)) == [("KRX", 500, 0)]
+
+
+class _Client:
+    """Order client double recording the venue code of each send"""
+
+    def __init__(self):
+        self.sent = []
+
+    def place_order(self, order_request, access_token, is_buy, exchange_code, trade_type_code):
+        self.sent.append((exchange_code, order_request.quantity))
+        return OrderResponse(success=True, order_number=f"{len(self.sent):07d}")
+
+
+def test_batch_auto_orders_are_routed_and_booked_per_leg(monkeypatch):
+    client = _Client()
+    monkeypatch.setattr(orders, "create_client", lambda config: client)
+    market = _market()
+    gate = RiskGate(RiskConfig(), lambda code: 70_000)
+    handler = orders.OrderHandler(
+        KiwoomConfig(access_token="token", journal_path=None, session_policy="off"),
+        risk_gate=gate, router=SmartOrderRouter(market)
+    )
+
+    results = asyncio.run(handler.submit_batch([(_order(150), True), (OrderRequest("005930", 10, "70000", "보통", "KRX"), True)]))
+    assert all(result.success for result in results)
+    assert sorted(client.sent) == [("KRX", 10), ("KRX", 50), ("NXT", 100)]
+    assert "AUTO" not in {venue for venue, _ in client.sent}
+    assert results[0].route and sorted(gate.orders) == ["0000001", "0000002", "0000003"]
+    assert gate.exposure.quantity["005930"] == 160
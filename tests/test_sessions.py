@@ -0,0 +1,94 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from engine.sessions import MarketCalendar, SessionOrderQueue
+from models.exceptions import MarketClosedError
+from models.types import OrderRequest, OrderResponse
+
+
+def _at(text):
+    return datetime.strptime(text, "%Y%m%d %H:%M:%S")
+
+
+def _order(trade_type="보통", exchange="KRX"):
+    return OrderRequest("005930", 1, "70000" if trade_type == "보통" else "", trade_type, exchange)
+
+
+def test_regular_day_sessions_per_venue():
+    calendar = MarketCalendar()
+    day = "20261019 "
+    assert calendar.session("KRX", _at(day + "08:35:00")) == "pre_open"
+    assert calendar.session("KRX", _at(day + "09:00:00")) == "regular"
+    assert calendar.session("KRX", _at(day + "15:25:00")) == "closing_auction"
+    assert calendar.session("KRX", _at(day + "18:00:00")) is None
+    assert calendar.session("NXT", _at(day + "09:00:10")) is None
+    assert calendar.session("NXT", _at(day + "09:00:30")) == "main"
+    assert calendar.session("NXT", _at(day + "19:59:59")) == "after_market"
+
+
+def test_holidays_and_shifted_days():
+    calendar = MarketCalendar(extra_holidays=["20261020"])
+    assert calendar.session("KRX", _at("20261009 10:00:00")) is None  # 한글날
+    assert calendar.session("KRX", _at("20261017 10:00:00")) is None  # Saturday
+    assert calendar.session("KRX", _at("20261020 10:00:00")) is None  # configured extra holiday
+
+    # The year's first trading day opens an hour late
+    assert calendar.session("KRX", _at("20260102 09:30:00")) == "pre_open"
+    assert calendar.session("KRX", _at("20260102 10:00:00")) == "regular"
+    assert calendar.session("KRX", _at("20260102 15:25:00")) == "closing_auction"
+    # Exam day shifts the close as well
+    assert calendar.session("KRX", _at("20261119 16:10:00")) == "regular"
+    assert calendar.session("KRX", _at("20261119 16:25:00")) == "closing_auction"
+
+
+def test_check_accepts_remaps_or_points_to_the_next_open():
+    calendar = MarketCalendar()
+    accepted = calendar.check(_order(), _at("20261019 10:00:00"))
+    assert (accepted.accepted, accepted.venue, accepted.session) == (True, "KRX", "regular")
+
+    remapped = calendar.check(_order(), _at("20261019 16:30:00"))
+    assert (remapped.accepted, remapped.remap) == (False, "시간외단일가")
+
+    closed = calendar.check(_order("시장가"), _at("20261016 18:30:00"))
+    assert not closed.accepted and closed.remap is None
+    assert closed.next_open == _at("20261019 08:30:00")
+
+    # AUTO may use NXT's after-market when KRX is closed
+    auto = calendar.check(_order(exchange="AUTO"), _at("20261019 18:30:00"))
+    assert (auto.accepted, auto.venue, auto.session) == (True, "NXT", "after_market")
+
+
+def test_next_open_skips_holidays():
+    calendar = MarketCalendar()
+    assert calendar.next_open(("KRX", "NXT"), "보통", _at("20261008 21:00:00")) == (_at("20261012 08:00:00"), "NXT")
+    assert calendar.next_open(("KRX",), "보통", _at("20261008 21:00:00")) == (_at("20261012 08:30:00"), "KRX")
+
+
+def test_queue_releases_due_orders_and_requeues_early_ones():
+    now = _at("20261019 08:59:59")
+    calendar = MarketCalendar(clock=lambda: now)
+    reopen = now + timedelta(hours=1)
+    sent = []
+
+    async def submit(order_request, is_buy, source):
+        sent.append(order_request.trade_type)
+        if order_request.trade_type == "시장가":
+            raise MarketClosedError("아직 열리지 않았습니다", reopen)
+        return OrderResponse(success=True, order_number="0000123")
+
+    async def main():
+        queue = SessionOrderQueue(submit, calendar)
+        await queue.start()
+        released = queue.enqueue(_order(), True, now)
+        early = queue.enqueue(_order("시장가"), True, now)
+        cancelled = queue.cancel(queue.enqueue(_order(), False, now).queue_id)
+        later = queue.enqueue(_order(), True, now + timedelta(minutes=5))
+        await asyncio.sleep(0.05)
+        await queue.stop()
+        return released, early, cancelled, later
+
+    released, early, cancelled, later = asyncio.run(main())
+    assert sorted(sent) == ["보통", "시장가"]
+    assert (released.status, released.result) == ("sent", "주문번호 0000123")
+    assert (early.status, early.release_at) == ("queued", reopen)
+    assert cancelled.status == "cancelled" and later.status == "queued"
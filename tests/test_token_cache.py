@@ -0,0 +1,76 @@
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from config.settings import KiwoomConfig
+from handlers.auth import AuthHandler
+from kiwoom.token_cache import TokenCache
+from models.types import TokenResponse
+
+
+def _expires(hours: float) -> str:
+    return (datetime.now() + timedelta(hours=hours)).strftime("%Y%m%d%H%M%S")
+
+
+def _token(token: str) -> TokenResponse:
+    return TokenResponse(success=True, token=token, token_type="bearer", expires_dt=_expires(12))
+
+
+def test_store_and_load_skip_malformed_entries(tmp_path):
+    cache = TokenCache(str(tmp_path / "tokens.json"))
+    key = cache.cache_key("appkey", False)
+    with open(cache.path, "w") as f:
+        json.dump({
+            key: {"token": "old", "expires": "20990101000000"},  # older schema
+            "other:real": "not an entry",
+            "third:mock": {"token": "t", "expires_dt": _expires(1), "extra": 1},
+        }, f)
+
+    assert cache.load("appkey", False) is None
+
+    cache.store("appkey", False, _token("fresh"))
+    assert cache.load("appkey", False).token == "fresh"
+    with open(cache.path) as f:
+        assert list(json.load(f)) == [key]
+
+
+def test_non_object_cache_file_is_ignored(tmp_path):
+    cache = TokenCache(str(tmp_path / "tokens.json"))
+    with open(cache.path, "w") as f:
+        json.dump(["not", "a", "mapping"], f)
+
+    assert cache.load("appkey", True) is None
+    response, from_cache = cache.get_or_issue("appkey", True, lambda: _token("issued"))
+    assert (response.token, from_cache) == ("issued", False)
+    assert cache.load("appkey", True).token == "issued"
+
+
+def test_load_cached_token_waits_for_the_lock_off_the_event_loop(tmp_path):
+    fcntl = pytest.importorskip("fcntl")
+    cache = TokenCache(str(tmp_path / "tokens.json"))
+    cache.store("appkey", False, _token("shared"))
+    config = KiwoomConfig(appkey="appkey", secretkey="secret", token_cache_path=cache.path)
+    handler = AuthHandler(config, cache)
+    assert config.access_token is None
+
+    async def scenario():
+        # Another process holding the cache lock
+        fd = os.open(cache.lock_path, os.O_RDWR)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        load = asyncio.create_task(handler.load_cached_token())
+        ticks = 0
+        for _ in range(5):
+            await asyncio.sleep(0.01)
+            ticks += 1
+        assert not load.done()
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+        return ticks, await asyncio.wait_for(load, 1)
+
+    ticks, loaded = asyncio.run(scenario())
+    assert ticks == 5
+    assert loaded
+    assert config.access_token == "shared"
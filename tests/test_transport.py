@@ -0,0 +1,59 @@
+import pytest
+
+from kiwoom.transport import REDACTED, RecordingTransport, ReplayTransport
+from models.exceptions import KiwoomAPIError
+from utils import json_codec
+
+
+URL = "https://api.kiwoom.com/api/dostk/ordr"
+
+
+class _Inner:
+    """Transport double answering with a running counter"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def send(self, method, url, headers, data):
+        self.calls += 1
+        return 200, {"return_code": 0, "ord_no": f"{self.calls:07d}", "token": "issued"}
+
+
+def _headers(api_id="kt10000"):
+    return {"api-id": api_id, "authorization": "Bearer secret", "Content-Type": "application/json"}
+
+
+@pytest.mark.parametrize("name", ["session.jsonl", "session.jsonl.gz"])
+def test_recording_redacts_secrets_and_replays_in_order(tmp_path, name):
+    path = str(tmp_path / "sessions" / name)
+    recorder = RecordingTransport(path, inner=_Inner())
+    recorder.send("post", URL, _headers(), {"stk_cd": "005930", "appkey": "key"})
+    recorder.send("post", URL, _headers(), {"stk_cd": "000660", "appkey": "key"})
+    recorder.close()
+
+    if not name.endswith(".gz"):
+        records = [json_codec.loads(line) for line in open(path, encoding="utf-8")]
+        assert records[0]["headers"]["authorization"] == REDACTED
+        assert records[0]["request"] == {"stk_cd": "005930", "appkey": REDACTED}
+        assert records[0]["response"]["token"] == REDACTED
+        assert (records[0]["method"], records[0]["endpoint"], records[0]["api_id"]) == ("POST", "/api/dostk/ordr", "kt10000")
+
+    replay = ReplayTransport(path, speed=0)
+    assert len(replay) == 2
+    assert [replay.send("POST", URL, _headers(), None)[1]["ord_no"] for _ in range(3)] == [
+        "0000001", "0000002", "0000001"
+    ]
+
+
+def test_replay_without_loop_or_match_raises(tmp_path):
+    path = str(tmp_path / "session.jsonl")
+    recorder = RecordingTransport(path, inner=_Inner())
+    recorder.send("POST", URL, _headers(), {})
+    recorder.close()
+
+    replay = ReplayTransport(path, speed=0, loop=False)
+    assert replay.send("POST", URL, _headers(), {})[0] == 200
+    with pytest.raises(KiwoomAPIError):
+        replay.send("POST", URL, _headers(), {})
+    with pytest.raises(KiwoomAPIError):
+        replay.send("POST", URL, _headers("kt10001"), {})
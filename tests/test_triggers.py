@@ -0,0 +1,108 @@
+from config.constants import TRIGGER_HISTORY
+from engine.triggers import COMPACT_MIN_STALE, TriggerCondition, TriggerEngine
+
+
+def _engine(last_price=None):
+    async def submit(request, is_buy, source):
+        raise AssertionError("alert-only conditions send no orders")
+
+    return TriggerEngine(submit, lambda code: last_price)
+
+
+def _arm(engine, condition, stock_code="005930", reference_price=None, **kwargs):
+    return engine.arm(
+        TriggerCondition(engine.new_id(), stock_code, condition, **kwargs), reference_price
+    )
+
+
+def test_price_thresholds_fire_once_crossed():
+    engine = _engine()
+    above = _arm(engine, "price_above", trigger_price=71_000)
+    below = _arm(engine, "price_below", trigger_price=69_000)
+
+    engine.on_tick("005930", 70_000)
+    assert above.is_armed and below.is_armed
+    engine.on_tick("005930", 71_500)
+    assert (above.status, above.fire_price) == ("fired", 71_500)
+    assert below.is_armed
+
+
+def test_trailing_stop_follows_new_highs():
+    engine = _engine()
+    amount = _arm(engine, "trailing_stop", reference_price=10_000, trail_amount=500)
+    percent = _arm(engine, "trailing_stop", reference_price=10_000, trail_percent=10)
+
+    for price in (10_400, 11_000, 10_600):
+        engine.on_tick("005930", price)
+    assert amount.is_armed and percent.is_armed
+
+    engine.on_tick("005930", 10_500)
+    assert amount.status == "fired" and percent.is_armed
+    engine.on_tick("005930", 9_900)
+    assert percent.status == "fired"
+
+
+def test_trailing_buy_fires_on_rise_from_trough():
+    engine = _engine()
+    condition = _arm(engine, "trailing_buy", reference_price=10_000, trail_amount=300)
+    engine.on_tick("005930", 9_500)
+    engine.on_tick("005930", 9_700)
+    assert condition.is_armed
+    engine.on_tick("005930", 9_800)
+    assert condition.status == "fired"
+
+
+def test_oco_fire_cancels_sibling_and_frees_symbol():
+    engine = _engine()
+    take = _arm(engine, "price_above", trigger_price=11_000, oco_group="g")
+    stop = _arm(engine, "price_below", trigger_price=9_000, oco_group="g")
+    assert engine.has_conditions("005930")
+
+    engine.on_tick("005930", 11_000)
+    assert take.status == "fired"
+    assert stop.status == "cancelled"
+    assert not engine.has_conditions("005930")
+    assert engine.armed_symbols() == []
+    assert engine.list() == []
+    assert {c.trigger_id for c in engine.list(include_inactive=True)} == {take.trigger_id, stop.trigger_id}
+
+
+def test_cancel_frees_symbol_and_keeps_status_queryable():
+    engine = _engine()
+    condition = _arm(engine, "price_above", trigger_price=11_000)
+    engine.cancel(condition.trigger_id)
+
+    assert not engine.has_conditions("005930")
+    assert engine.get(condition.trigger_id).status == "cancelled"
+    engine.on_tick("005930", 12_000)
+    assert condition.status == "cancelled"
+
+
+def test_failed_arm_does_not_mark_symbol():
+    engine = _engine(last_price=None)
+    try:
+        _arm(engine, "trailing_stop", trail_amount=100)
+    except ValueError:
+        pass
+    assert not engine.has_conditions("005930")
+
+
+def test_arm_cancel_cycles_stay_bounded():
+    engine = _engine(last_price=10_000)
+    resting = _arm(engine, "price_above", trigger_price=20_000)
+    _arm(engine, "trailing_stop", trail_amount=1_000)
+
+    for i in range(5_000):
+        condition = _arm(engine, "price_above" if i % 2 else "trailing_stop",
+                         trigger_price=30_000, trail_amount=2_000)
+        engine.cancel(condition.trigger_id)
+
+    book = engine._symbols["005930"]
+    assert len(engine._conditions) == 2
+    assert len(engine._finished) == TRIGGER_HISTORY
+    assert len(book.above) + len(book.trail_down) <= 2 + 2 * COMPACT_MIN_STALE
+
+    engine.on_tick("005930", 20_000)
+    assert resting.status == "fired"
+    engine.on_tick("005930", 18_000)
+    assert not engine.has_conditions("005930")
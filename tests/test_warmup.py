@@ -0,0 +1,107 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from config.settings import KiwoomConfig
+from engine.reference import ReferenceDataCache
+from handlers.auth import AuthHandler
+from kiwoom.token_cache import TokenCache
+from models.types import TokenResponse
+from engine.warmup import STEP_FAILED, STEP_OK, STEP_SKIPPED, WarmupScheduler
+
+
+def _scheduler(token_ok=True, access_token="token", **config):
+    config.setdefault("paper_trading", True)
+    config.setdefault("paper_cash", 12_345_678)  # a broker of its own
+    config.setdefault("journal_path", None)
+    requested = []
+
+    async def ensure_token(min_valid_sec):
+        requested.append(min_valid_sec)
+        return token_ok, "토큰 유효" if token_ok else "토큰 발급 실패"
+
+    scheduler = WarmupScheduler(
+        KiwoomConfig(access_token=access_token, **config), ensure_token, ReferenceDataCache()
+    )
+    return scheduler, requested
+
+
+def _statuses(report):
+    return {step.name: step.status for step in report.steps}
+
+
+def test_paper_mode_skips_rest_steps_and_loads_holdings():
+    scheduler, requested = _scheduler()
+    seen = []
+    scheduler.reference.add_holdings_listener(seen.append)
+
+    report = asyncio.run(scheduler.run("manual"))
+    assert _statuses(report) == {
+        "token": STEP_OK, "connections": STEP_SKIPPED, "holdings": STEP_OK,
+        "symbols": STEP_SKIPPED, "limits": STEP_SKIPPED, "health": STEP_OK,
+    }
+    assert report.ok and scheduler.last_report is report and requested
+    assert seen == [[]] and "holdings" in scheduler.reference.loaded_at
+
+
+def test_token_failure_skips_everything_after_it():
+    scheduler, _ = _scheduler(token_ok=False)
+    report = asyncio.run(scheduler.run())
+    assert not report.ok
+    assert report.steps[0].detail == "토큰 발급 실패"
+    assert [(step.status, step.detail) for step in report.steps[1:]] == [(STEP_SKIPPED, "토큰 없음")] * 5
+
+
+def test_selected_steps_only_and_missing_token_fails_holdings():
+    scheduler, requested = _scheduler(access_token=None)
+    report = asyncio.run(scheduler.run("startup", steps=("holdings",)))
+    assert [step.name for step in report.steps] == ["holdings"]
+    assert report.steps[0].status == STEP_FAILED and not requested
+    assert "holdings" not in scheduler.reference.loaded_at
+
+
+def test_next_run_inside_window_weekends_and_disabled():
+    scheduler, _ = _scheduler()
+    in_window = datetime(2026, 10, 19, 8, 55)
+    assert scheduler.next_run(in_window) == in_window
+    assert scheduler.next_run(datetime(2026, 10, 19, 9, 30)) == datetime(2026, 10, 20, 8, 50)
+    assert scheduler.next_run(datetime(2026, 10, 16, 12, 0)) == datetime(2026, 10, 19, 8, 50)
+
+    disabled, _ = _scheduler(warmup_time=None)
+    assert disabled.next_run(in_window) is None
+
+
+class _TokenClient:
+    """Token endpoint double counting issued tokens"""
+
+    def __init__(self, issued):
+        self.issued = issued
+
+    def get_token(self, token_request):
+        self.issued.append(token_request.appkey)
+        expires = (datetime.now() + timedelta(hours=24)).strftime("%Y%m%d%H%M%S")
+        return TokenResponse(success=True, token=f"token-{len(self.issued)}", expires_dt=expires)
+
+
+def test_processes_warming_up_together_share_one_issued_token(tmp_path):
+    path = str(tmp_path / "tokens.json")
+    expiring = (datetime.now() + timedelta(minutes=10)).strftime("%Y%m%d%H%M%S")
+    issued = []
+    schedulers = []
+    for _ in range(2):
+        # Each server process has its own config and cache handle on the same file
+        config = KiwoomConfig(
+            appkey="appkey", secretkey="secret", access_token="yesterday", token_expires_dt=expiring,
+            token_cache_path=path, journal_path=None
+        )
+        auth = AuthHandler(config, TokenCache(path))
+        auth.client = _TokenClient(issued)
+        schedulers.append(WarmupScheduler(config, auth.ensure_token, ReferenceDataCache()))
+
+    async def main():
+        return await asyncio.gather(*(scheduler.run(steps=("token",)) for scheduler in schedulers))
+
+    reports = asyncio.run(main())
+    assert all(report.ok for report in reports)
+    assert issued == ["appkey"]
+    assert {scheduler.config.access_token for scheduler in schedulers} == {"token-1"}
+    assert sorted(report.steps[0].detail.split()[0] for report in reports) == ["재발급", "캐시"]
@@ -0,0 +1,207 @@
+"""
+Admission control for concurrent tool calls
+
+A call runs when a global slot and a slot of its session are free.
+Otherwise it waits in one bounded queue, ordered by priority and then
+arrival, until a slot frees up or its deadline passes. Order/cancel calls
+are granted first and have slots that other calls cannot take. When the
+queue is full, an arriving call evicts the newest waiter of a lower
+priority, or is turned away itself.
+"""
+
+import asyncio
+import bisect
+import itertools
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Hashable, List, Optional
+
+from config.constants import PRIORITY_ORDER, PRIORITY_READ, TOOL_PRIORITIES
+from models.exceptions import OverloadError
+
+
+SHED_QUEUE_FULL = "queue_full"
+SHED_EVICTED = "evicted"
+SHED_TIMEOUT = "timeout"
+
+
+@dataclass
+class AdmissionStats:
+    """Counters per priority"""
+    admitted: Dict[int, int] = field(default_factory=dict)
+    waited: Dict[int, int] = field(default_factory=dict)
+    shed: Dict[str, Dict[int, int]] = field(default_factory=dict)
+    wait_ms_total: Dict[int, float] = field(default_factory=dict)
+    wait_ms_max: Dict[int, float] = field(default_factory=dict)
+
+    def record_admit(self, priority: int, wait_ms: Optional[float]) -> None:
+        self.admitted[priority] = self.admitted.get(priority, 0) + 1
+        if wait_ms is not None:
+            self.waited[priority] = self.waited.get(priority, 0) + 1
+            self.wait_ms_total[priority] = self.wait_ms_total.get(priority, 0.0) + wait_ms
+            self.wait_ms_max[priority] = max(self.wait_ms_max.get(priority, 0.0), wait_ms)
+
+    def record_shed(self, reason: str, priority: int) -> None:
+        counts = self.shed.setdefault(reason, {})
+        counts[priority] = counts.get(priority, 0) + 1
+
+
+@dataclass(slots=True)
+class _Waiter:
+    priority: int
+    seq: int
+    session: Hashable
+    future: asyncio.Future
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class AdmissionController:
+    """Bound in-flight tool calls globally and per session, with a priority queue"""
+
+    def __init__(
+        self,
+        max_concurrent: int = 32,
+        max_per_session: int = 8,
+        queue_size: int = 128,
+        queue_timeout: float = 10.0,
+        order_reserved: int = 4
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_per_session = max_per_session
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        # Slots only order/cancel calls may use, so a flood of reads cannot hold them all
+        self.order_reserved = min(order_reserved, max(0, max_concurrent - 1))
+        self.stats = AdmissionStats()
+        self.in_flight = 0
+        self._sessions: Dict[Hashable, int] = {}
+        # Sorted by (priority, arrival)
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_concurrent > 0
+
+    @property
+    def sessions(self) -> int:
+        return len(self._sessions)
+
+    def queued(self) -> Dict[int, int]:
+        """Waiting calls per priority"""
+        counts: Dict[int, int] = {}
+        for waiter in self._waiters:
+            if not waiter.future.done():
+                counts[waiter.priority] = counts.get(waiter.priority, 0) + 1
+        return counts
+
+    @asynccontextmanager
+    async def admit(self, tool: str, session: Hashable = None) -> AsyncIterator[None]:
+        """Hold a slot for the duration of a call, or raise OverloadError"""
+        if not self.enabled:
+            yield
+            return
+        await self._acquire(TOOL_PRIORITIES.get(tool, PRIORITY_READ), session)
+        try:
+            yield
+        finally:
+            self._release(session)
+
+    def _can_run(self, priority: int, session: Hashable) -> bool:
+        limit = self.max_concurrent if priority == PRIORITY_ORDER else self.max_concurrent - self.order_reserved
+        if self.in_flight >= limit:
+            return False
+        return self.max_per_session <= 0 or self._sessions.get(session, 0) < self.max_per_session
+
+    def _take(self, session: Hashable) -> None:
+        self.in_flight += 1
+        self._sessions[session] = self._sessions.get(session, 0) + 1
+
+    def _release(self, session: Hashable) -> None:
+        self.in_flight -= 1
+        remaining = self._sessions.get(session, 0) - 1
+        if remaining > 0:
+            self._sessions[session] = remaining
+        else:
+            self._sessions.pop(session, None)
+        self._grant()
+
+    def _grant(self) -> None:
+        """Hand free slots to waiters in priority order, skipping sessions at their cap"""
+        index = 0
+        while index < len(self._waiters) and self.in_flight < self.max_concurrent:
+            waiter = self._waiters[index]
+            if waiter.future.done():
+                del self._waiters[index]
+            elif self._can_run(waiter.priority, waiter.session):
+                del self._waiters[index]
+                self._take(waiter.session)
+                waiter.future.set_result(None)
+            else:
+                index += 1
+
+    async def _acquire(self, priority: int, session: Hashable) -> None:
+        if not self._waiters and self._can_run(priority, session):
+            self._take(session)
+            self.stats.record_admit(priority, None)
+            return
+
+        if len(self._waiters) >= self.queue_size:
+            self._make_room(priority)
+
+        started = time.perf_counter()
+        waiter = _Waiter(priority, next(self._seq), session, asyncio.get_running_loop().create_future())
+        bisect.insort(self._waiters, waiter)
+        self._grant()
+        try:
+            await asyncio.wait_for(waiter.future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            if self._granted(waiter):
+                # Granted as the deadline passed: the slot is ours, so run
+                self.stats.record_admit(priority, (time.perf_counter() - started) * 1000)
+                return
+            self._discard(waiter)
+            self.stats.record_shed(SHED_TIMEOUT, priority)
+            raise OverloadError(
+                f"대기 시간 {self.queue_timeout:g}초를 넘겨 요청이 취소되었습니다", SHED_TIMEOUT
+            ) from None
+        except asyncio.CancelledError:
+            if self._granted(waiter):
+                # Granted just as the caller went away
+                self._release(session)
+            self._discard(waiter)
+            raise
+        self.stats.record_admit(priority, (time.perf_counter() - started) * 1000)
+
+    @staticmethod
+    def _granted(waiter: _Waiter) -> bool:
+        """Whether _grant() took a slot for the waiter"""
+        future = waiter.future
+        return future.done() and not future.cancelled() and future.exception() is None
+
+    def _make_room(self, priority: int) -> None:
+        """Evict the newest lower-priority waiter, or shed the arriving call"""
+        for index in range(len(self._waiters) - 1, -1, -1):
+            victim = self._waiters[index]
+            if victim.future.done():
+                del self._waiters[index]
+                return
+            if victim.priority > priority:
+                del self._waiters[index]
+                self.stats.record_shed(SHED_EVICTED, victim.priority)
+                victim.future.set_exception(
+                    OverloadError("우선순위가 높은 요청에 밀려 대기 중인 요청이 취소되었습니다", SHED_EVICTED)
+                )
+                return
+            break
+        self.stats.record_shed(SHED_QUEUE_FULL, priority)
+        raise OverloadError(f"대기열이 가득 찼습니다 ({self.queue_size}건)", SHED_QUEUE_FULL)
+
+    def _discard(self, waiter: _Waiter) -> None:
+        index = bisect.bisect_left(self._waiters, waiter)
+        if index < len(self._waiters) and self._waiters[index] is waiter:
+            del self._waiters[index]
+        self._grant()
@@ -37,4 +37,12 @@ def get_remaining_time(expires_dt: str) -> Optional[str]:
         remaining = expire_dt - current_dt
         return str(remaining).split('.')[0]  # Remove microseconds
     except (ValueError, TypeError):
-        return None 
\ No newline at end of file
+        return None 
+
+def seconds_until_expiry(expires_dt: Optional[str]) -> Optional[float]:
+    """Seconds until expiration (negative once expired; None if unparseable)"""
+    try:
+        expire_dt = datetime.strptime(expires_dt, "%Y%m%d%H%M%S")
+        return (expire_dt - datetime.now()).total_seconds()
+    except (ValueError, TypeError):
+        return None
@@ -0,0 +1,85 @@
+"""
+JSON codec for upstream responses, realtime messages and rendered output
+
+Uses orjson when it is installed (several times faster, and it decodes
+bytes without an intermediate str) and the stdlib otherwise. Both produce
+compact, non-ASCII-preserving output. Call sites use `json_codec.loads` /
+`json_codec.dumps` so `set_codec` takes effect everywhere.
+"""
+
+import json
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+Loads = Callable[[Union[bytes, bytearray, str]], Any]
+Dumps = Callable[..., str]
+
+# Reused encoder for the common case; json.dumps builds a new one per call for non-default options
+_compact = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def _stdlib_dumps(
+    obj: Any,
+    indent: bool = False,
+    sort_keys: bool = False,
+    default: Optional[Callable[[Any], Any]] = None
+) -> str:
+    if not (indent or sort_keys or default):
+        return _compact.encode(obj)
+    return json.dumps(
+        obj,
+        ensure_ascii=False,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+        sort_keys=sort_keys,
+        default=default
+    )
+
+
+def _orjson_dumps(
+    obj: Any,
+    indent: bool = False,
+    sort_keys: bool = False,
+    default: Optional[Callable[[Any], Any]] = None
+) -> str:
+    option = orjson.OPT_NON_STR_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    return orjson.dumps(obj, default=default, option=option).decode("utf-8")
+
+
+CODECS: Dict[str, Tuple[Loads, Dumps]] = {"json": (json.loads, _stdlib_dumps)}
+if orjson is not None:
+    CODECS["orjson"] = (orjson.loads, _orjson_dumps)
+
+DEFAULT_CODEC = "orjson" if orjson is not None else "json"
+
+_name = DEFAULT_CODEC
+# Decode JSON from bytes or str
+loads: Loads = CODECS[_name][0]
+# Encode to a compact (or 2-space indented) str: dumps(obj, indent=False, sort_keys=False, default=None)
+dumps: Dumps = CODECS[_name][1]
+
+
+def set_codec(name: Optional[str]) -> str:
+    """Select a codec by name ("json", "orjson"; None or "auto" picks the fastest available)"""
+    global _name, loads, dumps
+    if not name or name == "auto":
+        name = DEFAULT_CODEC
+    if name not in CODECS:
+        raise ValueError(f"JSON codec not available: {name} (available: {', '.join(CODECS)})")
+    _name = name
+    loads, dumps = CODECS[name]
+    return name
+
+
+def codec_name() -> str:
+    """Name of the active codec"""
+    return _name
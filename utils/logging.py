@@ -2,36 +2,178 @@
 Logging utilities for Kiwoom MCP Server
 """
 
+import atexit
 import logging
-from typing import Optional
+import logging.handlers
+import os
+import queue
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
+from utils import json_codec
 
-def setup_logging(level: str = "INFO", name: Optional[str] = None) -> logging.Logger:
-    """Setup logging configuration"""
+
+AUDIT_LOGGER_NAME = "kiwoom.audit"
+
+# Record attributes emitted as structured fields when present
+STRUCTURED_FIELDS = (
+    "event", "tool", "api_id", "latency_ms", "ord_no", "journal_id", "stock_code", "source", "route"
+)
+
+# (logger, its queue handler, listener) per running pipeline
+_pipelines: List[Tuple[logging.Logger, logging.Handler, logging.handlers.QueueListener]] = []
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that defers message formatting to the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Pass the record through unformatted (the queue is in-process)"""
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of DEBUG/INFO records per logger-name prefix"""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        # Longest prefix wins
+        self.rates = sorted(rates.items(), key=lambda kv: len(kv[0]), reverse=True)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        for prefix, rate in self.rates:
+            if record.name == prefix or record.name.startswith(prefix + "."):
+                return rate >= 1 or random.random() < rate
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record with structured fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = value
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json_codec.dumps(data, default=str)
+
+
+def parse_sampling(spec: Optional[str]) -> Dict[str, float]:
+    """Parse 'kiwoom.client=0.1,engine.triggers=0.01' into rates"""
+    rates = {}
+    for part in (spec or "").split(","):
+        if "=" in part:
+            name, rate = part.split("=", 1)
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+def _start_pipeline(target: logging.Logger, handler: logging.Handler, filters: List[logging.Filter]) -> None:
+    """Route a logger through a queue to a handler on a listener thread"""
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = LazyQueueHandler(log_queue)
+    for log_filter in filters:
+        queue_handler.addFilter(log_filter)
+    target.addHandler(queue_handler)
+
+    listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    _pipelines.append((target, queue_handler, listener))
+
+
+def setup_logging(
+    level: str = "INFO",
+    name: Optional[str] = None,
+    log_format: str = "text",
+    sampling: Optional[str] = None,
+    audit_path: Optional[str] = None
+) -> logging.Logger:
+    """Setup non-blocking logging and return the named logger
+
+    Records are queued by the caller and formatted/written by a listener
+    thread, so log I/O never runs on the event loop.
+    """
     logger = logging.getLogger(name or "kiwoom-mcp")
-    
-    # Don't add handlers if already configured
-    if logger.handlers:
-        return logger
-    
+
     # Set level
     numeric_level = getattr(logging, level.upper(), None)
     if not isinstance(numeric_level, int):
         raise ValueError(f'Invalid log level: {level}')
-    
-    logger.setLevel(numeric_level)
-    
-    # Create console handler
+
+    root = logging.getLogger()
+
+    # Don't add handlers if already configured
+    if _pipelines:
+        return logger
+
+    root.setLevel(numeric_level)
+
+    # Console (stderr) handler - stdout is the MCP transport
     handler = logging.StreamHandler()
     handler.setLevel(numeric_level)
-    
-    # Create formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    handler.setFormatter(formatter)
-    
-    # Add handler to logger
-    logger.addHandler(handler)
-    
-    return logger 
\ No newline at end of file
+    if log_format == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        ))
+
+    rates = parse_sampling(sampling)
+    _start_pipeline(root, handler, [SamplingFilter(rates)] if rates else [])
+
+    # Order audit trail: separate rotating JSON file, never sampled
+    if audit_path:
+        audit_path = os.path.expanduser(audit_path)
+        directory = os.path.dirname(audit_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        audit_handler = logging.handlers.RotatingFileHandler(
+            audit_path, maxBytes=10 * 1024 * 1024, backupCount=10, encoding="utf-8"
+        )
+        audit_handler.setFormatter(JsonFormatter())
+        audit_logger = logging.getLogger(AUDIT_LOGGER_NAME)
+        audit_logger.setLevel(logging.INFO)
+        audit_logger.propagate = False
+        _start_pipeline(audit_logger, audit_handler, [])
+
+    atexit.register(shutdown_logging)
+    return logger
+
+
+def shutdown_logging() -> None:
+    """Flush queued records, stop listener threads and detach the queue handlers
+
+    Records logged afterwards are not queued for a stopped listener;
+    warnings still reach stderr through logging's last-resort handler.
+    """
+    while _pipelines:
+        target, queue_handler, listener = _pipelines.pop()
+        target.removeHandler(queue_handler)
+        queue_handler.close()
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def audit(event: str, msg: str, *args: Any, **fields: Any) -> None:
+    """Write an order audit record (message args are formatted lazily)"""
+    audit_logger = logging.getLogger(AUDIT_LOGGER_NAME)
+    if audit_logger.isEnabledFor(logging.INFO):
+        fields["event"] = event
+        audit_logger.info(msg, *args, extra=fields)
+
+
+def elapsed_ms(started: float) -> float:
+    """Milliseconds since a time.perf_counter() value"""
+    return round((time.perf_counter() - started) * 1000, 3)
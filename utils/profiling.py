@@ -0,0 +1,307 @@
+"""
+Order-entry latency tracing and runtime-toggled profilers
+
+`order_trace()` opens a trace for one order and `mark(stage)` records a
+monotonic timestamp when a stage ends. The trace lives in a context
+variable, so marks made in the worker thread of `asyncio.to_thread` land
+on the same trace. When tracing is off, `mark` is one context lookup.
+An order split across venues continues as one `leg_trace()` per leg.
+"""
+
+import cProfile
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+
+# Stage names in the order they are marked on the order path
+ORDER_STAGES = (
+    "parse",      # tool arguments -> OrderRequest
+    "rate_limit",  # algo child waiting for the order rate limiter
+    "session",    # market-session check against the trading calendar
+    "route",      # KRX/NXT split from cached top of book (exchange AUTO)
+    "risk",       # pre-trade risk check and reservation
+    "codes",      # token check, EXCHANGE_TYPES/TRADE_TYPES mapping, client selection
+    "journal",    # intent written to the order journal
+    "handoff",    # waiting for a to_thread worker
+    "build",      # URL, headers and payload
+    "upstream",   # connect (DNS/TLS when not pooled), send, server time, response headers
+    "download",   # response body
+    "decode",     # JSON decode
+    "response",   # OrderResponse built (paper: simulated execution)
+    "resume",     # event loop picking the result back up
+    "bookkeeping",  # journal outcome, risk release, audit, listeners
+    "render",     # tool response text
+)
+
+
+@dataclass
+class OrderTrace:
+    """Stage end timestamps for one order"""
+    source: str
+    started: float
+    marks: List[Tuple[str, float]] = field(default_factory=list)
+    failed: bool = False
+    # Continued by per-leg traces, which are recorded instead
+    split: bool = False
+
+    def durations(self) -> List[Tuple[str, float]]:
+        """(stage, seconds) in order marked"""
+        result = []
+        previous = self.started
+        for stage, at in self.marks:
+            result.append((stage, at - previous))
+            previous = at
+        return result
+
+    @property
+    def total(self) -> float:
+        return self.marks[-1][1] - self.started if self.marks else 0.0
+
+
+class StageStats:
+    """Count, total, max and a window of recent samples for percentiles"""
+
+    __slots__ = ("count", "total", "max", "recent")
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: Deque[float] = deque(maxlen=window)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.recent.append(seconds)
+
+    def percentile(self, p: float) -> float:
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class LatencyProfiler:
+    """Aggregate order traces per stage"""
+
+    def __init__(self, enabled: bool = False, window: int = 1024, keep_traces: int = 200):
+        self.enabled = enabled
+        self.window = window
+        self._lock = threading.Lock()
+        self.stages: Dict[str, StageStats] = {}
+        self.totals = StageStats(window)
+        self.traces: Deque[OrderTrace] = deque(maxlen=keep_traces)
+
+    def record(self, trace: OrderTrace) -> None:
+        """Fold a finished trace into the aggregates"""
+        if not trace.marks:
+            return
+        with self._lock:
+            for stage, seconds in trace.durations():
+                stats = self.stages.get(stage)
+                if stats is None:
+                    stats = self.stages[stage] = StageStats(self.window)
+                stats.add(seconds)
+            self.totals.add(trace.total)
+            self.traces.append(trace)
+
+    def reset(self) -> None:
+        """Drop aggregates and kept traces"""
+        with self._lock:
+            self.stages = {}
+            self.totals = StageStats(self.window)
+            self.traces.clear()
+
+    def slowest(self, count: int) -> List[OrderTrace]:
+        """Slowest kept traces"""
+        with self._lock:
+            return sorted(self.traces, key=lambda t: t.total, reverse=True)[:count]
+
+
+_profiler = LatencyProfiler()
+_current: ContextVar[Optional[OrderTrace]] = ContextVar("order_trace", default=None)
+
+
+def get_latency_profiler() -> LatencyProfiler:
+    """Process-wide order latency profiler"""
+    return _profiler
+
+
+@contextmanager
+def order_trace(source: str) -> Iterator[Optional[OrderTrace]]:
+    """Trace the enclosed order path (no-op when disabled or already inside a trace)"""
+    if not _profiler.enabled or _current.get() is not None:
+        yield None
+        return
+    trace = OrderTrace(source, time.perf_counter())
+    token = _current.set(trace)
+    try:
+        yield trace
+    except BaseException:
+        trace.failed = True
+        raise
+    finally:
+        _current.reset(token)
+        if not trace.split:
+            _profiler.record(trace)
+
+
+@contextmanager
+def leg_trace(leg: str) -> Iterator[Optional[OrderTrace]]:
+    """Trace one leg of a split order on its own, carrying the marks made before the split
+
+    Legs are sent concurrently, so their stages would interleave on a
+    shared trace. Enter this inside the leg's task; the parent trace is
+    then not recorded.
+    """
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    parent.split = True
+    trace = OrderTrace(f"{parent.source}/{leg}", parent.started, list(parent.marks))
+    token = _current.set(trace)
+    try:
+        yield trace
+    except BaseException:
+        trace.failed = True
+        raise
+    finally:
+        _current.reset(token)
+        _profiler.record(trace)
+
+
+def mark(stage: str, at: Optional[float] = None) -> None:
+    """Record the end of a stage on the current trace"""
+    trace = _current.get()
+    if trace is not None:
+        trace.marks.append((stage, at if at is not None else time.perf_counter()))
+
+
+# Shortest sampling interval; below it the sampler thread would hog the GIL
+MIN_SAMPLING_INTERVAL = 0.001
+
+
+class StackSampler:
+    """Sample every thread's stack on an interval and count folded stacks
+
+    Output is one `frame;frame;...;frame count` line per stack, the
+    collapsed format py-spy writes with `--format raw`, readable by
+    flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self, path: str) -> int:
+        """Stop sampling and write folded stacks; returns the sample count"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        return sum(self.samples.values())
+
+
+class RuntimeProfiler:
+    """Start and stop a sampling profiler or cProfile without a restart
+
+    cProfile sees only the thread that started it (the event loop), while
+    the sampler sees every thread including to_thread workers.
+    """
+
+    MODES = ("sampling", "cprofile")
+
+    def __init__(self, output_dir: str = "~/.kiwoom_mcp/profiles"):
+        self.output_dir = output_dir
+        self.mode: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self._sampler: Optional[StackSampler] = None
+        self._cprofile: Optional[cProfile.Profile] = None
+        self.logger = logging.getLogger(__name__)
+
+    def start(self, mode: str, interval: float = 0.005) -> None:
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown profiler mode: {mode}")
+        if self.mode is not None:
+            raise RuntimeError(f"{self.mode} profiler is already running")
+        if mode == "sampling" and not interval >= MIN_SAMPLING_INTERVAL:
+            raise ValueError(f"Sampling interval must be at least {MIN_SAMPLING_INTERVAL * 1000:g}ms")
+        if mode == "sampling":
+            self._sampler = StackSampler(interval)
+            self._sampler.start()
+        else:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        self.mode = mode
+        self.started_at = time.time()
+        self.logger.info("Started %s profiler", mode)
+
+    def stop(self, name: Optional[str] = None) -> Tuple[str, int]:
+        """Stop the running profiler and dump it under output_dir; returns (path, samples or calls)
+
+        `name` is a bare file name; anything with a directory part is
+        refused (ValueError) and the profiler keeps running.
+        """
+        if self.mode is None:
+            raise RuntimeError("No profiler is running")
+        if name is None:
+            suffix = "folded" if self.mode == "sampling" else "pstats"
+            name = time.strftime("%Y%m%d-%H%M%S") + f"-{self.mode}.{suffix}"
+        elif os.path.basename(name) != name or name in ("", ".", ".."):
+            raise ValueError(f"Profile output must be a file name, not a path: {name!r}")
+        directory = os.path.expanduser(self.output_dir)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, name)
+
+        if self.mode == "sampling":
+            count = self._sampler.stop(path)
+            self._sampler = None
+        else:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(path)
+            count = sum(entry.callcount for entry in self._cprofile.getstats())
+            self._cprofile = None
+        self.logger.info("Stopped %s profiler, wrote %s", self.mode, path)
+        self.mode = None
+        self.started_at = None
+        return path, count
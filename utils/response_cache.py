@@ -0,0 +1,167 @@
+"""
+Response cache with in-flight coalescing for idempotent tool calls
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+import mcp.types as types
+
+from utils import json_codec
+
+
+CacheKey = Tuple[str, str, str]
+
+
+def make_key(tool: str, arguments: Optional[Dict[str, Any]], account: str) -> CacheKey:
+    """Key on tool, canonical arguments and account"""
+    normalized = json_codec.dumps(arguments or {}, sort_keys=True, default=str)
+    return tool, normalized, account
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters"""
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    by_tool: Dict[str, List[int]] = field(default_factory=dict)
+
+    def record(self, tool: str, hit: bool) -> None:
+        counts = self.by_tool.setdefault(tool, [0, 0])
+        counts[0 if hit else 1] += 1
+
+
+class ResponseCache:
+    """LRU cache of rendered tool results with per-entry TTL and a byte budget
+
+    Concurrent calls for the same key share one in-flight task. Only
+    successful results are stored.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 8 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self.bytes = 0
+        # key -> (expires_at, size, result)
+        self._entries: "OrderedDict[CacheKey, Tuple[float, int, List[types.TextContent]]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        # Bumped on invalidation (all tools / per tool) so results computed across it are not stored
+        self._generation = 0
+        self._tool_generations: Dict[str, int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    async def get_or_call(
+        self,
+        key: CacheKey,
+        ttl: float,
+        call: Callable[[], Awaitable[List[types.TextContent]]],
+        cacheable: Callable[[List[types.TextContent]], bool] = lambda result: True
+    ) -> List[types.TextContent]:
+        """Return a fresh cached result, join an identical in-flight call, or make the call"""
+        tool = key[0]
+        self._loop = asyncio.get_running_loop()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                self.stats.record(tool, True)
+                return entry[2]
+            self._remove(key)
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats.coalesced += 1
+            self.stats.record(tool, True)
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+            # The leader was cancelled, not this caller: make the call afresh
+            return await self.get_or_call(key, ttl, call, cacheable)
+
+        self.stats.misses += 1
+        self.stats.record(tool, False)
+        future = self._loop.create_future()
+        self._inflight[key] = future
+        generation = self._generation_of(tool)
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unjoined failure is not reported as unhandled
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            if cacheable(result) and generation == self._generation_of(tool):
+                self._store(key, ttl, result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    def _store(self, key: CacheKey, ttl: float, result: List[types.TextContent]) -> None:
+        size = sum(len(content.text) for content in result) + len(key[1])
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + ttl, size, result)
+        self.bytes += size
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats.evictions += 1
+
+    def _remove(self, key: CacheKey) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+
+    def _generation_of(self, tool: str) -> Tuple[int, int]:
+        return self._generation, self._tool_generations.get(tool, 0)
+
+    def invalidate(self, tools: Optional[List[str]] = None) -> int:
+        """Drop entries for the given tools (all when None); returns the count dropped"""
+        if tools is None:
+            self._generation += 1
+        else:
+            for tool in tools:
+                self._tool_generations[tool] = self._tool_generations.get(tool, 0) + 1
+        keys = [k for k in self._entries if tools is None or k[0] in tools]
+        for key in keys:
+            self._remove(key)
+        self.stats.invalidations += len(keys)
+        return len(keys)
+
+    def invalidate_threadsafe(self, tools: Optional[List[str]] = None) -> None:
+        """Invalidate from any thread (paper fills arrive on worker threads)"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            # Nothing was ever cached on a live loop
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self.invalidate(tools)
+        else:
+            loop.call_soon_threadsafe(self.invalidate, tools)